@@ -59,6 +59,7 @@ def create_app(
         postgres_dsn=postgres_dsn or env_settings.postgres_dsn,
         market_data_provider=normalize_market_data_provider(market_data_provider or env_settings.market_data_provider),
         job_executor_mode=normalize_job_executor_mode(job_executor_mode or env_settings.job_executor_mode),
+        job_executor_workers=env_settings.job_executor_workers,
         cors_allowed_origins=env_settings.cors_allowed_origins,
         cors_allow_credentials=env_settings.cors_allow_credentials,
         cors_allow_methods=env_settings.cors_allow_methods,
@@ -132,6 +133,7 @@ def create_app(
         enabled_contexts=settings.enabled_contexts,
         get_current_user=get_current_user,
         job_executor_mode=settings.job_executor_mode,
+        job_executor_workers=settings.job_executor_workers,
     )
 
     @app.get("/internal/metrics")
@@ -104,7 +104,7 @@ def build_parser() -> argparse.ArgumentParser:
     resolve.add_argument("--storage-backend", default=None, help="storage backend: postgres|memory")
     resolve.add_argument("--postgres-dsn", default=None, help="postgres DSN")
     resolve.add_argument("--market-data-provider", default=None, help="market provider: inmemory|alpaca")
-    resolve.add_argument("--job-executor-mode", default=None, help="job executor mode: inprocess|celery-adapter")
+    resolve.add_argument("--job-executor-mode", default=None, help="job executor mode: inprocess|processpool|celery-adapter")
     resolve.add_argument("--enabled-contexts", nargs="*", default=None, help="上下文列表")
 
     return parser
@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Callable
 
@@ -13,11 +14,12 @@ from fastapi.responses import JSONResponse
 from backtest_runner.api import create_router as create_backtest_router
 from backtest_runner.repository import InMemoryBacktestRepository
 from backtest_runner.repository_postgres import PostgresBacktestRepository
+from backtest_runner.result_cache import InMemoryBacktestResultCache
 from backtest_runner.result_store import InMemoryBacktestResultStore
-from backtest_runner.result_store_postgres import PostgresBacktestResultStore
+from backtest_runner.result_store_postgres import PostgresBacktestResultCache, PostgresBacktestResultStore
 from backtest_runner.service import BacktestService
 from job_orchestration.api import create_router as create_job_router
-from job_orchestration.executor import InProcessJobExecutor
+from job_orchestration.executor import InProcessJobExecutor, JobExecutor, ProcessPoolJobExecutor
 from job_orchestration.repository import InMemoryJobRepository
 from job_orchestration.repository_postgres import PostgresJobRepository
 from job_orchestration.scheduler import InMemoryScheduler
@@ -25,6 +27,8 @@ from job_orchestration.service import JobOrchestrationService
 from market_data.alpaca_provider import AlpacaProvider
 from market_data.alpaca_transport import AlpacaHTTPTransport, resolve_alpaca_transport_config
 from market_data.api import create_router as create_market_router
+from market_data.bar_store import LocalBarStore
+from market_data.catalog_snapshot import AssetCatalogSnapshotStore
 from market_data.domain import MarketQuote
 from market_data.service import MarketDataService
 from monitoring_realtime.app import create_app as create_monitoring_app
@@ -108,11 +112,33 @@ def _build_market_service(*, market_data_provider: str) -> MarketDataService:
         provider = _InMemoryMarketProvider()
     elif provider_name == "alpaca":
         config = resolve_alpaca_transport_config(env_prefixes=("BACKEND_ALPACA",))
-        provider = AlpacaProvider(transport=AlpacaHTTPTransport(config=config))
+        # 配置快照路径后资产目录持久化到本地，重启/滚动发布时直接从快照提供搜索。
+        catalog_snapshot_path = os.getenv("BACKEND_MARKET_DATA_CATALOG_SNAPSHOT_PATH", "").strip()
+        provider = AlpacaProvider(
+            transport=AlpacaHTTPTransport(
+                config=config,
+                catalog_snapshot=(
+                    AssetCatalogSnapshotStore(path=catalog_snapshot_path) if catalog_snapshot_path else None
+                ),
+            )
+        )
     else:
         raise ValueError("market_data_provider must be one of: inmemory, alpaca")
 
-    return MarketDataService(provider=provider)
+    # 配置目录后历史 K 线落地到本地列式存储，回测/信号读取优先命中本地。
+    bar_store_dir = os.getenv("BACKEND_MARKET_DATA_BAR_STORE_DIR", "").strip()
+    bar_store = LocalBarStore(root_dir=bar_store_dir) if bar_store_dir else None
+    # 配置硬 TTL 后报价进入 stale-while-revalidate 模式；热点 symbol 由后台线程保持预热。
+    quote_stale_ttl = os.getenv("BACKEND_MARKET_DATA_QUOTE_STALE_TTL_SECONDS", "").strip()
+    hot_quote_symbols = [
+        item.strip() for item in os.getenv("BACKEND_MARKET_DATA_HOT_QUOTE_SYMBOLS", "").split(",") if item.strip()
+    ]
+    return MarketDataService(
+        provider=provider,
+        bar_store=bar_store,
+        quote_stale_ttl_seconds=float(quote_stale_ttl) if quote_stale_ttl else None,
+        hot_quote_symbols=hot_quote_symbols,
+    )
 
 
 def _build_postgres_engine(postgres_dsn: str):
@@ -141,6 +167,7 @@ class CompositionContext:
     market_service: MarketDataService
     backtest_result_store: InMemoryBacktestResultStore | PostgresBacktestResultStore
     health_repo: HealthReportRepository
+    backtest_result_cache: InMemoryBacktestResultCache = field(default_factory=InMemoryBacktestResultCache)
 
 
 class MetricsCollector:
@@ -191,6 +218,7 @@ def build_context(
         job_repo = PostgresJobRepository(engine=engine)
         job_scheduler = InMemoryScheduler()
         backtest_result_store = PostgresBacktestResultStore(engine=engine)
+        backtest_result_cache = InMemoryBacktestResultCache(backing=PostgresBacktestResultCache(engine=engine))
         risk_repo = PostgresRiskRepository(engine=engine)
         signal_repo = PostgresSignalRepository(engine=engine)
         preferences_store = PostgresPreferencesStore(engine=engine)
@@ -204,6 +232,7 @@ def build_context(
         job_repo = InMemoryJobRepository()
         job_scheduler = InMemoryScheduler()
         backtest_result_store = InMemoryBacktestResultStore()
+        backtest_result_cache = InMemoryBacktestResultCache()
         risk_repo = InMemoryRiskRepository()
         signal_repo = InMemorySignalRepository()
         preferences_store = InMemoryPreferencesStore()
@@ -225,6 +254,7 @@ def build_context(
         market_service=market_service,
         backtest_result_store=backtest_result_store,
         health_repo=health_repo,
+        backtest_result_cache=backtest_result_cache,
     )
 
 def build_current_user_dependency(*, context: CompositionContext) -> AuthUserFn:
@@ -292,16 +322,29 @@ def register_all_routes(
     enabled_contexts: set[str],
     get_current_user: AuthUserFn,
     job_executor_mode: str = "inprocess",
+    job_executor_workers: int = 2,
 ) -> None:
+    executor: JobExecutor
+    if job_executor_mode == "processpool":
+        pool_executor = ProcessPoolJobExecutor(name=job_executor_mode, max_workers=job_executor_workers)
+        app.router.on_shutdown.append(lambda: pool_executor.shutdown(wait=False))
+        executor = pool_executor
+    else:
+        executor = InProcessJobExecutor(name=job_executor_mode)
+
+    context.market_service.start_hot_quote_refresher()
+    app.router.on_shutdown.append(context.market_service.close)
+
     job_service = JobOrchestrationService(
         repository=context.job_repo,
         scheduler=context.job_scheduler,
-        executor=InProcessJobExecutor(name=job_executor_mode),
+        executor=executor,
         runtime_mode=job_executor_mode,
     )
     backtest_service = BacktestService(
         repository=context.backtest_repo,
         result_store=context.backtest_result_store,
+        result_cache=context.backtest_result_cache,
         strategy_owner_acl=lambda user_id, strategy_id: context.strategy_repo.get_by_id(
             strategy_id,
             user_id=user_id,
@@ -28,6 +28,7 @@ class CompositionSettings:
     postgres_dsn: str | None = None
     market_data_provider: str = "inmemory"
     job_executor_mode: str = "inprocess"
+    job_executor_workers: int = 2
     cors_allowed_origins: tuple[str, ...] = ()
     cors_allow_credentials: bool = True
     cors_allow_methods: tuple[str, ...] = ("GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
@@ -40,6 +41,7 @@ class CompositionSettings:
         postgres_dsn = os.getenv("BACKEND_POSTGRES_DSN", "").strip() or None
         market_data_provider = normalize_market_data_provider(os.getenv("BACKEND_MARKET_DATA_PROVIDER"))
         job_executor_mode = normalize_job_executor_mode(os.getenv("BACKEND_JOB_EXECUTOR_MODE"))
+        job_executor_workers = normalize_job_executor_workers(os.getenv("BACKEND_JOB_EXECUTOR_WORKERS"))
         cors_allowed_origins = normalize_cors_allowed_origins(os.getenv("BACKEND_CORS_ALLOWED_ORIGINS"))
         cors_allow_credentials = normalize_cors_allow_credentials(os.getenv("BACKEND_CORS_ALLOW_CREDENTIALS"))
         cors_allow_methods = normalize_cors_allow_methods(os.getenv("BACKEND_CORS_ALLOW_METHODS"))
@@ -51,6 +53,7 @@ class CompositionSettings:
                 postgres_dsn=postgres_dsn,
                 market_data_provider=market_data_provider,
                 job_executor_mode=job_executor_mode,
+                job_executor_workers=job_executor_workers,
                 cors_allowed_origins=cors_allowed_origins,
                 cors_allow_credentials=cors_allow_credentials,
                 cors_allow_methods=cors_allow_methods,
@@ -66,6 +69,7 @@ class CompositionSettings:
             postgres_dsn=postgres_dsn,
             market_data_provider=market_data_provider,
             job_executor_mode=job_executor_mode,
+            job_executor_workers=job_executor_workers,
             cors_allowed_origins=cors_allowed_origins,
             cors_allow_credentials=cors_allow_credentials,
             cors_allow_methods=cors_allow_methods,
@@ -89,11 +93,23 @@ def normalize_market_data_provider(provider: str | None) -> str:
 
 def normalize_job_executor_mode(mode: str | None) -> str:
     normalized = (mode or "inprocess").strip().lower()
-    if normalized not in {"inprocess", "celery-adapter"}:
-        raise ValueError("job_executor_mode must be one of: inprocess, celery-adapter")
+    if normalized not in {"inprocess", "processpool", "celery-adapter"}:
+        raise ValueError("job_executor_mode must be one of: inprocess, processpool, celery-adapter")
     return normalized
 
 
+def normalize_job_executor_workers(value: str | int | None) -> int:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return 2
+    try:
+        workers = int(value)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("job_executor_workers must be a positive integer") from exc
+    if workers <= 0:
+        raise ValueError("job_executor_workers must be a positive integer")
+    return workers
+
+
 def normalize_enabled_contexts(enabled_contexts: set[str] | None) -> set[str]:
     if enabled_contexts is None:
         return set(_DEFAULT_CONTEXTS)
@@ -2,10 +2,12 @@
 
 from backtest_runner.domain import BacktestTask, InvalidBacktestTransitionError
 from backtest_runner.orchestration import JobOrchestrationBacktestDispatcher
+from backtest_runner.progress import BacktestCancelledError, ExecutionControl
 from backtest_runner.repository import InMemoryBacktestRepository
 from backtest_runner.repository_postgres import PostgresBacktestRepository
+from backtest_runner.result_cache import InMemoryBacktestResultCache, fingerprint_engine_input
 from backtest_runner.result_store import InMemoryBacktestResultStore
-from backtest_runner.result_store_postgres import PostgresBacktestResultStore
+from backtest_runner.result_store_postgres import PostgresBacktestResultCache, PostgresBacktestResultStore
 from backtest_runner.service import (
     BacktestAccessDeniedError,
     BacktestDeleteInvalidStateError,
@@ -22,11 +24,16 @@ __all__ = [
     "PostgresBacktestRepository",
     "InMemoryBacktestResultStore",
     "PostgresBacktestResultStore",
+    "InMemoryBacktestResultCache",
+    "PostgresBacktestResultCache",
+    "fingerprint_engine_input",
     "BacktestIdempotencyConflictError",
     "BacktestAccessDeniedError",
     "BacktestDeleteInvalidStateError",
     "BacktestDispatchError",
     "BacktestExecutionError",
+    "BacktestCancelledError",
+    "ExecutionControl",
     "JobOrchestrationBacktestDispatcher",
     "BacktestService",
 ]
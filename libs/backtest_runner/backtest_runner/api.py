@@ -14,8 +14,10 @@ from backtest_runner.domain import InvalidBacktestTransitionError
 from backtest_runner.service import (
     BacktestAccessDeniedError,
     BacktestDeleteInvalidStateError,
+    BacktestExecutionError,
     BacktestIdempotencyConflictError,
     BacktestService,
+    compute_backtest_result,
 )
 from platform_core.response import error_response, paged_response, success_response
 
@@ -41,6 +43,22 @@ class CompareRequest(BaseModel):
     model_config = {"populate_by_name": True}
 
 
+class ParameterSweepRequest(BaseModel):
+    strategy_id: str = Field(alias="strategyId")
+    config: dict[str, Any] = Field(default_factory=dict)
+    parameter_sets: list[dict[str, Any]] | None = Field(default=None, alias="parameterSets")
+    parameter_grid: dict[str, list[Any]] | None = Field(default=None, alias="parameterGrid")
+
+    model_config = {"populate_by_name": True}
+
+
+class ExtendBacktestRequest(BaseModel):
+    bars: list[Any] | None = Field(default=None)
+    end_date: str | None = Field(default=None, alias="endDate")
+
+    model_config = {"populate_by_name": True}
+
+
 class RenameBacktestRequest(BaseModel):
     display_name: str | None = Field(default=None, alias="displayName")
 
@@ -163,36 +181,55 @@ def create_router(
                 idempotency_key=job_idempotency_key,
             )
 
-            def _execute_runner(_payload: dict[str, Any]) -> dict[str, Any]:
+            def _execution_failure(exc: BacktestExecutionError) -> JobExecutionFailure:
+                latest_task = service.get_task(user_id=current_user.id, task_id=task.id) or task
+                return JobExecutionFailure(
+                    error_code=exc.code,
+                    error_message=exc.message,
+                    result={
+                        "backtestTaskId": latest_task.id,
+                        "status": latest_task.status,
+                        "metrics": latest_task.metrics,
+                    },
+                )
+
+            control = job_service.create_control()
+
+            def _prepare() -> dict[str, Any]:
+                try:
+                    return service.begin_execution(user_id=current_user.id, task_id=task.id, control=control)
+                except BacktestExecutionError as exc:
+                    raise _execution_failure(exc) from exc
+
+            def _finalize(outcome: dict[str, Any]) -> dict[str, Any]:
                 try:
-                    execution = service.execute_task(user_id=current_user.id, task_id=task.id)
-                except Exception as exc:  # noqa: BLE001
-                    from backtest_runner.service import BacktestExecutionError
-
-                    if isinstance(exc, BacktestExecutionError):
-                        latest_task = service.get_task(user_id=current_user.id, task_id=task.id) or task
-                        raise JobExecutionFailure(
-                            error_code=exc.code,
-                            error_message=exc.message,
-                            result={
-                                "backtestTaskId": latest_task.id,
-                                "status": latest_task.status,
-                                "metrics": latest_task.metrics,
-                            },
-                        )
-                    raise
+                    execution = service.complete_execution(
+                        user_id=current_user.id,
+                        task_id=task.id,
+                        outcome=outcome,
+                    )
+                except BacktestExecutionError as exc:
+                    raise _execution_failure(exc) from exc
 
                 task_after = execution["task"]
                 return {
                     "backtestTaskId": task_after.id,
                     "status": task_after.status,
                     "metrics": task_after.metrics,
+                    "cacheHit": bool((execution["result"].get("cache") or {}).get("hit")),
                 }
 
-            job = job_service.dispatch_job_with_callable(
+            job = job_service.dispatch_job_offloaded(
                 user_id=current_user.id,
                 job_id=job.id,
-                runner=_execute_runner,
+                prepare=_prepare,
+                compute=compute_backtest_result,
+                finalize=_finalize,
+                control=control,
+                on_error=lambda _code, _message: service.fail_execution(
+                    user_id=current_user.id,
+                    task_id=task.id,
+                ),
             )
         except IdempotencyConflictError:
             return JSONResponse(
@@ -250,10 +287,43 @@ def create_router(
             return _access_denied_response()
         return success_response(data=compared)
 
+    @router.post("/backtests/sweeps")
+    def sweep_backtests(body: ParameterSweepRequest, current_user=Depends(get_current_user)):
+        try:
+            sweep = service.run_parameter_sweep(
+                user_id=current_user.id,
+                strategy_id=body.strategy_id,
+                config=body.config,
+                parameter_sets=body.parameter_sets,
+                parameter_grid=body.parameter_grid,
+            )
+        except BacktestAccessDeniedError:
+            return _access_denied_response()
+        except BacktestExecutionError as exc:
+            return JSONResponse(
+                status_code=422,
+                content=error_response(code=exc.code, message=exc.message),
+            )
+        return success_response(data=sweep)
+
     @router.get("/backtests/{task_id}/result")
-    def get_backtest_result(task_id: str, current_user=Depends(get_current_user)):
+    def get_backtest_result(
+        task_id: str,
+        view: str = Query(default="full", pattern="^(full|metrics)$"),
+        start: int | None = Query(default=None, ge=0),
+        end: int | None = Query(default=None, ge=0),
+        max_points: int | None = Query(default=None, alias="maxPoints", ge=3),
+        current_user=Depends(get_current_user),
+    ):
         try:
-            result = service.get_task_result(user_id=current_user.id, task_id=task_id)
+            result = service.get_task_result(
+                user_id=current_user.id,
+                task_id=task_id,
+                metrics_only=view == "metrics",
+                start=start,
+                end=end,
+                max_points=max_points,
+            )
         except BacktestAccessDeniedError:
             return _access_denied_response()
 
@@ -268,6 +338,34 @@ def create_router(
 
         return success_response(data=result)
 
+    @router.post("/backtests/{task_id}/extend")
+    def extend_backtest(
+        task_id: str,
+        body: ExtendBacktestRequest,
+        current_user=Depends(get_current_user),
+    ):
+        try:
+            extended = service.extend_task(
+                user_id=current_user.id,
+                task_id=task_id,
+                new_bars=body.bars,
+                end_date=body.end_date,
+            )
+        except BacktestAccessDeniedError:
+            return _access_denied_response()
+        except BacktestExecutionError as exc:
+            return JSONResponse(
+                status_code=422,
+                content=error_response(code=exc.code, message=exc.message),
+            )
+        return success_response(
+            data={
+                "task": _serialize_task(extended["task"]),
+                "result": extended["result"],
+                "appendedBars": extended["appendedBars"],
+            }
+        )
+
     @router.patch("/backtests/{task_id}/name")
     def rename_backtest(
         task_id: str,
@@ -308,7 +406,9 @@ def create_router(
         if task is None:
             return _access_denied_response()
 
-        return success_response(data=_serialize_task(task))
+        payload = _serialize_task(task)
+        payload["progress"] = service.task_progress(user_id=current_user.id, task_id=task.id)
+        return success_response(data=payload)
 
     @router.post("/backtests/{task_id}/transition")
     def transition_backtest(
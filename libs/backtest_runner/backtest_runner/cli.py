@@ -134,7 +134,14 @@ def _cmd_run_task(args: argparse.Namespace) -> None:
 
 def _cmd_result(args: argparse.Namespace) -> None:
     try:
-        result = _service.get_task_result(user_id=args.user_id, task_id=args.task_id)
+        result = _service.get_task_result(
+            user_id=args.user_id,
+            task_id=args.task_id,
+            metrics_only=bool(getattr(args, "metrics_only", False)),
+            start=getattr(args, "start", None),
+            end=getattr(args, "end", None),
+            max_points=getattr(args, "max_points", None),
+        )
     except BacktestAccessDeniedError:
         _output(
             {
@@ -306,6 +313,84 @@ def _cmd_compare(args: argparse.Namespace) -> None:
     _output({"success": True, "data": compared})
 
 
+def _cmd_sweep(args: argparse.Namespace) -> None:
+    try:
+        config = json.loads(args.config) if args.config else {}
+        parameter_sets = json.loads(args.parameter_sets) if getattr(args, "parameter_sets", None) else None
+        parameter_grid = json.loads(args.parameter_grid) if getattr(args, "parameter_grid", None) else None
+    except json.JSONDecodeError:
+        _output({"success": False, "error": {"code": "INVALID_CONFIG", "message": "invalid sweep json"}})
+        return
+
+    try:
+        sweep = _service.run_parameter_sweep(
+            user_id=args.user_id,
+            strategy_id=args.strategy_id,
+            config=config,
+            parameter_sets=parameter_sets,
+            parameter_grid=parameter_grid,
+        )
+    except BacktestAccessDeniedError:
+        _output(
+            {
+                "success": False,
+                "error": {
+                    "code": "BACKTEST_ACCESS_DENIED",
+                    "message": "strategy does not belong to current user",
+                },
+            }
+        )
+        return
+    except BacktestExecutionError as exc:
+        _output({"success": False, "error": {"code": exc.code, "message": exc.message}})
+        return
+
+    _output({"success": True, "data": sweep})
+
+
+def _cmd_extend(args: argparse.Namespace) -> None:
+    try:
+        bars = json.loads(args.bars) if getattr(args, "bars", None) else None
+    except json.JSONDecodeError:
+        _output({"success": False, "error": {"code": "INVALID_CONFIG", "message": "invalid bars json"}})
+        return
+    if isinstance(bars, list):
+        bars = [item if isinstance(item, dict) else {"close": item} for item in bars]
+
+    try:
+        extended = _service.extend_task(
+            user_id=args.user_id,
+            task_id=args.task_id,
+            new_bars=bars,
+            end_date=getattr(args, "end_date", None),
+        )
+    except BacktestAccessDeniedError:
+        _output(
+            {
+                "success": False,
+                "error": {
+                    "code": "BACKTEST_ACCESS_DENIED",
+                    "message": "backtest task does not belong to current user",
+                },
+            }
+        )
+        return
+    except BacktestExecutionError as exc:
+        _output({"success": False, "error": {"code": exc.code, "message": exc.message}})
+        return
+
+    _output(
+        {
+            "success": True,
+            "data": {
+                "task": _serialize_task(extended["task"]),
+                "result": extended["result"],
+                "appendedBars": extended["appendedBars"],
+            },
+        }
+    )
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="backtest-runner", description="QuantPoly 回测任务 CLI")
     sub = parser.add_subparsers(dest="command")
@@ -337,9 +422,26 @@ def build_parser() -> argparse.ArgumentParser:
     run_task.add_argument("--config", default="{}")
     run_task.add_argument("--idempotency-key", default=None)
 
+    sweep = sub.add_parser("sweep", help="同一行情下批量评估多组策略参数")
+    sweep.add_argument("--user-id", required=True)
+    sweep.add_argument("--strategy-id", required=True)
+    sweep.add_argument("--config", default="{}")
+    sweep.add_argument("--parameter-sets", default=None, help="参数组 JSON 数组")
+    sweep.add_argument("--parameter-grid", default=None, help="参数网格 JSON 对象，例如 {\"window\": [10, 20]}")
+
+    extend = sub.add_parser("extend", help="从检查点续算新增 bar")
+    extend.add_argument("--user-id", required=True)
+    extend.add_argument("--task-id", required=True)
+    extend.add_argument("--bars", default=None, help="新增 bar JSON 数组（收盘价或含 timestamp/close 的对象）")
+    extend.add_argument("--end-date", default=None)
+
     result = sub.add_parser("result", help="读取回测结果")
     result.add_argument("--user-id", required=True)
     result.add_argument("--task-id", required=True)
+    result.add_argument("--metrics-only", action="store_true", help="只返回指标")
+    result.add_argument("--start", type=int, default=None, help="起始 bar 下标（含）")
+    result.add_argument("--end", type=int, default=None, help="结束 bar 下标（不含）")
+    result.add_argument("--max-points", type=int, default=None, help="LTTB 降采样后的曲线点数")
 
     list_cmd = sub.add_parser("list", help="列表查询回测任务")
     list_cmd.add_argument("--user-id", required=True)
@@ -383,6 +485,8 @@ _COMMANDS = {
     "rename": _cmd_rename,
     "related": _cmd_related,
     "run-task": _cmd_run_task,
+    "sweep": _cmd_sweep,
+    "extend": _cmd_extend,
     "result": _cmd_result,
     "list": _cmd_list,
     "transition": _cmd_transition,
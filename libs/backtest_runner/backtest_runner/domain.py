@@ -65,6 +65,14 @@ class BacktestTask:
         elif to_status == "pending":
             self.metrics = None
 
+    def refresh_metrics(self, metrics: dict[str, float]) -> None:
+        """增量回测追加新 bar 后刷新已完成任务的指标。"""
+
+        if self.status != "completed":
+            raise InvalidBacktestTransitionError(f"metrics_refresh_invalid_state status={self.status}")
+        self.metrics = dict(metrics)
+        self.updated_at = datetime.now(timezone.utc)
+
     def rename(self, *, display_name: str | None) -> None:
         normalized = (display_name or "").strip()
         self.display_name = normalized or None
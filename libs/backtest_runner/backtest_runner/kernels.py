@@ -0,0 +1,311 @@
+"""回测信号向量化内核。
+
+基于共享前缀和（cumulative sum）在 O(n) 内计算模板信号，输出与
+`BacktestService._moving_average_events` / `_mean_reversion_events`
+保持同构的事件列表与 metadata。
+
+价格既可以是一维序列，也可以是 (bar, symbol) 二维矩阵；二维时所有列在同一组
+数组运算中完成，`*_events_by_column` 按列拆分事件。
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any
+
+import numpy as np
+
+# 均线交叉比较的相对容差：前缀和与逐段求和的舍入误差远小于该量级，
+# 低于容差的均线差值视为相等，使精确持平（如整数价格）的判定稳定。
+_TIE_TOLERANCE = 1e-10
+# 滚动方差的分段长度：段内前缀和量级有界，段间重叠 window-1 根，额外开销约 window/段长。
+_VARIANCE_BLOCK = 1024
+# z-score 落在 entry_z 附近该相对范围内时按逐 bar 实现的算式精确重算，保证阈值判定一致。
+_Z_TIE_TOLERANCE = 1e-8
+
+
+def _as_array(close_prices: Any) -> np.ndarray:
+    return np.asarray(close_prices, dtype=np.float64)
+
+
+class RollingStatistics:
+    """单条价格序列（或按列的价格矩阵）上的滚动均值/方差。
+
+    序列按固定长度分段，每段（含下一段所需的 window-1 根重叠）以段内均值中心化后做前缀和，
+    任意窗口的滚动均值/方差仍是数组差分（O(n)），但前缀和的量级只取决于段长与局部波动，
+    不随序列长度累积舍入误差。结果按窗口长度缓存，供参数扫描等场景在多组参数间复用。
+    二维输入沿 axis 0（时间）滚动，每列独立中心化。
+    """
+
+    def __init__(self, close_prices: Any) -> None:
+        self.prices = _as_array(close_prices)
+        size = self.size
+        columns = self.prices.shape[1:]
+        # 全序列（逐列）均值，作为均线持平判定容差的量级基准。
+        self.offset = self.prices.mean(axis=0) if size else np.zeros(columns, dtype=np.float64)
+
+        self._changes = np.zeros((max(size, 1), *columns), dtype=np.int64)
+        if size > 1:
+            np.cumsum(self.prices[1:] != self.prices[:-1], axis=0, out=self._changes[1:size])
+
+        self._means: dict[int, np.ndarray] = {}
+        self._variances: dict[int, np.ndarray] = {}
+        self._flat: dict[int, np.ndarray] = {}
+
+    @property
+    def size(self) -> int:
+        return int(self.prices.shape[0]) if self.prices.ndim else 0
+
+    def means(self, window: int) -> np.ndarray:
+        """长度为 n-window+1 的滚动均值，第 j 项对应 prices[j:j+window]。"""
+
+        if window not in self._means:
+            self._compute(window)
+        return self._means[window]
+
+    def variances(self, window: int) -> np.ndarray:
+        """总体方差（除以 window），对齐方式同 `means`。"""
+
+        if window not in self._variances:
+            self._compute(window)
+        return self._variances[window]
+
+    def _compute(self, window: int) -> None:
+        count = self.size - window + 1
+        columns = self.prices.shape[1:]
+        if count <= 0:
+            self._means[window] = np.zeros((0, *columns), dtype=np.float64)
+            self._variances[window] = np.zeros((0, *columns), dtype=np.float64)
+            return
+
+        block = max(window, _VARIANCE_BLOCK)
+        blocks = -(-count // block)
+        span = block + window - 1
+        padded = self.prices
+        pad = blocks * block + window - 1 - self.size
+        if pad > 0:
+            padded = np.concatenate([padded, np.repeat(padded[-1:], pad, axis=0)], axis=0)
+        # (blocks, span, *columns)：第 k 段覆盖起点落在 [k*block, (k+1)*block) 的全部窗口。
+        segments = np.moveaxis(np.lib.stride_tricks.sliding_window_view(padded, span, axis=0)[::block], -1, 1)
+        center = segments.mean(axis=1, keepdims=True)
+        centered = segments - center
+
+        prefix = np.zeros((blocks, span + 1, *columns), dtype=np.float64)
+        np.cumsum(centered, axis=1, out=prefix[:, 1:])
+        sums = prefix[:, window : window + block] - prefix[:, :block]
+        np.cumsum(centered * centered, axis=1, out=prefix[:, 1:])
+        sums_sq = prefix[:, window : window + block] - prefix[:, :block]
+
+        centered_mean = sums / float(window)
+        variance = np.maximum(sums_sq / float(window) - centered_mean * centered_mean, 0.0)
+        means = centered_mean + center
+        self._means[window] = means.reshape(blocks * block, *columns)[:count]
+        self._variances[window] = variance.reshape(blocks * block, *columns)[:count]
+
+    def flat_windows(self, window: int) -> np.ndarray:
+        """标记窗口内所有价格完全相同的位置（整数前缀和，结果精确）。"""
+
+        cached = self._flat.get(window)
+        if cached is None:
+            count = max(self.size - window + 1, 0)
+            if window <= 1:
+                cached = np.ones((count, *self.prices.shape[1:]), dtype=bool)
+            else:
+                cached = (self._changes[window - 1 : window - 1 + count] - self._changes[:count]) == 0
+            self._flat[window] = cached
+        return cached
+
+
+def _snap_ties(spread: np.ndarray, tolerance: float) -> np.ndarray:
+    return np.where(np.abs(spread) <= tolerance, 0.0, spread)
+
+
+def _column(values: np.ndarray, column: int | None) -> np.ndarray:
+    return values if column is None else values[:, column]
+
+
+def _moving_average_crosses(stats: RollingStatistics, short_window: int, long_window: int):
+    short_means = stats.means(short_window)
+    long_means = stats.means(long_window)
+
+    idx = np.arange(long_window, stats.size)
+    prev_short = short_means[idx - short_window]
+    curr_short = short_means[idx - short_window + 1]
+    prev_long = long_means[idx - long_window]
+    curr_long = long_means[idx - long_window + 1]
+
+    tolerance = _TIE_TOLERANCE * np.maximum(np.abs(stats.offset), 1.0)
+    prev_spread = _snap_ties(prev_short - prev_long, tolerance)
+    curr_spread = _snap_ties(curr_short - curr_long, tolerance)
+
+    bullish = (prev_spread <= 0) & (curr_spread > 0)
+    bearish = ~bullish & (prev_spread >= 0) & (curr_spread < 0)
+    return idx, bullish, bearish, curr_short, curr_long
+
+
+def _moving_average_column_events(
+    crosses: tuple[np.ndarray, ...],
+    *,
+    short_window: int,
+    long_window: int,
+    column: int | None = None,
+) -> list[dict[str, Any]]:
+    idx = crosses[0]
+    bullish, bearish, curr_short, curr_long = (_column(item, column) for item in crosses[1:])
+    positions = np.flatnonzero(bullish | bearish)
+    events: list[dict[str, Any]] = []
+    for index, is_buy, short_average, long_average in zip(
+        idx[positions].tolist(),
+        bullish[positions].tolist(),
+        curr_short[positions].tolist(),
+        curr_long[positions].tolist(),
+    ):
+        events.append(
+            {
+                "index": index,
+                "side": "BUY" if is_buy else "SELL",
+                "reason": "moving_average_bullish_cross" if is_buy else "moving_average_bearish_cross",
+                "triggered_indicator": "moving_average",
+                "metadata": {
+                    "shortWindow": short_window,
+                    "longWindow": long_window,
+                    "shortAverage": short_average,
+                    "longAverage": long_average,
+                },
+            }
+        )
+    return events
+
+
+def moving_average_events(
+    *,
+    close_prices: Any,
+    short_window: int,
+    long_window: int,
+    statistics: RollingStatistics | None = None,
+) -> list[dict[str, Any]]:
+    stats = statistics or RollingStatistics(close_prices)
+    if stats.size < long_window + 1:
+        return []
+
+    crosses = _moving_average_crosses(stats, short_window, long_window)
+    return _moving_average_column_events(crosses, short_window=short_window, long_window=long_window)
+
+
+def moving_average_events_by_column(
+    *,
+    close_matrix: Any,
+    short_window: int,
+    long_window: int,
+    statistics: RollingStatistics | None = None,
+) -> list[list[dict[str, Any]]]:
+    stats = statistics or RollingStatistics(close_matrix)
+    columns = int(stats.prices.shape[1])
+    if stats.size < long_window + 1:
+        return [[] for _ in range(columns)]
+
+    crosses = _moving_average_crosses(stats, short_window, long_window)
+    return [
+        _moving_average_column_events(crosses, short_window=short_window, long_window=long_window, column=column)
+        for column in range(columns)
+    ]
+
+
+def _mean_reversion_scores(stats: RollingStatistics, window: int, entry_z: float):
+    means = stats.means(window)
+    variances = stats.variances(window)
+    # 与逐 bar 实现一致：窗口内价格完全相同时标准差为 0，跳过该 bar。
+    tradable = ~stats.flat_windows(window)
+
+    current = stats.prices[window - 1 :]
+    deviations = np.sqrt(variances, where=tradable, out=np.ones_like(variances))
+    z_scores = np.where(tradable, (current - means) / deviations, 0.0)
+    _resolve_z_ties(stats.prices, z_scores, tradable, window=window, entry_z=entry_z)
+
+    oversold = tradable & (z_scores <= -entry_z)
+    overbought = tradable & ~oversold & (z_scores >= entry_z)
+    return z_scores, oversold, overbought
+
+
+def _resolve_z_ties(
+    prices: np.ndarray,
+    z_scores: np.ndarray,
+    tradable: np.ndarray,
+    *,
+    window: int,
+    entry_z: float,
+) -> None:
+    """阈值附近的 z-score 按逐 bar 实现的算式（两遍求和）原地重算，避免舍入误差翻转判定。"""
+
+    near = tradable & (np.abs(np.abs(z_scores) - entry_z) <= _Z_TIE_TOLERANCE * max(abs(entry_z), 1.0))
+    for position in zip(*np.nonzero(near)):
+        start = int(position[0])
+        values = prices[(slice(start, start + window), *position[1:])].tolist()
+        mean_price = sum(values) / float(window)
+        deviation = math.sqrt(sum((item - mean_price) ** 2 for item in values) / float(window))
+        z_scores[position] = (values[-1] - mean_price) / deviation if deviation else 0.0
+
+
+def _mean_reversion_column_events(
+    scores: tuple[np.ndarray, ...],
+    *,
+    window: int,
+    entry_z: float,
+    column: int | None = None,
+) -> list[dict[str, Any]]:
+    z_scores, oversold, overbought = (_column(item, column) for item in scores)
+    positions = np.flatnonzero(oversold | overbought)
+    events: list[dict[str, Any]] = []
+    for index, is_buy, z_score in zip(
+        (positions + (window - 1)).tolist(),
+        oversold[positions].tolist(),
+        z_scores[positions].tolist(),
+    ):
+        events.append(
+            {
+                "index": index,
+                "side": "BUY" if is_buy else "SELL",
+                "reason": "mean_reversion_oversold" if is_buy else "mean_reversion_overbought",
+                "triggered_indicator": "mean_reversion",
+                "metadata": {
+                    "window": window,
+                    "entryZ": entry_z,
+                    "zScore": z_score,
+                },
+            }
+        )
+    return events
+
+
+def mean_reversion_events(
+    *,
+    close_prices: Any,
+    window: int,
+    entry_z: float,
+    statistics: RollingStatistics | None = None,
+) -> list[dict[str, Any]]:
+    stats = statistics or RollingStatistics(close_prices)
+    if stats.size < window:
+        return []
+
+    scores = _mean_reversion_scores(stats, window, entry_z)
+    return _mean_reversion_column_events(scores, window=window, entry_z=entry_z)
+
+
+def mean_reversion_events_by_column(
+    *,
+    close_matrix: Any,
+    window: int,
+    entry_z: float,
+    statistics: RollingStatistics | None = None,
+) -> list[list[dict[str, Any]]]:
+    stats = statistics or RollingStatistics(close_matrix)
+    columns = int(stats.prices.shape[1])
+    if stats.size < window:
+        return [[] for _ in range(columns)]
+
+    scores = _mean_reversion_scores(stats, window, entry_z)
+    return [
+        _mean_reversion_column_events(scores, window=window, entry_z=entry_z, column=column)
+        for column in range(columns)
+    ]
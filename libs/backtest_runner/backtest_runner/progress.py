@@ -0,0 +1,61 @@
+"""回测执行的协作式取消与进度上报。
+
+引擎在分块边界调用 `check_progress`：上报已处理 bar 数并在收到取消请求时抛出
+`BacktestCancelledError`。控制对象只需提供 `cancelled` 与 `report(processed=, total=)`，
+跨进程执行时可传入 job_orchestration 的 `JobControl`（Manager 代理，可 pickle）。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Protocol
+
+
+class BacktestCancelledError(RuntimeError):
+    """回测在分块边界检测到取消请求。"""
+
+
+class ProgressControl(Protocol):
+    @property
+    def cancelled(self) -> bool: ...
+
+    def report(self, *, processed: int, total: int) -> None: ...
+
+
+class ExecutionControl:
+    """进程内的取消/进度通道。"""
+
+    def __init__(self) -> None:
+        self._cancel_event = threading.Event()
+        self._processed = 0
+        self._total = 0
+        self._started_at = time.time()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def report(self, *, processed: int, total: int) -> None:
+        self._processed, self._total = int(processed), int(total)
+
+    def snapshot(self) -> dict[str, Any]:
+        processed, total = self._processed, self._total
+        return {
+            "processed": processed,
+            "total": total,
+            "fraction": min(processed / total, 1.0) if total > 0 else 0.0,
+            "elapsedSeconds": max(time.time() - self._started_at, 0.0),
+            "cancelRequested": self.cancelled,
+        }
+
+
+def check_progress(control: ProgressControl | None, *, processed: int, total: int) -> None:
+    if control is None:
+        return
+    control.report(processed=processed, total=total)
+    if control.cancelled:
+        raise BacktestCancelledError("backtest cancelled")
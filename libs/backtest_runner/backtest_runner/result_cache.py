@@ -0,0 +1,125 @@
+"""回测结果内容寻址缓存。
+
+以引擎输入（模板、参数、标的、区间、资金、手续费）与收盘价序列哈希生成指纹，
+相同指纹的回测直接复用已算出的结果，无需再次撮合。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Protocol
+
+import numpy as np
+
+# 撮合/指标口径变化时递增，使旧指纹全部失效。
+ENGINE_FINGERPRINT_VERSION = 1
+
+_SERIES_KEYS = ("closePrices", "closeMatrix")
+
+
+def fingerprint_engine_input(engine_input: dict[str, Any], *, vectorized_kernels: bool = True) -> str:
+    """计算引擎输入指纹：元数据的规范化 JSON 加价格序列的字节哈希。"""
+
+    digest = hashlib.sha256()
+    metadata = {key: value for key, value in engine_input.items() if key not in _SERIES_KEYS}
+    metadata["engineVersion"] = ENGINE_FINGERPRINT_VERSION
+    metadata["vectorizedKernels"] = bool(vectorized_kernels)
+    digest.update(json.dumps(metadata, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+
+    for key in _SERIES_KEYS:
+        series = engine_input.get(key)
+        if series is None:
+            continue
+        values = np.ascontiguousarray(np.asarray(series, dtype=np.float64))
+        digest.update(key.encode("utf-8"))
+        digest.update(repr(values.shape).encode("utf-8"))
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+class BacktestResultCache(Protocol):
+    def get(self, fingerprint: str) -> dict[str, Any] | None:
+        """按指纹读取缓存结果。"""
+
+    def put(self, fingerprint: str, result: dict[str, Any]) -> None:
+        """写入缓存结果。"""
+
+
+class InMemoryBacktestResultCache:
+    """进程内 LRU；可选 `backing`（如 Postgres）作为二级缓存，未命中时回读并回填。
+
+    条目以紧凑 JSON 字节保存：按字节数受 `max_bytes` 约束，每次命中解码出独立副本，
+    调用方修改返回值不会污染缓存。
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        backing: BacktestResultCache | None = None,
+    ) -> None:
+        self._max_entries = max(1, int(max_entries))
+        self._max_bytes = max(0, int(max_bytes))
+        self._backing = backing
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "backingHits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, fingerprint: str) -> dict[str, Any] | None:
+        with self._lock:
+            encoded = self._entries.get(fingerprint)
+            if encoded is not None:
+                self._entries.move_to_end(fingerprint)
+                self._counters["hits"] += 1
+        if encoded is not None:
+            return json.loads(encoded)
+
+        entry = self._backing.get(fingerprint) if self._backing is not None else None
+        if entry is None:
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+        encoded = _encode(entry)
+        with self._lock:
+            self._counters["backingHits"] += 1
+            self._store_locked(fingerprint, encoded)
+        return json.loads(encoded)
+
+    def put(self, fingerprint: str, result: dict[str, Any]) -> None:
+        encoded = _encode(result)
+        with self._lock:
+            self._store_locked(fingerprint, encoded)
+        if self._backing is not None:
+            self._backing.put(fingerprint, json.loads(encoded))
+
+    def _store_locked(self, fingerprint: str, encoded: bytes) -> None:
+        previous = self._entries.pop(fingerprint, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        if len(encoded) > self._max_bytes:
+            return
+        self._entries[fingerprint] = encoded
+        self._bytes += len(encoded)
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self._counters["evictions"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "maxEntries": self._max_entries,
+                "bytes": self._bytes,
+                "maxBytes": self._max_bytes,
+            }
+
+
+def _encode(result: dict[str, Any]) -> bytes:
+    return json.dumps(result, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,539 @@
+"""回测结果列式编码。
+
+结果按区段拆分存储：
+- `metrics`：独立 dict，可单独读取；
+- `equity` / `curveIndex` / `returns`：float64 小端数组，按固定块大小分块 zlib 压缩，
+  区间读取只解压覆盖到的块；
+- `trades`：按固定条数分块的 zlib JSON，块头记录块内 bar 下标范围，切片只解压相交的块；
+- 其余字段（`meta`）：小字段整块 JSON；与 bar 对齐的 `timestamps`、`perSymbol[*].equity`
+  单独按行分块，切片只解压覆盖到的块。
+
+读取视图支持只取指标、按 bar 下标切片 `[start, end)`，以及 LTTB 降采样曲线。
+增量回测通过 `extend_record` 追加新 bar：只重写各区段末块，已有的完整块原样保留。
+早期写入的 `trades` / `meta`（整块 zlib JSON）仍可读取。
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import struct
+import zlib
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+RESULT_FORMAT = "columnar-v1"
+
+_MAGIC = b"QPF1"
+_ROWS_MAGIC = b"QPR1"
+_TRADES_MAGIC = b"QPT1"
+_META_MAGIC = b"QPM1"
+_HEADER = struct.Struct("<4sIII")
+_LENGTH = struct.Struct("<I")
+_TRADE_CHUNK = struct.Struct("<ddI")
+_CHUNK_SIZE = 4096
+_ROW_CHUNK_SIZE = 1024
+_TRADE_CHUNK_SIZE = 256
+_COMPRESS_LEVEL = 6
+
+_PACKED_KEYS = ("equityCurve", "dailyReturns", "trades", "metrics")
+
+
+def pack_floats(values: Any, *, chunk_size: int = _CHUNK_SIZE) -> bytes:
+    array = np.ascontiguousarray(np.asarray(values, dtype="<f8"))
+    count = int(array.size)
+    chunks = [
+        zlib.compress(array[offset : offset + chunk_size].tobytes(), _COMPRESS_LEVEL)
+        for offset in range(0, count, chunk_size)
+    ]
+    header = _HEADER.pack(_MAGIC, count, chunk_size, len(chunks))
+    lengths = b"".join(_LENGTH.pack(len(chunk)) for chunk in chunks)
+    return header + lengths + b"".join(chunks)
+
+
+def packed_count(blob: bytes) -> int:
+    magic, count, _chunk_size, _chunk_count = _HEADER.unpack_from(blob, 0)
+    if magic != _MAGIC:
+        raise ValueError("invalid packed float buffer")
+    return int(count)
+
+
+def _chunk_offsets(blob: bytes, chunk_count: int) -> list[int]:
+    offsets: list[int] = []
+    cursor = _HEADER.size + _LENGTH.size * chunk_count
+    for position in range(chunk_count):
+        offsets.append(cursor)
+        cursor += _LENGTH.unpack_from(blob, _HEADER.size + _LENGTH.size * position)[0]
+    offsets.append(cursor)
+    return offsets
+
+
+def unpack_floats(blob: bytes, *, start: int = 0, end: int | None = None) -> np.ndarray:
+    """解码 `[start, end)` 区间，只解压与区间相交的块。"""
+
+    magic, count, chunk_size, chunk_count = _HEADER.unpack_from(blob, 0)
+    if magic != _MAGIC:
+        raise ValueError("invalid packed float buffer")
+    lo = max(0, min(int(start), count))
+    hi = count if end is None else max(lo, min(int(end), count))
+    if lo == hi:
+        return np.zeros(0, dtype=np.float64)
+
+    offsets = _chunk_offsets(blob, chunk_count)
+    first, last = lo // chunk_size, (hi - 1) // chunk_size
+    parts = [
+        np.frombuffer(zlib.decompress(blob[offsets[position] : offsets[position + 1]]), dtype="<f8")
+        for position in range(first, last + 1)
+    ]
+    merged = np.concatenate(parts) if len(parts) > 1 else parts[0]
+    base = first * chunk_size
+    return merged[lo - base : hi - base].astype(np.float64)
+
+
+def _pack_json(value: Any) -> bytes:
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"), _COMPRESS_LEVEL)
+
+
+def _unpack_json(blob: bytes | None) -> Any:
+    if blob is None:
+        return None
+    return json.loads(zlib.decompress(bytes(blob)).decode("utf-8"))
+
+
+def pack_rows(rows: list[Any], *, chunk_size: int = _ROW_CHUNK_SIZE) -> bytes:
+    """按行分块的 JSON 列表，布局与 `pack_floats` 相同。"""
+
+    chunks = [_pack_json(rows[offset : offset + chunk_size]) for offset in range(0, len(rows), chunk_size)]
+    header = _HEADER.pack(_ROWS_MAGIC, len(rows), chunk_size, len(chunks))
+    lengths = b"".join(_LENGTH.pack(len(chunk)) for chunk in chunks)
+    return header + lengths + b"".join(chunks)
+
+
+def unpack_rows(blob: bytes, *, start: int = 0, end: int | None = None) -> list[Any]:
+    """解码 `[start, end)` 行，只解压与区间相交的块。"""
+
+    magic, count, chunk_size, chunk_count = _HEADER.unpack_from(blob, 0)
+    if magic != _ROWS_MAGIC:
+        raise ValueError("invalid packed row buffer")
+    lo = max(0, min(int(start), count))
+    hi = count if end is None else max(lo, min(int(end), count))
+    if lo == hi:
+        return []
+
+    offsets = _chunk_offsets(blob, chunk_count)
+    first, last = lo // chunk_size, (hi - 1) // chunk_size
+    rows: list[Any] = []
+    for position in range(first, last + 1):
+        rows.extend(_unpack_json(blob[offsets[position] : offsets[position + 1]]))
+    base = first * chunk_size
+    return rows[lo - base : hi - base]
+
+
+def _trade_index(trade: dict[str, Any]) -> float:
+    return float(trade.get("index", -1))
+
+
+def _pack_trades(trades: list[dict[str, Any]], *, chunk_size: int = _TRADE_CHUNK_SIZE) -> bytes:
+    chunks: list[bytes] = []
+    table: list[bytes] = []
+    for offset in range(0, len(trades), chunk_size):
+        part = trades[offset : offset + chunk_size]
+        indices = [_trade_index(trade) for trade in part]
+        chunk = _pack_json(part)
+        chunks.append(chunk)
+        table.append(_TRADE_CHUNK.pack(min(indices), max(indices), len(chunk)))
+    header = _HEADER.pack(_TRADES_MAGIC, len(trades), chunk_size, len(chunks))
+    return header + b"".join(table) + b"".join(chunks)
+
+
+def _unpack_trades(blob: bytes | None, *, lo: int | None = None, hi: int | None = None) -> list[dict[str, Any]]:
+    """解码 bar 下标落在 `[lo, hi)` 的成交；块头下标范围不相交的块直接跳过。"""
+
+    if blob is None:
+        return []
+    blob = bytes(blob)
+    windowed = lo is not None and hi is not None
+    if not blob.startswith(_TRADES_MAGIC):
+        trades = _unpack_json(blob) or []
+    else:
+        _magic, _count, _chunk_size, chunk_count = _HEADER.unpack_from(blob, 0)
+        cursor = _HEADER.size + _TRADE_CHUNK.size * chunk_count
+        trades = []
+        for position in range(chunk_count):
+            first, last, length = _TRADE_CHUNK.unpack_from(blob, _HEADER.size + _TRADE_CHUNK.size * position)
+            if not windowed or (last >= lo and first < hi):
+                trades.extend(_unpack_json(blob[cursor : cursor + length]))
+            cursor += length
+    if not windowed:
+        return trades
+    return [trade for trade in trades if lo <= _trade_index(trade) < hi]
+
+
+def _series_paths(meta: dict[str, Any]) -> list[tuple[str, ...]]:
+    """meta 中与 bar 对齐的列表字段路径。"""
+
+    paths: list[tuple[str, ...]] = []
+    if isinstance(meta.get("timestamps"), list):
+        paths.append(("timestamps",))
+    per_symbol = meta.get("perSymbol")
+    if isinstance(per_symbol, dict):
+        for symbol, entry in per_symbol.items():
+            if isinstance(entry, dict) and isinstance(entry.get("equity"), list):
+                paths.append(("perSymbol", symbol, "equity"))
+    return paths
+
+
+def _series_parent(meta: dict[str, Any], path: tuple[str, ...]) -> dict[str, Any]:
+    parent = meta
+    for key in path[:-1]:
+        parent = parent[key]
+    return parent
+
+
+def _pack_meta(meta: dict[str, Any]) -> bytes:
+    fields = dict(meta)
+    if isinstance(fields.get("perSymbol"), dict):
+        fields["perSymbol"] = {
+            symbol: dict(entry) if isinstance(entry, dict) else entry for symbol, entry in fields["perSymbol"].items()
+        }
+    series: list[dict[str, Any]] = []
+    blobs: list[bytes] = []
+    for path in _series_paths(fields):
+        parent = _series_parent(fields, path)
+        blob = pack_rows(parent[path[-1]])
+        # 原位置留空占位，解码时按原键序填回。
+        parent[path[-1]] = None
+        series.append({"path": list(path), "length": len(blob)})
+        blobs.append(blob)
+    head = _pack_json({"fields": fields, "series": series})
+    return _META_MAGIC + _LENGTH.pack(len(head)) + head + b"".join(blobs)
+
+
+def _unpack_meta(blob: bytes | None, *, lo: int | None = None, hi: int | None = None) -> dict[str, Any]:
+    """解码 meta；给出 `[lo, hi)` 时与 bar 对齐的列表只解码该区间。"""
+
+    if blob is None:
+        return {}
+    blob = bytes(blob)
+    windowed = lo is not None and hi is not None
+    if not blob.startswith(_META_MAGIC):
+        meta = dict(_unpack_json(blob) or {})
+        if windowed:
+            for path in _series_paths(meta):
+                parent = _series_parent(meta, path)
+                parent[path[-1]] = parent[path[-1]][lo:hi]
+        return meta
+
+    head_length = _LENGTH.unpack_from(blob, len(_META_MAGIC))[0]
+    cursor = len(_META_MAGIC) + _LENGTH.size + head_length
+    head = _unpack_json(blob[len(_META_MAGIC) + _LENGTH.size : cursor])
+    meta = dict(head.get("fields") or {})
+    for item in head.get("series") or []:
+        path, length = tuple(item["path"]), int(item["length"])
+        series_blob = blob[cursor : cursor + length]
+        cursor += length
+        rows = unpack_rows(series_blob, start=lo, end=hi) if windowed else unpack_rows(series_blob)
+        _series_parent(meta, path)[path[-1]] = rows
+    return meta
+
+
+def _packable_curve(curve: Any) -> bool:
+    if not isinstance(curve, list):
+        return False
+    return all(isinstance(point, dict) and point.keys() == {"index", "equity"} for point in curve)
+
+
+def encode_result(result: dict[str, Any]) -> dict[str, Any]:
+    """把结果 dict 编码为列式记录（值均为 bytes / dict / int，可直接落库）。"""
+
+    meta = {key: value for key, value in result.items() if key not in _PACKED_KEYS}
+    curve = result.get("equityCurve")
+    returns = result.get("dailyReturns")
+    record: dict[str, Any] = {
+        "format": RESULT_FORMAT,
+        "metrics": dict(result.get("metrics") or {}),
+        "trades": _pack_trades(list(result.get("trades") or [])),
+        "curveIndex": None,
+        "equity": None,
+        "returns": None,
+        "barCount": 0,
+    }
+
+    if curve is not None and _packable_curve(curve):
+        record["curveIndex"] = pack_floats([point["index"] for point in curve])
+        record["equity"] = pack_floats([point["equity"] for point in curve])
+        record["barCount"] = len(curve)
+    elif curve is not None:
+        meta["equityCurve"] = curve
+        record["barCount"] = len(curve)
+
+    if isinstance(returns, list):
+        record["returns"] = pack_floats(returns)
+    elif returns is not None:
+        meta["dailyReturns"] = returns
+
+    record["meta"] = _pack_meta(meta)
+    return record
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets 降采样，返回保留点的下标（含首尾）。"""
+
+    size = int(y.size)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+
+    every = (size - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    anchor = 0
+    for bucket in range(threshold - 2):
+        avg_start = int(math.floor((bucket + 1) * every)) + 1
+        avg_end = min(int(math.floor((bucket + 2) * every)) + 1, size)
+        avg_x = float(x[avg_start:avg_end].mean())
+        avg_y = float(y[avg_start:avg_end].mean())
+
+        range_start = int(math.floor(bucket * every)) + 1
+        range_end = int(math.floor((bucket + 1) * every)) + 1
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[range_start:range_end] - y[anchor])
+            - (x[anchor] - x[range_start:range_end]) * (avg_y - y[anchor])
+        )
+        anchor = range_start + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+    selected[-1] = size - 1
+    return selected
+
+
+def _slice_bounds(bar_count: int, start: int | None, end: int | None) -> tuple[int, int]:
+    lo = 0 if start is None else max(0, min(int(start), bar_count))
+    hi = bar_count if end is None else max(lo, min(int(end), bar_count))
+    return lo, hi
+
+
+def decode_result(
+    record: dict[str, Any],
+    *,
+    metrics_only: bool = False,
+    start: int | None = None,
+    end: int | None = None,
+    max_points: int | None = None,
+) -> dict[str, Any]:
+    """按视图解码列式记录；无切片/降采样参数时与写入前的结果 dict 等价。"""
+
+    metrics = dict(record.get("metrics") or {})
+    bar_count = int(record.get("barCount") or 0)
+    if metrics_only:
+        return {"metrics": metrics, "barCount": bar_count}
+
+    full_view = start is None and end is None and max_points is None
+    if full_view:
+        result: dict[str, Any] = _unpack_meta(record.get("meta"))
+        result["metrics"] = metrics
+        result["trades"] = _unpack_trades(record.get("trades"))
+        if record.get("equity") is not None:
+            index = unpack_floats(record["curveIndex"]).tolist()
+            equity = unpack_floats(record["equity"]).tolist()
+            result["equityCurve"] = [{"index": idx, "equity": value} for idx, value in zip(index, equity)]
+        if record.get("returns") is not None:
+            result["dailyReturns"] = unpack_floats(record["returns"]).tolist()
+        return result
+
+    lo, hi = _slice_bounds(bar_count, start, end)
+    # meta 中与 bar 对齐的列表、成交都只解码 `[lo, hi)` 覆盖到的块。
+    result = _unpack_meta(record.get("meta"), lo=lo, hi=hi)
+    result["metrics"] = metrics
+    curve = result.pop("equityCurve", None)
+    if record.get("equity") is not None:
+        index = unpack_floats(record["curveIndex"], start=lo, end=hi)
+        equity = unpack_floats(record["equity"], start=lo, end=hi)
+    elif isinstance(curve, list):
+        index = np.asarray([float(point.get("index", 0.0)) for point in curve[lo:hi]], dtype=np.float64)
+        equity = np.asarray([float(point.get("equity", 0.0)) for point in curve[lo:hi]], dtype=np.float64)
+    else:
+        index = equity = np.zeros(0, dtype=np.float64)
+
+    # 第 k 根 bar 的日收益位于 dailyReturns[k - 1]。
+    returns_lo, returns_hi = max(lo, 1) - 1, max(hi - 1, 0)
+    returns: np.ndarray | None = None
+    if record.get("returns") is not None:
+        returns = unpack_floats(record["returns"], start=returns_lo, end=returns_hi)
+    elif isinstance(result.get("dailyReturns"), list):
+        returns = np.asarray(result["dailyReturns"][returns_lo:returns_hi], dtype=np.float64)
+    result.pop("dailyReturns", None)
+
+    positions = np.arange(int(equity.size))
+    if max_points is not None and equity.size > max(int(max_points), 0):
+        positions = lttb_indices(index, equity, max(int(max_points), 3))
+        result["downsample"] = {
+            "method": "lttb",
+            "points": int(positions.size),
+            "sourcePoints": int(equity.size),
+        }
+    elif returns is not None:
+        result["dailyReturns"] = returns.tolist()
+
+    result["equityCurve"] = [
+        {"index": idx, "equity": value} for idx, value in zip(index[positions].tolist(), equity[positions].tolist())
+    ]
+    result["trades"] = _unpack_trades(record.get("trades"), lo=lo, hi=hi)
+    result["range"] = {"start": lo, "end": hi, "barCount": bar_count}
+
+    if isinstance(result.get("timestamps"), list):
+        result["timestamps"] = [result["timestamps"][position] for position in positions.tolist()]
+    per_symbol = result.get("perSymbol")
+    if isinstance(per_symbol, dict):
+        for entry in per_symbol.values():
+            if isinstance(entry, dict) and isinstance(entry.get("equity"), list):
+                window = entry["equity"]
+                entry["equity"] = [window[position] for position in positions.tolist()]
+    return result
+
+
+@dataclass
+class ResultExtension:
+    """增量回测追加到已存结果的新数据。
+
+    `last_equity` 不为空时替换原曲线末点（强制平仓前的权益）；原成交末笔的 `reason`
+    等于 `drop_trailing_reason` 时先移除（上一次的强制平仓）。
+    """
+
+    equity: list[float]
+    daily_returns: list[float]
+    trades: list[dict[str, Any]]
+    metrics: dict[str, float]
+    last_equity: float | None = None
+    fields: dict[str, Any] = field(default_factory=dict)
+    drop_trailing_reason: str | None = "force_close"
+
+
+def _splice_floats(blob: bytes, keep: int, values: list[float]) -> bytes:
+    """保留前 `keep` 个值并追加 `values`；只重编码 `keep` 所在块及之后的部分。"""
+
+    magic, count, chunk_size, chunk_count = _HEADER.unpack_from(blob, 0)
+    if magic != _MAGIC:
+        raise ValueError("invalid packed float buffer")
+    keep = max(0, min(int(keep), count))
+    first = keep // chunk_size
+    offsets = _chunk_offsets(blob, chunk_count)
+    kept = [blob[offsets[position] : offsets[position + 1]] for position in range(first)]
+    tail = np.concatenate(
+        (unpack_floats(blob, start=first * chunk_size, end=keep), np.asarray(values, dtype=np.float64))
+    ).astype("<f8")
+    chunks = kept + [
+        zlib.compress(tail[offset : offset + chunk_size].tobytes(), _COMPRESS_LEVEL)
+        for offset in range(0, int(tail.size), chunk_size)
+    ]
+    header = _HEADER.pack(_MAGIC, keep + len(values), chunk_size, len(chunks))
+    lengths = b"".join(_LENGTH.pack(len(chunk)) for chunk in chunks)
+    return header + lengths + b"".join(chunks)
+
+
+def _splice_trades(blob: bytes | None, trades: list[dict[str, Any]], *, drop_trailing_reason: str | None) -> bytes:
+    """追加成交；只解压末块，可选移除末笔（上一次的强制平仓）。"""
+
+    blob = bytes(blob) if blob is not None else _pack_trades([])
+    if not blob.startswith(_TRADES_MAGIC):
+        existing = list(_unpack_json(blob) or [])
+        if existing and drop_trailing_reason is not None and existing[-1].get("reason") == drop_trailing_reason:
+            existing.pop()
+        return _pack_trades(existing + trades)
+
+    _magic, count, chunk_size, chunk_count = _HEADER.unpack_from(blob, 0)
+    table = [
+        _TRADE_CHUNK.unpack_from(blob, _HEADER.size + _TRADE_CHUNK.size * position) for position in range(chunk_count)
+    ]
+    cursor = _HEADER.size + _TRADE_CHUNK.size * chunk_count
+    entries: list[bytes] = []
+    chunks: list[bytes] = []
+    for first, last, length in table[:-1]:
+        entries.append(_TRADE_CHUNK.pack(first, last, length))
+        chunks.append(blob[cursor : cursor + length])
+        cursor += length
+    tail: list[dict[str, Any]] = list(_unpack_json(blob[cursor : cursor + table[-1][2]])) if table else []
+    kept_count = count - len(tail)
+    if tail and drop_trailing_reason is not None and tail[-1].get("reason") == drop_trailing_reason:
+        tail.pop()
+    tail.extend(trades)
+
+    # 末块重新按块大小切分；解码时只依赖块头下标范围，块内条数无需对齐。
+    for offset in range(0, len(tail), chunk_size):
+        part = tail[offset : offset + chunk_size]
+        indices = [_trade_index(trade) for trade in part]
+        chunk = _pack_json(part)
+        entries.append(_TRADE_CHUNK.pack(min(indices), max(indices), len(chunk)))
+        chunks.append(chunk)
+    header = _HEADER.pack(_TRADES_MAGIC, kept_count + len(tail), chunk_size, len(chunks))
+    return header + b"".join(entries) + b"".join(chunks)
+
+
+def _update_meta_fields(blob: bytes | None, fields: dict[str, Any]) -> bytes:
+    """更新 meta 中的小字段；与 bar 对齐的分块序列原样保留。"""
+
+    if blob is None or not bytes(blob).startswith(_META_MAGIC):
+        return _pack_meta({**_unpack_meta(blob), **fields})
+    blob = bytes(blob)
+    head_end = len(_META_MAGIC) + _LENGTH.size + _LENGTH.unpack_from(blob, len(_META_MAGIC))[0]
+    head = _unpack_json(blob[len(_META_MAGIC) + _LENGTH.size : head_end])
+    series_keys = {str(item["path"][0]) for item in head.get("series") or []}
+    if series_keys.intersection(fields):
+        return _pack_meta({**_unpack_meta(blob), **fields})
+    head["fields"] = {**dict(head.get("fields") or {}), **fields}
+    packed_head = _pack_json(head)
+    return _META_MAGIC + _LENGTH.pack(len(packed_head)) + packed_head + blob[head_end:]
+
+
+def extend_result(result: dict[str, Any], extension: ResultExtension) -> dict[str, Any]:
+    """把追加数据合并进已解码的结果 dict（记录不可增量追加时使用）。"""
+
+    merged = dict(result)
+    trades = list(merged.get("trades") or [])
+    if trades and extension.drop_trailing_reason is not None and trades[-1].get("reason") == extension.drop_trailing_reason:
+        trades.pop()
+    merged["trades"] = trades + list(extension.trades)
+    merged["metrics"] = dict(extension.metrics)
+    if "equityCurve" in merged:
+        curve = list(merged["equityCurve"])
+        if curve and extension.last_equity is not None:
+            curve[-1] = {**curve[-1], "equity": extension.last_equity}
+        start = len(curve)
+        curve.extend({"index": float(start + idx), "equity": value} for idx, value in enumerate(extension.equity))
+        merged["equityCurve"] = curve
+        merged["dailyReturns"] = list(merged.get("dailyReturns") or []) + list(extension.daily_returns)
+    merged.update(extension.fields)
+    return merged
+
+
+def extend_record(record: dict[str, Any], extension: ResultExtension) -> dict[str, Any]:
+    """在列式记录上追加新 bar，返回新记录；各区段只重编码末块。"""
+
+    if record.get("equity") is None and "equityCurve" in _unpack_meta(record.get("meta")):
+        # 曲线未列式存储（非标准点结构），退回整体解码再编码。
+        return encode_result(extend_result(decode_result(record), extension))
+
+    extended = dict(record)
+    extended["metrics"] = dict(extension.metrics)
+    extended["trades"] = _splice_trades(
+        record.get("trades"),
+        list(extension.trades),
+        drop_trailing_reason=extension.drop_trailing_reason,
+    )
+    if record.get("equity") is not None:
+        bar_count = packed_count(record["equity"])
+        equity = list(extension.equity)
+        keep = bar_count
+        if bar_count and extension.last_equity is not None:
+            keep, equity = bar_count - 1, [float(extension.last_equity)] + equity
+        extended["equity"] = _splice_floats(record["equity"], keep, equity)
+        extended["curveIndex"] = _splice_floats(
+            record["curveIndex"],
+            bar_count,
+            [float(bar_count + idx) for idx in range(len(extension.equity))],
+        )
+        returns = record.get("returns") if record.get("returns") is not None else pack_floats([])
+        extended["returns"] = _splice_floats(returns, packed_count(returns), list(extension.daily_returns))
+        extended["barCount"] = bar_count + len(extension.equity)
+    extended["meta"] = _update_meta_fields(record.get("meta"), dict(extension.fields))
+    return extended
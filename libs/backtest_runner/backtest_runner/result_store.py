@@ -4,28 +4,65 @@ from __future__ import annotations
 
 import copy
 import threading
+from dataclasses import replace
 from datetime import datetime, timezone
 from typing import Any
 
+from backtest_runner import result_codec
+
 
 class InMemoryBacktestResultStore:
+    """结果以列式记录保存（见 `result_codec`），读取时按视图解码。"""
+
     def __init__(self) -> None:
         self._results: dict[str, dict[str, dict[str, Any]]] = {}
+        self._checkpoints: dict[tuple[str, str], dict[str, Any]] = {}
         self._lock = threading.RLock()
 
     def save_result(self, *, user_id: str, task_id: str, result: dict[str, Any]) -> None:
-        payload = copy.deepcopy(result)
+        payload = dict(result)
         payload.setdefault("updatedAt", datetime.now(timezone.utc).isoformat())
+        record = result_codec.encode_result(payload)
         with self._lock:
             bucket = self._results.setdefault(user_id, {})
-            bucket[task_id] = payload
+            bucket[task_id] = record
 
     def get_result(self, *, user_id: str, task_id: str) -> dict[str, Any] | None:
+        return self.get_result_view(user_id=user_id, task_id=task_id)
+
+    def get_result_view(
+        self,
+        *,
+        user_id: str,
+        task_id: str,
+        metrics_only: bool = False,
+        start: int | None = None,
+        end: int | None = None,
+        max_points: int | None = None,
+    ) -> dict[str, Any] | None:
         with self._lock:
-            item = self._results.get(user_id, {}).get(task_id)
-            if item is None:
-                return None
-            return copy.deepcopy(item)
+            record = self._results.get(user_id, {}).get(task_id)
+        if record is None:
+            return None
+        return result_codec.decode_result(
+            record,
+            metrics_only=metrics_only,
+            start=start,
+            end=end,
+            max_points=max_points,
+        )
+
+    def append_result(self, *, user_id: str, task_id: str, extension: result_codec.ResultExtension) -> bool:
+        """增量回测：在已存记录上追加新 bar，不重写已有区段；结果不存在时返回 False。"""
+
+        fields = {"updatedAt": datetime.now(timezone.utc).isoformat(), **extension.fields}
+        with self._lock:
+            bucket = self._results.get(user_id, {})
+            record = bucket.get(task_id)
+            if record is None:
+                return False
+            bucket[task_id] = result_codec.extend_record(record, replace(extension, fields=fields))
+            return True
 
     def delete_result(self, *, user_id: str, task_id: str) -> bool:
         with self._lock:
@@ -35,4 +72,17 @@ class InMemoryBacktestResultStore:
             del bucket[task_id]
             if not bucket:
                 self._results.pop(user_id, None)
+            self._checkpoints.pop((user_id, task_id), None)
             return True
+
+    def save_checkpoint(self, *, user_id: str, task_id: str, checkpoint: dict[str, Any]) -> None:
+        payload = copy.deepcopy(checkpoint)
+        with self._lock:
+            self._checkpoints[(user_id, task_id)] = payload
+
+    def get_checkpoint(self, *, user_id: str, task_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            item = self._checkpoints.get((user_id, task_id))
+            if item is None:
+                return None
+            return copy.deepcopy(item)
@@ -3,9 +3,25 @@
 from __future__ import annotations
 
 import json
+from dataclasses import replace
 from datetime import datetime, timezone
 from typing import Any
 
+from backtest_runner import result_codec
+
+# 列式结果区段（见 result_codec）；旧行只有 result_json。
+_COLUMNAR_COLUMNS = (
+    ("result_format", "TEXT"),
+    ("metrics_json", "TEXT"),
+    ("meta_blob", "BYTEA"),
+    ("trades_blob", "BYTEA"),
+    ("curve_index_blob", "BYTEA"),
+    ("equity_blob", "BYTEA"),
+    ("returns_blob", "BYTEA"),
+    ("bar_count", "INTEGER"),
+)
+_COLUMNAR_DDL = ",\n".join(f"                    {column} {column_type}" for column, column_type in _COLUMNAR_COLUMNS)
+
 
 class PostgresBacktestResultStore:
     def __init__(self, *, engine: Any) -> None:
@@ -24,46 +40,133 @@ class PostgresBacktestResultStore:
     def _init_schema(self) -> None:
         with self._engine.begin() as conn:
             self._execute(conn, 
-                """
+                f"""
                 CREATE TABLE IF NOT EXISTS backtest_runner_result (
                     task_id TEXT NOT NULL,
                     user_id TEXT NOT NULL,
-                    result_json TEXT NOT NULL,
+                    result_json TEXT,
+{_COLUMNAR_DDL},
                     created_at TEXT NOT NULL,
                     updated_at TEXT NOT NULL,
                     PRIMARY KEY (task_id, user_id)
                 )
                 """
             )
+            self._execute(conn, 
+                """
+                CREATE TABLE IF NOT EXISTS backtest_runner_checkpoint (
+                    task_id TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    checkpoint_json TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (task_id, user_id)
+                )
+                """
+            )
+        self._upgrade_legacy_schema()
+
+    def _result_columns(self) -> dict[str, str] | None:
+        """读取结果表现有列（列名 → is_nullable）；后端没有 information_schema 时返回 None。"""
+
+        try:
+            with self._engine.begin() as conn:
+                rows = self._execute(conn, 
+                    """
+                    SELECT column_name, is_nullable
+                    FROM information_schema.columns
+                    WHERE table_schema = current_schema() AND table_name = ?
+                    """,
+                    ("backtest_runner_result",),
+                ).fetchall()
+        except Exception:  # noqa: BLE001
+            return None
+        return {str(row[0]): str(row[1]) for row in rows}
+
+    def _upgrade_legacy_schema(self) -> None:
+        # 列式格式之前建的表：result_json 非空且缺少列式区段，按需补齐。
+        columns = self._result_columns()
+        if not columns:
+            return
+        missing = [(column, column_type) for column, column_type in _COLUMNAR_COLUMNS if column not in columns]
+        relax_result_json = columns.get("result_json") == "NO"
+        if not missing and not relax_result_json:
+            return
+
+        with self._engine.begin() as conn:
+            if relax_result_json:
+                self._execute(conn, "ALTER TABLE backtest_runner_result ALTER COLUMN result_json DROP NOT NULL")
+            for column, column_type in missing:
+                self._execute(
+                    conn,
+                    f"ALTER TABLE backtest_runner_result ADD COLUMN IF NOT EXISTS {column} {column_type}",
+                )
 
     def save_result(self, *, user_id: str, task_id: str, result: dict[str, Any]) -> None:
         now = datetime.now(timezone.utc).isoformat()
         payload = dict(result)
         payload.setdefault("updatedAt", now)
+        record = result_codec.encode_result(payload)
 
         with self._engine.begin() as conn:
             self._execute(conn, 
                 """
-                INSERT INTO backtest_runner_result (task_id, user_id, result_json, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?)
+                INSERT INTO backtest_runner_result (
+                    task_id, user_id, result_json, result_format, metrics_json, meta_blob, trades_blob,
+                    curve_index_blob, equity_blob, returns_blob, bar_count, created_at, updated_at
+                )
+                VALUES (?, ?, NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(task_id, user_id) DO UPDATE SET
-                    result_json = excluded.result_json,
+                    result_json = NULL,
+                    result_format = excluded.result_format,
+                    metrics_json = excluded.metrics_json,
+                    meta_blob = excluded.meta_blob,
+                    trades_blob = excluded.trades_blob,
+                    curve_index_blob = excluded.curve_index_blob,
+                    equity_blob = excluded.equity_blob,
+                    returns_blob = excluded.returns_blob,
+                    bar_count = excluded.bar_count,
                     updated_at = excluded.updated_at
                 """,
                 (
                     task_id,
                     user_id,
-                    json.dumps(payload, ensure_ascii=False),
+                    record["format"],
+                    json.dumps(record["metrics"], ensure_ascii=False),
+                    record["meta"],
+                    record["trades"],
+                    record["curveIndex"],
+                    record["equity"],
+                    record["returns"],
+                    record["barCount"],
                     now,
                     now,
                 ),
             )
 
     def get_result(self, *, user_id: str, task_id: str) -> dict[str, Any] | None:
+        return self.get_result_view(user_id=user_id, task_id=task_id)
+
+    def get_result_view(
+        self,
+        *,
+        user_id: str,
+        task_id: str,
+        metrics_only: bool = False,
+        start: int | None = None,
+        end: int | None = None,
+        max_points: int | None = None,
+    ) -> dict[str, Any] | None:
+        # 只取指标时不读取任何大字段。
+        columns = (
+            "result_format, metrics_json, bar_count, result_json"
+            if metrics_only
+            else "result_format, metrics_json, bar_count, result_json, meta_blob, trades_blob, "
+            "curve_index_blob, equity_blob, returns_blob"
+        )
         with self._engine.begin() as conn:
             row = self._execute(conn, 
-                """
-                SELECT result_json
+                f"""
+                SELECT {columns}
                 FROM backtest_runner_result
                 WHERE task_id = ? AND user_id = ?
                 """,
@@ -72,7 +175,99 @@ class PostgresBacktestResultStore:
 
         if row is None:
             return None
-        return json.loads(row[0])
+
+        if row[0] is None and metrics_only:
+            # 旧格式行：整块 JSON，只取指标。
+            legacy = json.loads(row[3])
+            curve = legacy.get("equityCurve")
+            return {
+                "metrics": dict(legacy.get("metrics") or {}),
+                "barCount": len(curve) if isinstance(curve, list) else 0,
+            }
+        if metrics_only:
+            record = {
+                "format": row[0],
+                "metrics": json.loads(row[1] or "{}"),
+                "barCount": int(row[2] or 0),
+            }
+        else:
+            record = self._row_record(row)
+
+        return result_codec.decode_result(
+            record,
+            metrics_only=metrics_only,
+            start=start,
+            end=end,
+            max_points=max_points,
+        )
+
+    @staticmethod
+    def _row_record(row: Any) -> dict[str, Any]:
+        """完整列行 → 列式记录；旧格式行（只有 result_json）按同一编码转换。"""
+
+        if row[0] is None:
+            return result_codec.encode_result(json.loads(row[3]))
+        return {
+            "format": row[0],
+            "metrics": json.loads(row[1] or "{}"),
+            "barCount": int(row[2] or 0),
+            "meta": bytes(row[4]) if row[4] is not None else None,
+            "trades": bytes(row[5]) if row[5] is not None else None,
+            "curveIndex": bytes(row[6]) if row[6] is not None else None,
+            "equity": bytes(row[7]) if row[7] is not None else None,
+            "returns": bytes(row[8]) if row[8] is not None else None,
+        }
+
+    def append_result(self, *, user_id: str, task_id: str, extension: result_codec.ResultExtension) -> bool:
+        """增量回测：在已存记录上追加新 bar，只重编码各区段末块；结果不存在时返回 False。"""
+
+        now = datetime.now(timezone.utc).isoformat()
+        with self._engine.begin() as conn:
+            row = self._execute(conn, 
+                """
+                SELECT result_format, metrics_json, bar_count, result_json, meta_blob, trades_blob,
+                    curve_index_blob, equity_blob, returns_blob
+                FROM backtest_runner_result
+                WHERE task_id = ? AND user_id = ?
+                """,
+                (task_id, user_id),
+            ).fetchone()
+            if row is None:
+                return False
+            record = result_codec.extend_record(
+                self._row_record(row),
+                replace(extension, fields={"updatedAt": now, **extension.fields}),
+            )
+            self._execute(conn, 
+                """
+                UPDATE backtest_runner_result SET
+                    result_json = NULL,
+                    result_format = ?,
+                    metrics_json = ?,
+                    meta_blob = ?,
+                    trades_blob = ?,
+                    curve_index_blob = ?,
+                    equity_blob = ?,
+                    returns_blob = ?,
+                    bar_count = ?,
+                    updated_at = ?
+                WHERE task_id = ? AND user_id = ?
+                """,
+                (
+                    record["format"],
+                    json.dumps(record["metrics"], ensure_ascii=False),
+                    record["meta"],
+                    record["trades"],
+                    record["curveIndex"],
+                    record["equity"],
+                    record["returns"],
+                    record["barCount"],
+                    now,
+                    task_id,
+                    user_id,
+                ),
+            )
+        return True
 
     def delete_result(self, *, user_id: str, task_id: str) -> bool:
         with self._engine.begin() as conn:
@@ -83,4 +278,97 @@ class PostgresBacktestResultStore:
                 """,
                 (task_id, user_id),
             )
+            self._execute(conn, 
+                """
+                DELETE FROM backtest_runner_checkpoint
+                WHERE task_id = ? AND user_id = ?
+                """,
+                (task_id, user_id),
+            )
             return cursor.rowcount > 0
+
+    def save_checkpoint(self, *, user_id: str, task_id: str, checkpoint: dict[str, Any]) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        with self._engine.begin() as conn:
+            self._execute(conn, 
+                """
+                INSERT INTO backtest_runner_checkpoint (task_id, user_id, checkpoint_json, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(task_id, user_id) DO UPDATE SET
+                    checkpoint_json = excluded.checkpoint_json,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    task_id,
+                    user_id,
+                    json.dumps(checkpoint, ensure_ascii=False),
+                    now,
+                ),
+            )
+
+    def get_checkpoint(self, *, user_id: str, task_id: str) -> dict[str, Any] | None:
+        with self._engine.begin() as conn:
+            row = self._execute(conn, 
+                """
+                SELECT checkpoint_json
+                FROM backtest_runner_checkpoint
+                WHERE task_id = ? AND user_id = ?
+                """,
+                (task_id, user_id),
+            ).fetchone()
+
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+
+class PostgresBacktestResultCache:
+    """按引擎输入指纹持久化的回测结果缓存（与 backtest_runner_result 同库）。"""
+
+    def __init__(self, *, engine: Any) -> None:
+        self._engine = engine
+        self._init_schema()
+
+    _execute = staticmethod(PostgresBacktestResultStore._execute)
+
+    def _init_schema(self) -> None:
+        with self._engine.begin() as conn:
+            self._execute(conn, 
+                """
+                CREATE TABLE IF NOT EXISTS backtest_runner_result_cache (
+                    fingerprint TEXT PRIMARY KEY,
+                    result_json TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+
+    def get(self, fingerprint: str) -> dict[str, Any] | None:
+        with self._engine.begin() as conn:
+            row = self._execute(conn, 
+                """
+                SELECT result_json
+                FROM backtest_runner_result_cache
+                WHERE fingerprint = ?
+                """,
+                (fingerprint,),
+            ).fetchone()
+
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def put(self, fingerprint: str, result: dict[str, Any]) -> None:
+        with self._engine.begin() as conn:
+            self._execute(conn, 
+                """
+                INSERT INTO backtest_runner_result_cache (fingerprint, result_json, created_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(fingerprint) DO NOTHING
+                """,
+                (
+                    fingerprint,
+                    json.dumps(result, ensure_ascii=False),
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
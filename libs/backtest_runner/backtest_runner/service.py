@@ -2,14 +2,30 @@
 
 from __future__ import annotations
 
+import itertools
 import math
+import threading
+import time
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Protocol
 
 from platform_core.callback_contract import require_explicit_keyword_parameters
 
+from backtest_runner import kernels, result_codec, simulation
 from backtest_runner.domain import BacktestTask
+from backtest_runner.progress import (
+    BacktestCancelledError,
+    ExecutionControl,
+    ProgressControl,
+    check_progress,
+)
 from backtest_runner.repository import InMemoryBacktestRepository
+from backtest_runner.result_cache import (
+    BacktestResultCache,
+    InMemoryBacktestResultCache,
+    fingerprint_engine_input,
+)
 from backtest_runner.result_store import InMemoryBacktestResultStore
 
 
@@ -38,6 +54,11 @@ class BacktestExecutionError(RuntimeError):
         self.message = message
 
 
+_CHECKPOINT_VERSION = 1
+# 组合回测：有报价 bar 不足全部 bar 并集一半的标的视为稀疏，剔除后不参与时间戳取交集。
+_PORTFOLIO_MIN_COVERAGE = 0.5
+
+
 class BacktestDispatcher(Protocol):
     def submit_backtest(self, task: BacktestTask) -> str:
         """向编排系统提交回测任务并返回 job_id。"""
@@ -50,8 +71,29 @@ class BacktestResultStore(Protocol):
     def get_result(self, *, user_id: str, task_id: str) -> dict[str, Any] | None:
         """读取回测结果。"""
 
+    def get_result_view(
+        self,
+        *,
+        user_id: str,
+        task_id: str,
+        metrics_only: bool = False,
+        start: int | None = None,
+        end: int | None = None,
+        max_points: int | None = None,
+    ) -> dict[str, Any] | None:
+        """按视图读取回测结果：只取指标、bar 区间切片或降采样曲线。"""
+
+    def append_result(self, *, user_id: str, task_id: str, extension: result_codec.ResultExtension) -> bool:
+        """增量回测：在已存结果上追加新 bar，不重写已有数据。"""
+
     def delete_result(self, *, user_id: str, task_id: str) -> bool:
-        """删除回测结果。"""
+        """删除回测结果（连同检查点）。"""
+
+    def save_checkpoint(self, *, user_id: str, task_id: str, checkpoint: dict[str, Any]) -> None:
+        """保存增量回测检查点。"""
+
+    def get_checkpoint(self, *, user_id: str, task_id: str) -> dict[str, Any] | None:
+        """读取增量回测检查点。"""
 
 
 class BacktestService:
@@ -63,16 +105,33 @@ class BacktestService:
         dispatcher: BacktestDispatcher | None = None,
         strategy_owner_acl: Callable[[str, str], bool] | None = None,
         result_store: BacktestResultStore | None = None,
+        result_cache: BacktestResultCache | None = None,
         strategy_reader: Callable[..., Any] | None = None,
         market_history_reader: Callable[..., Any] | None = None,
+        vectorized_kernels: bool = True,
+        max_sweep_combinations: int = 200,
+        max_sweep_bar_evaluations: int = 2_000_000,
+        sweep_time_budget_seconds: float = 30.0,
+        history_fetch_workers: int = 8,
+        max_portfolio_symbols: int = 500,
     ) -> None:
         self._repository = repository
         self._on_task_created = on_task_created
         self._dispatcher = dispatcher
         self._strategy_owner_acl = strategy_owner_acl or (lambda _user_id, _strategy_id: True)
         self._result_store = result_store or InMemoryBacktestResultStore()
+        self._result_cache = result_cache or InMemoryBacktestResultCache()
         self._strategy_reader = strategy_reader
         self._market_history_reader = market_history_reader
+        self._vectorized_kernels = vectorized_kernels
+        self._max_sweep_combinations = max(1, int(max_sweep_combinations))
+        # 扫描在请求线程内同步执行：按 组合数 × bar 数 限制总工作量，并设置墙钟预算。
+        self._max_sweep_bar_evaluations = max(1, int(max_sweep_bar_evaluations))
+        self._sweep_time_budget_seconds = max(0.0, float(sweep_time_budget_seconds))
+        self._history_fetch_workers = max(1, int(history_fetch_workers))
+        self._max_portfolio_symbols = max(1, int(max_portfolio_symbols))
+        self._controls: dict[str, Any] = {}
+        self._controls_lock = threading.Lock()
 
         require_explicit_keyword_parameters(
             self._strategy_reader,
@@ -119,34 +178,47 @@ class BacktestService:
 
     @staticmethod
     def _extract_close_prices(rows: Any) -> list[float]:
+        return [close for _timestamp, close in BacktestService._extract_close_series(rows)]
+
+    @staticmethod
+    def _extract_close_series(rows: Any) -> list[tuple[Any, float]]:
         if rows is None:
             return []
 
-        prices: list[float] = []
+        series: list[tuple[Any, float]] = []
         for row in list(rows):
             value: Any = None
+            timestamp: Any = None
             if isinstance(row, dict):
                 value = row.get("close")
                 if value is None:
                     value = row.get("close_price")
                 if value is None:
                     value = row.get("c")
+                for key in ("timestamp", "t", "date"):
+                    timestamp = row.get(key)
+                    if timestamp is not None:
+                        break
             else:
                 for key in ("close_price", "close", "c"):
                     if hasattr(row, key):
                         value = getattr(row, key)
                         if value is not None:
                             break
+                for key in ("timestamp", "t", "date"):
+                    timestamp = getattr(row, key, None)
+                    if timestamp is not None:
+                        break
 
             if value is None:
                 continue
 
             try:
-                prices.append(float(value))
+                series.append((timestamp, float(value)))
             except (TypeError, ValueError):
                 continue
 
-        return prices
+        return series
 
     def _call_strategy_reader(self, *, user_id: str, strategy_id: str) -> Any:
         if self._strategy_reader is None:
@@ -323,8 +395,8 @@ class BacktestService:
             "winRate": float(win_rate),
         }
 
+    @staticmethod
     def _simulate_backtest(
-        self,
         *,
         symbol: str,
         close_prices: list[float],
@@ -431,7 +503,7 @@ class BacktestService:
             if equity_curve:
                 equity_curve[-1]["equity"] = float(cash)
 
-        metrics = self._equity_metrics(
+        metrics = BacktestService._equity_metrics(
             initial_capital=initial_capital,
             equity_curve=equity_curve,
             daily_returns=daily_returns,
@@ -445,16 +517,115 @@ class BacktestService:
             "metrics": metrics,
         }
 
+    def _capital_settings(self, config: dict[str, Any]) -> tuple[float, float]:
+        initial_capital = self._to_non_negative_float(config.get("initialCapital"), fallback=100000.0)
+        if initial_capital is None or initial_capital <= 0:
+            raise BacktestExecutionError(
+                code="BACKTEST_INVALID_CONFIG",
+                message="initialCapital must be positive",
+            )
+
+        commission_rate = self._to_non_negative_float(config.get("commissionRate"), fallback=0.0)
+        if commission_rate is None:
+            raise BacktestExecutionError(
+                code="BACKTEST_INVALID_CONFIG",
+                message="commissionRate must be non-negative",
+            )
+        return float(initial_capital), float(commission_rate)
+
+    def _portfolio_symbols(self, config: dict[str, Any]) -> list[str] | None:
+        """`symbols` 含两个及以上标的（且未指定单个 `symbol`）时进入组合回测。"""
+
+        if str(config.get("symbol") or "").strip():
+            return None
+        raw = config.get("symbols")
+        if not isinstance(raw, list):
+            return None
+
+        symbols: list[str] = []
+        for item in raw:
+            symbol = str(item or "").strip().upper()
+            if symbol and symbol not in symbols:
+                symbols.append(symbol)
+        if len(symbols) < 2:
+            return None
+        if len(symbols) > self._max_portfolio_symbols:
+            raise BacktestExecutionError(
+                code="BACKTEST_INVALID_CONFIG",
+                message=f"symbols exceeds limit of {self._max_portfolio_symbols}",
+            )
+        return symbols
+
+    def _load_portfolio_history(
+        self,
+        *,
+        user_id: str,
+        symbols: list[str],
+        config: dict[str, Any],
+        timeframe: str,
+        start_date: Any,
+        end_date: Any,
+    ) -> tuple[dict[str, list[tuple[Any, float]]], list[dict[str, str]]]:
+        inline_prices = config.get("prices")
+        if self._market_history_reader is None and not isinstance(inline_prices, dict):
+            raise BacktestExecutionError(
+                code="BACKTEST_HISTORY_UNAVAILABLE",
+                message="market history reader is not configured",
+            )
+
+        def _fetch(symbol: str) -> list[tuple[Any, float]]:
+            if self._market_history_reader is None:
+                return self._extract_close_series([{"close": item} for item in inline_prices.get(symbol) or []])
+            rows = self._call_market_history_reader(
+                user_id=user_id,
+                symbol=symbol,
+                start_date=str(start_date) if start_date is not None else None,
+                end_date=str(end_date) if end_date is not None else None,
+                timeframe=timeframe,
+                limit=None,
+            )
+            return self._extract_close_series(rows)
+
+        # 行情读取以 I/O 为主，用有界线程池并发拉取各标的历史。
+        workers = min(self._history_fetch_workers, len(symbols))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backtest-history") as pool:
+            futures = {symbol: pool.submit(_fetch, symbol) for symbol in symbols}
+
+        series: dict[str, list[tuple[Any, float]]] = {}
+        skipped: list[dict[str, str]] = []
+        for symbol, future in futures.items():
+            try:
+                rows = future.result()
+            except Exception as exc:  # noqa: BLE001
+                skipped.append({"symbol": symbol, "reason": str(exc) or "history_failed"})
+                continue
+            if not rows:
+                skipped.append({"symbol": symbol, "reason": "history_empty"})
+                continue
+            series[symbol] = rows
+        return series, skipped
+
     def _build_engine_input(self, *, user_id: str, task: BacktestTask) -> dict[str, Any]:
-        config = dict(task.config or {})
+        return self._build_engine_input_from_config(
+            user_id=user_id,
+            strategy_id=task.strategy_id,
+            config=dict(task.config or {}),
+        )
 
-        strategy = self._call_strategy_reader(user_id=user_id, strategy_id=task.strategy_id)
+    def _build_engine_input_from_config(
+        self,
+        *,
+        user_id: str,
+        strategy_id: str,
+        config: dict[str, Any],
+    ) -> dict[str, Any]:
+        strategy = self._call_strategy_reader(user_id=user_id, strategy_id=strategy_id)
         if strategy is None and self._strategy_reader is not None:
             raise BacktestExecutionError(code="BACKTEST_STRATEGY_NOT_FOUND", message="strategy not found")
 
         if strategy is None:
             strategy = {
-                "id": task.strategy_id,
+                "id": strategy_id,
                 "userId": user_id,
                 "status": config.get("strategyStatus", "active"),
                 "template": config.get("template", "moving_average"),
@@ -487,6 +658,44 @@ class BacktestService:
         if not isinstance(parameters, dict):
             parameters = {}
 
+        timeframe = str(config.get("timeframe") or "1Day")
+        start_date = config.get("startDate")
+        end_date = config.get("endDate")
+
+        portfolio_symbols = self._portfolio_symbols(config)
+        if portfolio_symbols is not None:
+            series, skipped = self._load_portfolio_history(
+                user_id=user_id,
+                symbols=portfolio_symbols,
+                config=config,
+                timeframe=timeframe,
+                start_date=start_date,
+                end_date=end_date,
+            )
+            timestamps, symbols, close_matrix, alignment = simulation.align_close_series(
+                series,
+                min_coverage=_PORTFOLIO_MIN_COVERAGE,
+            )
+            skipped = skipped + [
+                {"symbol": symbol, "reason": "history_sparse"} for symbol in alignment["sparseSymbols"]
+            ]
+            initial_capital, commission_rate = self._capital_settings(config)
+            return {
+                "mode": "portfolio",
+                "symbols": symbols,
+                "skippedSymbols": skipped,
+                "template": template,
+                "parameters": parameters,
+                "timeframe": timeframe,
+                "startDate": start_date,
+                "endDate": end_date,
+                "timestamps": timestamps,
+                "alignment": alignment,
+                "closeMatrix": close_matrix,
+                "initialCapital": initial_capital,
+                "commissionRate": commission_rate,
+            }
+
         symbol = str(config.get("symbol") or "").strip().upper()
         if not symbol:
             symbols = config.get("symbols")
@@ -495,10 +704,6 @@ class BacktestService:
         if not symbol:
             raise BacktestExecutionError(code="BACKTEST_INVALID_CONFIG", message="config missing symbol")
 
-        timeframe = str(config.get("timeframe") or "1Day")
-        start_date = config.get("startDate")
-        end_date = config.get("endDate")
-
         history_rows = self._call_market_history_reader(
             user_id=user_id,
             symbol=symbol,
@@ -519,25 +724,15 @@ class BacktestService:
                 message="market history reader is not configured",
             )
 
-        close_prices = self._extract_close_prices(history_rows)
-        if not close_prices:
+        close_series = self._extract_close_series(history_rows)
+        if not close_series:
             inline_prices = config.get("prices")
             if isinstance(inline_prices, list):
-                close_prices = self._extract_close_prices([{"close": item} for item in inline_prices])
+                close_series = self._extract_close_series([{"close": item} for item in inline_prices])
+        close_prices = [close for _timestamp, close in close_series]
+        last_timestamp = simulation.timestamp_label(close_series[-1][0]) if close_series else None
 
-        initial_capital = self._to_non_negative_float(config.get("initialCapital"), fallback=100000.0)
-        if initial_capital is None or initial_capital <= 0:
-            raise BacktestExecutionError(
-                code="BACKTEST_INVALID_CONFIG",
-                message="initialCapital must be positive",
-            )
-
-        commission_rate = self._to_non_negative_float(config.get("commissionRate"), fallback=0.0)
-        if commission_rate is None:
-            raise BacktestExecutionError(
-                code="BACKTEST_INVALID_CONFIG",
-                message="commissionRate must be non-negative",
-            )
+        initial_capital, commission_rate = self._capital_settings(config)
 
         return {
             "symbol": symbol,
@@ -547,78 +742,411 @@ class BacktestService:
             "startDate": start_date,
             "endDate": end_date,
             "closePrices": close_prices,
-            "initialCapital": float(initial_capital),
-            "commissionRate": float(commission_rate),
+            "lastTimestamp": str(last_timestamp) if last_timestamp is not None else None,
+            "initialCapital": initial_capital,
+            "commissionRate": commission_rate,
         }
 
-    def _run_backtest_engine(self, *, user_id: str, task: BacktestTask) -> dict[str, Any]:
-        engine_input = self._build_engine_input(user_id=user_id, task=task)
-        close_prices = engine_input["closePrices"]
-        template = str(engine_input["template"])
-        parameters = dict(engine_input["parameters"])
-
+    @classmethod
+    def _template_parameters(cls, *, template: str, parameters: dict[str, Any], bar_count: int) -> dict[str, Any]:
         if template == "moving_average":
-            short_window = self._to_positive_int(parameters.get("shortWindow"), fallback=5)
-            long_window = self._to_positive_int(parameters.get("longWindow"), fallback=20)
+            short_window = cls._to_positive_int(parameters.get("shortWindow"), fallback=5)
+            long_window = cls._to_positive_int(parameters.get("longWindow"), fallback=20)
             if short_window is None or long_window is None or short_window >= long_window:
                 raise BacktestExecutionError(
                     code="BACKTEST_INVALID_PARAMETERS",
                     message="moving_average parameters invalid",
                 )
-            if len(close_prices) < long_window + 1:
+            if bar_count < long_window + 1:
                 raise BacktestExecutionError(
                     code="BACKTEST_INSUFFICIENT_DATA",
                     message="insufficient_data",
                 )
-            events = self._moving_average_events(
-                close_prices=close_prices,
-                short_window=short_window,
-                long_window=long_window,
-            )
-        elif template == "mean_reversion":
-            window = self._to_positive_int(parameters.get("window"), fallback=20)
-            entry_z = self._to_non_negative_float(parameters.get("entryZ"), fallback=1.5)
+            return {"short_window": short_window, "long_window": long_window}
+
+        if template == "mean_reversion":
+            window = cls._to_positive_int(parameters.get("window"), fallback=20)
+            entry_z = cls._to_non_negative_float(parameters.get("entryZ"), fallback=1.5)
             if window is None or entry_z is None or entry_z <= 0:
                 raise BacktestExecutionError(
                     code="BACKTEST_INVALID_PARAMETERS",
                     message="mean_reversion parameters invalid",
                 )
-            if len(close_prices) < window:
+            if bar_count < window:
                 raise BacktestExecutionError(
                     code="BACKTEST_INSUFFICIENT_DATA",
                     message="insufficient_data",
                 )
-            events = self._mean_reversion_events(
+            return {"window": window, "entry_z": float(entry_z)}
+
+        raise BacktestExecutionError(
+            code="BACKTEST_UNSUPPORTED_TEMPLATE",
+            message=f"unsupported template: {template}",
+        )
+
+    @classmethod
+    def _template_events(
+        cls,
+        *,
+        template: str,
+        parameters: dict[str, Any],
+        close_prices: list[float],
+        statistics: kernels.RollingStatistics | None = None,
+        vectorized_kernels: bool = True,
+    ) -> list[dict[str, Any]]:
+        normalized = cls._template_parameters(template=template, parameters=parameters, bar_count=len(close_prices))
+        if template == "moving_average":
+            if vectorized_kernels:
+                return kernels.moving_average_events(close_prices=close_prices, statistics=statistics, **normalized)
+            return cls._moving_average_events(close_prices=close_prices, **normalized)
+
+        if vectorized_kernels:
+            return kernels.mean_reversion_events(close_prices=close_prices, statistics=statistics, **normalized)
+        return cls._mean_reversion_events(close_prices=close_prices, **normalized)
+
+    @classmethod
+    def _template_events_by_column(
+        cls,
+        *,
+        template: str,
+        parameters: dict[str, Any],
+        close_matrix: Any,
+        vectorized_kernels: bool = True,
+    ) -> list[list[dict[str, Any]]]:
+        """组合回测：对 (bar, symbol) 价格矩阵的每一列生成模板事件。"""
+
+        normalized = cls._template_parameters(template=template, parameters=parameters, bar_count=len(close_matrix))
+        if vectorized_kernels:
+            if template == "moving_average":
+                return kernels.moving_average_events_by_column(close_matrix=close_matrix, **normalized)
+            return kernels.mean_reversion_events_by_column(close_matrix=close_matrix, **normalized)
+
+        reference = cls._moving_average_events if template == "moving_average" else cls._mean_reversion_events
+        columns = [close_matrix[:, column].tolist() for column in range(close_matrix.shape[1])]
+        return [reference(close_prices=column, **normalized) for column in columns]
+
+    @classmethod
+    def _compute_engine_result(
+        cls,
+        *,
+        engine_input: dict[str, Any],
+        vectorized_kernels: bool = True,
+        metrics_only: bool = False,
+        with_checkpoint: bool = False,
+        control: ProgressControl | None = None,
+    ) -> dict[str, Any]:
+        if engine_input.get("mode") == "portfolio":
+            return cls._compute_portfolio_result(
+                engine_input=engine_input,
+                vectorized_kernels=vectorized_kernels,
+                metrics_only=metrics_only,
+                control=control,
+            )
+
+        close_prices = engine_input["closePrices"]
+        template = str(engine_input["template"])
+        check_progress(control, processed=0, total=len(close_prices))
+        events = cls._template_events(
+            template=template,
+            parameters=dict(engine_input["parameters"]),
+            close_prices=close_prices,
+            vectorized_kernels=vectorized_kernels,
+        )
+
+        checkpoint: dict[str, Any] | None = None
+        if vectorized_kernels:
+            simulated_result = simulation.simulate_backtest(
+                symbol=engine_input["symbol"],
                 close_prices=close_prices,
-                window=window,
-                entry_z=float(entry_z),
+                events=events,
+                initial_capital=float(engine_input["initialCapital"]),
+                commission_rate=float(engine_input["commissionRate"]),
+                control=control,
             )
+            simulated = simulated_result.to_payload(include_curve=not metrics_only)
+            if with_checkpoint:
+                checkpoint = cls._checkpoint_payload(
+                    engine_input=engine_input,
+                    state=simulation.build_checkpoint(
+                        simulated_result,
+                        close_prices=close_prices,
+                        window=cls._checkpoint_window(
+                            template=template,
+                            parameters=dict(engine_input["parameters"]),
+                            bar_count=len(close_prices),
+                        ),
+                        last_timestamp=engine_input.get("lastTimestamp"),
+                        initial_capital=float(engine_input["initialCapital"]),
+                        commission_rate=float(engine_input["commissionRate"]),
+                    ),
+                )
         else:
-            raise BacktestExecutionError(
-                code="BACKTEST_UNSUPPORTED_TEMPLATE",
-                message=f"unsupported template: {template}",
+            simulated = cls._simulate_backtest(
+                symbol=engine_input["symbol"],
+                close_prices=close_prices,
+                events=events,
+                initial_capital=float(engine_input["initialCapital"]),
+                commission_rate=float(engine_input["commissionRate"]),
             )
+            check_progress(control, processed=len(close_prices), total=len(close_prices))
 
-        simulated = self._simulate_backtest(
-            symbol=engine_input["symbol"],
-            close_prices=close_prices,
-            events=events,
+        result = {
+            "symbol": engine_input["symbol"],
+            "template": template,
+            "timeframe": engine_input["timeframe"],
+            "startDate": engine_input["startDate"],
+            "endDate": engine_input["endDate"],
+            "trades": simulated["trades"],
+            "metrics": simulated["metrics"],
+        }
+        if not metrics_only:
+            result["equityCurve"] = simulated["equityCurve"]
+            result["dailyReturns"] = simulated["dailyReturns"]
+        if checkpoint is not None:
+            result["checkpoint"] = checkpoint
+        return result
+
+    @classmethod
+    def _checkpoint_window(cls, *, template: str, parameters: dict[str, Any], bar_count: int) -> int:
+        """续算时需要保留的尾部价格数量：足以复算首个新 bar 的模板信号。"""
+
+        normalized = cls._template_parameters(template=template, parameters=parameters, bar_count=bar_count)
+        if template == "moving_average":
+            return int(normalized["long_window"])
+        return int(normalized["window"])
+
+    @staticmethod
+    def _checkpoint_payload(*, engine_input: dict[str, Any], state: simulation.EngineCheckpoint) -> dict[str, Any]:
+        return {
+            "version": _CHECKPOINT_VERSION,
+            "symbol": engine_input["symbol"],
+            "template": str(engine_input["template"]),
+            "parameters": dict(engine_input["parameters"]),
+            "timeframe": engine_input["timeframe"],
+            "state": state.to_payload(),
+        }
+
+    @classmethod
+    def _compute_portfolio_result(
+        cls,
+        *,
+        engine_input: dict[str, Any],
+        vectorized_kernels: bool = True,
+        metrics_only: bool = False,
+        control: ProgressControl | None = None,
+    ) -> dict[str, Any]:
+        template = str(engine_input["template"])
+        symbols = list(engine_input["symbols"])
+        close_matrix = engine_input["closeMatrix"]
+        check_progress(control, processed=0, total=len(close_matrix) * len(symbols))
+        events_by_symbol = cls._template_events_by_column(
+            template=template,
+            parameters=dict(engine_input["parameters"]),
+            close_matrix=close_matrix,
+            vectorized_kernels=vectorized_kernels,
+        )
+        simulated = simulation.simulate_portfolio(
+            symbols=symbols,
+            close_matrix=close_matrix,
+            events_by_symbol=events_by_symbol,
             initial_capital=float(engine_input["initialCapital"]),
             commission_rate=float(engine_input["commissionRate"]),
+            control=control,
+        ).to_payload(include_curve=not metrics_only)
+
+        result = {
+            "mode": "portfolio",
+            "symbols": symbols,
+            "skippedSymbols": list(engine_input.get("skippedSymbols") or []),
+            "template": template,
+            "timeframe": engine_input["timeframe"],
+            "startDate": engine_input["startDate"],
+            "endDate": engine_input["endDate"],
+            "barCount": len(close_matrix),
+            "alignment": dict(engine_input.get("alignment") or {}),
+            "trades": simulated["trades"],
+            "metrics": simulated["metrics"],
+            "perSymbol": simulated["perSymbol"],
+        }
+        if not metrics_only:
+            result["timestamps"] = list(engine_input.get("timestamps") or [])
+            result["equityCurve"] = simulated["equityCurve"]
+            result["dailyReturns"] = simulated["dailyReturns"]
+        return result
+
+    def _run_backtest_engine(
+        self,
+        *,
+        user_id: str,
+        task: BacktestTask,
+        metrics_only: bool = False,
+    ) -> dict[str, Any]:
+        engine_input = self._build_engine_input(user_id=user_id, task=task)
+        computed = self._compute_engine_result(
+            engine_input=engine_input,
+            vectorized_kernels=self._vectorized_kernels,
+            metrics_only=metrics_only,
         )
+        return {"taskId": task.id, "strategyId": task.strategy_id, **computed}
+
+    def _expand_sweep_parameters(
+        self,
+        *,
+        parameter_sets: list[dict[str, Any]] | None,
+        parameter_grid: dict[str, list[Any]] | None,
+    ) -> list[dict[str, Any]]:
+        combinations: list[dict[str, Any]] = []
+        for item in parameter_sets or []:
+            if not isinstance(item, dict):
+                raise BacktestExecutionError(
+                    code="BACKTEST_INVALID_SWEEP",
+                    message="parameterSets items must be objects",
+                )
+            combinations.append(dict(item))
+
+        if parameter_grid:
+            keys = list(parameter_grid.keys())
+            axes: list[list[Any]] = []
+            for key in keys:
+                values = parameter_grid[key]
+                if not isinstance(values, list) or not values:
+                    raise BacktestExecutionError(
+                        code="BACKTEST_INVALID_SWEEP",
+                        message=f"parameterGrid.{key} must be a non-empty list",
+                    )
+                axes.append(values)
+            grid_size = math.prod(len(values) for values in axes)
+            if len(combinations) + grid_size > self._max_sweep_combinations:
+                raise BacktestExecutionError(
+                    code="BACKTEST_SWEEP_TOO_LARGE",
+                    message=f"sweep exceeds {self._max_sweep_combinations} parameter combinations",
+                )
+            combinations.extend(dict(zip(keys, values)) for values in itertools.product(*axes))
+
+        if not combinations:
+            raise BacktestExecutionError(
+                code="BACKTEST_INVALID_SWEEP",
+                message="parameterSets or parameterGrid is required",
+            )
+        if len(combinations) > self._max_sweep_combinations:
+            raise BacktestExecutionError(
+                code="BACKTEST_SWEEP_TOO_LARGE",
+                message=f"sweep exceeds {self._max_sweep_combinations} parameter combinations",
+            )
+        return combinations
+
+    def run_parameter_sweep(
+        self,
+        *,
+        user_id: str,
+        strategy_id: str,
+        config: dict[str, Any],
+        parameter_sets: list[dict[str, Any]] | None = None,
+        parameter_grid: dict[str, list[Any]] | None = None,
+    ) -> dict[str, Any]:
+        """同一策略/标的/区间下批量评估多组参数，只加载一次行情并共享滚动统计。
+
+        在调用线程内同步执行：组合数、组合数 × bar 数超限时拒绝，超过时间预算时中止，
+        均以 `BacktestExecutionError` 报告。
+        """
+
+        if not self._strategy_owner_acl(user_id, strategy_id):
+            raise BacktestAccessDeniedError("strategy does not belong to current user")
+
+        combinations = self._expand_sweep_parameters(
+            parameter_sets=parameter_sets,
+            parameter_grid=parameter_grid,
+        )
+        engine_input = self._build_engine_input_from_config(
+            user_id=user_id,
+            strategy_id=strategy_id,
+            config=dict(config or {}),
+        )
+        if engine_input.get("mode") == "portfolio":
+            raise BacktestExecutionError(
+                code="BACKTEST_INVALID_SWEEP",
+                message="parameter sweep requires a single symbol",
+            )
+        close_prices = engine_input["closePrices"]
+        if len(combinations) * len(close_prices) > self._max_sweep_bar_evaluations:
+            raise BacktestExecutionError(
+                code="BACKTEST_SWEEP_TOO_LARGE",
+                message=(
+                    f"sweep of {len(combinations)} combinations over {len(close_prices)} bars "
+                    f"exceeds {self._max_sweep_bar_evaluations} bar evaluations"
+                ),
+            )
+        template = str(engine_input["template"])
+        base_parameters = dict(engine_input["parameters"])
+        initial_capital = float(engine_input["initialCapital"])
+        commission_rate = float(engine_input["commissionRate"])
+        statistics = kernels.RollingStatistics(close_prices) if self._vectorized_kernels else None
+        deadline = time.monotonic() + self._sweep_time_budget_seconds
+
+        parameter_keys: list[str] = []
+        for combination in combinations:
+            for key in combination:
+                if key not in parameter_keys:
+                    parameter_keys.append(key)
+        metric_keys = list(simulation.empty_metrics().keys())
+
+        rows: list[list[Any]] = []
+        errors: list[dict[str, Any]] = []
+        for index, combination in enumerate(combinations):
+            if index > 0 and time.monotonic() > deadline:
+                raise BacktestExecutionError(
+                    code="BACKTEST_SWEEP_TIMEOUT",
+                    message=f"sweep exceeded time budget of {self._sweep_time_budget_seconds} seconds",
+                )
+            parameters = {**base_parameters, **combination}
+            try:
+                events = self._template_events(
+                    template=template,
+                    parameters=parameters,
+                    close_prices=close_prices,
+                    statistics=statistics,
+                    vectorized_kernels=self._vectorized_kernels,
+                )
+            except BacktestExecutionError as exc:
+                if exc.code == "BACKTEST_UNSUPPORTED_TEMPLATE":
+                    raise
+                errors.append({"parameters": combination, "code": exc.code, "message": exc.message})
+                continue
+
+            if statistics is not None:
+                metrics = simulation.simulate_backtest(
+                    symbol=engine_input["symbol"],
+                    close_prices=statistics.prices,
+                    events=events,
+                    initial_capital=initial_capital,
+                    commission_rate=commission_rate,
+                ).metrics
+            else:
+                metrics = self._simulate_backtest(
+                    symbol=engine_input["symbol"],
+                    close_prices=close_prices,
+                    events=events,
+                    initial_capital=initial_capital,
+                    commission_rate=commission_rate,
+                )["metrics"]
+
+            rows.append(
+                [combination.get(key) for key in parameter_keys]
+                + [float(metrics.get(key, 0.0)) for key in metric_keys]
+            )
 
         return {
-            "taskId": task.id,
-            "strategyId": task.strategy_id,
+            "strategyId": strategy_id,
             "symbol": engine_input["symbol"],
             "template": template,
             "timeframe": engine_input["timeframe"],
             "startDate": engine_input["startDate"],
             "endDate": engine_input["endDate"],
-            "equityCurve": simulated["equityCurve"],
-            "dailyReturns": simulated["dailyReturns"],
-            "trades": simulated["trades"],
-            "metrics": simulated["metrics"],
+            "barCount": len(close_prices),
+            "combinationCount": len(combinations),
+            "columns": parameter_keys + metric_keys,
+            "rows": rows,
+            "errors": errors,
         }
 
     def create_task(
@@ -667,7 +1195,20 @@ class BacktestService:
 
         return task
 
-    def execute_task(self, *, user_id: str, task_id: str) -> dict[str, Any]:
+    def begin_execution(
+        self,
+        *,
+        user_id: str,
+        task_id: str,
+        control: ProgressControl | None = None,
+    ) -> dict[str, Any]:
+        """执行第一阶段：任务置为 running 并装配引擎输入（读取策略与行情）。
+
+        返回值可 pickle，交给 `compute_backtest_result` 在任意进程中完成纯计算。
+        `control` 在计算阶段的分块边界被检查；跨进程执行时需传入可 pickle 的通道
+        （如 `JobOrchestrationService.create_control()`）。未传入时使用进程内通道。
+        """
+
         task = self._repository.get_by_id(task_id, user_id=user_id)
         if task is None:
             raise BacktestAccessDeniedError("backtest task does not belong to current user")
@@ -683,19 +1224,7 @@ class BacktestService:
             )
 
         try:
-            result = self._run_backtest_engine(user_id=user_id, task=task)
-            metrics = result.get("metrics") or {}
-            completed = self.transition(
-                user_id=user_id,
-                task_id=task.id,
-                to_status="completed",
-                metrics={key: float(value) for key, value in metrics.items()},
-            )
-            if completed is None:
-                raise BacktestAccessDeniedError("backtest task does not belong to current user")
-            self._result_store.save_result(user_id=user_id, task_id=completed.id, result=result)
-            result["metrics"] = dict(completed.metrics or {})
-            return {"task": completed, "result": result}
+            engine_input = self._build_engine_input(user_id=user_id, task=task)
         except BacktestExecutionError:
             self.transition(user_id=user_id, task_id=task.id, to_status="failed")
             raise
@@ -703,6 +1232,243 @@ class BacktestService:
             self.transition(user_id=user_id, task_id=task.id, to_status="failed")
             raise BacktestExecutionError(code="BACKTEST_ENGINE_FAILED", message=str(exc)) from exc
 
+        control = control if control is not None else ExecutionControl()
+        with self._controls_lock:
+            self._controls[task.id] = control
+
+        fingerprint = fingerprint_engine_input(engine_input, vectorized_kernels=self._vectorized_kernels)
+        prepared: dict[str, Any] = {
+            "taskId": task.id,
+            "strategyId": task.strategy_id,
+            "engineInput": engine_input,
+            "vectorizedKernels": self._vectorized_kernels,
+            "fingerprint": fingerprint,
+            "control": control,
+        }
+        cached = self._result_cache.get(fingerprint)
+        if cached is not None:
+            # 命中时不再携带行情序列，计算阶段直接返回缓存结果。
+            prepared["engineInput"] = None
+            prepared["cachedResult"] = cached
+        return prepared
+
+    def complete_execution(self, *, user_id: str, task_id: str, outcome: dict[str, Any]) -> dict[str, Any]:
+        """执行第三阶段：按 `compute_backtest_result` 的输出落库结果或标记失败。"""
+
+        with self._controls_lock:
+            self._controls.pop(task_id, None)
+
+        error = outcome.get("error")
+        current = self._repository.get_by_id(task_id, user_id=user_id)
+        cancelled = (current is not None and current.status == "cancelled") or (
+            error is not None and error.get("code") == "BACKTEST_CANCELLED"
+        )
+        if cancelled:
+            # 计算期间被取消：不落库结果，任务收敛为 cancelled。
+            if current is not None and current.status == "running":
+                self.transition(user_id=user_id, task_id=task_id, to_status="cancelled")
+            raise BacktestExecutionError(code="BACKTEST_CANCELLED", message="backtest cancelled")
+
+        if error is not None:
+            self.transition(user_id=user_id, task_id=task_id, to_status="failed")
+            raise BacktestExecutionError(
+                code=str(error.get("code") or "BACKTEST_ENGINE_FAILED"),
+                message=str(error.get("message") or "backtest engine failed"),
+            )
+
+        result = dict(outcome["result"])
+        # 检查点按任务单独保存，不进入结果缓存。
+        checkpoint = result.pop("checkpoint", None)
+        cache_info = result.get("cache") or {}
+        fingerprint = cache_info.get("fingerprint")
+        if fingerprint and not cache_info.get("hit"):
+            self._result_cache.put(
+                str(fingerprint),
+                {key: value for key, value in result.items() if key not in {"taskId", "strategyId", "cache"}},
+            )
+        metrics = result.get("metrics") or {}
+        completed = self.transition(
+            user_id=user_id,
+            task_id=task_id,
+            to_status="completed",
+            metrics={key: float(value) for key, value in metrics.items()},
+        )
+        if completed is None:
+            raise BacktestAccessDeniedError("backtest task does not belong to current user")
+        self._result_store.save_result(user_id=user_id, task_id=completed.id, result=result)
+        save_checkpoint = getattr(self._result_store, "save_checkpoint", None)
+        if checkpoint is not None and callable(save_checkpoint):
+            save_checkpoint(user_id=user_id, task_id=completed.id, checkpoint=checkpoint)
+        result["metrics"] = dict(completed.metrics or {})
+        return {"task": completed, "result": result}
+
+    def extend_task(
+        self,
+        *,
+        user_id: str,
+        task_id: str,
+        new_bars: list[Any] | None = None,
+        end_date: str | None = None,
+    ) -> dict[str, Any]:
+        """增量回测：从检查点续算新增 bar，只处理新数据并更新已存结果与任务指标。
+
+        `new_bars` 为空时通过行情读取器拉取检查点末 bar 之后的数据。
+        """
+
+        task = self._repository.get_by_id(task_id, user_id=user_id)
+        if task is None:
+            raise BacktestAccessDeniedError("backtest task does not belong to current user")
+        if task.status != "completed":
+            raise BacktestExecutionError(
+                code="BACKTEST_INVALID_STATE",
+                message=f"task status={task.status} is not extendable",
+            )
+
+        get_checkpoint = getattr(self._result_store, "get_checkpoint", None)
+        checkpoint = get_checkpoint(user_id=user_id, task_id=task_id) if callable(get_checkpoint) else None
+        stored = self._result_store.get_result_view(user_id=user_id, task_id=task_id, metrics_only=True)
+        if checkpoint is None or stored is None or checkpoint.get("version") != _CHECKPOINT_VERSION:
+            raise BacktestExecutionError(
+                code="BACKTEST_CHECKPOINT_UNAVAILABLE",
+                message="backtest checkpoint is unavailable",
+            )
+
+        state = simulation.EngineCheckpoint.from_payload(checkpoint["state"])
+        new_series = self._load_extension_bars(
+            user_id=user_id,
+            task=task,
+            checkpoint=checkpoint,
+            last_timestamp=state.last_timestamp,
+            new_bars=new_bars,
+            end_date=end_date,
+        )
+        if not new_series:
+            result = self._result_store.get_result(user_id=user_id, task_id=task_id) or {}
+            result["metrics"] = dict(task.metrics or {})
+            return {"task": task, "result": result, "appendedBars": 0}
+
+        new_prices = [close for _timestamp, close in new_series]
+        window = state.price_window
+        events = self._template_events(
+            template=str(checkpoint["template"]),
+            parameters=dict(checkpoint["parameters"]),
+            close_prices=window + new_prices,
+            vectorized_kernels=self._vectorized_kernels,
+        )
+        # 只保留新 bar 上的事件，并换算为全序列绝对下标。
+        offset = state.bar_count - len(window)
+        events = [
+            {**event, "index": int(event["index"]) + offset} for event in events if int(event["index"]) >= len(window)
+        ]
+        last_label = new_series[-1][0]
+        resumed = simulation.resume_backtest(
+            checkpoint=state,
+            symbol=str(checkpoint["symbol"]),
+            new_prices=new_prices,
+            events=events,
+            last_timestamp=str(last_label) if last_label is not None else state.last_timestamp,
+        )
+
+        # 上一次的强制平仓交易与末点权益由检查点状态替换。
+        extension = result_codec.ResultExtension(
+            equity=resumed.equity.tolist(),
+            daily_returns=resumed.daily_returns.tolist(),
+            trades=resumed.trades,
+            metrics=dict(resumed.metrics),
+            last_equity=state.last_equity,
+            fields={"endDate": end_date} if end_date is not None else {},
+        )
+
+        task.refresh_metrics({key: float(value) for key, value in resumed.metrics.items()})
+        self._repository.save(task)
+        append_result = getattr(self._result_store, "append_result", None)
+        if callable(append_result):
+            append_result(user_id=user_id, task_id=task_id, extension=extension)
+        else:
+            result = result_codec.extend_result(
+                self._result_store.get_result(user_id=user_id, task_id=task_id) or {},
+                extension,
+            )
+            result.pop("updatedAt", None)
+            self._result_store.save_result(user_id=user_id, task_id=task_id, result=result)
+        self._result_store.save_checkpoint(
+            user_id=user_id,
+            task_id=task_id,
+            checkpoint={**checkpoint, "state": resumed.checkpoint.to_payload()},
+        )
+        result = self._result_store.get_result(user_id=user_id, task_id=task_id) or {}
+        return {"task": task, "result": result, "appendedBars": len(new_prices)}
+
+    def _load_extension_bars(
+        self,
+        *,
+        user_id: str,
+        task: BacktestTask,
+        checkpoint: dict[str, Any],
+        last_timestamp: str | None,
+        new_bars: list[Any] | None,
+        end_date: str | None,
+    ) -> list[tuple[Any, float]]:
+        if new_bars is None:
+            if last_timestamp is None:
+                raise BacktestExecutionError(
+                    code="BACKTEST_CHECKPOINT_UNAVAILABLE",
+                    message="checkpoint has no timestamp; new bars must be provided",
+                )
+            config = dict(task.config or {})
+            resolved_end = end_date if end_date is not None else config.get("endDate")
+            new_bars = self._call_market_history_reader(
+                user_id=user_id,
+                symbol=str(checkpoint["symbol"]),
+                start_date=last_timestamp,
+                end_date=str(resolved_end) if resolved_end is not None else None,
+                timeframe=str(checkpoint.get("timeframe") or "1Day"),
+                limit=None,
+            )
+            if new_bars is None:
+                raise BacktestExecutionError(
+                    code="BACKTEST_HISTORY_UNAVAILABLE",
+                    message="market history reader is not configured",
+                )
+
+        series = [
+            (simulation.timestamp_label(timestamp), close)
+            for timestamp, close in self._extract_close_series(new_bars)
+        ]
+        if last_timestamp is None:
+            return series
+        # 读取器按闭区间返回，丢弃检查点末 bar 及更早的数据；按解析后的时间比较，
+        # 纯日期与带时间的标签混用时字符串比较不可靠。
+        return [
+            (str(label), close)
+            for label, close in series
+            if label is not None and simulation.timestamp_after(label, last_timestamp)
+        ]
+
+    def fail_execution(self, *, user_id: str, task_id: str) -> BacktestTask | None:
+        """计算阶段未能返回（超时、执行器异常）时，将 running 任务收敛为 failed。"""
+
+        with self._controls_lock:
+            self._controls.pop(task_id, None)
+        task = self._repository.get_by_id(task_id, user_id=user_id)
+        if task is None or task.status != "running":
+            return task
+        return self.transition(user_id=user_id, task_id=task_id, to_status="failed")
+
+    def execute_task(
+        self,
+        *,
+        user_id: str,
+        task_id: str,
+        control: ProgressControl | None = None,
+    ) -> dict[str, Any]:
+        prepared = self.begin_execution(user_id=user_id, task_id=task_id, control=control)
+        return self.complete_execution(
+            user_id=user_id,
+            task_id=task_id,
+            outcome=compute_backtest_result(prepared),
+        )
+
     def get_task(self, *, user_id: str, task_id: str) -> BacktestTask | None:
         return self._repository.get_by_id(task_id, user_id=user_id)
 
@@ -743,11 +1509,41 @@ class BacktestService:
         )
         return [item for item in all_items if item.id != task.id][:normalized_limit]
 
-    def get_task_result(self, *, user_id: str, task_id: str) -> dict[str, Any] | None:
+    def get_task_result(
+        self,
+        *,
+        user_id: str,
+        task_id: str,
+        metrics_only: bool = False,
+        start: int | None = None,
+        end: int | None = None,
+        max_points: int | None = None,
+    ) -> dict[str, Any] | None:
         task = self._repository.get_by_id(task_id, user_id=user_id)
         if task is None:
             raise BacktestAccessDeniedError("backtest task does not belong to current user")
-        return self._result_store.get_result(user_id=user_id, task_id=task_id)
+
+        full_view = not metrics_only and start is None and end is None and max_points is None
+        get_result_view = getattr(self._result_store, "get_result_view", None)
+        if full_view or not callable(get_result_view):
+            result = self._result_store.get_result(user_id=user_id, task_id=task_id)
+            if result is None or full_view:
+                return result
+            return result_codec.decode_result(
+                result_codec.encode_result(result),
+                metrics_only=metrics_only,
+                start=start,
+                end=end,
+                max_points=max_points,
+            )
+        return get_result_view(
+            user_id=user_id,
+            task_id=task_id,
+            metrics_only=metrics_only,
+            start=start,
+            end=end,
+            max_points=max_points,
+        )
 
     def list_tasks(
         self,
@@ -789,7 +1585,26 @@ class BacktestService:
         return task
 
     def cancel_task(self, *, user_id: str, task_id: str) -> BacktestTask | None:
-        return self.transition(user_id=user_id, task_id=task_id, to_status="cancelled")
+        task = self.transition(user_id=user_id, task_id=task_id, to_status="cancelled")
+        if task is not None:
+            # 运行中的计算在下一个分块边界退出。
+            with self._controls_lock:
+                control = self._controls.get(task_id)
+            cancel = getattr(control, "cancel", None)
+            if callable(cancel):
+                cancel()
+        return task
+
+    def task_progress(self, *, user_id: str, task_id: str) -> dict[str, Any] | None:
+        """运行中任务的实时进度（已处理 bar / 总 bar、耗时）；未在执行时返回 None。"""
+
+        task = self._repository.get_by_id(task_id, user_id=user_id)
+        if task is None:
+            raise BacktestAccessDeniedError("backtest task does not belong to current user")
+        with self._controls_lock:
+            control = self._controls.get(task_id)
+        snapshot = getattr(control, "snapshot", None)
+        return snapshot() if callable(snapshot) else None
 
     def retry_task(self, *, user_id: str, task_id: str) -> BacktestTask | None:
         return self.transition(user_id=user_id, task_id=task_id, to_status="pending")
@@ -886,3 +1701,46 @@ class BacktestService:
                 "worstReturnRate": min(return_rates) if return_rates else 0.0,
             },
         }
+
+
+def compute_backtest_result(prepared: dict[str, Any]) -> dict[str, Any]:
+    """回测纯计算阶段（模块级函数，可被进程池 pickle）。
+
+    输入为 `BacktestService.begin_execution` 的返回值；引擎异常折叠为
+    `{"error": {...}}`，避免跨进程传递异常对象。
+    """
+
+    fingerprint = prepared.get("fingerprint")
+    cached = prepared.get("cachedResult")
+    if cached is not None:
+        return {
+            "result": {
+                "taskId": prepared["taskId"],
+                "strategyId": prepared["strategyId"],
+                **cached,
+                "cache": {"hit": True, "fingerprint": fingerprint},
+            }
+        }
+
+    try:
+        computed = BacktestService._compute_engine_result(
+            engine_input=prepared["engineInput"],
+            vectorized_kernels=bool(prepared.get("vectorizedKernels", True)),
+            with_checkpoint=True,
+            control=prepared.get("control"),
+        )
+    except BacktestCancelledError as exc:
+        return {"error": {"code": "BACKTEST_CANCELLED", "message": str(exc)}}
+    except BacktestExecutionError as exc:
+        return {"error": {"code": exc.code, "message": exc.message}}
+    except Exception as exc:  # noqa: BLE001
+        return {"error": {"code": "BACKTEST_ENGINE_FAILED", "message": str(exc)}}
+
+    result = {
+        "taskId": prepared["taskId"],
+        "strategyId": prepared["strategyId"],
+        **computed,
+    }
+    if fingerprint is not None:
+        result["cache"] = {"hit": False, "fingerprint": fingerprint}
+    return {"result": result}
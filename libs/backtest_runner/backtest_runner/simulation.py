@@ -0,0 +1,771 @@
+"""回测撮合模拟（数组化）。
+
+权益、持仓与日收益保存在预分配的 float 数组中；交易事件只在触发的 bar 上
+逐条处理，事件之间的持仓/现金区段整体填充，指标通过向量化归约计算。
+dict 形态的 `equityCurve` 仅在序列化时生成。
+
+组合回测按等权把初始资金分配到各标的，逐列复用单标的模拟，再对权益矩阵
+按行求和得到组合权益。
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+from datetime import date, datetime, timezone
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from backtest_runner.progress import ProgressControl, check_progress
+
+# 分块撮合的块大小（bar 数）：取消检查与进度上报发生在块边界。
+CHUNK_BARS = 65_536
+
+
+def empty_metrics() -> dict[str, float]:
+    return {
+        "returnRate": 0.0,
+        "maxDrawdown": 0.0,
+        "sharpeRatio": 0.0,
+        "tradeCount": 0.0,
+        "winRate": 0.0,
+    }
+
+
+@dataclass
+class SimulationResult:
+    equity: np.ndarray
+    daily_returns: np.ndarray
+    positions: np.ndarray
+    trades: list[dict[str, Any]] = field(default_factory=list)
+    sell_pnls: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float64))
+    metrics: dict[str, float] = field(default_factory=empty_metrics)
+    state: EngineState | None = None
+    pre_close_equity: float = 0.0
+
+    def equity_curve(self) -> list[dict[str, float]]:
+        return [{"index": float(idx), "equity": value} for idx, value in enumerate(self.equity.tolist())]
+
+    def to_payload(self, *, include_curve: bool = True) -> dict[str, Any]:
+        payload: dict[str, Any] = {"trades": self.trades, "metrics": dict(self.metrics)}
+        if include_curve:
+            payload["equityCurve"] = self.equity_curve()
+            payload["dailyReturns"] = self.daily_returns.tolist()
+        return payload
+
+
+def equity_metrics(
+    *,
+    initial_capital: float,
+    equity: np.ndarray,
+    daily_returns: np.ndarray,
+    sell_pnls: np.ndarray,
+) -> dict[str, float]:
+    if equity.size == 0:
+        return empty_metrics()
+
+    final_equity = float(equity[-1])
+    return_rate = (final_equity - initial_capital) / initial_capital if initial_capital > 0 else 0.0
+
+    peaks = np.maximum.accumulate(equity)
+    drawdowns = np.divide(peaks - equity, peaks, out=np.zeros_like(equity), where=peaks > 0)
+    max_drawdown = max(float(drawdowns.max()), 0.0)
+
+    sharpe_ratio = 0.0
+    if daily_returns.size >= 2:
+        std_dev = float(daily_returns.std(ddof=1))
+        if std_dev > 0:
+            sharpe_ratio = (float(daily_returns.mean()) / std_dev) * math.sqrt(252.0)
+
+    trade_count = float(sell_pnls.size)
+    win_rate = float(np.count_nonzero(sell_pnls > 0)) / trade_count if sell_pnls.size else 0.0
+
+    return {
+        "returnRate": float(return_rate),
+        "maxDrawdown": float(max_drawdown),
+        "sharpeRatio": float(sharpe_ratio),
+        "tradeCount": float(trade_count),
+        "winRate": float(win_rate),
+    }
+
+
+def _group_events(events: list[dict[str, Any]], size: int) -> list[tuple[int, list[dict[str, Any]]]]:
+    events_by_index: dict[int, list[dict[str, Any]]] = {}
+    for event in events:
+        index = int(event.get("index", -1))
+        if index < 0 or index >= size:
+            continue
+        events_by_index.setdefault(index, []).append(event)
+    return sorted(events_by_index.items())
+
+
+@dataclass
+class EngineState:
+    """撮合状态（强制平仓之前）。"""
+
+    cash: float
+    position_qty: float = 0.0
+    entry_cost: float = 0.0
+
+
+def _simulate_segment(
+    *,
+    symbol: str,
+    prices: np.ndarray,
+    events: list[dict[str, Any]],
+    state: EngineState,
+    commission_rate: float,
+    index_offset: int = 0,
+) -> tuple[np.ndarray, np.ndarray, list[dict[str, Any]], list[float]]:
+    """在一段价格上推进撮合状态；事件 index 为绝对下标，`index_offset` 为本段首 bar 的绝对下标。"""
+
+    size = int(prices.size)
+    cash_series = np.empty(size, dtype=np.float64)
+    positions = np.zeros(size, dtype=np.float64)
+    trades: list[dict[str, Any]] = []
+    sell_pnls: list[float] = []
+
+    cash = state.cash
+    position_qty = state.position_qty
+    entry_cost = state.entry_cost
+    segment_start = 0
+
+    shifted = events
+    if index_offset:
+        shifted = [{**event, "index": int(event.get("index", -1)) - index_offset} for event in events]
+
+    for idx, day_events in _group_events(shifted, size):
+        cash_series[segment_start:idx] = cash
+        positions[segment_start:idx] = position_qty
+        segment_start = idx
+
+        price = float(prices[idx])
+        for event in day_events:
+            side = str(event.get("side") or "").upper()
+            if side == "BUY" and position_qty <= 0 and price > 0 and cash > 0:
+                invested_cash = cash
+                fee = invested_cash * commission_rate
+                net_cash = invested_cash - fee
+                if net_cash <= 0:
+                    continue
+                position_qty = net_cash / price
+                entry_cost = invested_cash + fee
+                cash = 0.0
+                trades.append(
+                    {
+                        "index": idx + index_offset,
+                        "symbol": symbol,
+                        "side": "BUY",
+                        "price": price,
+                        "quantity": float(position_qty),
+                        "reason": event.get("reason"),
+                        "triggered_indicator": event.get("triggered_indicator"),
+                        "metadata": dict(event.get("metadata") or {}),
+                    }
+                )
+
+            if side == "SELL" and position_qty > 0:
+                gross = position_qty * price
+                fee = gross * commission_rate
+                cash = gross - fee
+                pnl = cash - entry_cost
+                sell_pnls.append(float(pnl))
+                trades.append(
+                    {
+                        "index": idx + index_offset,
+                        "symbol": symbol,
+                        "side": "SELL",
+                        "price": price,
+                        "quantity": float(position_qty),
+                        "reason": event.get("reason"),
+                        "triggered_indicator": event.get("triggered_indicator"),
+                        "pnl": float(pnl),
+                        "metadata": dict(event.get("metadata") or {}),
+                    }
+                )
+                position_qty = 0.0
+                entry_cost = 0.0
+
+    cash_series[segment_start:] = cash
+    positions[segment_start:] = position_qty
+
+    state.cash = cash
+    state.position_qty = position_qty
+    state.entry_cost = entry_cost
+    return cash_series, positions, trades, sell_pnls
+
+
+def _force_close(
+    *,
+    symbol: str,
+    state: EngineState,
+    final_price: float,
+    final_index: int,
+    commission_rate: float,
+) -> tuple[float, dict[str, Any]]:
+    gross = state.position_qty * final_price
+    fee = gross * commission_rate
+    cash = gross - fee
+    pnl = cash - state.entry_cost
+    trade = {
+        "index": float(final_index),
+        "symbol": symbol,
+        "side": "SELL",
+        "price": final_price,
+        "quantity": float(state.position_qty),
+        "reason": "force_close",
+        "triggered_indicator": "engine",
+        "pnl": float(pnl),
+        "metadata": {},
+    }
+    return cash, trade
+
+
+def _returns(equity: np.ndarray) -> np.ndarray:
+    previous = equity[:-1]
+    return np.divide(
+        equity[1:] - previous,
+        previous,
+        out=np.zeros(max(int(equity.size) - 1, 0), dtype=np.float64),
+        where=previous != 0,
+    )
+
+
+def simulate_backtest(
+    *,
+    symbol: str,
+    close_prices: Any,
+    events: list[dict[str, Any]],
+    initial_capital: float,
+    commission_rate: float,
+    control: ProgressControl | None = None,
+    progress_base: int = 0,
+    progress_total: int | None = None,
+    chunk_bars: int = CHUNK_BARS,
+) -> SimulationResult:
+    """按 `chunk_bars` 分块推进撮合；每块结束时经 `control` 上报进度并检查取消。
+
+    `progress_base` / `progress_total` 供组合回测把多列进度折算到同一分母。
+    """
+
+    prices = np.asarray(close_prices, dtype=np.float64)
+    size = int(prices.size)
+    total = progress_total if progress_total is not None else size
+    chunk_bars = max(1, int(chunk_bars))
+
+    ordered = sorted(events, key=lambda event: int(event.get("index", -1)))
+    event_indexes = [int(event.get("index", -1)) for event in ordered]
+
+    state = EngineState(cash=initial_capital)
+    cash_series = np.empty(size, dtype=np.float64)
+    positions = np.empty(size, dtype=np.float64)
+    trades: list[dict[str, Any]] = []
+    sell_pnls: list[float] = []
+    for start in range(0, size, chunk_bars):
+        end = min(start + chunk_bars, size)
+        lo, hi = bisect.bisect_left(event_indexes, start), bisect.bisect_left(event_indexes, end)
+        chunk_cash, chunk_positions, chunk_trades, chunk_pnls = _simulate_segment(
+            symbol=symbol,
+            prices=prices[start:end],
+            events=ordered[lo:hi],
+            state=state,
+            commission_rate=commission_rate,
+            index_offset=start,
+        )
+        cash_series[start:end] = chunk_cash
+        positions[start:end] = chunk_positions
+        trades.extend(chunk_trades)
+        sell_pnls.extend(chunk_pnls)
+        check_progress(control, processed=progress_base + end, total=total)
+    equity = cash_series + positions * prices
+
+    # 日收益基于强制平仓前的权益，与逐 bar 实现保持一致。
+    daily_returns = _returns(equity)
+    pre_close_equity = float(equity[-1]) if size else float(initial_capital)
+
+    if state.position_qty > 0 and size:
+        cash, trade = _force_close(
+            symbol=symbol,
+            state=state,
+            final_price=float(prices[-1]),
+            final_index=size - 1,
+            commission_rate=commission_rate,
+        )
+        sell_pnls.append(float(trade["pnl"]))
+        trades.append(trade)
+        equity[-1] = cash
+        positions[-1] = 0.0
+
+    pnl_array = np.asarray(sell_pnls, dtype=np.float64)
+    return SimulationResult(
+        equity=equity,
+        daily_returns=daily_returns,
+        positions=positions,
+        trades=trades,
+        sell_pnls=pnl_array,
+        metrics=equity_metrics(
+            initial_capital=initial_capital,
+            equity=equity,
+            daily_returns=daily_returns,
+            sell_pnls=pnl_array,
+        ),
+        state=state,
+        pre_close_equity=pre_close_equity,
+    )
+
+
+@dataclass
+class EngineCheckpoint:
+    """增量回测检查点：恢复撮合与指标累计所需的最小状态。
+
+    权益相关字段均基于强制平仓前的末 bar；`price_window` 为模板信号所需的最近价格。
+    """
+
+    bar_count: int
+    last_timestamp: str | None
+    price_window: list[float]
+    cash: float
+    position_qty: float
+    entry_cost: float
+    last_equity: float
+    peak_equity: float
+    max_drawdown: float
+    return_count: int
+    return_mean: float
+    return_m2: float
+    sell_count: int
+    win_count: int
+    initial_capital: float
+    commission_rate: float
+
+    def to_payload(self) -> dict[str, Any]:
+        return {
+            "barCount": self.bar_count,
+            "lastTimestamp": self.last_timestamp,
+            "priceWindow": list(self.price_window),
+            "cash": self.cash,
+            "positionQty": self.position_qty,
+            "entryCost": self.entry_cost,
+            "lastEquity": self.last_equity,
+            "peakEquity": self.peak_equity,
+            "maxDrawdown": self.max_drawdown,
+            "returnCount": self.return_count,
+            "returnMean": self.return_mean,
+            "returnM2": self.return_m2,
+            "sellCount": self.sell_count,
+            "winCount": self.win_count,
+            "initialCapital": self.initial_capital,
+            "commissionRate": self.commission_rate,
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "EngineCheckpoint":
+        return cls(
+            bar_count=int(payload["barCount"]),
+            last_timestamp=payload.get("lastTimestamp"),
+            price_window=[float(item) for item in payload.get("priceWindow") or []],
+            cash=float(payload["cash"]),
+            position_qty=float(payload["positionQty"]),
+            entry_cost=float(payload["entryCost"]),
+            last_equity=float(payload["lastEquity"]),
+            peak_equity=float(payload["peakEquity"]),
+            max_drawdown=float(payload["maxDrawdown"]),
+            return_count=int(payload["returnCount"]),
+            return_mean=float(payload["returnMean"]),
+            return_m2=float(payload["returnM2"]),
+            sell_count=int(payload["sellCount"]),
+            win_count=int(payload["winCount"]),
+            initial_capital=float(payload["initialCapital"]),
+            commission_rate=float(payload["commissionRate"]),
+        )
+
+
+def _drawdown_summary(equity: np.ndarray, *, peak: float, max_drawdown: float) -> tuple[float, float]:
+    if equity.size == 0:
+        return peak, max_drawdown
+    peaks = np.maximum.accumulate(np.concatenate(([peak], equity)))[1:]
+    drawdowns = np.divide(peaks - equity, peaks, out=np.zeros_like(equity), where=peaks > 0)
+    return float(peaks[-1]), max(max_drawdown, float(drawdowns.max()))
+
+
+def _merge_moments(
+    count: int,
+    mean: float,
+    m2: float,
+    values: np.ndarray,
+) -> tuple[int, float, float]:
+    """合并两段样本的 (count, mean, M2)（Chan 并行方差公式）。"""
+
+    extra = int(values.size)
+    if extra == 0:
+        return count, mean, m2
+    extra_mean = float(values.mean())
+    extra_m2 = float(((values - extra_mean) ** 2).sum())
+    if count == 0:
+        return extra, extra_mean, extra_m2
+    total = count + extra
+    delta = extra_mean - mean
+    return total, mean + delta * extra / total, m2 + extra_m2 + delta * delta * count * extra / total
+
+
+def _sharpe(count: int, mean: float, m2: float) -> float:
+    if count < 2:
+        return 0.0
+    variance = m2 / (count - 1)
+    if variance <= 0:
+        return 0.0
+    return (mean / math.sqrt(variance)) * math.sqrt(252.0)
+
+
+def build_checkpoint(
+    result: SimulationResult,
+    *,
+    close_prices: Any,
+    window: int,
+    last_timestamp: str | None,
+    initial_capital: float,
+    commission_rate: float,
+) -> EngineCheckpoint:
+    prices = np.asarray(close_prices, dtype=np.float64)
+    state = result.state or EngineState(cash=initial_capital)
+
+    pre_close = result.equity.copy()
+    if pre_close.size:
+        pre_close[-1] = result.pre_close_equity
+    peak, max_drawdown = _drawdown_summary(pre_close, peak=0.0, max_drawdown=0.0)
+    count, mean, m2 = _merge_moments(0, 0.0, 0.0, result.daily_returns)
+
+    realized = [float(trade["pnl"]) for trade in result.trades if trade["side"] == "SELL" and trade["reason"] != "force_close"]
+    return EngineCheckpoint(
+        bar_count=int(prices.size),
+        last_timestamp=last_timestamp,
+        price_window=prices[-window:].tolist() if window > 0 else [],
+        cash=float(state.cash),
+        position_qty=float(state.position_qty),
+        entry_cost=float(state.entry_cost),
+        last_equity=float(result.pre_close_equity),
+        peak_equity=peak,
+        max_drawdown=max_drawdown,
+        return_count=count,
+        return_mean=mean,
+        return_m2=m2,
+        sell_count=len(realized),
+        win_count=sum(1 for pnl in realized if pnl > 0),
+        initial_capital=float(initial_capital),
+        commission_rate=float(commission_rate),
+    )
+
+
+@dataclass
+class ResumeResult:
+    equity: np.ndarray
+    daily_returns: np.ndarray
+    trades: list[dict[str, Any]]
+    metrics: dict[str, float]
+    checkpoint: EngineCheckpoint
+
+
+def resume_backtest(
+    *,
+    checkpoint: EngineCheckpoint,
+    symbol: str,
+    new_prices: Any,
+    events: list[dict[str, Any]],
+    last_timestamp: str | None,
+) -> ResumeResult:
+    """从检查点继续撮合新 bar，只处理新增部分并合并指标。
+
+    `events` 使用绝对下标（首个新 bar 为 `checkpoint.bar_count`）。返回的权益/收益/交易
+    仅覆盖新 bar；调用方负责把上一次的强制平仓交易与末点权益替换为检查点状态。
+    """
+
+    prices = np.asarray(new_prices, dtype=np.float64)
+    size = int(prices.size)
+    commission_rate = checkpoint.commission_rate
+    state = EngineState(
+        cash=checkpoint.cash,
+        position_qty=checkpoint.position_qty,
+        entry_cost=checkpoint.entry_cost,
+    )
+    cash_series, positions, trades, sell_pnls = _simulate_segment(
+        symbol=symbol,
+        prices=prices,
+        events=events,
+        state=state,
+        commission_rate=commission_rate,
+        index_offset=checkpoint.bar_count,
+    )
+    equity = cash_series + positions * prices
+    daily_returns = _returns(np.concatenate(([checkpoint.last_equity], equity)))
+
+    peak, pre_close_drawdown = _drawdown_summary(
+        equity,
+        peak=checkpoint.peak_equity,
+        max_drawdown=checkpoint.max_drawdown,
+    )
+    count, mean, m2 = _merge_moments(
+        checkpoint.return_count,
+        checkpoint.return_mean,
+        checkpoint.return_m2,
+        daily_returns,
+    )
+    sell_count = checkpoint.sell_count + len(sell_pnls)
+    win_count = checkpoint.win_count + sum(1 for pnl in sell_pnls if pnl > 0)
+    window = len(checkpoint.price_window)
+    updated = EngineCheckpoint(
+        bar_count=checkpoint.bar_count + size,
+        last_timestamp=last_timestamp,
+        price_window=(checkpoint.price_window + prices.tolist())[-window:] if window else [],
+        cash=state.cash,
+        position_qty=state.position_qty,
+        entry_cost=state.entry_cost,
+        last_equity=float(equity[-1]) if size else checkpoint.last_equity,
+        peak_equity=peak,
+        max_drawdown=pre_close_drawdown,
+        return_count=count,
+        return_mean=mean,
+        return_m2=m2,
+        sell_count=sell_count,
+        win_count=win_count,
+        initial_capital=checkpoint.initial_capital,
+        commission_rate=commission_rate,
+    )
+
+    final_equity = updated.last_equity
+    max_drawdown = pre_close_drawdown
+    if state.position_qty > 0 and size:
+        final_equity, trade = _force_close(
+            symbol=symbol,
+            state=EngineState(cash=state.cash, position_qty=state.position_qty, entry_cost=state.entry_cost),
+            final_price=float(prices[-1]),
+            final_index=updated.bar_count - 1,
+            commission_rate=commission_rate,
+        )
+        trades.append(trade)
+        sell_count += 1
+        win_count += 1 if trade["pnl"] > 0 else 0
+        equity[-1] = final_equity
+        # 末点改为平仓后权益：回撤以平仓前峰值重新评估该点。
+        before_last, before_drawdown = _drawdown_summary(
+            equity[:-1],
+            peak=checkpoint.peak_equity,
+            max_drawdown=checkpoint.max_drawdown,
+        )
+        _, max_drawdown = _drawdown_summary(equity[-1:], peak=before_last, max_drawdown=before_drawdown)
+
+    initial_capital = checkpoint.initial_capital
+    metrics = {
+        "returnRate": float((final_equity - initial_capital) / initial_capital) if initial_capital > 0 else 0.0,
+        "maxDrawdown": float(max(max_drawdown, 0.0)),
+        "sharpeRatio": float(_sharpe(count, mean, m2)),
+        "tradeCount": float(sell_count),
+        "winRate": float(win_count) / float(sell_count) if sell_count else 0.0,
+    }
+    return ResumeResult(
+        equity=equity,
+        daily_returns=daily_returns,
+        trades=trades,
+        metrics=metrics,
+        checkpoint=updated,
+    )
+
+
+def timestamp_label(value: Any) -> Any:
+    isoformat = getattr(value, "isoformat", None)
+    return isoformat() if callable(isoformat) else value
+
+
+def parse_timestamp(value: Any) -> datetime | None:
+    """把时间戳标签解析为 UTC 时间；纯日期视为当天 00:00 UTC，无法解析时返回 None。"""
+
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, date):
+        parsed = datetime(value.year, value.month, value.day)
+    else:
+        text = str(value).strip().replace("Z", "+00:00")
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            return None
+    return parsed.replace(tzinfo=timezone.utc) if parsed.tzinfo is None else parsed.astimezone(timezone.utc)
+
+
+def timestamp_after(value: Any, reference: Any) -> bool:
+    """`value` 是否晚于 `reference`；任一无法解析时退回字符串比较。"""
+
+    left, right = parse_timestamp(value), parse_timestamp(reference)
+    if left is None or right is None:
+        return str(value) > str(reference)
+    return left > right
+
+
+def align_close_series(
+    series: dict[str, list[tuple[Any, float]]],
+    *,
+    min_coverage: float = 0.0,
+) -> tuple[list[Any], list[str], np.ndarray, dict[str, Any]]:
+    """把各标的 (timestamp, close) 序列对齐为 (bar, symbol) 价格矩阵。
+
+    所有序列都带时间戳时按时间戳取交集（只保留全部标的都有报价的 bar）；
+    覆盖率（有报价的 bar / 全部 bar 并集）低于 `min_coverage` 的稀疏标的先剔除，
+    避免单个标的把整个组合截短（全部低于阈值时不剔除）。
+    否则按位置右对齐，截取共同长度的最近一段。
+
+    返回 (时间戳, 标的, 矩阵, 对齐报告)；报告记录并集 bar 数、对齐后 bar 数、
+    被丢弃的 bar 数、各标的缺失 bar 数以及被剔除的稀疏标的。
+    """
+
+    symbols = list(series.keys())
+    if not symbols:
+        return [], [], np.zeros((0, 0), dtype=np.float64), _alignment_report(0, 0, {}, [])
+
+    has_timestamps = all(timestamp is not None for rows in series.values() for timestamp, _close in rows)
+    if not has_timestamps:
+        longest = max(len(rows) for rows in series.values())
+        length = min(len(rows) for rows in series.values())
+        matrix = np.empty((length, len(symbols)), dtype=np.float64)
+        for column, symbol in enumerate(symbols):
+            rows = series[symbol]
+            matrix[:, column] = [close for _timestamp, close in rows[len(rows) - length :]]
+        missing = {symbol: longest - len(rows) for symbol, rows in series.items()}
+        return list(range(length)), symbols, matrix, _alignment_report(longest, length, missing, [])
+
+    by_symbol = {
+        symbol: {timestamp_label(timestamp): close for timestamp, close in rows} for symbol, rows in series.items()
+    }
+    union = set().union(*(set(closes) for closes in by_symbol.values()))
+    sparse = [symbol for symbol in symbols if len(by_symbol[symbol]) < min_coverage * len(union)]
+    if len(sparse) < len(symbols):
+        symbols = [symbol for symbol in symbols if symbol not in sparse]
+    else:
+        sparse = []
+    common = set.intersection(*(set(by_symbol[symbol]) for symbol in symbols))
+    try:
+        timestamps = sorted(common)
+    except TypeError:
+        timestamps = sorted(common, key=str)
+
+    matrix = np.empty((len(timestamps), len(symbols)), dtype=np.float64)
+    for column, symbol in enumerate(symbols):
+        closes = by_symbol[symbol]
+        matrix[:, column] = [closes[timestamp] for timestamp in timestamps]
+    missing = {symbol: len(union) - len(by_symbol[symbol]) for symbol in symbols}
+    return timestamps, symbols, matrix, _alignment_report(len(union), len(timestamps), missing, sparse)
+
+
+def _alignment_report(
+    union_bars: int,
+    aligned_bars: int,
+    missing: dict[str, int],
+    sparse: list[str],
+) -> dict[str, Any]:
+    return {
+        "unionBars": union_bars,
+        "alignedBars": aligned_bars,
+        "droppedBars": union_bars - aligned_bars,
+        "missingBars": {symbol: count for symbol, count in missing.items() if count > 0},
+        "sparseSymbols": list(sparse),
+    }
+
+
+@dataclass
+class PortfolioResult:
+    symbols: list[str]
+    equity: np.ndarray
+    daily_returns: np.ndarray
+    per_symbol: list[SimulationResult]
+    trades: list[dict[str, Any]] = field(default_factory=list)
+    metrics: dict[str, float] = field(default_factory=empty_metrics)
+
+    def equity_curve(self) -> list[dict[str, float]]:
+        return [{"index": float(idx), "equity": value} for idx, value in enumerate(self.equity.tolist())]
+
+    def to_payload(self, *, include_curve: bool = True) -> dict[str, Any]:
+        per_symbol: dict[str, Any] = {}
+        for symbol, result in zip(self.symbols, self.per_symbol):
+            entry: dict[str, Any] = {"metrics": dict(result.metrics), "tradeCount": len(result.trades)}
+            if include_curve:
+                # 逐标的权益只输出数值序列，下标与组合 `equityCurve` / `timestamps` 对齐。
+                entry["equity"] = result.equity.tolist()
+            per_symbol[symbol] = entry
+
+        payload: dict[str, Any] = {
+            "trades": self.trades,
+            "metrics": dict(self.metrics),
+            "perSymbol": per_symbol,
+        }
+        if include_curve:
+            payload["equityCurve"] = self.equity_curve()
+            payload["dailyReturns"] = self.daily_returns.tolist()
+        return payload
+
+
+def simulate_portfolio(
+    *,
+    symbols: list[str],
+    close_matrix: Any,
+    events_by_symbol: list[list[dict[str, Any]]],
+    initial_capital: float,
+    commission_rate: float,
+    control: ProgressControl | None = None,
+) -> PortfolioResult:
+    matrix = np.asarray(close_matrix, dtype=np.float64)
+    allocation = initial_capital / len(symbols) if symbols else 0.0
+    size = int(matrix.shape[0]) if matrix.ndim == 2 else 0
+
+    per_symbol = [
+        simulate_backtest(
+            symbol=symbol,
+            close_prices=matrix[:, column],
+            events=events_by_symbol[column],
+            initial_capital=allocation,
+            commission_rate=commission_rate,
+            control=control,
+            progress_base=column * size,
+            progress_total=size * len(symbols),
+        )
+        for column, symbol in enumerate(symbols)
+    ]
+
+    if per_symbol:
+        equity = np.sum([result.equity for result in per_symbol], axis=0)
+    else:
+        equity = np.zeros(size, dtype=np.float64)
+
+    # 组合日收益取各标的强制平仓前权益之和，与单标的口径一致：
+    # 持仓期间现金为 0，平仓前末 bar 权益即持仓市值。
+    pre_close = equity.copy()
+    for result in per_symbol:
+        if result.trades and result.trades[-1].get("reason") == "force_close":
+            last = result.trades[-1]
+            pre_close[-1] += float(last["quantity"]) * float(last["price"]) - float(result.equity[-1])
+    previous = pre_close[:-1]
+    daily_returns = np.divide(
+        pre_close[1:] - previous,
+        previous,
+        out=np.zeros(max(size - 1, 0), dtype=np.float64),
+        where=previous != 0,
+    )
+
+    trades = sorted(
+        (trade for result in per_symbol for trade in result.trades),
+        key=lambda trade: float(trade["index"]),
+    )
+    sell_pnls = np.concatenate([result.sell_pnls for result in per_symbol]) if per_symbol else np.zeros(0)
+
+    return PortfolioResult(
+        symbols=list(symbols),
+        equity=equity,
+        daily_returns=daily_returns,
+        per_symbol=per_symbol,
+        trades=trades,
+        metrics=equity_metrics(
+            initial_capital=initial_capital,
+            equity=equity,
+            daily_returns=daily_returns,
+            sell_pnls=sell_pnls,
+        ),
+    )
@@ -0,0 +1,63 @@
+"""backtest_runner 取消与进度 API 合同测试。"""
+
+from __future__ import annotations
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backtest_runner.api import create_router
+from backtest_runner.progress import ExecutionControl
+from backtest_runner.repository import InMemoryBacktestRepository
+from backtest_runner.service import BacktestService
+
+
+def _build_client() -> tuple[TestClient, BacktestService]:
+    history = [{"timestamp": f"2024-01-01T{idx:08d}", "close": 10.0 + idx % 7} for idx in range(40)]
+
+    def _market_history_reader(
+        *,
+        user_id: str,
+        symbol: str,
+        start_date: str | None,
+        end_date: str | None,
+        timeframe: str,
+        limit: int | None,
+    ):
+        del user_id, symbol, start_date, end_date, timeframe, limit
+        return history
+
+    class _User:
+        id = "u-1"
+
+    service = BacktestService(repository=InMemoryBacktestRepository(), market_history_reader=_market_history_reader)
+    app = FastAPI()
+    app.include_router(create_router(service=service, get_current_user=lambda: _User()))
+    return TestClient(app), service
+
+
+def test_get_backtest_exposes_progress_and_cancel_signals_running_compute():
+    client, service = _build_client()
+    config = {"symbol": "AAPL", "template": "moving_average", "parameters": {"shortWindow": 2, "longWindow": 4}}
+    task = service.create_task(user_id="u-1", strategy_id="s-1", config=config)
+
+    idle = client.get(f"/backtests/{task.id}")
+    assert idle.status_code == 200
+    assert idle.json()["data"]["progress"] is None
+
+    control = ExecutionControl()
+    service.begin_execution(user_id="u-1", task_id=task.id, control=control)
+    control.report(processed=10, total=40)
+
+    running = client.get(f"/backtests/{task.id}")
+    progress = running.json()["data"]["progress"]
+    assert running.json()["data"]["status"] == "running"
+    assert progress["processed"] == 10
+    assert progress["total"] == 40
+    assert progress["fraction"] == 0.25
+    assert progress["cancelRequested"] is False
+
+    cancelled = client.post(f"/backtests/{task.id}/cancel")
+    assert cancelled.status_code == 200
+    assert cancelled.json()["data"]["status"] == "cancelled"
+    assert control.cancelled is True
+    assert client.get(f"/backtests/{task.id}").json()["data"]["progress"]["cancelRequested"] is True
@@ -157,3 +157,95 @@ def test_submit_task_marks_job_failed_when_template_not_supported():
     assert payload["data"]["status"] == "failed"
     assert payload["data"]["error"]["code"] == "BACKTEST_UNSUPPORTED_TEMPLATE"
     assert payload["data"]["backtestTask"]["status"] == "failed"
+
+
+def test_submit_task_with_process_pool_executor_returns_before_engine_completes():
+    import time
+
+    from job_orchestration.executor import ProcessPoolJobExecutor
+
+    executor = ProcessPoolJobExecutor(max_workers=1)
+    job_service = JobOrchestrationService(
+        repository=InMemoryJobRepository(),
+        scheduler=InMemoryScheduler(),
+        executor=executor,
+    )
+    service = _build_service(
+        prices=[10, 10, 10, 10, 10, 11, 12, 13, 12, 11, 10, 9, 8, 9, 10, 11, 12],
+    )
+    client = TestClient(_build_app(current_user_id="u-1", service=service, job_service=job_service))
+
+    try:
+        submitted = client.post(
+            "/backtests/tasks",
+            json={
+                "strategyId": "s-1",
+                "idempotencyKey": "backtest-engine-process-pool",
+                "config": {"symbol": "AAPL"},
+            },
+        )
+        assert submitted.status_code == 200
+        data = submitted.json()["data"]
+        assert data["status"] in {"running", "succeeded"}
+
+        job_id = data["taskId"]
+        deadline = time.monotonic() + 10.0
+        job = job_service.get_job(user_id="u-1", job_id=job_id)
+        while job is not None and job.status == "running" and time.monotonic() < deadline:
+            time.sleep(0.01)
+            job = job_service.get_job(user_id="u-1", job_id=job_id)
+    finally:
+        executor.shutdown()
+
+    assert job is not None
+    assert job.status == "succeeded"
+    task_id = data["backtestTask"]["id"]
+    assert service.get_task(user_id="u-1", task_id=task_id).status == "completed"
+    result = client.get(f"/backtests/{task_id}/result").json()["data"]
+    assert result["taskId"] == task_id
+    assert isinstance(result["equityCurve"], list)
+
+
+def test_back_to_back_submissions_with_process_pool_executor_both_complete():
+    import time
+
+    from job_orchestration.executor import ProcessPoolJobExecutor
+
+    executor = ProcessPoolJobExecutor(max_workers=1)
+    job_service = JobOrchestrationService(
+        repository=InMemoryJobRepository(),
+        scheduler=InMemoryScheduler(),
+        executor=executor,
+    )
+    service = _build_service(
+        prices=[10, 10, 10, 10, 10, 11, 12, 13, 12, 11, 10, 9, 8, 9, 10, 11, 12],
+    )
+    client = TestClient(_build_app(current_user_id="u-1", service=service, job_service=job_service))
+
+    try:
+        submitted = [
+            client.post(
+                "/backtests/tasks",
+                json={
+                    "strategyId": "s-1",
+                    "idempotencyKey": f"backtest-back-to-back-{idx}",
+                    "config": {"symbol": "AAPL"},
+                },
+            )
+            for idx in range(2)
+        ]
+        assert [item.status_code for item in submitted] == [200, 200]
+        payloads = [item.json()["data"] for item in submitted]
+
+        deadline = time.monotonic() + 20.0
+        jobs = [job_service.get_job(user_id="u-1", job_id=item["taskId"]) for item in payloads]
+        while any(job.status in {"queued", "running"} for job in jobs) and time.monotonic() < deadline:
+            time.sleep(0.01)
+            jobs = [job_service.get_job(user_id="u-1", job_id=item["taskId"]) for item in payloads]
+    finally:
+        executor.shutdown()
+
+    assert [job.status for job in jobs] == ["succeeded", "succeeded"]
+    for item in payloads:
+        task = service.get_task(user_id="u-1", task_id=item["backtestTask"]["id"])
+        assert task.status == "completed"
@@ -0,0 +1,75 @@
+"""backtest_runner 增量回测 API 合同测试。"""
+
+from __future__ import annotations
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backtest_runner.api import create_router
+from backtest_runner.repository import InMemoryBacktestRepository
+from backtest_runner.service import BacktestService
+
+
+def _build_client(service: BacktestService, *, user_id: str = "u-1") -> TestClient:
+    class _User:
+        id = user_id
+
+    app = FastAPI()
+    app.include_router(create_router(service=service, get_current_user=lambda: _User()))
+    return TestClient(app)
+
+
+def _bars(values: list[float], *, start: int = 0) -> list[dict]:
+    return [{"timestamp": f"2024-01-01T00:{start + idx:05d}", "close": value} for idx, value in enumerate(values)]
+
+
+def test_extend_endpoint_appends_new_bars_and_refreshes_metrics():
+    prices = [10, 10, 10, 10, 10, 11, 12, 13, 12, 11, 10, 9, 8, 9, 10, 11, 12]
+    history = _bars(prices)
+
+    def _market_history_reader(
+        *,
+        user_id: str,
+        symbol: str,
+        start_date: str | None,
+        end_date: str | None,
+        timeframe: str,
+        limit: int | None,
+    ):
+        del user_id, symbol, start_date, end_date, timeframe, limit
+        return history
+
+    service = BacktestService(repository=InMemoryBacktestRepository(), market_history_reader=_market_history_reader)
+    client = _build_client(service)
+    config = {"symbol": "AAPL", "template": "moving_average", "parameters": {"shortWindow": 2, "longWindow": 4}}
+    task = service.create_task(user_id="u-1", strategy_id="s-1", config=config)
+    service.execute_task(user_id="u-1", task_id=task.id)
+
+    resp = client.post(
+        f"/backtests/{task.id}/extend",
+        json={"bars": _bars([13, 14, 12, 9, 8], start=len(prices))},
+    )
+
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    assert data["appendedBars"] == 5
+    assert len(data["result"]["equityCurve"]) == len(prices) + 5
+    assert data["task"]["metrics"] == data["result"]["metrics"]
+
+    history.extend(_bars([13, 14, 12, 9, 8], start=len(prices)))
+    full_service = BacktestService(repository=InMemoryBacktestRepository(), market_history_reader=_market_history_reader)
+    reference = full_service.create_task(user_id="u-1", strategy_id="s-1", config=config)
+    full = full_service.execute_task(user_id="u-1", task_id=reference.id)["result"]
+    assert [trade["index"] for trade in data["result"]["trades"]] == [trade["index"] for trade in full["trades"]]
+
+
+def test_extend_endpoint_rejects_foreign_and_unfinished_tasks():
+    service = BacktestService(repository=InMemoryBacktestRepository())
+    task = service.create_task(user_id="u-1", strategy_id="s-1", config={"symbol": "AAPL"})
+
+    pending = _build_client(service).post(f"/backtests/{task.id}/extend", json={})
+    foreign = _build_client(service, user_id="u-2").post(f"/backtests/{task.id}/extend", json={})
+
+    assert pending.status_code == 422
+    assert pending.json()["error"]["code"] == "BACKTEST_INVALID_STATE"
+    assert foreign.status_code == 403
@@ -0,0 +1,59 @@
+"""backtest_runner 结果视图 API 合同测试。"""
+
+from __future__ import annotations
+
+import random
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backtest_runner.api import create_router
+from backtest_runner.repository import InMemoryBacktestRepository
+from backtest_runner.service import BacktestService
+
+
+def _prices(size: int = 600) -> list[float]:
+    rng = random.Random(21)
+    prices = [100.0]
+    for _ in range(size - 1):
+        prices.append(max(prices[-1] + rng.gauss(0.0, 1.0), 1.0))
+    return prices
+
+
+def _build() -> tuple[TestClient, str]:
+    class _User:
+        id = "u-1"
+
+    service = BacktestService(repository=InMemoryBacktestRepository())
+    task = service.create_task(
+        user_id="u-1",
+        strategy_id="s-1",
+        config={"symbol": "AAPL", "template": "moving_average", "prices": _prices()},
+    )
+    service.execute_task(user_id="u-1", task_id=task.id)
+
+    app = FastAPI()
+    app.include_router(create_router(service=service, get_current_user=lambda: _User()))
+    return TestClient(app), task.id
+
+
+def test_result_endpoint_supports_metrics_slice_and_downsample_views():
+    client, task_id = _build()
+
+    full = client.get(f"/backtests/{task_id}/result").json()["data"]
+    metrics = client.get(f"/backtests/{task_id}/result", params={"view": "metrics"}).json()["data"]
+    sliced = client.get(f"/backtests/{task_id}/result", params={"start": 100, "end": 150}).json()["data"]
+    sampled = client.get(f"/backtests/{task_id}/result", params={"maxPoints": 50}).json()["data"]
+
+    assert metrics == {"metrics": full["metrics"], "barCount": 600}
+    assert sliced["equityCurve"] == full["equityCurve"][100:150]
+    assert sliced["dailyReturns"] == full["dailyReturns"][99:149]
+    assert len(sampled["equityCurve"]) == 50
+    assert sampled["equityCurve"][-1] == full["equityCurve"][-1]
+
+
+def test_result_endpoint_rejects_invalid_view_parameters():
+    client, task_id = _build()
+
+    assert client.get(f"/backtests/{task_id}/result", params={"view": "raw"}).status_code == 422
+    assert client.get(f"/backtests/{task_id}/result", params={"maxPoints": 2}).status_code == 422
@@ -0,0 +1,189 @@
+"""backtest_runner 参数扫描 API 合同测试。"""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backtest_runner.api import create_router
+from backtest_runner.repository import InMemoryBacktestRepository
+from backtest_runner.service import BacktestService
+
+
+def _prices(size: int = 400) -> list[float]:
+    rng = random.Random(8)
+    prices = [100.0]
+    for _ in range(size - 1):
+        prices.append(max(prices[-1] + rng.gauss(0.0, 1.0), 1.0))
+    return prices
+
+
+def _build_service(*, prices: list[float], template: str, history_calls: list[str], **options) -> BacktestService:
+    def _strategy_reader(*, user_id: str, strategy_id: str):
+        return {
+            "id": strategy_id,
+            "userId": user_id,
+            "status": "active",
+            "template": template,
+            "parameters": {"shortWindow": 3, "longWindow": 5, "window": 20, "entryZ": 1.5},
+        }
+
+    def _market_history_reader(
+        *,
+        user_id: str,
+        symbol: str,
+        start_date: str | None,
+        end_date: str | None,
+        timeframe: str,
+        limit: int | None,
+    ):
+        del user_id, start_date, end_date, timeframe, limit
+        history_calls.append(symbol)
+        return [{"close": value} for value in prices]
+
+    return BacktestService(
+        repository=InMemoryBacktestRepository(),
+        strategy_reader=_strategy_reader,
+        market_history_reader=_market_history_reader,
+        **options,
+    )
+
+
+def _build_client(service: BacktestService) -> TestClient:
+    class _User:
+        id = "u-1"
+
+    app = FastAPI()
+    app.include_router(create_router(service=service, get_current_user=lambda: _User()))
+    return TestClient(app)
+
+
+def test_sweep_grid_loads_history_once_and_matches_single_runs():
+    history_calls: list[str] = []
+    prices = _prices()
+    service = _build_service(prices=prices, template="moving_average", history_calls=history_calls)
+    client = _build_client(service)
+
+    resp = client.post(
+        "/backtests/sweeps",
+        json={
+            "strategyId": "s-1",
+            "config": {"symbol": "AAPL"},
+            "parameterGrid": {"shortWindow": [3, 5, 10], "longWindow": [20, 40]},
+        },
+    )
+
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    assert history_calls == ["AAPL"]
+    assert data["combinationCount"] == 6
+    assert data["barCount"] == len(prices)
+    assert data["columns"][:2] == ["shortWindow", "longWindow"]
+    assert "returnRate" in data["columns"]
+    assert len(data["rows"]) == 6
+    assert data["errors"] == []
+
+    return_rate_col = data["columns"].index("returnRate")
+    for row in data["rows"]:
+        reference = BacktestService(repository=InMemoryBacktestRepository(), vectorized_kernels=False)
+        ref_task = reference.create_task(
+            user_id="u-1",
+            strategy_id="s-1",
+            config={
+                "symbol": "AAPL",
+                "template": "moving_average",
+                "parameters": {"shortWindow": row[0], "longWindow": row[1]},
+                "prices": prices,
+            },
+        )
+        expected = reference.execute_task(user_id="u-1", task_id=ref_task.id)["result"]["metrics"]
+        assert row[return_rate_col] == pytest.approx(expected["returnRate"], rel=1e-9, abs=1e-12)
+
+
+def test_sweep_records_invalid_combinations_without_failing_whole_sweep():
+    service = _build_service(prices=_prices(), template="mean_reversion", history_calls=[])
+    client = _build_client(service)
+
+    resp = client.post(
+        "/backtests/sweeps",
+        json={
+            "strategyId": "s-1",
+            "config": {"symbol": "AAPL"},
+            "parameterSets": [{"window": 10, "entryZ": 1.0}, {"window": 20, "entryZ": -1}, {"window": 5000}],
+        },
+    )
+
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    assert len(data["rows"]) == 1
+    assert [item["code"] for item in data["errors"]] == [
+        "BACKTEST_INVALID_PARAMETERS",
+        "BACKTEST_INSUFFICIENT_DATA",
+    ]
+
+
+def test_sweep_rejects_empty_or_oversized_requests():
+    service = _build_service(prices=_prices(), template="moving_average", history_calls=[])
+    client = _build_client(service)
+
+    empty = client.post("/backtests/sweeps", json={"strategyId": "s-1", "config": {"symbol": "AAPL"}})
+    assert empty.status_code == 422
+    assert empty.json()["error"]["code"] == "BACKTEST_INVALID_SWEEP"
+
+    oversized = client.post(
+        "/backtests/sweeps",
+        json={
+            "strategyId": "s-1",
+            "config": {"symbol": "AAPL"},
+            "parameterGrid": {"shortWindow": list(range(1, 40)), "longWindow": list(range(40, 80))},
+        },
+    )
+    assert oversized.status_code == 422
+    assert oversized.json()["error"]["code"] == "BACKTEST_SWEEP_TOO_LARGE"
+
+
+def test_sweep_rejects_work_beyond_bar_evaluation_budget():
+    service = _build_service(
+        prices=_prices(400),
+        template="moving_average",
+        history_calls=[],
+        max_sweep_bar_evaluations=1000,
+    )
+    client = _build_client(service)
+
+    response = client.post(
+        "/backtests/sweeps",
+        json={
+            "strategyId": "s-1",
+            "config": {"symbol": "AAPL"},
+            "parameterGrid": {"shortWindow": [3, 5, 10], "longWindow": [20]},
+        },
+    )
+
+    assert response.status_code == 422
+    assert response.json()["error"]["code"] == "BACKTEST_SWEEP_TOO_LARGE"
+
+
+def test_sweep_aborts_when_time_budget_is_exhausted():
+    service = _build_service(
+        prices=_prices(),
+        template="moving_average",
+        history_calls=[],
+        sweep_time_budget_seconds=0,
+    )
+    client = _build_client(service)
+
+    response = client.post(
+        "/backtests/sweeps",
+        json={
+            "strategyId": "s-1",
+            "config": {"symbol": "AAPL"},
+            "parameterGrid": {"shortWindow": [3, 5, 10], "longWindow": [20, 40]},
+        },
+    )
+
+    assert response.status_code == 422
+    assert response.json()["error"]["code"] == "BACKTEST_SWEEP_TIMEOUT"
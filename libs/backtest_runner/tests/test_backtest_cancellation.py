@@ -0,0 +1,137 @@
+"""backtest_runner 协作式取消与进度上报测试。"""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from backtest_runner import kernels, simulation
+from backtest_runner.progress import BacktestCancelledError, ExecutionControl
+from backtest_runner.repository import InMemoryBacktestRepository
+from backtest_runner.service import BacktestExecutionError, BacktestService, compute_backtest_result
+
+
+def _random_walk(*, seed: int, size: int) -> list[float]:
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(size - 1):
+        prices.append(max(prices[-1] + rng.gauss(0.0, 1.0), 1.0))
+    return prices
+
+
+class _RecordingControl(ExecutionControl):
+    def __init__(self, *, cancel_after: int | None = None, on_cancel=None) -> None:
+        super().__init__()
+        self.reports: list[tuple[int, int]] = []
+        self._cancel_after = cancel_after
+        self._on_cancel = on_cancel
+
+    def report(self, *, processed: int, total: int) -> None:
+        super().report(processed=processed, total=total)
+        self.reports.append((processed, total))
+        if self._cancel_after is not None and len(self.reports) >= self._cancel_after:
+            if self._on_cancel is not None:
+                self._on_cancel()
+            else:
+                self.cancel()
+
+
+def _simulation_kwargs(size: int) -> dict:
+    prices = _random_walk(seed=5, size=size)
+    return {
+        "symbol": "AAPL",
+        "close_prices": prices,
+        "events": kernels.mean_reversion_events(close_prices=prices, window=20, entry_z=1.2),
+        "initial_capital": 100000.0,
+        "commission_rate": 0.001,
+    }
+
+
+def test_chunked_simulation_matches_single_pass_and_reports_each_chunk():
+    kwargs = _simulation_kwargs(2000)
+    control = _RecordingControl()
+
+    chunked = simulation.simulate_backtest(**kwargs, control=control, chunk_bars=300).to_payload()
+    single = simulation.simulate_backtest(**kwargs).to_payload()
+
+    assert chunked["trades"] == single["trades"]
+    assert chunked["metrics"] == pytest.approx(single["metrics"])
+    assert [point["equity"] for point in chunked["equityCurve"]] == pytest.approx(
+        [point["equity"] for point in single["equityCurve"]]
+    )
+    assert [processed for processed, _ in control.reports] == [300, 600, 900, 1200, 1500, 1800, 2000]
+    assert {total for _, total in control.reports} == {2000}
+    assert control.snapshot()["fraction"] == pytest.approx(1.0)
+
+
+def test_chunked_simulation_stops_at_chunk_boundary_when_cancelled():
+    control = _RecordingControl(cancel_after=2)
+
+    with pytest.raises(BacktestCancelledError):
+        simulation.simulate_backtest(**_simulation_kwargs(2000), control=control, chunk_bars=500)
+
+    assert [processed for processed, _ in control.reports] == [500, 1000]
+
+
+def _build_service(prices: list[float]) -> BacktestService:
+    history = [{"timestamp": f"2024-01-01T{idx:08d}", "close": price} for idx, price in enumerate(prices)]
+
+    def _market_history_reader(
+        *,
+        user_id: str,
+        symbol: str,
+        start_date: str | None,
+        end_date: str | None,
+        timeframe: str,
+        limit: int | None,
+    ):
+        del user_id, symbol, start_date, end_date, timeframe, limit
+        return history
+
+    return BacktestService(repository=InMemoryBacktestRepository(), market_history_reader=_market_history_reader)
+
+
+def _config() -> dict:
+    return {"symbol": "AAPL", "template": "moving_average", "parameters": {"shortWindow": 5, "longWindow": 20}}
+
+
+def test_cancel_task_during_compute_converges_to_cancelled_without_result():
+    prices = _random_walk(seed=9, size=simulation.CHUNK_BARS + 1000)
+    service = _build_service(prices)
+    task = service.create_task(user_id="u-1", strategy_id="s-1", config=_config())
+
+    # 第一块撮合完成后（第 2 次上报）由外部发起取消。
+    control = _RecordingControl(
+        cancel_after=2,
+        on_cancel=lambda: service.cancel_task(user_id="u-1", task_id=task.id),
+    )
+    prepared = service.begin_execution(user_id="u-1", task_id=task.id, control=control)
+    progress = service.task_progress(user_id="u-1", task_id=task.id)
+    assert progress is not None
+    assert progress["cancelRequested"] is False
+
+    outcome = compute_backtest_result(prepared)
+    assert outcome["error"]["code"] == "BACKTEST_CANCELLED"
+    assert control.reports[:2] == [(0, len(prices)), (simulation.CHUNK_BARS, len(prices))]
+
+    with pytest.raises(BacktestExecutionError) as exc_info:
+        service.complete_execution(user_id="u-1", task_id=task.id, outcome=outcome)
+
+    assert exc_info.value.code == "BACKTEST_CANCELLED"
+    assert service.get_task(user_id="u-1", task_id=task.id).status == "cancelled"
+    assert service.get_task_result(user_id="u-1", task_id=task.id) is None
+    assert service.task_progress(user_id="u-1", task_id=task.id) is None
+
+
+def test_execute_task_with_cancelled_control_marks_task_cancelled():
+    service = _build_service(_random_walk(seed=3, size=200))
+    task = service.create_task(user_id="u-1", strategy_id="s-1", config=_config())
+    control = ExecutionControl()
+    control.cancel()
+
+    with pytest.raises(BacktestExecutionError) as exc_info:
+        service.execute_task(user_id="u-1", task_id=task.id, control=control)
+
+    assert exc_info.value.code == "BACKTEST_CANCELLED"
+    assert service.get_task(user_id="u-1", task_id=task.id).status == "cancelled"
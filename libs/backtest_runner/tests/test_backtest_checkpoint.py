@@ -0,0 +1,187 @@
+"""backtest_runner 增量回测检查点测试。"""
+
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from backtest_runner import result_codec
+from backtest_runner.repository import InMemoryBacktestRepository
+from backtest_runner.result_store import InMemoryBacktestResultStore
+from backtest_runner.service import BacktestExecutionError, BacktestService
+
+
+def _history(size: int, *, seed: int = 11) -> list[dict]:
+    rng = random.Random(seed)
+    price = 100.0
+    rows = []
+    for offset in range(size):
+        price = max(price + rng.gauss(0.0, 1.0), 1.0)
+        rows.append({"timestamp": (date(2020, 1, 1) + timedelta(days=offset)).isoformat(), "close": price})
+    return rows
+
+
+def _build_service(history: list[dict], **kwargs) -> tuple[BacktestService, list[tuple]]:
+    calls: list[tuple] = []
+
+    def _market_history_reader(
+        *,
+        user_id: str,
+        symbol: str,
+        start_date: str | None,
+        end_date: str | None,
+        timeframe: str,
+        limit: int | None,
+    ):
+        del user_id, timeframe, limit
+        calls.append((symbol, start_date, end_date))
+        return [
+            row
+            for row in history
+            if (start_date is None or row["timestamp"] >= start_date)
+            and (end_date is None or row["timestamp"] <= end_date)
+        ]
+
+    service = BacktestService(
+        repository=InMemoryBacktestRepository(),
+        market_history_reader=_market_history_reader,
+        **kwargs,
+    )
+    return service, calls
+
+
+def _config(template: str, end_date: str) -> dict:
+    return {
+        "symbol": "AAPL",
+        "template": template,
+        "parameters": {"shortWindow": 5, "longWindow": 20, "window": 20, "entryZ": 1.2},
+        "endDate": end_date,
+        "commissionRate": 0.001,
+    }
+
+
+def _assert_results_match(extended: dict, full: dict) -> None:
+    for key, value in full["metrics"].items():
+        assert extended["metrics"][key] == pytest.approx(value, rel=1e-9, abs=1e-12), key
+    assert [(trade["index"], trade["side"], trade["reason"]) for trade in extended["trades"]] == [
+        (trade["index"], trade["side"], trade["reason"]) for trade in full["trades"]
+    ]
+    assert [point["equity"] for point in extended["equityCurve"]] == pytest.approx(
+        [point["equity"] for point in full["equityCurve"]]
+    )
+    assert extended["dailyReturns"] == pytest.approx(full["dailyReturns"], abs=1e-12)
+
+
+@pytest.mark.parametrize("template", ["moving_average", "mean_reversion"])
+def test_extend_task_matches_full_rerun(template: str):
+    history = _history(700)
+    service, _ = _build_service(history)
+
+    task = service.create_task(user_id="u-1", strategy_id="s-1", config=_config(template, history[599]["timestamp"]))
+    service.execute_task(user_id="u-1", task_id=task.id)
+    appended = []
+    for stop in (600, 601, 650, 700):
+        extended = service.extend_task(user_id="u-1", task_id=task.id, end_date=history[stop - 1]["timestamp"])
+        appended.append(extended["appendedBars"])
+
+        full_service, _ = _build_service(history)
+        reference = full_service.create_task(
+            user_id="u-1",
+            strategy_id="s-1",
+            config=_config(template, history[stop - 1]["timestamp"]),
+        )
+        full = full_service.execute_task(user_id="u-1", task_id=reference.id)["result"]
+
+        _assert_results_match(extended["result"], full)
+        _assert_results_match(service.get_task_result(user_id="u-1", task_id=task.id), full)
+        assert service.get_task(user_id="u-1", task_id=task.id).metrics == pytest.approx(full["metrics"])
+
+    assert appended == [0, 1, 49, 50]
+
+
+def test_extend_task_only_fetches_bars_after_checkpoint():
+    history = _history(300)
+    service, calls = _build_service(history)
+    task = service.create_task(user_id="u-1", strategy_id="s-1", config=_config("moving_average", history[249]["timestamp"]))
+    service.execute_task(user_id="u-1", task_id=task.id)
+
+    extended = service.extend_task(user_id="u-1", task_id=task.id, new_bars=history[240:260])
+
+    assert calls == [("AAPL", None, history[249]["timestamp"])]
+    assert extended["appendedBars"] == 10
+    assert len(extended["result"]["equityCurve"]) == 260
+    assert extended["result"]["equityCurve"][-1]["index"] == 259.0
+
+
+def test_extend_task_requires_completed_task_with_checkpoint():
+    history = _history(120)
+    service, _ = _build_service(history, vectorized_kernels=False)
+    task = service.create_task(user_id="u-1", strategy_id="s-1", config=_config("moving_average", history[99]["timestamp"]))
+
+    with pytest.raises(BacktestExecutionError) as pending:
+        service.extend_task(user_id="u-1", task_id=task.id)
+    assert pending.value.code == "BACKTEST_INVALID_STATE"
+
+    service.execute_task(user_id="u-1", task_id=task.id)
+    with pytest.raises(BacktestExecutionError) as missing:
+        service.extend_task(user_id="u-1", task_id=task.id)
+    assert missing.value.code == "BACKTEST_CHECKPOINT_UNAVAILABLE"
+
+
+def test_delete_task_drops_checkpoint():
+    history = _history(120)
+    store = InMemoryBacktestResultStore()
+    service, _ = _build_service(history, result_store=store)
+    task = service.create_task(user_id="u-1", strategy_id="s-1", config=_config("mean_reversion", history[99]["timestamp"]))
+    service.execute_task(user_id="u-1", task_id=task.id)
+
+    assert store.get_checkpoint(user_id="u-1", task_id=task.id)["state"]["barCount"] == 100
+    assert service.delete_task(user_id="u-1", task_id=task.id) is True
+    assert store.get_checkpoint(user_id="u-1", task_id=task.id) is None
+
+
+def test_extend_task_compares_parsed_timestamps_across_label_formats():
+    history = _history(120)
+    service, _ = _build_service(history)
+    task = service.create_task(user_id="u-1", strategy_id="s-1", config=_config("moving_average", history[99]["timestamp"]))
+    service.execute_task(user_id="u-1", task_id=task.id)
+
+    # 检查点末 bar 为纯日期；同一天的带时间标签不是新 bar。
+    new_bars = [
+        {"timestamp": f"{row['timestamp']}T00:00:00Z", "close": row["close"]} for row in history[99:102]
+    ]
+    extended = service.extend_task(user_id="u-1", task_id=task.id, new_bars=new_bars)
+
+    assert extended["appendedBars"] == 2
+    assert len(extended["result"]["equityCurve"]) == 102
+
+
+def test_extend_task_appends_without_rewriting_stored_chunks():
+    history = _history(9000)
+    store = InMemoryBacktestResultStore()
+    service, _ = _build_service(history, result_store=store)
+    task = service.create_task(user_id="u-1", strategy_id="s-1", config=_config("mean_reversion", history[8799]["timestamp"]))
+    service.execute_task(user_id="u-1", task_id=task.id)
+    before = dict(store._results["u-1"][task.id])
+
+    service.extend_task(user_id="u-1", task_id=task.id, new_bars=history[8800:8810])
+    after = store._results["u-1"][task.id]
+
+    # 首个 4096 点的完整块原样保留，只有末块被重编码。
+    def first_chunk(blob: bytes) -> bytes:
+        header = result_codec._HEADER.size
+        length = result_codec._LENGTH.unpack_from(blob, header)[0]
+        start = header + result_codec._LENGTH.size * result_codec._HEADER.unpack_from(blob, 0)[3]
+        return blob[start : start + length]
+
+    assert after["barCount"] == 8810
+    for key in ("equity", "curveIndex", "returns"):
+        assert first_chunk(after[key]) == first_chunk(before[key])
+    full_service, _ = _build_service(history)
+    reference = full_service.create_task(
+        user_id="u-1", strategy_id="s-1", config=_config("mean_reversion", history[8809]["timestamp"])
+    )
+    full = full_service.execute_task(user_id="u-1", task_id=reference.id)["result"]
+    _assert_results_match(service.get_task_result(user_id="u-1", task_id=task.id), full)
@@ -0,0 +1,143 @@
+"""backtest_runner 回测结果内容寻址缓存测试。"""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from backtest_runner import simulation
+from backtest_runner.repository import InMemoryBacktestRepository
+from backtest_runner.result_cache import InMemoryBacktestResultCache, fingerprint_engine_input
+from backtest_runner.service import BacktestService
+
+
+def _prices(size: int = 300, *, seed: int = 5) -> list[float]:
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(size - 1):
+        prices.append(max(prices[-1] + rng.gauss(0.0, 1.0), 1.0))
+    return prices
+
+
+def _build_service(history: dict[str, list[float]], **kwargs) -> BacktestService:
+    def _market_history_reader(
+        *,
+        user_id: str,
+        symbol: str,
+        start_date: str | None,
+        end_date: str | None,
+        timeframe: str,
+        limit: int | None,
+    ):
+        del user_id, start_date, end_date, timeframe, limit
+        return [{"close": value} for value in history[symbol]]
+
+    return BacktestService(
+        repository=InMemoryBacktestRepository(),
+        market_history_reader=_market_history_reader,
+        **kwargs,
+    )
+
+
+def _execute(service: BacktestService, config: dict) -> dict:
+    task = service.create_task(user_id="u-1", strategy_id="s-1", config=config)
+    return service.execute_task(user_id="u-1", task_id=task.id)
+
+
+_CONFIG = {"symbol": "AAPL", "template": "moving_average", "parameters": {"shortWindow": 5, "longWindow": 20}}
+
+
+def test_identical_backtest_reuses_cached_result_without_simulating(monkeypatch):
+    service = _build_service({"AAPL": _prices()})
+    first = _execute(service, _CONFIG)
+
+    def _fail(**_kwargs):
+        raise AssertionError("simulation should be skipped on cache hit")
+
+    monkeypatch.setattr(simulation, "simulate_backtest", _fail)
+    second = _execute(service, dict(_CONFIG))
+
+    assert first["result"]["cache"]["hit"] is False
+    assert second["result"]["cache"] == {"hit": True, "fingerprint": first["result"]["cache"]["fingerprint"]}
+    assert second["result"]["taskId"] == second["task"].id
+    assert second["task"].status == "completed"
+    assert second["task"].metrics == first["task"].metrics
+    assert second["result"]["trades"] == first["result"]["trades"]
+    stored = service.get_task_result(user_id="u-1", task_id=second["task"].id)
+    assert stored["equityCurve"] == first["result"]["equityCurve"]
+
+
+def test_changed_bars_or_parameters_miss_the_cache():
+    history = {"AAPL": _prices()}
+    service = _build_service(history)
+    _execute(service, _CONFIG)
+
+    changed_params = _execute(service, {**_CONFIG, "parameters": {"shortWindow": 5, "longWindow": 30}})
+    history["AAPL"] = history["AAPL"][:-1] + [history["AAPL"][-1] + 0.01]
+    changed_bars = _execute(service, _CONFIG)
+
+    assert changed_params["result"]["cache"]["hit"] is False
+    assert changed_bars["result"]["cache"]["hit"] is False
+
+
+def test_cache_entries_exclude_checkpoint_and_original_task_stays_extendable():
+    cache = InMemoryBacktestResultCache()
+    service = _build_service({"AAPL": _prices()}, result_cache=cache)
+    first = _execute(service, _CONFIG)
+
+    assert "checkpoint" not in cache.get(first["result"]["cache"]["fingerprint"])
+    extended = service.extend_task(user_id="u-1", task_id=first["task"].id, new_bars=[{"close": 101.0}])
+
+    assert extended["appendedBars"] == 1
+    assert len(extended["result"]["equityCurve"]) == 301
+
+
+def test_cache_hits_are_isolated_copies_and_bounded_by_bytes():
+    cache = InMemoryBacktestResultCache(max_bytes=200)
+    cache.put("a", {"trades": [{"index": 1}], "metrics": {"returnRate": 0.1}})
+
+    hit = cache.get("a")
+    hit["trades"][0]["index"] = 99
+    hit["metrics"]["returnRate"] = 5.0
+    assert cache.get("a") == {"trades": [{"index": 1}], "metrics": {"returnRate": 0.1}}
+
+    cache.put("b", {"equityCurve": [1.0] * 35})
+    cache.put("huge", {"equityCurve": [1.0] * 500})
+
+    assert cache.get("a") is None
+    assert cache.get("huge") is None
+    assert cache.get("b") == {"equityCurve": [1.0] * 35}
+    stats = cache.stats()
+    assert stats["bytes"] <= stats["maxBytes"] == 200
+    assert stats["evictions"] == 1
+
+
+def test_backing_cache_is_consulted_after_lru_miss():
+    backing = InMemoryBacktestResultCache()
+    history = {"AAPL": _prices()}
+    first = _execute(_build_service(history, result_cache=InMemoryBacktestResultCache(backing=backing)), _CONFIG)
+
+    cache = InMemoryBacktestResultCache(max_entries=1, backing=backing)
+    second = _execute(_build_service(history, result_cache=cache), _CONFIG)
+
+    assert second["result"]["cache"]["hit"] is True
+    assert second["result"]["metrics"] == pytest.approx(first["result"]["metrics"])
+    assert cache.stats()["backingHits"] == 1
+
+
+def test_fingerprint_covers_series_and_settings():
+    base = {
+        "symbol": "AAPL",
+        "template": "moving_average",
+        "parameters": {"shortWindow": 5, "longWindow": 20},
+        "closePrices": [1.0, 2.0, 3.0],
+        "initialCapital": 100000.0,
+        "commissionRate": 0.0,
+    }
+    reordered = {**base, "parameters": {"longWindow": 20, "shortWindow": 5}}
+
+    assert fingerprint_engine_input(base) == fingerprint_engine_input(reordered)
+    assert fingerprint_engine_input(base) != fingerprint_engine_input({**base, "closePrices": [1.0, 2.0, 3.5]})
+    assert fingerprint_engine_input(base) != fingerprint_engine_input({**base, "commissionRate": 0.001})
+    assert fingerprint_engine_input(base) != fingerprint_engine_input(base, vectorized_kernels=False)
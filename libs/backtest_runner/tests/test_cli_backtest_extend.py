@@ -0,0 +1,50 @@
+"""backtest_runner 增量回测 CLI 合同测试。"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+from backtest_runner import cli
+from backtest_runner.repository import InMemoryBacktestRepository
+from backtest_runner.service import BacktestService
+
+
+def _run(handler, *, capsys, **kwargs):
+    handler(argparse.Namespace(**kwargs))
+    out = capsys.readouterr().out
+    return json.loads(out)
+
+
+def test_cli_extend_appends_bars_to_completed_task(capsys, monkeypatch):
+    repo = InMemoryBacktestRepository()
+    monkeypatch.setattr(cli, "_repo", repo)
+    monkeypatch.setattr(cli, "_service", BacktestService(repository=repo))
+    prices = [10, 10, 10, 10, 10, 11, 12, 13, 12, 11, 10, 9, 8, 9, 10, 11, 12]
+
+    created = _run(
+        cli._cmd_run_task,
+        capsys=capsys,
+        user_id="u-1",
+        strategy_id="s-1",
+        config=json.dumps(
+            {
+                "symbol": "AAPL",
+                "template": "moving_average",
+                "parameters": {"shortWindow": 2, "longWindow": 4},
+                "prices": prices,
+            }
+        ),
+        idempotency_key=None,
+    )
+    task_id = created["data"]["task"]["id"]
+
+    extended = _run(cli._cmd_extend, capsys=capsys, user_id="u-1", task_id=task_id, bars="[13, 14, 12]", end_date=None)
+    invalid = _run(cli._cmd_extend, capsys=capsys, user_id="u-1", task_id=task_id, bars="[", end_date=None)
+    missing = _run(cli._cmd_extend, capsys=capsys, user_id="u-2", task_id=task_id, bars=None, end_date=None)
+
+    assert extended["success"] is True
+    assert extended["data"]["appendedBars"] == 3
+    assert len(extended["data"]["result"]["equityCurve"]) == len(prices) + 3
+    assert invalid["error"]["code"] == "INVALID_CONFIG"
+    assert missing["error"]["code"] == "BACKTEST_ACCESS_DENIED"
@@ -0,0 +1,46 @@
+"""backtest_runner 结果视图 CLI 合同测试。"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+from backtest_runner import cli
+from backtest_runner.repository import InMemoryBacktestRepository
+from backtest_runner.service import BacktestService
+
+
+def _run(handler, *, capsys, **kwargs):
+    handler(argparse.Namespace(**kwargs))
+    out = capsys.readouterr().out
+    return json.loads(out)
+
+
+def test_cli_result_supports_metrics_only_and_slices(capsys, monkeypatch):
+    repo = InMemoryBacktestRepository()
+    monkeypatch.setattr(cli, "_repo", repo)
+    monkeypatch.setattr(cli, "_service", BacktestService(repository=repo))
+    prices = [10, 10, 10, 10, 10, 11, 12, 13, 12, 11, 10, 9, 8, 9, 10, 11, 12]
+
+    created = _run(
+        cli._cmd_run_task,
+        capsys=capsys,
+        user_id="u-1",
+        strategy_id="s-1",
+        config=json.dumps(
+            {"symbol": "AAPL", "template": "moving_average", "parameters": {"shortWindow": 2, "longWindow": 4}, "prices": prices}
+        ),
+        idempotency_key=None,
+    )
+    task_id = created["data"]["task"]["id"]
+
+    metrics = _run(
+        cli._cmd_result, capsys=capsys, user_id="u-1", task_id=task_id, metrics_only=True, start=None, end=None, max_points=None
+    )
+    sliced = _run(
+        cli._cmd_result, capsys=capsys, user_id="u-1", task_id=task_id, metrics_only=False, start=5, end=10, max_points=None
+    )
+
+    assert metrics["data"] == {"metrics": created["data"]["result"]["metrics"], "barCount": len(prices)}
+    assert sliced["data"]["equityCurve"] == created["data"]["result"]["equityCurve"][5:10]
+    assert sliced["data"]["range"] == {"start": 5, "end": 10, "barCount": len(prices)}
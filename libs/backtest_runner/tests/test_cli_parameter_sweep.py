@@ -0,0 +1,70 @@
+"""backtest_runner 参数扫描 CLI 合同测试。"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+from backtest_runner import cli
+from backtest_runner.repository import InMemoryBacktestRepository
+from backtest_runner.service import BacktestService
+
+
+def _run(handler, *, capsys, **kwargs):
+    handler(argparse.Namespace(**kwargs))
+    out = capsys.readouterr().out
+    return json.loads(out)
+
+
+def _setup_service(monkeypatch) -> None:
+    repo = InMemoryBacktestRepository()
+    monkeypatch.setattr(cli, "_repo", repo)
+    monkeypatch.setattr(cli, "_service", BacktestService(repository=repo))
+
+
+def test_cli_sweep_returns_metrics_table(capsys, monkeypatch):
+    _setup_service(monkeypatch)
+    prices = [10, 10, 10, 10, 10, 11, 12, 13, 12, 11, 10, 9, 8, 9, 10, 11, 12]
+
+    payload = _run(
+        cli._cmd_sweep,
+        capsys=capsys,
+        user_id="u-1",
+        strategy_id="s-1",
+        config=json.dumps({"symbol": "AAPL", "template": "moving_average", "prices": prices}),
+        parameter_sets='[{"shortWindow": 2, "longWindow": 4}]',
+        parameter_grid='{"shortWindow": [3], "longWindow": [5, 6]}',
+    )
+
+    assert payload["success"] is True
+    data = payload["data"]
+    assert data["combinationCount"] == 3
+    assert [row[:2] for row in data["rows"]] == [[2, 4], [3, 5], [3, 6]]
+    assert data["columns"][2:] == ["returnRate", "maxDrawdown", "sharpeRatio", "tradeCount", "winRate"]
+
+
+def test_cli_sweep_reports_invalid_json_and_empty_sweep(capsys, monkeypatch):
+    _setup_service(monkeypatch)
+
+    invalid = _run(
+        cli._cmd_sweep,
+        capsys=capsys,
+        user_id="u-1",
+        strategy_id="s-1",
+        config="{",
+        parameter_sets=None,
+        parameter_grid=None,
+    )
+    assert invalid["error"]["code"] == "INVALID_CONFIG"
+
+    empty = _run(
+        cli._cmd_sweep,
+        capsys=capsys,
+        user_id="u-1",
+        strategy_id="s-1",
+        config='{"symbol": "AAPL", "prices": [1, 2, 3]}',
+        parameter_sets=None,
+        parameter_grid=None,
+    )
+    assert empty["success"] is False
+    assert empty["error"]["code"] == "BACKTEST_INVALID_SWEEP"
@@ -0,0 +1,249 @@
+"""backtest_runner 多标的组合回测测试。"""
+
+from __future__ import annotations
+
+import random
+import threading
+
+import numpy as np
+import pytest
+
+from backtest_runner import kernels, simulation
+from backtest_runner.repository import InMemoryBacktestRepository
+from backtest_runner.service import BacktestExecutionError, BacktestService
+
+
+def _random_walk(*, seed: int, size: int) -> list[float]:
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(size - 1):
+        prices.append(max(prices[-1] + rng.gauss(0.0, 1.0), 1.0))
+    return prices
+
+
+def _history(prices: list[float], *, skip_days: set[int] | None = None) -> list[dict]:
+    return [
+        {"timestamp": f"2024-01-01T00:00:{idx:05d}", "close": value}
+        for idx, value in enumerate(prices)
+        if idx not in (skip_days or set())
+    ]
+
+
+def _build_service(histories: dict[str, list[dict]], **kwargs) -> BacktestService:
+    def _market_history_reader(
+        *,
+        user_id: str,
+        symbol: str,
+        start_date: str | None,
+        end_date: str | None,
+        timeframe: str,
+        limit: int | None,
+    ):
+        del user_id, start_date, end_date, timeframe, limit
+        return histories.get(symbol, [])
+
+    return BacktestService(
+        repository=InMemoryBacktestRepository(),
+        market_history_reader=_market_history_reader,
+        **kwargs,
+    )
+
+
+def _run(service: BacktestService, config: dict) -> dict:
+    task = service.create_task(user_id="u-1", strategy_id="s-1", config=config)
+    return service.execute_task(user_id="u-1", task_id=task.id)["result"]
+
+
+@pytest.mark.parametrize(
+    ("template", "build"),
+    [
+        (
+            "moving_average",
+            lambda matrix, column: (
+                kernels.moving_average_events_by_column(close_matrix=matrix, short_window=5, long_window=20)[column],
+                kernels.moving_average_events(close_prices=matrix[:, column], short_window=5, long_window=20),
+            ),
+        ),
+        (
+            "mean_reversion",
+            lambda matrix, column: (
+                kernels.mean_reversion_events_by_column(close_matrix=matrix, window=20, entry_z=1.5)[column],
+                kernels.mean_reversion_events(close_prices=matrix[:, column], window=20, entry_z=1.5),
+            ),
+        ),
+    ],
+)
+def test_column_kernels_match_single_series_kernels(template: str, build):
+    matrix = np.column_stack([_random_walk(seed=seed, size=800) for seed in (1, 2, 3, 4)])
+
+    for column in range(matrix.shape[1]):
+        by_column, single = build(matrix, column)
+        assert single, template
+        assert [(item["index"], item["side"]) for item in by_column] == [
+            (item["index"], item["side"]) for item in single
+        ]
+
+
+def test_align_close_series_intersects_timestamps():
+    timestamps, symbols, matrix, alignment = simulation.align_close_series(
+        {
+            "AAPL": [("2024-01-02", 1.0), ("2024-01-01", 2.0), ("2024-01-03", 3.0)],
+            "MSFT": [("2024-01-01", 10.0), ("2024-01-03", 30.0)],
+        }
+    )
+
+    assert timestamps == ["2024-01-01", "2024-01-03"]
+    assert symbols == ["AAPL", "MSFT"]
+    assert matrix.tolist() == [[2.0, 10.0], [3.0, 30.0]]
+    assert alignment == {
+        "unionBars": 3,
+        "alignedBars": 2,
+        "droppedBars": 1,
+        "missingBars": {"MSFT": 1},
+        "sparseSymbols": [],
+    }
+
+
+def test_align_close_series_drops_sparse_symbols_instead_of_truncating():
+    dense = [(f"2024-01-{day:02d}", float(day)) for day in range(1, 21)]
+    sparse = dense[::5]
+
+    timestamps, symbols, matrix, alignment = simulation.align_close_series(
+        {"AAPL": dense, "MSFT": dense[1:], "THIN": sparse},
+        min_coverage=0.5,
+    )
+
+    assert symbols == ["AAPL", "MSFT"]
+    assert len(timestamps) == 19
+    assert matrix.shape == (19, 2)
+    assert alignment["sparseSymbols"] == ["THIN"]
+    assert alignment["droppedBars"] == 1
+    assert alignment["missingBars"] == {"MSFT": 1}
+
+
+def test_portfolio_backtest_aggregates_per_symbol_simulations():
+    prices = {symbol: _random_walk(seed=seed, size=400) for seed, symbol in enumerate(["AAPL", "MSFT", "NVDA"])}
+    histories = {
+        "AAPL": _history(prices["AAPL"]),
+        "MSFT": _history(prices["MSFT"], skip_days={10, 11}),
+        "NVDA": _history(prices["NVDA"]),
+    }
+    service = _build_service(histories)
+
+    result = _run(
+        service,
+        {
+            "symbols": ["aapl", "MSFT", "NVDA", "EMPTY"],
+            "template": "mean_reversion",
+            "parameters": {"window": 20, "entryZ": 1.5},
+            "initialCapital": 90000.0,
+            "commissionRate": 0.001,
+        },
+    )
+
+    assert result["mode"] == "portfolio"
+    assert result["symbols"] == ["AAPL", "MSFT", "NVDA"]
+    assert result["skippedSymbols"] == [{"symbol": "EMPTY", "reason": "history_empty"}]
+    assert result["barCount"] == 398
+    assert result["alignment"]["droppedBars"] == 2
+    assert result["alignment"]["missingBars"] == {"MSFT": 2}
+    assert len(result["equityCurve"]) == 398
+    assert result["timestamps"][10] == "2024-01-01T00:00:00012"
+
+    aligned = {
+        symbol: [value for idx, value in enumerate(series) if idx not in {10, 11}] for symbol, series in prices.items()
+    }
+    portfolio_equity = np.zeros(398)
+    for symbol in result["symbols"]:
+        single = _run(
+            _build_service({symbol: _history(aligned[symbol])}),
+            {
+                "symbol": symbol,
+                "template": "mean_reversion",
+                "parameters": {"window": 20, "entryZ": 1.5},
+                "initialCapital": 30000.0,
+                "commissionRate": 0.001,
+            },
+        )
+        for key, value in single["metrics"].items():
+            assert result["perSymbol"][symbol]["metrics"][key] == pytest.approx(value, rel=1e-9, abs=1e-12)
+        portfolio_equity += [point["equity"] for point in single["equityCurve"]]
+
+    assert [point["equity"] for point in result["equityCurve"]] == pytest.approx(portfolio_equity.tolist())
+    assert result["metrics"]["returnRate"] == pytest.approx(portfolio_equity[-1] / 90000.0 - 1.0)
+    assert result["metrics"]["tradeCount"] == sum(
+        entry["metrics"]["tradeCount"] for entry in result["perSymbol"].values()
+    )
+
+
+def test_portfolio_backtest_matches_reference_engine():
+    histories = {symbol: _history(_random_walk(seed=seed, size=300)) for seed, symbol in enumerate("ABCDE")}
+    config = {
+        "symbols": list("ABCDE"),
+        "template": "moving_average",
+        "parameters": {"shortWindow": 5, "longWindow": 20},
+    }
+
+    vectorized = _run(_build_service(histories), config)
+    reference = _run(_build_service(histories, vectorized_kernels=False), config)
+
+    assert [(trade["symbol"], trade["index"]) for trade in vectorized["trades"]] == [
+        (trade["symbol"], trade["index"]) for trade in reference["trades"]
+    ]
+    for key, value in reference["metrics"].items():
+        assert vectorized["metrics"][key] == pytest.approx(value, rel=1e-9, abs=1e-12)
+
+
+def test_portfolio_history_is_fetched_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+    history = _history(_random_walk(seed=3, size=60))
+
+    def _market_history_reader(
+        *,
+        user_id: str,
+        symbol: str,
+        start_date: str | None,
+        end_date: str | None,
+        timeframe: str,
+        limit: int | None,
+    ):
+        del user_id, symbol, start_date, end_date, timeframe, limit
+        barrier.wait()
+        return history
+
+    service = BacktestService(
+        repository=InMemoryBacktestRepository(),
+        market_history_reader=_market_history_reader,
+        history_fetch_workers=3,
+    )
+
+    result = _run(service, {"symbols": ["A", "B", "C"], "template": "moving_average"})
+
+    assert result["skippedSymbols"] == []
+    assert result["symbols"] == ["A", "B", "C"]
+
+
+def test_portfolio_rejects_universe_above_limit():
+    service = _build_service({}, max_portfolio_symbols=2)
+    task = service.create_task(user_id="u-1", strategy_id="s-1", config={"symbols": ["A", "B", "C"]})
+
+    with pytest.raises(BacktestExecutionError) as exc_info:
+        service.execute_task(user_id="u-1", task_id=task.id)
+
+    assert exc_info.value.code == "BACKTEST_INVALID_CONFIG"
+    assert service.get_task(user_id="u-1", task_id=task.id).status == "failed"
+
+
+def test_portfolio_skips_sparse_symbol_and_reports_it():
+    histories = {
+        "AAPL": _history(_random_walk(seed=1, size=200)),
+        "MSFT": _history(_random_walk(seed=2, size=200)),
+        "THIN": _history(_random_walk(seed=3, size=200), skip_days=set(range(0, 200, 3)) | set(range(1, 200, 3))),
+    }
+
+    result = _run(_build_service(histories), {"symbols": ["AAPL", "MSFT", "THIN"], "template": "moving_average"})
+
+    assert result["symbols"] == ["AAPL", "MSFT"]
+    assert result["skippedSymbols"] == [{"symbol": "THIN", "reason": "history_sparse"}]
+    assert result["barCount"] == 200
+    assert result["alignment"]["sparseSymbols"] == ["THIN"]
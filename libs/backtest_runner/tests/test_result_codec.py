@@ -0,0 +1,131 @@
+"""backtest_runner 列式结果编码测试。"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from backtest_runner import result_codec
+from backtest_runner.result_store import InMemoryBacktestResultStore
+
+
+def _result(size: int = 10_000) -> dict:
+    rng = np.random.default_rng(3)
+    equity = (100000.0 + np.cumsum(rng.normal(0.0, 50.0, size))).tolist()
+    return {
+        "taskId": "t-1",
+        "symbol": "AAPL",
+        "metrics": {"returnRate": 0.1, "maxDrawdown": 0.05, "sharpeRatio": 1.2, "tradeCount": 2.0, "winRate": 0.5},
+        "trades": [
+            {"index": 5, "side": "BUY", "price": 1.0},
+            {"index": 9000, "side": "SELL", "price": 2.0, "pnl": 1.0},
+        ],
+        "equityCurve": [{"index": float(idx), "equity": value} for idx, value in enumerate(equity)],
+        "dailyReturns": np.diff(equity).tolist(),
+    }
+
+
+def test_packed_floats_decode_only_requested_range():
+    values = np.linspace(-1.0, 1.0, 10_001)
+    blob = result_codec.pack_floats(values, chunk_size=1000)
+
+    assert result_codec.packed_count(blob) == 10_001
+    assert result_codec.unpack_floats(blob).tolist() == values.tolist()
+    assert result_codec.unpack_floats(blob, start=999, end=2001).tolist() == values[999:2001].tolist()
+    assert result_codec.unpack_floats(blob, start=10_000).tolist() == [1.0]
+    assert result_codec.unpack_floats(blob, start=50, end=50).size == 0
+
+
+def test_round_trip_is_lossless_and_compact():
+    result = _result()
+    record = result_codec.encode_result(result)
+
+    assert result_codec.decode_result(record) == result
+    packed_bytes = sum(len(record[key]) for key in ("meta", "trades", "curveIndex", "equity", "returns"))
+    assert packed_bytes < len(repr(result["equityCurve"])) / 3
+
+
+def test_metrics_only_and_slice_views():
+    result = _result()
+    record = result_codec.encode_result(result)
+
+    assert result_codec.decode_result(record, metrics_only=True) == {"metrics": result["metrics"], "barCount": 10_000}
+
+    sliced = result_codec.decode_result(record, start=100, end=200)
+    assert sliced["equityCurve"] == result["equityCurve"][100:200]
+    assert sliced["dailyReturns"] == result["dailyReturns"][99:199]
+    assert sliced["trades"] == []
+    assert sliced["range"] == {"start": 100, "end": 200, "barCount": 10_000}
+    assert result_codec.decode_result(record, start=8000)["trades"] == [result["trades"][1]]
+
+
+def test_lttb_downsample_keeps_endpoints_and_extremes():
+    result = _result()
+    equity = [point["equity"] for point in result["equityCurve"]]
+    record = result_codec.encode_result(result)
+
+    sampled = result_codec.decode_result(record, max_points=200)
+
+    curve = sampled["equityCurve"]
+    assert len(curve) == 200
+    assert curve[0] == result["equityCurve"][0]
+    assert curve[-1] == result["equityCurve"][-1]
+    assert max(point["equity"] for point in curve) == pytest.approx(max(equity))
+    assert sampled["downsample"] == {"method": "lttb", "points": 200, "sourcePoints": 10_000}
+    assert "dailyReturns" not in sampled
+
+
+def test_in_memory_store_serves_views():
+    store = InMemoryBacktestResultStore()
+    store.save_result(user_id="u-1", task_id="t-1", result=_result(500))
+
+    full = store.get_result(user_id="u-1", task_id="t-1")
+    metrics = store.get_result_view(user_id="u-1", task_id="t-1", metrics_only=True)
+    window = store.get_result_view(user_id="u-1", task_id="t-1", start=490, max_points=5)
+
+    assert len(full["equityCurve"]) == 500
+    assert "updatedAt" in full
+    assert metrics["barCount"] == 500
+    assert [point["index"] for point in window["equityCurve"]][0] == 490.0
+    assert len(window["equityCurve"]) == 5
+
+
+def test_slice_decodes_only_trades_and_series_chunks_it_covers(monkeypatch):
+    result = _result()
+    result["trades"] = [{"index": idx, "side": "BUY" if idx % 20 == 0 else "SELL"} for idx in range(0, 10_000, 10)]
+    result["timestamps"] = [f"2024-01-01T00:{idx:05d}" for idx in range(10_000)]
+    result["perSymbol"] = {"AAPL": {"weight": 1.0, "equity": [float(idx) for idx in range(10_000)]}}
+    record = result_codec.encode_result(result)
+
+    assert result_codec.decode_result(record) == result
+
+    decoded: list[int] = []
+    original = result_codec._unpack_json
+
+    def counting(blob):
+        value = original(blob)
+        decoded.append(len(value) if isinstance(value, list) else 0)
+        return value
+
+    monkeypatch.setattr(result_codec, "_unpack_json", counting)
+    sliced = result_codec.decode_result(record, start=5000, end=5100)
+
+    assert sliced["trades"] == [trade for trade in result["trades"] if 5000 <= trade["index"] < 5100]
+    assert sliced["timestamps"] == result["timestamps"][5000:5100]
+    assert sliced["perSymbol"]["AAPL"] == {"weight": 1.0, "equity": result["perSymbol"]["AAPL"]["equity"][5000:5100]}
+    # 1000 笔成交、2 × 10000 行序列：每段只解压覆盖到的一个块。
+    assert sorted(decoded) == [0, 256, 1024, 1024]
+
+
+def test_legacy_trades_and_meta_blobs_still_decode():
+    result = _result(300)
+    result["timestamps"] = [str(idx) for idx in range(300)]
+    record = result_codec.encode_result(result)
+    meta = {key: value for key, value in result.items() if key not in ("equityCurve", "dailyReturns", "trades", "metrics")}
+    record["meta"] = result_codec._pack_json(meta)
+    record["trades"] = result_codec._pack_json(result["trades"])
+
+    assert result_codec.decode_result(record) == result
+    sliced = result_codec.decode_result(record, start=0, end=10)
+    assert sliced["timestamps"] == result["timestamps"][:10]
+    assert sliced["trades"] == [result["trades"][0]]
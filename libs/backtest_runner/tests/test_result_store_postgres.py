@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from backtest_runner.result_store_postgres import PostgresBacktestResultStore
+
+
+class _SqliteEngine:
+    def __init__(self) -> None:
+        import sqlite3
+
+        self._conn = sqlite3.connect(":memory:")
+        self.statements: list[str] = []
+
+    def begin(self):
+        return _SqliteTransaction(self._conn, self.statements)
+
+
+class _SqliteTransaction:
+    def __init__(self, conn, statements: list[str]) -> None:
+        self._conn = conn
+        self._statements = statements
+
+    def __enter__(self):
+        return _SqliteConnection(self._conn, self._statements)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self._conn.commit()
+        else:
+            self._conn.rollback()
+
+
+class _SqliteConnection:
+    def __init__(self, conn, statements: list[str]) -> None:
+        self._conn = conn
+        self._statements = statements
+
+    def exec_driver_sql(self, sql: str, params: tuple | None = None):
+        self._statements.append(sql)
+        normalized_sql = sql.replace("%s", "?")
+        if params is None:
+            return self._conn.execute(normalized_sql)
+        return self._conn.execute(normalized_sql, params)
+
+
+def test_postgres_result_store_should_init_schema_without_alter_on_other_backends():
+    engine = _SqliteEngine()
+    store = PostgresBacktestResultStore(engine=engine)
+
+    store.save_result(
+        user_id="u-1",
+        task_id="t-1",
+        result={"metrics": {"totalReturn": 0.1}, "equityCurve": [], "trades": []},
+    )
+
+    assert not any("ALTER TABLE" in statement for statement in engine.statements)
+    assert store.get_result_view(user_id="u-1", task_id="t-1", metrics_only=True)["metrics"] == {"totalReturn": 0.1}
+
+
+def test_postgres_result_store_appends_extension_in_place():
+    from backtest_runner.result_codec import ResultExtension
+
+    store = PostgresBacktestResultStore(engine=_SqliteEngine())
+    store.save_result(
+        user_id="u-1",
+        task_id="t-1",
+        result={
+            "metrics": {"totalReturn": 0.1},
+            "equityCurve": [{"index": 0.0, "equity": 100.0}, {"index": 1.0, "equity": 99.0}],
+            "dailyReturns": [-0.01],
+            "trades": [{"index": 1, "side": "SELL", "reason": "force_close"}],
+        },
+    )
+
+    appended = store.append_result(
+        user_id="u-1",
+        task_id="t-1",
+        extension=ResultExtension(
+            equity=[102.0],
+            daily_returns=[0.02],
+            trades=[{"index": 2, "side": "SELL", "reason": "force_close"}],
+            metrics={"totalReturn": 0.02},
+            last_equity=100.0,
+            fields={"endDate": "2024-01-03"},
+        ),
+    )
+
+    result = store.get_result(user_id="u-1", task_id="t-1")
+    assert appended is True
+    assert result["equityCurve"] == [
+        {"index": 0.0, "equity": 100.0},
+        {"index": 1.0, "equity": 100.0},
+        {"index": 2.0, "equity": 102.0},
+    ]
+    assert result["dailyReturns"] == [-0.01, 0.02]
+    assert result["trades"] == [{"index": 2, "side": "SELL", "reason": "force_close"}]
+    assert result["metrics"] == {"totalReturn": 0.02}
+    assert result["endDate"] == "2024-01-03"
+    assert store.append_result(user_id="u-1", task_id="missing", extension=ResultExtension([], [], [], {})) is False
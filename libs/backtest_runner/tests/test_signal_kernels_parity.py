@@ -0,0 +1,144 @@
+"""backtest_runner 向量化信号内核与逐 bar 实现一致性测试。"""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from backtest_runner import kernels
+from backtest_runner.repository import InMemoryBacktestRepository
+from backtest_runner.service import BacktestService
+
+
+def _random_walk(*, seed: int, size: int, start: float = 100.0) -> list[float]:
+    rng = random.Random(seed)
+    prices = [start]
+    for _ in range(size - 1):
+        prices.append(max(prices[-1] + rng.gauss(0.0, 1.0), 1.0))
+    return prices
+
+
+def _assert_events_equal(actual: list[dict], expected: list[dict]) -> None:
+    assert [(item["index"], item["side"], item["reason"]) for item in actual] == [
+        (item["index"], item["side"], item["reason"]) for item in expected
+    ]
+    for got, want in zip(actual, expected):
+        assert got["triggered_indicator"] == want["triggered_indicator"]
+        assert got["metadata"].keys() == want["metadata"].keys()
+        for key, value in want["metadata"].items():
+            assert got["metadata"][key] == pytest.approx(value, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize("seed", [1, 7, 42])
+@pytest.mark.parametrize(("short_window", "long_window"), [(3, 5), (5, 20), (20, 120)])
+def test_moving_average_kernel_matches_reference(seed: int, short_window: int, long_window: int):
+    prices = _random_walk(seed=seed, size=2000)
+
+    expected = BacktestService._moving_average_events(
+        close_prices=prices,
+        short_window=short_window,
+        long_window=long_window,
+    )
+    actual = kernels.moving_average_events(
+        close_prices=prices,
+        short_window=short_window,
+        long_window=long_window,
+    )
+
+    assert expected
+    _assert_events_equal(actual, expected)
+
+
+@pytest.mark.parametrize("seed", [3, 11, 99])
+@pytest.mark.parametrize(("window", "entry_z"), [(5, 1.0), (20, 1.5), (250, 2.0)])
+def test_mean_reversion_kernel_matches_reference(seed: int, window: int, entry_z: float):
+    prices = _random_walk(seed=seed, size=2000)
+
+    expected = BacktestService._mean_reversion_events(close_prices=prices, window=window, entry_z=entry_z)
+    actual = kernels.mean_reversion_events(close_prices=prices, window=window, entry_z=entry_z)
+
+    assert expected
+    _assert_events_equal(actual, expected)
+
+
+def test_mean_reversion_kernel_matches_reference_on_long_series():
+    # 长序列上全局前缀和的 E[x²]-E[x]² 会累积舍入误差并翻转阈值附近的判定。
+    prices = _random_walk(seed=2024, size=200_000, start=5_000.0)
+
+    expected = BacktestService._mean_reversion_events(close_prices=prices, window=20, entry_z=1.5)
+    actual = kernels.mean_reversion_events(close_prices=prices, window=20, entry_z=1.5)
+
+    assert len(expected) > 10_000
+    _assert_events_equal(actual, expected)
+
+
+def test_rolling_variance_is_stable_for_large_offsets():
+    base = [1e9 + value for value in _random_walk(seed=8, size=5000)]
+    stats = kernels.RollingStatistics(base)
+
+    variances = stats.variances(20).tolist()
+    for start in range(0, len(base) - 19, 97):
+        window = base[start : start + 20]
+        mean = sum(window) / 20.0
+        assert variances[start] == pytest.approx(sum((item - mean) ** 2 for item in window) / 20.0, rel=1e-6)
+
+
+def test_mean_reversion_kernel_skips_flat_windows_like_reference():
+    prices = [10.0] * 8 + [10.0, 12.0, 8.0, 10.0] + [10.0] * 8
+
+    expected = BacktestService._mean_reversion_events(close_prices=prices, window=4, entry_z=1.2)
+    actual = kernels.mean_reversion_events(close_prices=prices, window=4, entry_z=1.2)
+
+    _assert_events_equal(actual, expected)
+
+
+def test_moving_average_kernel_treats_exact_ties_as_touching():
+    prices = [10.0, 10.0, 10.0, 10.0, 10.0, 11.0, 10.0, 10.0, 10.0, 10.0, 10.0, 9.0]
+
+    events = kernels.moving_average_events(close_prices=prices, short_window=2, long_window=4)
+
+    assert [(item["index"], item["side"]) for item in events] == [
+        (5, "BUY"),
+        (7, "SELL"),
+        (11, "SELL"),
+    ]
+
+
+def test_kernels_return_empty_when_series_shorter_than_window():
+    assert kernels.moving_average_events(close_prices=[1.0, 2.0], short_window=1, long_window=2) == []
+    assert kernels.mean_reversion_events(close_prices=[1.0, 2.0], window=3, entry_z=1.0) == []
+
+
+@pytest.mark.parametrize(
+    ("template", "parameters"),
+    [
+        ("moving_average", {"shortWindow": 5, "longWindow": 20}),
+        ("mean_reversion", {"window": 20, "entryZ": 1.5}),
+    ],
+)
+def test_execute_task_result_matches_reference_engine(template: str, parameters: dict):
+    prices = _random_walk(seed=5, size=600)
+
+    def _build(*, vectorized_kernels: bool) -> BacktestService:
+        return BacktestService(
+            repository=InMemoryBacktestRepository(),
+            vectorized_kernels=vectorized_kernels,
+        )
+
+    results = []
+    for vectorized in (True, False):
+        service = _build(vectorized_kernels=vectorized)
+        task = service.create_task(
+            user_id="u-1",
+            strategy_id="s-1",
+            config={"symbol": "AAPL", "template": template, "parameters": parameters, "prices": prices},
+        )
+        results.append(service.execute_task(user_id="u-1", task_id=task.id)["result"])
+
+    vectorized_result, reference_result = results
+    assert [trade["index"] for trade in vectorized_result["trades"]] == [
+        trade["index"] for trade in reference_result["trades"]
+    ]
+    for key, value in reference_result["metrics"].items():
+        assert vectorized_result["metrics"][key] == pytest.approx(value, rel=1e-9, abs=1e-12)
@@ -0,0 +1,103 @@
+"""backtest_runner 数组化撮合模拟与逐 bar 实现一致性测试。"""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from backtest_runner import kernels, simulation
+from backtest_runner.repository import InMemoryBacktestRepository
+from backtest_runner.service import BacktestService
+
+
+def _random_walk(*, seed: int, size: int) -> list[float]:
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(size - 1):
+        prices.append(max(prices[-1] + rng.gauss(0.0, 1.0), 1.0))
+    return prices
+
+
+def _reference(**kwargs):
+    return BacktestService(repository=InMemoryBacktestRepository())._simulate_backtest(**kwargs)
+
+
+@pytest.mark.parametrize("commission_rate", [0.0, 0.001])
+@pytest.mark.parametrize("seed", [2, 17])
+def test_simulation_matches_reference_loop(seed: int, commission_rate: float):
+    prices = _random_walk(seed=seed, size=1500)
+    events = kernels.mean_reversion_events(close_prices=prices, window=20, entry_z=1.5)
+    kwargs = {
+        "symbol": "AAPL",
+        "close_prices": prices,
+        "events": events,
+        "initial_capital": 100000.0,
+        "commission_rate": commission_rate,
+    }
+
+    expected = _reference(**kwargs)
+    actual = simulation.simulate_backtest(**kwargs).to_payload()
+
+    assert actual["trades"] == expected["trades"]
+    assert [point["index"] for point in actual["equityCurve"]] == [point["index"] for point in expected["equityCurve"]]
+    assert [point["equity"] for point in actual["equityCurve"]] == pytest.approx(
+        [point["equity"] for point in expected["equityCurve"]], rel=1e-12
+    )
+    assert actual["dailyReturns"] == pytest.approx(expected["dailyReturns"], rel=1e-9, abs=1e-15)
+    for key, value in expected["metrics"].items():
+        assert actual["metrics"][key] == pytest.approx(value, rel=1e-9, abs=1e-12)
+
+
+def test_simulation_force_closes_open_position_on_last_bar():
+    prices = [10.0, 11.0, 12.0, 13.0]
+    events = [{"index": 1, "side": "BUY", "reason": "test", "triggered_indicator": "test"}]
+
+    result = simulation.simulate_backtest(
+        symbol="AAPL",
+        close_prices=prices,
+        events=events,
+        initial_capital=1100.0,
+        commission_rate=0.0,
+    )
+
+    assert [trade["side"] for trade in result.trades] == ["BUY", "SELL"]
+    assert result.trades[-1]["reason"] == "force_close"
+    assert result.equity.tolist() == pytest.approx([1100.0, 1100.0, 1200.0, 1300.0])
+    assert result.positions.tolist() == pytest.approx([0.0, 100.0, 100.0, 0.0])
+    assert result.metrics["returnRate"] == pytest.approx(200.0 / 1100.0)
+    assert result.metrics["winRate"] == 1.0
+
+
+def test_simulation_payload_omits_curve_when_metrics_only():
+    result = simulation.simulate_backtest(
+        symbol="AAPL",
+        close_prices=[10.0, 9.0, 11.0],
+        events=[{"index": 0, "side": "BUY"}, {"index": 1, "side": "SELL"}],
+        initial_capital=1000.0,
+        commission_rate=0.0,
+    )
+
+    payload = result.to_payload(include_curve=False)
+
+    assert "equityCurve" not in payload
+    assert "dailyReturns" not in payload
+    assert payload["metrics"]["maxDrawdown"] == pytest.approx(0.1)
+    assert payload["metrics"]["winRate"] == 0.0
+
+
+def test_simulation_of_empty_series_returns_zero_metrics():
+    result = simulation.simulate_backtest(
+        symbol="AAPL",
+        close_prices=[],
+        events=[],
+        initial_capital=1000.0,
+        commission_rate=0.0,
+    )
+
+    assert result.to_payload() == {
+        "trades": [],
+        "metrics": simulation.empty_metrics(),
+        "equityCurve": [],
+        "dailyReturns": [],
+    }
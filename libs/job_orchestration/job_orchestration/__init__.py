@@ -2,8 +2,14 @@
 
 from job_orchestration.api import create_router
 from job_orchestration.celery_adapter import CeleryJobAdapter
+from job_orchestration.control import JobControl
 from job_orchestration.domain import InvalidJobTransitionError, Job, ScheduleConfig
-from job_orchestration.executor import InProcessJobExecutor, JobExecutor, JobExecutorError
+from job_orchestration.executor import (
+    InProcessJobExecutor,
+    JobExecutor,
+    JobExecutorError,
+    ProcessPoolJobExecutor,
+)
 from job_orchestration.repository import InMemoryJobRepository
 from job_orchestration.repository_postgres import PostgresJobRepository
 from job_orchestration.scheduler import InMemoryScheduler
@@ -21,8 +27,10 @@ __all__ = [
     "PostgresJobRepository",
     "InMemoryScheduler",
     "InProcessJobExecutor",
+    "ProcessPoolJobExecutor",
     "JobExecutor",
     "JobExecutorError",
+    "JobControl",
     "CeleryJobAdapter",
     "IdempotencyConflictError",
     "JobAccessDeniedError",
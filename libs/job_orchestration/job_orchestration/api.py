@@ -54,7 +54,7 @@ def _dt(value: datetime | None) -> str | None:
     return value.isoformat()
 
 
-def _job_payload(job) -> dict[str, Any]:
+def _job_payload(job, *, progress: dict[str, Any] | None = None) -> dict[str, Any]:
     return {
         "id": job.id,
         "taskId": job.id,
@@ -76,6 +76,7 @@ def _job_payload(job) -> dict[str, Any]:
         }
         if job.executor_name or job.dispatch_id
         else None,
+        "progress": progress,
         "startedAt": _dt(job.started_at),
         "finishedAt": _dt(job.finished_at),
         "createdAt": _dt(job.created_at),
@@ -249,7 +250,8 @@ def create_router(*, service: JobOrchestrationService, get_current_user: Any) ->
         job = service.get_job(user_id=current_user.id, job_id=job_id)
         if job is None:
             return _job_access_denied_response()
-        return success_response(data=_job_payload(job))
+        progress = service.job_progress(user_id=current_user.id, job_id=job_id)
+        return success_response(data=_job_payload(job, progress=progress))
 
     @router.post("/jobs/{job_id}/transition")
     def transition_job(
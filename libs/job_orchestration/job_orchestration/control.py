@@ -0,0 +1,41 @@
+"""任务协作式取消与进度通道。
+
+计算函数在分块边界读取 `cancelled` 并调用 `report` 上报进度；调度方通过 `cancel`
+请求取消、通过 `snapshot` 读取实时进度。由 `ProcessPoolJobExecutor.create_control`
+提供的 Manager 代理构造时可 pickle，能跨进程传入计算函数。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+
+class JobControl:
+    def __init__(self, *, cancel_event: Any | None = None, state: Any | None = None) -> None:
+        self._cancel_event = cancel_event if cancel_event is not None else threading.Event()
+        self._state = state if state is not None else {}
+        self._state.update({"processed": 0, "total": 0, "startedAt": time.time()})
+
+    @property
+    def cancelled(self) -> bool:
+        return bool(self._cancel_event.is_set())
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def report(self, *, processed: int, total: int) -> None:
+        self._state.update({"processed": int(processed), "total": int(total)})
+
+    def snapshot(self) -> dict[str, Any]:
+        state = dict(self._state)
+        processed = int(state.get("processed") or 0)
+        total = int(state.get("total") or 0)
+        return {
+            "processed": processed,
+            "total": total,
+            "fraction": min(processed / total, 1.0) if total > 0 else 0.0,
+            "elapsedSeconds": max(time.time() - float(state.get("startedAt") or time.time()), 0.0),
+            "cancelRequested": self.cancelled,
+        }
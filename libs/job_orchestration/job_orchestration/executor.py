@@ -1,13 +1,19 @@
-"""job_orchestration 任务执行器抽象与 in-process 基线实现。"""
+"""job_orchestration 任务执行器抽象与 in-process / process-pool 实现。"""
 
 from __future__ import annotations
 
+import multiprocessing
+import threading
 import uuid
 from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass
 from typing import Any, Protocol
 
+from job_orchestration.control import JobControl
 from job_orchestration.domain import Job
+from job_orchestration.task_registry import get_task_type_definition
 
 
 class JobExecutorError(RuntimeError):
@@ -98,3 +104,220 @@ class InProcessJobExecutor:
                 result=dict(result or {}),
             )
         )
+
+
+class ProcessPoolJobExecutor:
+    """有界进程池执行器。
+
+    CPU 密集的计算函数在 `ProcessPoolExecutor` 中运行，调用方线程立即返回；
+    每个在途任务由协调线程负责 prepare -> 进程内计算 -> finalize -> callback。
+    在途数量按 taskType 受 `TaskSlaPolicy.max_in_flight` 约束（可通过 `max_in_flight` 覆盖）。
+
+    提交到进程池的函数与参数必须可 pickle（模块级函数 + 纯数据）。
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = 2,
+        max_in_flight: dict[str, int] | None = None,
+        handlers: dict[str, Callable[[dict[str, Any]], dict[str, Any] | None]] | None = None,
+        name: str = "processpool",
+        process_pool: Executor | None = None,
+    ) -> None:
+        self._max_workers = max(1, int(max_workers))
+        self._max_in_flight_overrides = {key: max(0, int(value)) for key, value in (max_in_flight or {}).items()}
+        self._handlers = dict(handlers or {})
+        self._name = name
+        self._process_pool = process_pool
+        self._coordinator: ThreadPoolExecutor | None = None
+        self._manager: Any | None = None
+        self._in_flight: dict[str, int] = {}
+        self._release_listeners: list[Callable[[str], None]] = []
+        self._closed = False
+        self._lock = threading.Lock()
+        # 协调线程上超时但仍在进程中运行的 future：名额要等它真正结束才释放。
+        self._local = threading.local()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def submit(self, *, job: Job) -> str:
+        del job
+        return str(uuid.uuid4())
+
+    def max_in_flight(self, task_type: str) -> int:
+        if task_type in self._max_in_flight_overrides:
+            return self._max_in_flight_overrides[task_type]
+        definition = get_task_type_definition(task_type)
+        if definition is None:
+            return 1
+        return max(0, int(definition.sla.max_in_flight))
+
+    def has_capacity(self, task_type: str) -> bool:
+        with self._lock:
+            return self._in_flight.get(task_type, 0) < self.max_in_flight(task_type)
+
+    def in_flight(self) -> dict[str, int]:
+        with self._lock:
+            return {key: value for key, value in self._in_flight.items() if value > 0}
+
+    def add_release_listener(self, listener: Callable[[str], None]) -> None:
+        """注册在途名额释放回调（参数为 taskType），用于驱动排队中的任务出队。"""
+
+        with self._lock:
+            self._release_listeners.append(listener)
+
+    def _reserve(self, task_type: str) -> None:
+        with self._lock:
+            current = self._in_flight.get(task_type, 0)
+            if current >= self.max_in_flight(task_type):
+                raise JobExecutorError(f"max in-flight exceeded for task_type={task_type}")
+            self._in_flight[task_type] = current + 1
+
+    def _release(self, task_type: str) -> None:
+        with self._lock:
+            self._in_flight[task_type] = max(0, self._in_flight.get(task_type, 0) - 1)
+            listeners = [] if self._closed else list(self._release_listeners)
+        for listener in listeners:
+            try:
+                listener(task_type)
+            except Exception:  # noqa: BLE001
+                pass
+
+    def _release_when_done(self, task_type: str, outstanding: list[Future]) -> None:
+        pending = [future for future in outstanding if not future.done()]
+        if not pending:
+            self._release(task_type)
+            return
+        remaining = [len(pending)]
+
+        def _done(_: Future) -> None:
+            with self._lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self._release(task_type)
+
+        for future in pending:
+            future.add_done_callback(_done)
+
+    def _pools(self) -> tuple[Executor, ThreadPoolExecutor]:
+        with self._lock:
+            if self._closed:
+                raise JobExecutorError("executor has been shut down")
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self._max_workers)
+            if self._coordinator is None:
+                self._coordinator = ThreadPoolExecutor(
+                    max_workers=self._max_workers * 4,
+                    thread_name_prefix=f"{self._name}-coordinator",
+                )
+            return self._process_pool, self._coordinator
+
+    def create_control(self) -> JobControl:
+        """创建可跨进程传递的取消/进度通道；注入的非进程池（测试用线程池）直接使用本地通道。"""
+
+        with self._lock:
+            if self._process_pool is not None and not isinstance(self._process_pool, ProcessPoolExecutor):
+                return JobControl()
+            if self._manager is None:
+                self._manager = multiprocessing.Manager()
+            manager = self._manager
+        return JobControl(cancel_event=manager.Event(), state=manager.dict())
+
+    def run_in_process(self, fn: Callable[[Any], Any], arg: Any, *, timeout: float | None = None) -> Any:
+        """在进程池中执行 `fn(arg)` 并阻塞等待结果（应在协调线程中调用）。"""
+
+        process_pool, _ = self._pools()
+        future = process_pool.submit(fn, arg)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            if not future.cancel():
+                self._local.outstanding = [*getattr(self._local, "outstanding", []), future]
+            raise
+
+    def run_in_background(self, *, job: Job, body: Callable[[], None]) -> None:
+        """占用一个在途名额并在协调线程中执行 `body`，立即返回。"""
+
+        self._reserve(job.task_type)
+
+        def _run() -> None:
+            self._local.outstanding = []
+            try:
+                body()
+            finally:
+                outstanding: list[Future] = self._local.outstanding
+                self._local.outstanding = []
+                self._release_when_done(job.task_type, outstanding)
+
+        try:
+            _, coordinator = self._pools()
+            coordinator.submit(_run)
+        except Exception:
+            self._release(job.task_type)
+            raise
+
+    def dispatch(self, *, job: Job, dispatch_id: str, callback: ExecutionCallback) -> None:
+        handler = self._handlers.get(job.task_type)
+        if handler is None:
+            callback(
+                ExecutionCallbackPayload(
+                    job_id=job.id,
+                    user_id=job.user_id,
+                    dispatch_id=dispatch_id,
+                    executor_name=self.name,
+                    status="failed",
+                    error_code="TASK_HANDLER_NOT_FOUND",
+                    error_message=f"task handler not found for task_type={job.task_type}",
+                )
+            )
+            return
+
+        payload = dict(job.payload)
+
+        def _body() -> None:
+            try:
+                result = self.run_in_process(handler, payload)
+            except Exception as exc:  # noqa: BLE001
+                callback(
+                    ExecutionCallbackPayload(
+                        job_id=job.id,
+                        user_id=job.user_id,
+                        dispatch_id=dispatch_id,
+                        executor_name=self.name,
+                        status="failed",
+                        error_code="EXECUTOR_DISPATCH_FAILED",
+                        error_message=str(exc),
+                    )
+                )
+                return
+
+            callback(
+                ExecutionCallbackPayload(
+                    job_id=job.id,
+                    user_id=job.user_id,
+                    dispatch_id=dispatch_id,
+                    executor_name=self.name,
+                    status="succeeded",
+                    result=dict(result or {}),
+                )
+            )
+
+        self.run_in_background(job=job, body=_body)
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        with self._lock:
+            coordinator, process_pool, manager = self._coordinator, self._process_pool, self._manager
+            self._closed = True
+            self._coordinator = None
+            self._process_pool = None
+            self._manager = None
+        if coordinator is not None:
+            coordinator.shutdown(wait=wait)
+        if process_pool is not None:
+            process_pool.shutdown(wait=wait)
+        if manager is not None:
+            manager.shutdown()
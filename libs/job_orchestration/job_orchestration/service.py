@@ -2,10 +2,15 @@
 
 from __future__ import annotations
 
+import threading
+from collections import deque
 from collections.abc import Callable
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Protocol
 
+from job_orchestration.control import JobControl
 from job_orchestration.domain import InvalidJobTransitionError, Job, ScheduleConfig
 from job_orchestration.executor import ExecutionCallbackPayload, InProcessJobExecutor, JobExecutor
 from job_orchestration.task_registry import (
@@ -114,6 +119,19 @@ class JobExecutionFailure(RuntimeError):
         self.result = dict(result or {}) if result is not None else None
 
 
+@dataclass(frozen=True)
+class _PendingOffload:
+    """因并发上限暂未启动的分阶段任务，名额释放后按 FIFO 出队执行。"""
+
+    user_id: str
+    job_id: str
+    prepare: Callable[[], Any]
+    compute: Callable[[Any], Any]
+    finalize: Callable[[Any], dict[str, Any] | None]
+    on_error: Callable[[str, str], Any] | None
+    control: JobControl | None
+
+
 class JobOrchestrationService:
     def __init__(
         self,
@@ -128,10 +146,16 @@ class JobOrchestrationService:
         self._scheduler = scheduler
         self._executor = executor or InProcessJobExecutor()
         self._runtime_mode = runtime_mode
+        self._metrics_lock = threading.Lock()
+        # 准入判断与占用执行器名额需原子完成，出队回调可能在协调线程中重入。
+        self._dispatch_lock = threading.RLock()
+        self._pending_offloads: deque[_PendingOffload] = deque()
+        self._controls: dict[str, JobControl] = {}
         self._execution_metrics: dict[str, Any] = {
             "dispatched": 0,
             "succeeded": 0,
             "failed": 0,
+            "cancelled": 0,
             "lastDispatchedAt": None,
             "lastFinishedAt": None,
             "lastErrorCode": None,
@@ -143,6 +167,10 @@ class JobOrchestrationService:
             "recoveredAt": None,
         }
 
+        add_release_listener = getattr(self._executor, "add_release_listener", None)
+        if callable(add_release_listener):
+            add_release_listener(lambda _task_type: self._drain_pending_offloads())
+
         if auto_recover:
             self.recover_runtime()
 
@@ -240,19 +268,39 @@ class JobOrchestrationService:
         self._repository.save(job)
         return job
 
+    def _admit_queued_job(self, *, user_id: str, job: Job) -> bool:
+        limit = self._concurrency_limit_for_task_type(task_type=job.task_type)
+        running = self._repository.list(user_id=user_id, status="running", task_type=job.task_type)
+        has_capacity = getattr(self._executor, "has_capacity", None)
+        executor_full = callable(has_capacity) and not has_capacity(job.task_type)
+        if limit <= 0 or len(running) >= limit or executor_full:
+            job.error_code = "CONCURRENCY_LIMIT_EXCEEDED"
+            job.error_message = f"concurrency limit exceeded for task_type={job.task_type}"
+            job.updated_at = datetime.now(timezone.utc)
+            self._repository.save(job)
+            return False
+
+        job.error_code = None
+        job.error_message = None
+        return True
+
     def _record_dispatch_attempt(self) -> None:
-        self._execution_metrics["dispatched"] = int(self._execution_metrics["dispatched"]) + 1
-        self._execution_metrics["lastDispatchedAt"] = datetime.now(timezone.utc).isoformat()
+        with self._metrics_lock:
+            self._execution_metrics["dispatched"] = int(self._execution_metrics["dispatched"]) + 1
+            self._execution_metrics["lastDispatchedAt"] = datetime.now(timezone.utc).isoformat()
 
     def _apply_execution_callback(self, event: ExecutionCallbackPayload) -> None:
         job = self._repository.get(user_id=event.user_id, job_id=event.job_id)
-        if job is None:
+        if job is None or job.status == "cancelled":
+            # 已取消的任务忽略迟到的执行结果。
             return
 
-        if event.status == "succeeded":
+        if event.status == "cancelled":
+            job.transition_to("cancelled")
+            job.error_code = event.error_code
+            job.error_message = event.error_message
+        elif event.status == "succeeded":
             job.mark_succeeded(result=dict(event.result or {}))
-            self._execution_metrics["succeeded"] = int(self._execution_metrics["succeeded"]) + 1
-            self._execution_metrics["lastErrorCode"] = None
         else:
             job.mark_failed(
                 error_code=event.error_code or "EXECUTION_FAILED",
@@ -260,10 +308,17 @@ class JobOrchestrationService:
             )
             if event.result is not None:
                 job.result = dict(event.result)
-            self._execution_metrics["failed"] = int(self._execution_metrics["failed"]) + 1
-            self._execution_metrics["lastErrorCode"] = event.error_code or "EXECUTION_FAILED"
 
-        self._execution_metrics["lastFinishedAt"] = datetime.now(timezone.utc).isoformat()
+        with self._metrics_lock:
+            if event.status == "succeeded":
+                self._execution_metrics["succeeded"] = int(self._execution_metrics["succeeded"]) + 1
+                self._execution_metrics["lastErrorCode"] = None
+            elif event.status == "cancelled":
+                self._execution_metrics["cancelled"] = int(self._execution_metrics.get("cancelled", 0)) + 1
+            else:
+                self._execution_metrics["failed"] = int(self._execution_metrics["failed"]) + 1
+                self._execution_metrics["lastErrorCode"] = event.error_code or "EXECUTION_FAILED"
+            self._execution_metrics["lastFinishedAt"] = datetime.now(timezone.utc).isoformat()
         job.executor_name = event.executor_name
         job.dispatch_id = event.dispatch_id
         self._repository.save(job)
@@ -271,18 +326,8 @@ class JobOrchestrationService:
     def dispatch_job(self, *, user_id: str, job_id: str) -> Job:
         job = self._load_owned_job(user_id=user_id, job_id=job_id)
 
-        if job.status == "queued":
-            limit = self._concurrency_limit_for_task_type(task_type=job.task_type)
-            running = self._repository.list(user_id=user_id, status="running", task_type=job.task_type)
-            if limit <= 0 or len(running) >= limit:
-                job.error_code = "CONCURRENCY_LIMIT_EXCEEDED"
-                job.error_message = f"concurrency limit exceeded for task_type={job.task_type}"
-                job.updated_at = datetime.now(timezone.utc)
-                self._repository.save(job)
-                return job
-
-            job.error_code = None
-            job.error_message = None
+        if job.status == "queued" and not self._admit_queued_job(user_id=user_id, job=job):
+            return job
 
         dispatch_id = self._executor.submit(job=job)
         job.start_execution(executor_name=self._executor.name, dispatch_id=dispatch_id)
@@ -323,18 +368,8 @@ class JobOrchestrationService:
     ) -> Job:
         job = self._load_owned_job(user_id=user_id, job_id=job_id)
 
-        if job.status == "queued":
-            limit = self._concurrency_limit_for_task_type(task_type=job.task_type)
-            running = self._repository.list(user_id=user_id, status="running", task_type=job.task_type)
-            if limit <= 0 or len(running) >= limit:
-                job.error_code = "CONCURRENCY_LIMIT_EXCEEDED"
-                job.error_message = f"concurrency limit exceeded for task_type={job.task_type}"
-                job.updated_at = datetime.now(timezone.utc)
-                self._repository.save(job)
-                return job
-
-            job.error_code = None
-            job.error_message = None
+        if job.status == "queued" and not self._admit_queued_job(user_id=user_id, job=job):
+            return job
 
         dispatch_id = self._executor.submit(job=job)
         job.start_execution(executor_name=self._executor.name, dispatch_id=dispatch_id)
@@ -383,8 +418,193 @@ class JobOrchestrationService:
             raise JobAccessDeniedError("job does not belong to current user")
         return refreshed
 
+    def dispatch_job_offloaded(
+        self,
+        *,
+        user_id: str,
+        job_id: str,
+        prepare: Callable[[], Any],
+        compute: Callable[[Any], Any],
+        finalize: Callable[[Any], dict[str, Any] | None],
+        on_error: Callable[[str, str], Any] | None = None,
+        control: JobControl | None = None,
+    ) -> Job:
+        """分阶段执行任务：prepare/finalize 在当前进程，compute 可下沉到执行器进程池。
+
+        执行器提供 `run_in_background` / `run_in_process`（如 `ProcessPoolJobExecutor`）时，
+        本方法在任务进入 running 后立即返回，结果经 `_apply_execution_callback` 回写；
+        否则在调用线程内同步完成，语义与 `dispatch_job_with_callable` 一致。
+        `compute` 与 `prepare()` 的返回值需可 pickle；`on_error(code, message)` 在超时或
+        执行器异常（非 `JobExecutionFailure`）时回调，用于收敛业务侧状态。
+        传入 `control`（见 `create_control`）时，`cancel_job` 会通知计算函数协作式退出，
+        `job_progress` 返回其实时进度；取消后的失败按 cancelled 收敛。
+        超出并发上限的任务保持 queued 并进入待执行队列，执行器释放名额后按提交顺序自动启动。
+        """
+
+        job = self._load_owned_job(user_id=user_id, job_id=job_id)
+        pending = _PendingOffload(
+            user_id=user_id,
+            job_id=job_id,
+            prepare=prepare,
+            compute=compute,
+            finalize=finalize,
+            on_error=on_error,
+            control=control,
+        )
+
+        with self._dispatch_lock:
+            if job.status == "queued" and not self._admit_queued_job(user_id=user_id, job=job):
+                # 保持 queued，等在途任务结束释放名额后由 `_drain_pending_offloads` 启动。
+                if all(item.job_id != job_id for item in self._pending_offloads):
+                    self._pending_offloads.append(pending)
+                return job
+            inline_body = self._start_offloaded(job=job, pending=pending)
+
+        if inline_body is not None:
+            inline_body()
+            self._drain_pending_offloads()
+
+        refreshed = self._repository.get(user_id=user_id, job_id=job_id)
+        if refreshed is None:
+            raise JobAccessDeniedError("job does not belong to current user")
+        return refreshed
+
+    def _drain_pending_offloads(self) -> None:
+        """按 FIFO 启动已可准入的排队任务；已被取消或不再 queued 的条目直接丢弃。"""
+
+        while True:
+            with self._dispatch_lock:
+                admitted: tuple[_PendingOffload, Job] | None = None
+                for item in list(self._pending_offloads):
+                    job = self._repository.get(user_id=item.user_id, job_id=item.job_id)
+                    if job is None or job.status != "queued":
+                        self._pending_offloads.remove(item)
+                        continue
+                    if self._admit_queued_job(user_id=item.user_id, job=job):
+                        self._pending_offloads.remove(item)
+                        admitted = (item, job)
+                        break
+                if admitted is None:
+                    return
+                item, job = admitted
+                inline_body = self._start_offloaded(job=job, pending=item)
+            if inline_body is not None:
+                inline_body()
+
+    def _start_offloaded(self, *, job: Job, pending: _PendingOffload) -> Callable[[], None] | None:
+        """将已准入的任务置为 running 并交给执行器；执行器不支持后台执行时返回需同步运行的 body。"""
+
+        prepare, compute, finalize = pending.prepare, pending.compute, pending.finalize
+        on_error, control = pending.on_error, pending.control
+
+        dispatch_id = self._executor.submit(job=job)
+        job.start_execution(executor_name=self._executor.name, dispatch_id=dispatch_id)
+        self._repository.save(job)
+        self._record_dispatch_attempt()
+
+        run_in_process = getattr(self._executor, "run_in_process", None)
+        run_in_background = getattr(self._executor, "run_in_background", None)
+        definition = get_task_type_definition(job.task_type)
+        timeout = float(definition.sla.timeout_seconds) if definition is not None else None
+
+        def _event(**kwargs: Any) -> ExecutionCallbackPayload:
+            return ExecutionCallbackPayload(
+                job_id=job.id,
+                user_id=job.user_id,
+                dispatch_id=dispatch_id,
+                executor_name=self._executor.name,
+                **kwargs,
+            )
+
+        def _fail(error_code: str, error_message: str) -> None:
+            if on_error is not None:
+                try:
+                    on_error(error_code, error_message)
+                except Exception:  # noqa: BLE001
+                    pass
+            self._apply_execution_callback(
+                _event(status="failed", error_code=error_code, error_message=error_message)
+            )
+
+        if control is not None:
+            with self._metrics_lock:
+                self._controls[job.id] = control
+
+        def _body() -> None:
+            try:
+                _run()
+            finally:
+                if control is not None:
+                    with self._metrics_lock:
+                        self._controls.pop(job.id, None)
+
+        def _cancelled(error_code: str, error_message: str) -> bool:
+            if control is None or not control.cancelled:
+                return False
+            self._apply_execution_callback(
+                _event(status="cancelled", error_code=error_code, error_message=error_message)
+            )
+            return True
+
+        def _run() -> None:
+            try:
+                prepared = prepare()
+                if callable(run_in_process):
+                    output = run_in_process(compute, prepared, timeout=timeout)
+                else:
+                    output = compute(prepared)
+                result = finalize(output)
+                self._apply_execution_callback(_event(status="succeeded", result=dict(result or {})))
+            except JobExecutionFailure as exc:
+                if _cancelled(exc.error_code, exc.error_message):
+                    return
+                self._apply_execution_callback(
+                    _event(
+                        status="failed",
+                        error_code=exc.error_code,
+                        error_message=exc.error_message,
+                        result=dict(exc.result or {}) if exc.result is not None else None,
+                    )
+                )
+            except FutureTimeoutError:
+                # 通知计算进程尽快停止；执行器在进程真正结束前不释放在途名额。
+                if control is not None:
+                    control.cancel()
+                _fail("EXECUTION_TIMEOUT", f"job exceeded timeout of {timeout} seconds")
+            except Exception as exc:  # noqa: BLE001
+                if _cancelled("JOB_CANCELLED", str(exc)):
+                    return
+                _fail("EXECUTOR_DISPATCH_FAILED", str(exc))
+
+        if not callable(run_in_background):
+            return _body
+        try:
+            run_in_background(job=job, body=_body)
+        except Exception as exc:  # noqa: BLE001
+            _fail("EXECUTOR_DISPATCH_FAILED", str(exc))
+        return None
+
+    def create_control(self) -> JobControl:
+        """为 `dispatch_job_offloaded` 创建取消/进度通道（进程池执行器下可跨进程）。"""
+
+        create_control = getattr(self._executor, "create_control", None)
+        if callable(create_control):
+            return create_control()
+        return JobControl()
+
+    def job_progress(self, *, user_id: str, job_id: str) -> dict[str, Any] | None:
+        self._load_owned_job(user_id=user_id, job_id=job_id)
+        with self._metrics_lock:
+            control = self._controls.get(job_id)
+        return control.snapshot() if control is not None else None
+
     def cancel_job(self, *, user_id: str, job_id: str) -> Job:
-        return self.transition_job(user_id=user_id, job_id=job_id, to_status="cancelled")
+        job = self.transition_job(user_id=user_id, job_id=job_id, to_status="cancelled")
+        with self._metrics_lock:
+            control = self._controls.get(job_id)
+        if control is not None:
+            control.cancel()
+        return job
 
     def retry_job(self, *, user_id: str, job_id: str) -> Job:
         return self.transition_job(user_id=user_id, job_id=job_id, to_status="queued")
@@ -516,15 +736,23 @@ class JobOrchestrationService:
         system_schedules = self._scheduler.list_schedules(user_id=_SYSTEM_USER_ID, namespace=_SYSTEM_NAMESPACE)
         active_system_schedules = len([item for item in system_schedules if item.status == "active"])
 
+        executor_status: dict[str, Any] = {
+            "name": self._executor.name,
+            "mode": self._runtime_mode,
+        }
+        in_flight = getattr(self._executor, "in_flight", None)
+        if callable(in_flight):
+            executor_status["inFlight"] = in_flight()
+
+        with self._metrics_lock:
+            execution = dict(self._execution_metrics)
+
         return {
-            "executor": {
-                "name": self._executor.name,
-                "mode": self._runtime_mode,
-            },
+            "executor": executor_status,
             "scheduler": {
                 "running": bool(self._scheduler.running),
             },
-            "execution": dict(self._execution_metrics),
+            "execution": execution,
             "systemSchedules": {
                 "total": len(system_schedules),
                 "active": active_system_schedules,
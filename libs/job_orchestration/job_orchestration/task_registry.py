@@ -17,6 +17,8 @@ class TaskSlaPolicy:
     timeout_seconds: int = 900
     max_retries: int = 0
     concurrency_limit: int = 1
+    # 单进程内该 taskType 同时在后台执行器中运行的上限（跨用户）。
+    max_in_flight: int = 4
 
     def to_payload(self) -> dict[str, object]:
         return {
@@ -24,6 +26,7 @@ class TaskSlaPolicy:
             "timeoutSeconds": int(self.timeout_seconds),
             "maxRetries": int(self.max_retries),
             "concurrencyLimit": int(self.concurrency_limit),
+            "maxInFlight": int(self.max_in_flight),
         }
 
 
@@ -49,18 +52,21 @@ _INTERACTIVE_SLA = TaskSlaPolicy(
     timeout_seconds=1800,
     max_retries=1,
     concurrency_limit=1,
+    max_in_flight=4,
 )
 _BATCH_SLA = TaskSlaPolicy(
     priority=50,
     timeout_seconds=1800,
     max_retries=0,
     concurrency_limit=2,
+    max_in_flight=2,
 )
 _MAINTENANCE_SLA = TaskSlaPolicy(
     priority=10,
     timeout_seconds=900,
     max_retries=0,
     concurrency_limit=1,
+    max_in_flight=1,
 )
 
 
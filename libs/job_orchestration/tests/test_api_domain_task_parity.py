@@ -58,6 +58,7 @@ def test_submit_and_poll_job_for_domain_task_type():
     polled_payload = polled.json()
     assert polled_payload["success"] is True
     assert polled_payload["data"]["id"] == job_id
+    assert polled_payload["data"]["progress"] is None
 
 
 def test_list_jobs_supports_status_and_task_type_filters():
@@ -0,0 +1,314 @@
+"""job_orchestration 进程池执行器与分阶段调度测试。"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+from job_orchestration.executor import InProcessJobExecutor, ProcessPoolJobExecutor
+from job_orchestration.repository import InMemoryJobRepository
+from job_orchestration.scheduler import InMemoryScheduler
+from job_orchestration.service import JobExecutionFailure, JobOrchestrationService
+from job_orchestration.task_registry import get_task_type_definition
+
+
+def _build_service(executor) -> JobOrchestrationService:
+    return JobOrchestrationService(
+        repository=InMemoryJobRepository(),
+        scheduler=InMemoryScheduler(),
+        executor=executor,
+    )
+
+
+def _submit(service: JobOrchestrationService, *, key: str):
+    return service.submit_job(
+        user_id="u-1",
+        task_type="backtest_run",
+        payload={"strategyId": "s-1"},
+        idempotency_key=key,
+    )
+
+
+def _wait_for_terminal(service: JobOrchestrationService, *, job_id: str, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = service.get_job(user_id="u-1", job_id=job_id)
+        if job is not None and job.status in {"succeeded", "failed", "cancelled"}:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish in time")
+
+
+def _count_until_cancelled(control) -> int:
+    for step in range(1, 1001):
+        if control.cancelled:
+            raise RuntimeError("cancelled")
+        control.report(processed=step, total=1000)
+        time.sleep(0.01)
+    return 1000
+
+
+def test_offloaded_dispatch_runs_compute_in_process_pool_and_returns_running_job():
+    executor = ProcessPoolJobExecutor(max_workers=1)
+    service = _build_service(executor)
+    job = _submit(service, key="pp-1")
+
+    try:
+        dispatched = service.dispatch_job_offloaded(
+            user_id="u-1",
+            job_id=job.id,
+            prepare=lambda: [1, 2, 3, 4],
+            compute=sum,
+            finalize=lambda total: {"total": total},
+        )
+        assert dispatched.status == "running"
+        assert dispatched.executor_name == "processpool"
+
+        finished = _wait_for_terminal(service, job_id=job.id)
+    finally:
+        executor.shutdown()
+
+    assert finished.status == "succeeded"
+    assert finished.result == {"total": 10}
+    assert executor.in_flight() == {}
+
+
+def test_offloaded_dispatch_respects_max_in_flight_per_task_type():
+    release = threading.Event()
+    executor = ProcessPoolJobExecutor(
+        max_in_flight={"backtest_run": 1},
+        process_pool=ThreadPoolExecutor(max_workers=2),
+    )
+    service = _build_service(executor)
+    first = _submit(service, key="pp-limit-1")
+    second = _submit(service, key="pp-limit-2")
+
+    try:
+        running = service.dispatch_job_offloaded(
+            user_id="u-1",
+            job_id=first.id,
+            prepare=lambda: release.wait(5),
+            compute=bool,
+            finalize=lambda value: {"released": value},
+        )
+        queued = service.dispatch_job_offloaded(
+            user_id="u-1",
+            job_id=second.id,
+            prepare=lambda: True,
+            compute=bool,
+            finalize=lambda value: {"released": value},
+        )
+
+        assert running.status == "running"
+        assert executor.in_flight() == {"backtest_run": 1}
+        assert queued.status == "queued"
+        assert queued.error_code == "CONCURRENCY_LIMIT_EXCEEDED"
+
+        release.set()
+        assert _wait_for_terminal(service, job_id=first.id).status == "succeeded"
+        drained = _wait_for_terminal(service, job_id=second.id)
+        assert drained.status == "succeeded"
+        assert drained.result == {"released": True}
+        assert drained.error_code is None
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert service.runtime_status()["executor"]["inFlight"] == {}
+
+
+def test_queued_offloaded_jobs_start_in_submission_order_and_skip_cancelled():
+    release = threading.Event()
+    started: list[str] = []
+    executor = ProcessPoolJobExecutor(
+        max_in_flight={"backtest_run": 1},
+        process_pool=ThreadPoolExecutor(max_workers=2),
+    )
+    service = _build_service(executor)
+    jobs = [_submit(service, key=f"pp-fifo-{idx}") for idx in range(4)]
+
+    def _prepare(label: str, *, block: bool = False):
+        def _inner() -> str:
+            started.append(label)
+            if block:
+                release.wait(5)
+            return label
+
+        return _inner
+
+    try:
+        for idx, job in enumerate(jobs):
+            service.dispatch_job_offloaded(
+                user_id="u-1",
+                job_id=job.id,
+                prepare=_prepare(f"job-{idx}", block=idx == 0),
+                compute=str,
+                finalize=lambda label: {"label": label},
+            )
+        cancelled = service.cancel_job(user_id="u-1", job_id=jobs[2].id)
+        assert cancelled.status == "cancelled"
+
+        release.set()
+        finished = [_wait_for_terminal(service, job_id=job.id) for job in jobs]
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert [job.status for job in finished] == ["succeeded", "succeeded", "cancelled", "succeeded"]
+    assert started == ["job-0", "job-1", "job-3"]
+    assert executor.in_flight() == {}
+
+
+def test_offloaded_dispatch_maps_failures_and_notifies_on_error():
+    executor = ProcessPoolJobExecutor(process_pool=ThreadPoolExecutor(max_workers=1))
+    service = _build_service(executor)
+    business_failure = _submit(service, key="pp-fail-1")
+    compute_failure = _submit(service, key="pp-fail-2")
+    notified: list[tuple[str, str]] = []
+
+    def _reject(_value):
+        raise JobExecutionFailure(error_code="BACKTEST_INVALID", error_message="invalid", result={"status": "failed"})
+
+    def _explode(_value):
+        raise ValueError("boom")
+
+    try:
+        service.dispatch_job_offloaded(
+            user_id="u-1",
+            job_id=business_failure.id,
+            prepare=lambda: 1,
+            compute=abs,
+            finalize=_reject,
+            on_error=lambda code, message: notified.append((code, message)),
+        )
+        first = _wait_for_terminal(service, job_id=business_failure.id)
+        service.dispatch_job_offloaded(
+            user_id="u-1",
+            job_id=compute_failure.id,
+            prepare=lambda: 1,
+            compute=_explode,
+            finalize=lambda value: {"value": value},
+            on_error=lambda code, message: notified.append((code, message)),
+        )
+        second = _wait_for_terminal(service, job_id=compute_failure.id)
+    finally:
+        executor.shutdown()
+
+    assert first.status == "failed"
+    assert first.error_code == "BACKTEST_INVALID"
+    assert first.result == {"status": "failed"}
+    assert second.status == "failed"
+    assert second.error_code == "EXECUTOR_DISPATCH_FAILED"
+    assert notified == [("EXECUTOR_DISPATCH_FAILED", "boom")]
+
+
+def test_offloaded_dispatch_runs_inline_without_background_executor():
+    service = _build_service(InProcessJobExecutor())
+    job = _submit(service, key="inline-1")
+
+    dispatched = service.dispatch_job_offloaded(
+        user_id="u-1",
+        job_id=job.id,
+        prepare=lambda: -3,
+        compute=abs,
+        finalize=lambda value: {"value": value},
+    )
+
+    assert dispatched.status == "succeeded"
+    assert dispatched.result == {"value": 3}
+
+
+def test_cancel_job_signals_control_across_process_pool_and_exposes_progress():
+    executor = ProcessPoolJobExecutor(max_workers=1)
+    service = _build_service(executor)
+    job = _submit(service, key="pp-cancel-1")
+
+    try:
+        control = service.create_control()
+        service.dispatch_job_offloaded(
+            user_id="u-1",
+            job_id=job.id,
+            prepare=lambda: control,
+            compute=_count_until_cancelled,
+            finalize=lambda total: {"total": total},
+            control=control,
+        )
+
+        deadline = time.monotonic() + 10.0
+        progress = service.job_progress(user_id="u-1", job_id=job.id)
+        while (progress is None or progress["processed"] == 0) and time.monotonic() < deadline:
+            time.sleep(0.01)
+            progress = service.job_progress(user_id="u-1", job_id=job.id)
+        assert progress is not None
+        assert progress["total"] == 1000
+        assert 0 < progress["processed"] < 1000
+        assert progress["cancelRequested"] is False
+
+        cancelled = service.cancel_job(user_id="u-1", job_id=job.id)
+        assert cancelled.status == "cancelled"
+        assert control.cancelled is True
+
+        finished = _wait_for_terminal(service, job_id=job.id)
+        deadline = time.monotonic() + 10.0
+        while service.job_progress(user_id="u-1", job_id=job.id) is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        executor.shutdown()
+
+    assert finished.status == "cancelled"
+    assert finished.result is None
+    assert service.job_progress(user_id="u-1", job_id=job.id) is None
+
+
+def test_timeout_cancels_compute_and_keeps_slot_until_process_finishes(monkeypatch):
+    definition = get_task_type_definition("backtest_run")
+    short = replace(definition, sla=replace(definition.sla, timeout_seconds=0.05))
+    monkeypatch.setattr(
+        "job_orchestration.service.get_task_type_definition",
+        lambda task_type: short if task_type == "backtest_run" else get_task_type_definition(task_type),
+    )
+    executor = ProcessPoolJobExecutor(
+        max_in_flight={"backtest_run": 1},
+        process_pool=ThreadPoolExecutor(max_workers=1),
+    )
+    service = _build_service(executor)
+    job = _submit(service, key="pp-timeout-1")
+    stopped = threading.Event()
+    proceed = threading.Event()
+
+    def _compute(control) -> int:
+        while not control.cancelled:
+            time.sleep(0.01)
+        stopped.set()
+        # 模拟进程在收到取消后仍需一段时间才退出。
+        proceed.wait(5)
+        return 0
+
+    try:
+        control = service.create_control()
+        service.dispatch_job_offloaded(
+            user_id="u-1",
+            job_id=job.id,
+            prepare=lambda: control,
+            compute=_compute,
+            finalize=lambda total: {"total": total},
+            control=control,
+        )
+        finished = _wait_for_terminal(service, job_id=job.id)
+
+        assert finished.status == "failed"
+        assert finished.error_code == "EXECUTION_TIMEOUT"
+        assert stopped.wait(5)
+        assert executor.in_flight() == {"backtest_run": 1}
+        assert executor.has_capacity("backtest_run") is False
+
+        proceed.set()
+        deadline = time.monotonic() + 5.0
+        while executor.in_flight() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert executor.in_flight() == {}
+    finally:
+        proceed.set()
+        executor.shutdown()
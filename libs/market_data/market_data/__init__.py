@@ -2,7 +2,10 @@
 
 from market_data.alpaca_provider import AlpacaProvider
 from market_data.alpaca_transport import AlpacaHTTPTransport, AlpacaTransportConfig, resolve_alpaca_transport_config
-from market_data.cache import InMemoryTTLCache
+from market_data.asset_index import AssetSearchIndex
+from market_data.bar_store import LocalBarStore
+from market_data.cache import BoundedTTLCache, InMemoryTTLCache
+from market_data.catalog_snapshot import AssetCatalogSnapshotStore
 from market_data.domain import (
     BatchQuoteItem,
     MarketAsset,
@@ -15,17 +18,32 @@ from market_data.domain import (
     UpstreamUnauthorizedError,
     UpstreamUnavailableError,
 )
-from market_data.rate_limit import SlidingWindowRateLimiter
+from market_data.fake_provider import FakeMarketDataProvider
+from market_data.history_cache import HistoryCache
+from market_data.indicators import IndicatorCache, IndicatorEngine
+from market_data.http_pool import PooledHTTPRequestExecutor
+from market_data.rate_limit import AdaptiveTokenBucket, GCRARateLimiter, InMemoryRateLimitBackend
 from market_data.service import BatchQuoteResult, MarketDataService, QuoteResult
 from market_data.stream_gateway import MarketDataStreamGateway, StreamGatewayError, StreamSubscription
+from market_data.stream_push import ConflatingEventQueue, MarketDataPushStream
 
 __all__ = [
     "AlpacaProvider",
     "AlpacaHTTPTransport",
     "AlpacaTransportConfig",
     "resolve_alpaca_transport_config",
+    "AssetSearchIndex",
+    "AssetCatalogSnapshotStore",
+    "BoundedTTLCache",
     "InMemoryTTLCache",
-    "SlidingWindowRateLimiter",
+    "HistoryCache",
+    "LocalBarStore",
+    "IndicatorCache",
+    "IndicatorEngine",
+    "PooledHTTPRequestExecutor",
+    "GCRARateLimiter",
+    "InMemoryRateLimitBackend",
+    "AdaptiveTokenBucket",
     "MarketDataService",
     "QuoteResult",
     "BatchQuoteResult",
@@ -42,4 +60,7 @@ __all__ = [
     "MarketDataStreamGateway",
     "StreamGatewayError",
     "StreamSubscription",
+    "MarketDataPushStream",
+    "ConflatingEventQueue",
+    "FakeMarketDataProvider",
 ]
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Callable
+from typing import Any, Callable, Iterator
 
 from market_data.domain import (
     MarketAsset,
@@ -18,14 +19,24 @@ Transport = Callable[..., Any]
 
 
 class AlpacaProvider:
+    # Alpaca 行情 API 免费档位文档限额（按账户计），供共享上游令牌桶取值。
+    upstream_requests_per_minute = 200
+
     def __init__(
         self,
         *,
         transport: Transport,
         max_retries: int = 1,
+        batch_size: int = 100,
+        batch_concurrency: int = 4,
+        history_page_size: int = 10_000,
     ) -> None:
         self._transport = transport
         self._max_retries = max_retries
+        self._batch_size = max(1, int(batch_size))
+        self._batch_concurrency = max(1, int(batch_concurrency))
+        # Alpaca bars 接口单页上限 10000 条。
+        self._history_page_size = max(1, min(int(history_page_size), 10_000))
 
     def _call_with_retry(self, operation: str, **kwargs):
         for attempt in range(self._max_retries + 1):
@@ -97,9 +108,12 @@ class AlpacaProvider:
 
     def quote(self, *, symbol: str) -> MarketQuote:
         payload = self._call_with_retry("quote", symbol=symbol.upper())
+        return self._to_quote(symbol=symbol.upper(), payload=payload)
+
+    def _to_quote(self, *, symbol: str, payload: dict[str, Any]) -> MarketQuote:
         return MarketQuote(
-            symbol=symbol.upper(),
-            name=payload.get("name", symbol.upper()),
+            symbol=symbol,
+            name=payload.get("name", symbol),
             price=self._to_float(payload.get("price")),
             previous_close=self._to_float(payload.get("previousClose")),
             open_price=self._to_float(payload.get("open")),
@@ -112,13 +126,78 @@ class AlpacaProvider:
         )
 
     def batch_quote(self, *, symbols: list[str]) -> dict[str, MarketQuote]:
-        result: dict[str, MarketQuote] = {}
+        """批量行情。
+
+        transport 支持 `batch_quote` 时按 `batch_size` 分块并发请求多 symbol 快照，否则逐个请求。
+        按 symbol 降级：失败的分块/symbol 不出现在结果中；全部失败时抛出首个错误。
+        """
+
+        normalized: list[str] = []
         for symbol in symbols:
-            normalized = symbol.upper()
-            result[normalized] = self.quote(symbol=normalized)
+            upper = symbol.upper()
+            if upper and upper not in normalized:
+                normalized.append(upper)
+        if not normalized:
+            return {}
+
+        if getattr(self._transport, "supports_batch_quote", False):
+            chunks = [normalized[idx : idx + self._batch_size] for idx in range(0, len(normalized), self._batch_size)]
+            fetch = self._fetch_quote_chunk
+        else:
+            chunks = [[symbol] for symbol in normalized]
+            fetch = self._fetch_single_quote
+
+        if len(chunks) == 1:
+            outcomes = [self._capture(fetch, chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(chunks), self._batch_concurrency)) as pool:
+                outcomes = list(pool.map(lambda chunk: self._capture(fetch, chunk), chunks))
+
+        result: dict[str, MarketQuote] = {}
+        errors: list[MarketDataError] = []
+        for quotes, error in outcomes:
+            result.update(quotes)
+            if error is not None:
+                errors.append(error)
+        if not result and errors:
+            raise errors[0]
         return result
 
-    def history(
+    @staticmethod
+    def _capture(fetch, chunk: list[str]) -> tuple[dict[str, MarketQuote], MarketDataError | None]:
+        try:
+            return fetch(chunk), None
+        except MarketDataError as exc:
+            return {}, exc
+
+    def _fetch_quote_chunk(self, chunk: list[str]) -> dict[str, MarketQuote]:
+        payload = self._call_with_retry("batch_quote", symbols=chunk)
+        items = payload.get("items", {}) if isinstance(payload, dict) else {}
+        return {
+            symbol: self._to_quote(symbol=symbol, payload=items[symbol])
+            for symbol in chunk
+            if isinstance(items.get(symbol), dict)
+        }
+
+    def _fetch_single_quote(self, chunk: list[str]) -> dict[str, MarketQuote]:
+        return {symbol: self.quote(symbol=symbol) for symbol in chunk}
+
+    def _to_candles(self, rows: Any) -> list[MarketCandle]:
+        candles: list[MarketCandle] = []
+        for row in rows:
+            candles.append(
+                MarketCandle(
+                    timestamp=self._to_datetime(row.get("timestamp")),
+                    open_price=float(row.get("open", 0)),
+                    high_price=float(row.get("high", 0)),
+                    low_price=float(row.get("low", 0)),
+                    close_price=float(row.get("close", 0)),
+                    volume=float(row.get("volume", 0)),
+                )
+            )
+        return candles
+
+    def history_page(
         self,
         *,
         symbol: str,
@@ -126,28 +205,85 @@ class AlpacaProvider:
         end_date: str,
         timeframe: str,
         limit: int | None,
-    ) -> list[MarketCandle]:
+        page_token: str | None = None,
+    ) -> tuple[list[MarketCandle], str | None]:
+        """拉取一页历史 K 线，返回 (bars, 下一页 token)。
+
+        transport 不支持分页时整段请求一次，下一页 token 恒为 None。
+        """
+
+        if not getattr(self._transport, "supports_history_pages", False):
+            payload = self._call_with_retry(
+                "history",
+                symbol=symbol.upper(),
+                start_date=start_date,
+                end_date=end_date,
+                timeframe=timeframe,
+                limit=limit,
+            )
+            rows = payload.get("items", []) if isinstance(payload, dict) else payload
+            return self._to_candles(rows), None
+
+        page_limit = self._history_page_size if limit is None else min(limit, self._history_page_size)
         payload = self._call_with_retry(
-            "history",
+            "history_page",
             symbol=symbol.upper(),
             start_date=start_date,
             end_date=end_date,
             timeframe=timeframe,
-            limit=limit,
+            limit=page_limit,
+            page_token=page_token,
         )
-        rows = payload.get("items", payload if isinstance(payload, list) else [])
-        candles: list[MarketCandle] = []
-        for row in rows:
-            candles.append(
-                MarketCandle(
-                    timestamp=self._to_datetime(row.get("timestamp")),
-                    open_price=float(row.get("open", 0)),
-                    high_price=float(row.get("high", 0)),
-                    low_price=float(row.get("low", 0)),
-                    close_price=float(row.get("close", 0)),
-                    volume=float(row.get("volume", 0)),
-                )
+        return self._to_candles(payload.get("items", [])), payload.get("nextPageToken") or None
+
+    def iter_history(
+        self,
+        *,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        timeframe: str,
+        limit: int | None,
+    ) -> Iterator[list[MarketCandle]]:
+        """逐页产出历史 K 线，内存只保留当前页。"""
+
+        remaining = limit
+        page_token: str | None = None
+        while remaining is None or remaining > 0:
+            candles, page_token = self.history_page(
+                symbol=symbol,
+                start_date=start_date,
+                end_date=end_date,
+                timeframe=timeframe,
+                limit=remaining,
+                page_token=page_token,
             )
+            if remaining is not None:
+                candles = candles[:remaining]
+                remaining -= len(candles)
+            if candles:
+                yield candles
+            if not page_token or not candles:
+                return
+
+    def history(
+        self,
+        *,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        timeframe: str,
+        limit: int | None,
+    ) -> list[MarketCandle]:
+        candles: list[MarketCandle] = []
+        for page in self.iter_history(
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            timeframe=timeframe,
+            limit=limit,
+        ):
+            candles.extend(page)
         return candles
 
     def health(self) -> dict[str, Any]:
@@ -158,7 +294,6 @@ class AlpacaProvider:
                     return payload
             except Exception:  # noqa: BLE001
                 pass
-
         return {
             "provider": "alpaca",
             "healthy": True,
@@ -4,14 +4,18 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 import time
 from collections.abc import Callable, Mapping
 from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
 from typing import Any
 from urllib.error import HTTPError, URLError
 from urllib.parse import urlencode
 from urllib.request import Request, urlopen
 
+from market_data.asset_index import AssetSearchIndex
+from market_data.catalog_snapshot import AssetCatalogSnapshotStore, catalog_version, compact_asset, diff_catalog
 from market_data.domain import (
     MarketDataError,
     UpstreamRateLimitedError,
@@ -19,6 +23,7 @@ from market_data.domain import (
     UpstreamUnauthorizedError,
     UpstreamUnavailableError,
 )
+from market_data.http_pool import PooledHTTPRequestExecutor
 
 RequestExecutor = Callable[
     [
@@ -60,6 +65,10 @@ class AlpacaTransportConfig:
 _DEFAULT_ENV_PREFIXES = ("BACKEND_ALPACA", "MARKET_DATA_ALPACA")
 
 
+# `_request_json` 收到 304 时的返回值：条件请求命中，本地副本仍有效。
+_NOT_MODIFIED = object()
+
+
 def _first_non_empty(values: list[str | None]) -> str | None:
     for value in values:
         if value is None:
@@ -175,26 +184,78 @@ def _default_request_executor(
         raise RuntimeError(f"alpaca request failed: {reason or exc}") from exc
 
 
+def _parse_retry_after(value: str | None, *, reset: str | None = None, now: float | None = None) -> float | None:
+    current = time.time() if now is None else now
+    text = (value or "").strip()
+    if text:
+        try:
+            return max(float(text), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(text).timestamp() - current, 0.0)
+        except (TypeError, ValueError):
+            pass
+    if not reset:
+        return None
+    try:
+        return max(float(reset.strip()) - current, 0.0)
+    except ValueError:
+        return None
+
+
 class AlpacaHTTPTransport:
     """可运行的 Alpaca HTTP transport。"""
 
+    # 支持 `batch_quote` 操作（/v2/stocks/snapshots 多 symbol 快照）。
+    supports_batch_quote = True
+    # 支持 `history_page` 操作（按 page_token 逐页拉取 bar）。
+    supports_history_pages = True
+
     def __init__(
         self,
         *,
         config: AlpacaTransportConfig,
         request_executor: Callable[..., tuple[int, Any]] | None = None,
         asset_catalog_cache_ttl_seconds: float = 300.0,
+        catalog_snapshot: AssetCatalogSnapshotStore | None = None,
+        catalog_snapshot_max_age_seconds: float = 7 * 86_400.0,
+        background_catalog_refresh: bool = True,
     ) -> None:
         self._config = config
-        self._request_executor = request_executor or _default_request_executor
+        # 默认使用 keep-alive 连接池，按 host 复用连接并启用 gzip。
+        self._request_executor = request_executor or PooledHTTPRequestExecutor()
         self._asset_catalog_cache_ttl_seconds = max(0.0, float(asset_catalog_cache_ttl_seconds))
         self._asset_catalog_cache: list[dict[str, Any]] | None = None
         self._asset_catalog_cached_at = 0.0
+        self._asset_catalog_version: str | None = None
+        self._asset_catalog_etag: str | None = None
+        # 随目录刷新重建，搜索请求只查索引。
+        self._asset_search_index: AssetSearchIndex[dict[str, Any]] | None = None
+        self._catalog_snapshot = catalog_snapshot
+        self._background_catalog_refresh = background_catalog_refresh
+        self._catalog_lock = threading.Lock()
+        self._catalog_refresh_thread: threading.Thread | None = None
+        self._catalog_retry_at = 0.0
+        self._catalog_source = "none"
+        self._catalog_last_diff: dict[str, int] | None = None
+        self._catalog_counters = {
+            "refreshes": 0,
+            "notModified": 0,
+            "unchanged": 0,
+            "refreshErrors": 0,
+            "snapshotWrites": 0,
+            "snapshotWriteErrors": 0,
+        }
+        self._load_catalog_snapshot(max_age_seconds=catalog_snapshot_max_age_seconds)
 
         self._healthy = True
         self._status = "ok"
         self._message = ""
         self._last_latency_ms = 0
+        self._last_connect_ms: int | None = None
+        self._last_transfer_ms: int | None = None
+        self._last_connection_reused: bool | None = None
         self._last_failure_code: str | None = None
 
     def _record_success(self, *, latency_ms: int) -> None:
@@ -211,7 +272,22 @@ class AlpacaHTTPTransport:
         self._last_latency_ms = latency_ms
         self._last_failure_code = code
 
-    def _request_json(self, *, path: str, params: dict[str, Any]) -> Any:
+    def _record_timing(self) -> None:
+        last_timing = getattr(self._request_executor, "last_timing", None)
+        timing = last_timing() if callable(last_timing) else None
+        if not timing:
+            return
+        self._last_connect_ms = timing.get("connectMs")
+        self._last_transfer_ms = timing.get("transferMs")
+        self._last_connection_reused = timing.get("connectionReused")
+
+    def _request_json(
+        self,
+        *,
+        path: str,
+        params: dict[str, Any],
+        extra_headers: dict[str, str] | None = None,
+    ) -> Any:
         started = time.perf_counter()
         url = f"{self._config.base_url}{path}"
 
@@ -220,7 +296,7 @@ class AlpacaHTTPTransport:
                 method="GET",
                 path=url,
                 params=params,
-                headers=self._config.auth_headers(),
+                headers={**self._config.auth_headers(), **(extra_headers or {})},
                 timeout_seconds=self._config.timeout_seconds,
             )
         except TimeoutError as exc:
@@ -237,12 +313,13 @@ class AlpacaHTTPTransport:
             raise UpstreamUnavailableError(str(exc)) from exc
 
         latency_ms = int((time.perf_counter() - started) * 1000)
+        self._record_timing()
         if status in {401, 403}:
             self._record_failure(latency_ms=latency_ms, code="UPSTREAM_AUTH_FAILED", message="alpaca auth failed")
             raise UpstreamUnauthorizedError("alpaca auth failed")
         if status == 429:
             self._record_failure(latency_ms=latency_ms, code="UPSTREAM_RATE_LIMITED", message="alpaca rate limited")
-            raise UpstreamRateLimitedError("alpaca rate limited")
+            raise UpstreamRateLimitedError("alpaca rate limited", retry_after=self._last_retry_after())
         if status >= 500:
             self._record_failure(
                 latency_ms=latency_ms,
@@ -259,66 +336,178 @@ class AlpacaHTTPTransport:
             raise UpstreamUnavailableError(f"alpaca request failed: status={status}")
 
         self._record_success(latency_ms=latency_ms)
+        if status == 304:
+            return _NOT_MODIFIED
         return payload
 
     @staticmethod
-    def _contains_keyword(*, item: dict[str, Any], keyword: str) -> bool:
-        if not keyword:
-            return True
-        lowered = keyword.lower()
-        symbol = str(item.get("symbol", "")).lower()
-        name = str(item.get("name", "")).lower()
-        return lowered in symbol or lowered in name
+    def _normalize_asset(item: dict[str, Any]) -> dict[str, Any] | None:
+        symbol = str(item.get("symbol", "")).upper().strip()
+        if not symbol:
+            return None
+        return {
+            "symbol": symbol,
+            "name": str(item.get("name") or symbol),
+            "exchange": item.get("exchange"),
+            "currency": item.get("currency", "USD"),
+            "assetClass": item.get("class", item.get("assetClass", "us_equity")),
+            "tradable": bool(item.get("tradable", True)),
+            "fractionable": bool(item.get("fractionable", False)),
+        }
 
     def _search_assets(self, *, keyword: str, limit: int) -> dict[str, Any]:
-        raw_items = self._catalog_assets()
-        items: list[dict[str, Any]] = []
-
-        for item in raw_items:
-            if not isinstance(item, dict):
-                continue
-            if not self._contains_keyword(item=item, keyword=keyword):
-                continue
-            symbol = str(item.get("symbol", "")).upper().strip()
-            if not symbol:
-                continue
-            items.append(
-                {
-                    "symbol": symbol,
-                    "name": str(item.get("name") or symbol),
-                    "exchange": item.get("exchange"),
-                    "currency": item.get("currency", "USD"),
-                    "assetClass": item.get("class", item.get("assetClass", "us_equity")),
-                    "tradable": bool(item.get("tradable", True)),
-                    "fractionable": bool(item.get("fractionable", False)),
-                }
-            )
-            if len(items) >= max(1, limit):
-                break
-
-        return {"items": items}
+        index = self._catalog_index()
+        # 返回字典的浅拷贝，调用方修改结果不会污染索引。
+        return {"items": [dict(item) for item in index.search(keyword, limit=max(1, limit))]}
+
+    def _catalog_index(self) -> AssetSearchIndex[dict[str, Any]]:
+        self._catalog_assets()
+        with self._catalog_lock:
+            if self._asset_search_index is None:
+                self._asset_search_index = self._build_search_index(self._asset_catalog_cache or [])
+            return self._asset_search_index
+
+    def _build_search_index(self, raw_items: list[dict[str, Any]]) -> AssetSearchIndex[dict[str, Any]]:
+        normalized = [self._normalize_asset(item) for item in raw_items]
+        return AssetSearchIndex(
+            [item for item in normalized if item is not None],
+            symbol_of=lambda item: item["symbol"],
+            name_of=lambda item: item["name"],
+        )
 
     def _catalog_assets(self) -> list[dict[str, Any]]:
         now = time.monotonic()
-        if (
-            self._asset_catalog_cache is not None
-            and self._asset_catalog_cache_ttl_seconds > 0
-            and now - self._asset_catalog_cached_at <= self._asset_catalog_cache_ttl_seconds
-        ):
-            return list(self._asset_catalog_cache)
+        ttl = self._asset_catalog_cache_ttl_seconds
+        with self._catalog_lock:
+            cached = self._asset_catalog_cache
+            if cached is not None and ttl > 0:
+                if now - self._asset_catalog_cached_at <= ttl:
+                    return list(cached)
+                # 已有目录（含启动时加载的快照）过期：先返回旧目录，后台发起条件请求刷新。
+                if self._background_catalog_refresh:
+                    self._start_catalog_refresh_locked(now=now)
+                    return list(cached)
+
+        self._refresh_catalog()
+        with self._catalog_lock:
+            return list(self._asset_catalog_cache or [])
+
+    def _start_catalog_refresh_locked(self, *, now: float) -> None:
+        if self._catalog_refresh_thread is not None and self._catalog_refresh_thread.is_alive():
+            return
+        if now < self._catalog_retry_at:
+            return
+        self._catalog_refresh_thread = threading.Thread(
+            target=self._run_catalog_refresh,
+            name="alpaca-catalog-refresh",
+            daemon=True,
+        )
+        self._catalog_refresh_thread.start()
+
+    def _run_catalog_refresh(self) -> None:
+        try:
+            self._refresh_catalog()
+        except Exception:  # noqa: BLE001
+            # 失败已记录在 transport 健康状态中；继续提供旧目录，退避后再试。
+            with self._catalog_lock:
+                self._catalog_counters["refreshErrors"] += 1
+                self._catalog_retry_at = time.monotonic() + min(self._asset_catalog_cache_ttl_seconds, 30.0)
+
+    def wait_for_catalog_refresh(self, timeout: float | None = None) -> bool:
+        """等待进行中的后台目录刷新结束；返回是否已结束。"""
+
+        thread = self._catalog_refresh_thread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
 
+    def _refresh_catalog(self) -> None:
+        with self._catalog_lock:
+            etag = self._asset_catalog_etag if self._asset_catalog_cache is not None else None
         payload = self._request_json(
             path="/v2/assets",
             params={
                 "status": "active",
                 "asset_class": "us_equity",
             },
+            extra_headers={"If-None-Match": etag} if etag else None,
         )
+        now = time.monotonic()
+
+        if payload is _NOT_MODIFIED:
+            with self._catalog_lock:
+                self._asset_catalog_cached_at = now
+                self._catalog_counters["notModified"] += 1
+            if self._catalog_snapshot is not None:
+                self._catalog_snapshot.touch()
+            return
+
         raw_items = payload if isinstance(payload, list) else payload.get("assets", [])
-        items = [item for item in raw_items if isinstance(item, dict)]
-        self._asset_catalog_cache = list(items)
-        self._asset_catalog_cached_at = now
-        return list(items)
+        items = [compact_asset(item) for item in raw_items if isinstance(item, dict)]
+        version = catalog_version(items)
+        response_etag = self._last_response_etag()
+
+        with self._catalog_lock:
+            previous = self._asset_catalog_cache
+            unchanged = previous is not None and version == self._asset_catalog_version
+        # 上游没有增量接口：本地按 symbol 比对，内容未变时既不重建索引也不重写快照。
+        index = None if unchanged else self._build_search_index(items)
+
+        with self._catalog_lock:
+            self._asset_catalog_cached_at = now
+            self._asset_catalog_etag = response_etag
+            self._catalog_counters["refreshes"] += 1
+            if unchanged:
+                self._catalog_counters["unchanged"] += 1
+            else:
+                self._catalog_last_diff = diff_catalog(previous or [], items)
+                self._asset_catalog_cache = items
+                self._asset_catalog_version = version
+                self._asset_search_index = index
+                self._catalog_source = "upstream"
+
+        if self._catalog_snapshot is None:
+            return
+        if unchanged and response_etag == etag:
+            self._catalog_snapshot.touch()
+            return
+        try:
+            self._catalog_snapshot.save(items, version=version, etag=response_etag)
+        except OSError:
+            with self._catalog_lock:
+                self._catalog_counters["snapshotWriteErrors"] += 1
+            return
+        with self._catalog_lock:
+            self._catalog_counters["snapshotWrites"] += 1
+
+    def _load_catalog_snapshot(self, *, max_age_seconds: float) -> None:
+        if self._catalog_snapshot is None:
+            return
+        snapshot = self._catalog_snapshot.load()
+        if snapshot is None or snapshot.age_seconds() > max_age_seconds:
+            return
+        self._asset_catalog_cache = list(snapshot.items)
+        self._asset_catalog_version = snapshot.version
+        self._asset_catalog_etag = snapshot.etag
+        # 快照年龄折算到单调时钟：未过 TTL 的快照直接视为新鲜。
+        self._asset_catalog_cached_at = time.monotonic() - snapshot.age_seconds()
+        self._asset_search_index = self._build_search_index(snapshot.items)
+        self._catalog_source = "snapshot"
+
+    def _last_response_headers(self) -> dict[str, str]:
+        last_headers = getattr(self._request_executor, "last_response_headers", None)
+        headers = last_headers() if callable(last_headers) else None
+        return dict(headers or {})
+
+    def _last_response_etag(self) -> str | None:
+        return self._last_response_headers().get("ETag") or None
+
+    def _last_retry_after(self) -> float | None:
+        """429 响应建议的等待秒数：优先 Retry-After（秒数或 HTTP 日期），其次 X-RateLimit-Reset（epoch 秒）。"""
+
+        headers = self._last_response_headers()
+        return _parse_retry_after(headers.get("Retry-After"), reset=headers.get("X-RateLimit-Reset"))
 
     def _asset_detail(self, *, symbol: str) -> dict[str, Any]:
         payload = self._request_json(
@@ -337,12 +526,8 @@ class AlpacaHTTPTransport:
             "fractionable": bool(item.get("fractionable", False)),
         }
 
-    def _quote_snapshot(self, *, symbol: str) -> dict[str, Any]:
-        payload = self._request_json(
-            path=f"/v2/stocks/{symbol}/snapshot",
-            params={"feed": "iex"},
-        )
-
+    @staticmethod
+    def _map_snapshot(*, symbol: str, payload: Any) -> dict[str, Any]:
         snapshot = payload.get("snapshot") if isinstance(payload, dict) and isinstance(payload.get("snapshot"), dict) else payload
         if not isinstance(snapshot, dict):
             snapshot = {}
@@ -365,7 +550,32 @@ class AlpacaHTTPTransport:
             "timestamp": latest_trade.get("t") or daily_bar.get("t"),
         }
 
-    def _history_bars(
+    def _quote_snapshot(self, *, symbol: str) -> dict[str, Any]:
+        payload = self._request_json(
+            path=f"/v2/stocks/{symbol}/snapshot",
+            params={"feed": "iex"},
+        )
+        return self._map_snapshot(symbol=symbol, payload=payload)
+
+    def _batch_snapshots(self, *, symbols: list[str]) -> dict[str, Any]:
+        """一次请求拉取多个 symbol 的快照；响应中缺失或为空的 symbol 不出现在 items 中。"""
+
+        payload = self._request_json(
+            path="/v2/stocks/snapshots",
+            params={"symbols": ",".join(symbols), "feed": "iex"},
+        )
+        raw = payload.get("snapshots") if isinstance(payload, dict) and isinstance(payload.get("snapshots"), dict) else payload
+        if not isinstance(raw, dict):
+            raw = {}
+
+        items: dict[str, Any] = {}
+        for symbol in symbols:
+            snapshot = raw.get(symbol)
+            if isinstance(snapshot, dict) and snapshot:
+                items[symbol] = self._map_snapshot(symbol=symbol, payload=snapshot)
+        return {"items": items}
+
+    def _history_page(
         self,
         *,
         symbol: str,
@@ -373,6 +583,7 @@ class AlpacaHTTPTransport:
         end_date: str,
         timeframe: str,
         limit: int | None,
+        page_token: str | None,
     ) -> dict[str, Any]:
         payload = self._request_json(
             path=f"/v2/stocks/{symbol}/bars",
@@ -382,12 +593,13 @@ class AlpacaHTTPTransport:
                 "timeframe": timeframe,
                 "limit": limit,
                 "feed": "iex",
+                "page_token": page_token,
             },
         )
 
         raw_bars = payload.get("bars", []) if isinstance(payload, dict) else []
         items: list[dict[str, Any]] = []
-        for bar in raw_bars:
+        for bar in raw_bars or []:
             if not isinstance(bar, dict):
                 continue
             items.append(
@@ -401,7 +613,38 @@ class AlpacaHTTPTransport:
                 }
             )
 
-        return {"items": items}
+        next_page_token = payload.get("next_page_token") if isinstance(payload, dict) else None
+        return {"items": items, "nextPageToken": next_page_token or None}
+
+    def _history_bars(
+        self,
+        *,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        timeframe: str,
+        limit: int | None,
+    ) -> dict[str, Any]:
+        """跟随 `next_page_token` 拉取整段区间；`limit` 为总条数上限。"""
+
+        items: list[dict[str, Any]] = []
+        page_token: str | None = None
+        while True:
+            remaining = None if limit is None else limit - len(items)
+            page = self._history_page(
+                symbol=symbol,
+                start_date=start_date,
+                end_date=end_date,
+                timeframe=timeframe,
+                limit=remaining,
+                page_token=page_token,
+            )
+            items.extend(page["items"])
+            page_token = page["nextPageToken"]
+            if not page_token or not page["items"] or (limit is not None and len(items) >= limit):
+                break
+
+        return {"items": items[:limit] if limit is not None else items}
 
     def __call__(self, operation: str, **kwargs):
         op = operation.strip().lower()
@@ -412,6 +655,9 @@ class AlpacaHTTPTransport:
         if op == "quote":
             symbol = str(kwargs.get("symbol", "")).upper().strip()
             return self._quote_snapshot(symbol=symbol)
+        if op == "batch_quote":
+            symbols = [str(item).upper().strip() for item in kwargs.get("symbols") or [] if str(item).strip()]
+            return self._batch_snapshots(symbols=symbols)
         if op == "history":
             symbol = str(kwargs.get("symbol", "")).upper().strip()
             return self._history_bars(
@@ -421,13 +667,23 @@ class AlpacaHTTPTransport:
                 timeframe=str(kwargs.get("timeframe", "1Day")),
                 limit=int(kwargs["limit"]) if kwargs.get("limit") is not None else None,
             )
+        if op == "history_page":
+            symbol = str(kwargs.get("symbol", "")).upper().strip()
+            return self._history_page(
+                symbol=symbol,
+                start_date=str(kwargs.get("start_date", "")),
+                end_date=str(kwargs.get("end_date", "")),
+                timeframe=str(kwargs.get("timeframe", "1Day")),
+                limit=int(kwargs["limit"]) if kwargs.get("limit") is not None else None,
+                page_token=str(kwargs["page_token"]) if kwargs.get("page_token") else None,
+            )
         if op == "asset_detail":
             symbol = str(kwargs.get("symbol", "")).upper().strip()
             return self._asset_detail(symbol=symbol)
         raise ValueError(f"unsupported alpaca operation: {operation}")
 
     def health(self) -> dict[str, Any]:
-        return {
+        payload = {
             "provider": "alpaca",
             "transport": "alpaca-http",
             "healthy": self._healthy,
@@ -436,5 +692,24 @@ class AlpacaHTTPTransport:
             "baseUrl": self._config.base_url,
             "timeoutSeconds": self._config.timeout_seconds,
             "lastLatencyMs": self._last_latency_ms,
+            "lastConnectMs": self._last_connect_ms,
+            "lastTransferMs": self._last_transfer_ms,
+            "lastConnectionReused": self._last_connection_reused,
             "lastFailureCode": self._last_failure_code,
         }
+        with self._catalog_lock:
+            payload["assetCatalog"] = {
+                **self._catalog_counters,
+                "source": self._catalog_source,
+                "version": self._asset_catalog_version,
+                "entries": len(self._asset_catalog_cache or []),
+                "ageSeconds": (
+                    time.monotonic() - self._asset_catalog_cached_at if self._asset_catalog_cache is not None else None
+                ),
+                "lastDiff": self._catalog_last_diff,
+                "snapshotPath": str(self._catalog_snapshot.path) if self._catalog_snapshot is not None else None,
+            }
+        stats = getattr(self._request_executor, "stats", None)
+        if callable(stats):
+            payload["connectionPool"] = stats()
+        return payload
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Literal
 
 from fastapi import APIRouter, Body, Depends, Query, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
@@ -22,6 +23,7 @@ from market_data.domain import (
 )
 from market_data.service import MarketDataService
 from market_data.stream_gateway import MarketDataStreamGateway, StreamGatewayError
+from market_data.stream_push import ConflatingEventQueue, MarketDataPushStream
 from platform_core.callback_contract import require_explicit_keyword_parameters
 from platform_core.response import error_response, success_response
 
@@ -123,6 +125,9 @@ class SyncTaskRequest(BaseModel):
     start_date: str = Field(alias="startDate")
     end_date: str = Field(alias="endDate")
     timeframe: str = Field(default="1Day")
+    coverage_scope: Literal["user", "global"] = Field(default="user", alias="coverageScope")
+    full_refresh: bool = Field(default=False, alias="fullRefresh")
+    max_workers: int = Field(default=1, ge=1, le=32, alias="maxWorkers")
     idempotency_key: str | None = Field(default=None, alias="idempotencyKey")
 
     model_config = {"populate_by_name": True}
@@ -135,6 +140,7 @@ class IndicatorSpec(BaseModel):
     slow: int | None = None
     signal: int | None = None
     std_dev: float | None = Field(default=None, alias="stdDev")
+    series: bool | None = None
 
     model_config = {"populate_by_name": True}
 
@@ -171,6 +177,8 @@ def create_router(
     service: MarketDataService,
     get_current_user: Any,
     job_service: JobOrchestrationService | None = None,
+    stream_refresh_seconds: float = 1.0,
+    stream_queue_size: int = 256,
 ) -> APIRouter:
     require_explicit_keyword_parameters(
         get_current_user,
@@ -180,7 +188,12 @@ def create_router(
 
     router = APIRouter()
     stream_gateway = MarketDataStreamGateway(
-        quote_reader=lambda user_id, symbols: service.get_quotes(user_id=user_id, symbols=symbols),
+        snapshot_reader=lambda symbols: service.get_shared_quotes(symbols=symbols),
+    )
+    push_stream = MarketDataPushStream(
+        gateway=stream_gateway,
+        refresh_interval_seconds=stream_refresh_seconds,
+        queue_size=stream_queue_size,
     )
 
     def _stream_now() -> str:
@@ -322,11 +335,128 @@ def create_router(
             stream_gateway.clear_subscriptions(user_id=current_user.id)
             stream_gateway.close_connection(user_id=current_user.id, connection_id=connection_id)
 
+    async def _pump_push_queue(websocket: WebSocket, queue: ConflatingEventQueue) -> None:
+        while True:
+            await websocket.send_json(await queue.get())
+
+    @router.websocket("/market/stream/push")
+    async def stream_push_socket(websocket: WebSocket):
+        """服务端推送：订阅后由后台生产者按固定节奏推送有变化的报价，慢消费者按 symbol 合并。"""
+
+        try:
+            current_user = _resolve_ws_current_user(websocket=websocket)
+        except PermissionError:
+            await websocket.accept()
+            await websocket.send_json(
+                _stream_error_event(
+                    code="STREAM_AUTH_REQUIRED",
+                    message="stream auth required",
+                )
+            )
+            await websocket.close(code=4401)
+            return
+
+        try:
+            connection_id = stream_gateway.open_connection(user_id=current_user.id)
+        except StreamGatewayError as exc:
+            await websocket.accept()
+            await websocket.send_json(_stream_error_event(code=exc.code, message=exc.message))
+            await websocket.close(code=4408)
+            return
+
+        await websocket.accept()
+        queue = push_stream.open_queue()
+        pump = asyncio.create_task(_pump_push_queue(websocket, queue))
+        subscription_ids: list[str] = []
+        await websocket.send_json(
+            {
+                "type": "stream.ready",
+                "timestamp": _stream_now(),
+                "payload": {
+                    "status": stream_gateway.health(user_id=current_user.id)["status"],
+                    "mode": "push",
+                },
+            }
+        )
+
+        try:
+            while True:
+                message = await websocket.receive_json()
+                action = str(message.get("action") or "").strip().lower()
+
+                if action == "subscribe":
+                    try:
+                        subscription = stream_gateway.subscribe(
+                            user_id=current_user.id,
+                            symbols=[str(item) for item in list(message.get("symbols") or [])],
+                            channel=str(message.get("channel") or "quote"),
+                            timeframe=str(message.get("timeframe") or "1Min"),
+                        )
+                    except StreamGatewayError as exc:
+                        await websocket.send_json(_stream_error_event(code=exc.code, message=exc.message))
+                        continue
+
+                    subscription_ids.append(subscription.id)
+                    push_stream.attach(subscription_id=subscription.id, queue=queue)
+                    await websocket.send_json(
+                        {
+                            "type": "stream.subscribed",
+                            "subscriptionId": subscription.id,
+                            "symbols": list(subscription.symbols),
+                            "channel": subscription.channel,
+                            "timeframe": subscription.timeframe,
+                            "timestamp": _stream_now(),
+                        }
+                    )
+                    continue
+
+                if action == "unsubscribe":
+                    subscription_id = str(message.get("subscriptionId") or "")
+                    push_stream.detach(subscription_id=subscription_id)
+                    removed = stream_gateway.unsubscribe(
+                        user_id=current_user.id,
+                        subscription_id=subscription_id,
+                    )
+                    if not removed:
+                        await websocket.send_json(
+                            _stream_error_event(
+                                code="STREAM_SUBSCRIPTION_NOT_FOUND",
+                                message="subscription not found",
+                            )
+                        )
+                        continue
+
+                    subscription_ids.remove(subscription_id)
+                    await websocket.send_json(
+                        {
+                            "type": "stream.unsubscribed",
+                            "subscriptionId": subscription_id,
+                            "timestamp": _stream_now(),
+                        }
+                    )
+                    continue
+
+                await websocket.send_json(
+                    _stream_error_event(
+                        code="STREAM_INVALID_SUBSCRIPTION",
+                        message="invalid stream action",
+                    )
+                )
+        except WebSocketDisconnect:
+            pass
+        finally:
+            pump.cancel()
+            push_stream.close_queue(queue)
+            for subscription_id in subscription_ids:
+                stream_gateway.unsubscribe(user_id=current_user.id, subscription_id=subscription_id)
+            stream_gateway.close_connection(user_id=current_user.id, connection_id=connection_id)
+
     @router.get("/market/stream/status")
     def stream_status(current_user=Depends(get_current_user)):
         return success_response(
             data={
                 "stream": stream_gateway.health(user_id=current_user.id),
+                "push": push_stream.stats(),
                 "provider": service.provider_health(user_id=current_user.id),
                 "subscriptions": [
                     row.to_payload() for row in stream_gateway.list_subscriptions(user_id=current_user.id)
@@ -345,7 +475,10 @@ def create_router(
                 ),
             )
 
-        job_idempotency_key = body.idempotency_key or f"market-data-sync:{','.join(body.symbols)}:{body.start_date}:{body.end_date}:{body.timeframe}"
+        job_idempotency_key = body.idempotency_key or (
+            f"market-data-sync:{','.join(body.symbols)}:{body.start_date}:{body.end_date}:{body.timeframe}"
+            f":{body.coverage_scope}:{int(body.full_refresh)}"
+        )
 
         try:
             job = job_service.submit_job(
@@ -356,6 +489,9 @@ def create_router(
                     "startDate": body.start_date,
                     "endDate": body.end_date,
                     "timeframe": body.timeframe,
+                    "coverageScope": body.coverage_scope,
+                    "fullRefresh": body.full_refresh,
+                    "maxWorkers": body.max_workers,
                 },
                 idempotency_key=job_idempotency_key,
             )
@@ -367,6 +503,15 @@ def create_router(
                     start_date=str(payload.get("startDate") or ""),
                     end_date=str(payload.get("endDate") or ""),
                     timeframe=str(payload.get("timeframe") or "1Day"),
+                    coverage_scope=str(payload.get("coverageScope") or "user"),
+                    full_refresh=bool(payload.get("fullRefresh")),
+                    max_workers=int(payload.get("maxWorkers") or 1),
+                    # 逐 symbol 写入部分结果，运行中即可通过状态查询读取。
+                    on_progress=lambda partial: service.record_sync_result(
+                        user_id=current_user.id,
+                        task_id=job.id,
+                        result=partial,
+                    ),
                 )
                 service.record_sync_result(user_id=current_user.id, task_id=job.id, result=result)
                 if int(result.get("summary", {}).get("failureCount", 0)) > 0:
@@ -444,6 +589,15 @@ def create_router(
                     start_date=str(payload.get("startDate") or ""),
                     end_date=str(payload.get("endDate") or ""),
                     timeframe=str(payload.get("timeframe") or "1Day"),
+                    coverage_scope=str(payload.get("coverageScope") or "user"),
+                    full_refresh=bool(payload.get("fullRefresh")),
+                    max_workers=int(payload.get("maxWorkers") or 1),
+                    # 逐 symbol 写入部分结果，运行中即可通过状态查询读取。
+                    on_progress=lambda partial: service.record_sync_result(
+                        user_id=current_user.id,
+                        task_id=task_id,
+                        result=partial,
+                    ),
                 )
                 service.record_sync_result(user_id=current_user.id, task_id=task_id, result=result)
                 if int(result.get("summary", {}).get("failureCount", 0)) > 0:
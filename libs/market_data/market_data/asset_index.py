@@ -0,0 +1,130 @@
+"""资产目录搜索索引。
+
+目录刷新时一次性构建，之后每次搜索不再线性扫描全量目录：
+- 按 symbol 排序的数组：二分定位前缀区间，覆盖精确匹配与前缀匹配；
+- `symbol + name` 的三元组倒排索引：求交得到候选，再校验子串，覆盖 symbol 子串与名称匹配；
+- 结果按 精确 symbol > symbol 前缀 > symbol 子串 > 名称匹配 排序，只取 top-k。
+
+不足三个字符的关键词无法走三元组索引，只有在前缀匹配凑不满 top-k 时才回退扫描预先小写化的文本。
+"""
+
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from typing import Generic, TypeVar
+
+_T = TypeVar("_T")
+
+_GRAM = 3
+
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_SYMBOL_SUBSTRING = 2
+RANK_NAME = 3
+
+
+def _grams(text: str) -> set[str]:
+    return {text[idx : idx + _GRAM] for idx in range(len(text) - _GRAM + 1)}
+
+
+class AssetSearchIndex(Generic[_T]):
+    def __init__(
+        self,
+        items: Iterable[_T],
+        *,
+        symbol_of: Callable[[_T], str],
+        name_of: Callable[[_T], str],
+    ) -> None:
+        self._items: list[_T] = []
+        self._symbols: list[str] = []
+        self._names: list[str] = []
+        seen: set[str] = set()
+        for item in items:
+            symbol = str(symbol_of(item) or "").strip().lower()
+            if not symbol or symbol in seen:
+                continue
+            seen.add(symbol)
+            self._items.append(item)
+            self._symbols.append(symbol)
+            self._names.append(str(name_of(item) or "").strip().lower())
+
+        self._sorted: list[tuple[str, int]] = sorted((symbol, idx) for idx, symbol in enumerate(self._symbols))
+        self._sorted_keys = [symbol for symbol, _ in self._sorted]
+        self._postings: dict[str, list[int]] = {}
+        for idx, (symbol, name) in enumerate(zip(self._symbols, self._names)):
+            # 换行分隔 symbol 与 name，跨界三元组不会被关键词命中。
+            for gram in _grams(f"{symbol}\n{name}"):
+                self._postings.setdefault(gram, []).append(idx)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def items(self, *, limit: int | None = None) -> list[_T]:
+        """按原目录顺序返回条目。"""
+
+        return list(self._items if limit is None else self._items[: max(0, limit)])
+
+    def search(self, keyword: str, *, limit: int) -> list[_T]:
+        return [item for _, item in self.search_ranked(keyword, limit=limit)]
+
+    def search_ranked(self, keyword: str, *, limit: int) -> list[tuple[int, _T]]:
+        """返回 (rank, item) 列表，rank 越小越相关；空关键词按目录顺序返回。"""
+
+        limit = max(0, int(limit))
+        needle = str(keyword or "").strip().lower()
+        if limit == 0:
+            return []
+        if not needle:
+            return [(RANK_NAME, item) for item in self._items[:limit]]
+
+        ranked: list[tuple[int, int]] = []
+        taken: set[int] = set()
+        position = bisect_left(self._sorted_keys, needle)
+        while position < len(self._sorted) and len(ranked) < limit:
+            symbol, idx = self._sorted[position]
+            if not symbol.startswith(needle):
+                break
+            ranked.append((RANK_EXACT if symbol == needle else RANK_PREFIX, idx))
+            taken.add(idx)
+            position += 1
+
+        remaining = limit - len(ranked)
+        if remaining > 0:
+            matches = (
+                (rank, self._symbols[idx], idx)
+                for idx in self._candidates(needle)
+                if idx not in taken
+                for rank in (self._substring_rank(idx, needle),)
+                if rank is not None
+            )
+            ranked.extend((rank, idx) for rank, _, idx in heapq.nsmallest(remaining, matches))
+
+        return [(rank, self._items[idx]) for rank, idx in ranked]
+
+    def _candidates(self, needle: str) -> Iterable[int]:
+        if len(needle) < _GRAM:
+            return range(len(self._items))
+        postings = [self._postings.get(gram) for gram in _grams(needle)]
+        if any(posting is None for posting in postings):
+            return ()
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        return candidates
+
+    def _substring_rank(self, idx: int, needle: str) -> int | None:
+        if needle in self._symbols[idx]:
+            return RANK_SYMBOL_SUBSTRING
+        if needle in self._names[idx]:
+            return RANK_NAME
+        return None
+
+
+__all__ = [
+    "AssetSearchIndex",
+]
@@ -0,0 +1,414 @@
+"""本地列式 K 线存储。
+
+每个 (symbol, timeframe) 一个目录：
+- `timestamp.i64` 与 `open/high/low/close/volume.f64`：本机字节序定长数组，按时间升序追加；
+- `coverage.json`：已从上游完整拉取过的闭区间（UTC 微秒），查询区间被覆盖时无需回源。
+
+读取时 mmap 时间戳列二分定位 `[start, end]`，只切出命中的下标区间。
+新数据整体晚于已有末 bar 时直接追加；否则合并后整列重写（临时文件 + rename）。
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote
+
+from market_data.domain import MarketCandle
+from market_data.history_cache import _as_utc, _parse_bounds, timeframe_period
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+_COVERAGE_FILE = "coverage.json"
+Interval = tuple[datetime, datetime]
+
+
+def _to_micros(value: datetime) -> int:
+    delta = _as_utc(value) - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=int(value))
+
+
+def format_bound(value: datetime, *, end_of_range: bool) -> str:
+    """区间端点转为 provider 参数：整天边界输出日期，其余输出 ISO 时间。"""
+
+    value = _as_utc(value)
+    start_of_day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if not end_of_range and value == start_of_day:
+        return value.date().isoformat()
+    if end_of_range and value == start_of_day + timedelta(days=1) - timedelta(microseconds=1):
+        return value.date().isoformat()
+    return value.isoformat()
+
+
+def merge_intervals(intervals: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for lo, hi in sorted(intervals):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def subtract_intervals(lo: int, hi: int, covered: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    gaps: list[tuple[int, int]] = []
+    cursor = lo
+    for covered_lo, covered_hi in covered:
+        if covered_hi < cursor:
+            continue
+        if covered_lo > hi:
+            break
+        if covered_lo > cursor:
+            gaps.append((cursor, covered_lo - 1))
+        cursor = max(cursor, covered_hi + 1)
+        if cursor > hi:
+            break
+    if cursor <= hi:
+        gaps.append((cursor, hi))
+    return gaps
+
+
+class LocalBarStore:
+    def __init__(
+        self,
+        *,
+        root_dir: str | os.PathLike[str],
+        clock: Callable[[], float] = time.time,
+        publish_delay_seconds: float = 0.0,
+    ) -> None:
+        self._root = Path(root_dir)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._clock = clock
+        # 上游发布 bar 的延迟（如延时行情）：期内收盘的 bar 可能尚未返回。
+        self._publish_delay = timedelta(seconds=max(0.0, float(publish_delay_seconds)))
+        self._locks: dict[tuple[str, str], threading.RLock] = {}
+        self._guard = threading.Lock()
+        self._counters = {"reads": 0, "localHits": 0, "writes": 0, "barsWritten": 0, "rewrites": 0}
+
+    def _series_lock(self, symbol: str, timeframe: str) -> threading.RLock:
+        with self._guard:
+            return self._locks.setdefault((symbol, timeframe), threading.RLock())
+
+    def _series_dir(self, symbol: str, timeframe: str) -> Path:
+        return self._root / quote(timeframe, safe="") / quote(symbol, safe="")
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._guard:
+            self._counters[key] += amount
+
+    def _load_coverage(self, directory: Path) -> list[tuple[int, int]]:
+        path = directory / _COVERAGE_FILE
+        if not path.exists():
+            return []
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        return [(int(lo), int(hi)) for lo, hi in raw.get("intervals", [])]
+
+    def _save_coverage(self, directory: Path, intervals: list[tuple[int, int]]) -> None:
+        path = directory / _COVERAGE_FILE
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"intervals": [list(item) for item in intervals]}), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def coverage(self, *, symbol: str, timeframe: str) -> list[Interval]:
+        with self._series_lock(symbol, timeframe):
+            intervals = self._load_coverage(self._series_dir(symbol, timeframe))
+        return [(_from_micros(lo), _from_micros(hi)) for lo, hi in intervals]
+
+    def missing_ranges(
+        self,
+        *,
+        symbol: str,
+        timeframe: str,
+        start_date: str | None,
+        end_date: str | None,
+    ) -> list[Interval] | None:
+        """返回查询区间中尚未覆盖的子区间；区间无法解析时返回 None。"""
+
+        bounds = _parse_bounds(start_date, end_date)
+        if bounds is None:
+            return None
+        lo, hi = _to_micros(bounds[0]), _to_micros(bounds[1])
+        with self._series_lock(symbol, timeframe):
+            covered = self._load_coverage(self._series_dir(symbol, timeframe))
+        return [(_from_micros(gap_lo), _from_micros(gap_hi)) for gap_lo, gap_hi in subtract_intervals(lo, hi, covered)]
+
+    def read(
+        self,
+        *,
+        symbol: str,
+        timeframe: str,
+        start_date: str | None,
+        end_date: str | None,
+        limit: int | None = None,
+    ) -> list[MarketCandle] | None:
+        """查询区间被完整覆盖时返回本地 bar，否则返回 None。"""
+
+        self._count("reads")
+        bounds = _parse_bounds(start_date, end_date)
+        if bounds is None:
+            return None
+        lo, hi = _to_micros(bounds[0]), _to_micros(bounds[1])
+        directory = self._series_dir(symbol, timeframe)
+        with self._series_lock(symbol, timeframe):
+            if subtract_intervals(lo, hi, self._load_coverage(directory)):
+                return None
+            candles = self._read_range_locked(directory, lo=lo, hi=hi, limit=limit)
+        self._count("localHits")
+        return candles
+
+    def read_stored(
+        self,
+        *,
+        symbol: str,
+        timeframe: str,
+        start_date: str | None,
+        end_date: str | None,
+        limit: int | None = None,
+    ) -> list[MarketCandle]:
+        """返回本地已有的区间内 bar，不检查覆盖；供已回源补齐缺口的调用方合并读取。"""
+
+        self._count("reads")
+        bounds = _parse_bounds(start_date, end_date)
+        if bounds is None:
+            return []
+        lo, hi = _to_micros(bounds[0]), _to_micros(bounds[1])
+        with self._series_lock(symbol, timeframe):
+            return self._read_range_locked(self._series_dir(symbol, timeframe), lo=lo, hi=hi, limit=limit)
+
+    def iter_stored(
+        self,
+        *,
+        symbol: str,
+        timeframe: str,
+        start_date: str | None,
+        end_date: str | None,
+        chunk_size: int = 10_000,
+        limit: int | None = None,
+    ) -> Iterator[list[MarketCandle]]:
+        """按块产出本地区间内 bar（不检查覆盖），每块单独加锁读取，内存占用以块大小为界。"""
+
+        bounds = _parse_bounds(start_date, end_date)
+        if bounds is None:
+            return
+        lo, hi = _to_micros(bounds[0]), _to_micros(bounds[1])
+        chunk_size = max(1, int(chunk_size))
+        remaining = limit
+        directory = self._series_dir(symbol, timeframe)
+        while lo <= hi and (remaining is None or remaining > 0):
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            self._count("reads")
+            with self._series_lock(symbol, timeframe):
+                chunk = self._read_range_locked(directory, lo=lo, hi=hi, limit=size)
+            if not chunk:
+                return
+            yield chunk
+            if remaining is not None:
+                remaining -= len(chunk)
+            # 以时间戳推进游标：块间发生重写也不会重复或遗漏。
+            lo = _to_micros(chunk[-1].timestamp) + 1
+
+    def count_bars(self, *, symbol: str, timeframe: str, start_date: str | None, end_date: str | None) -> int:
+        """本地已有的区间内 bar 数（不检查覆盖），只读时间戳列。"""
+
+        bounds = _parse_bounds(start_date, end_date)
+        if bounds is None:
+            return 0
+        lo, hi = _to_micros(bounds[0]), _to_micros(bounds[1])
+        with self._series_lock(symbol, timeframe):
+            with _mapped(self._series_dir(symbol, timeframe) / "timestamp.i64") as ts_buffer:
+                if ts_buffer is None:
+                    return 0
+                timestamps = ts_buffer.cast("q")
+                try:
+                    return max(bisect_right(timestamps, hi) - bisect_left(timestamps, lo), 0)
+                finally:
+                    timestamps.release()
+
+    def _read_range_locked(self, directory: Path, *, lo: int, hi: int, limit: int | None) -> list[MarketCandle]:
+        with _mapped(directory / "timestamp.i64") as ts_buffer:
+            if ts_buffer is None:
+                return []
+            timestamps = ts_buffer.cast("q")
+            try:
+                first = bisect_left(timestamps, lo)
+                last = bisect_right(timestamps, hi)
+                if limit is not None:
+                    last = min(last, first + max(int(limit), 0))
+                selected = timestamps[first:last].tolist()
+            finally:
+                timestamps.release()
+
+        columns: dict[str, list[float]] = {}
+        for name in _PRICE_COLUMNS:
+            with _mapped(directory / f"{name}.f64") as buffer:
+                if buffer is None:
+                    columns[name] = []
+                    continue
+                values = buffer.cast("d")
+                try:
+                    columns[name] = values[first:last].tolist()
+                finally:
+                    values.release()
+
+        # 追加写中断时各列长度可能不一致，以最短列为准。
+        count = min([len(selected), *(len(values) for values in columns.values())])
+        return [
+            MarketCandle(
+                timestamp=_from_micros(selected[idx]),
+                open_price=columns["open"][idx],
+                high_price=columns["high"][idx],
+                low_price=columns["low"][idx],
+                close_price=columns["close"][idx],
+                volume=columns["volume"][idx],
+            )
+            for idx in range(count)
+        ]
+
+    def write(
+        self,
+        *,
+        symbol: str,
+        timeframe: str,
+        candles: list[MarketCandle],
+        start_date: str | None,
+        end_date: str | None,
+    ) -> int:
+        """写入一次完整拉取 `[start_date, end_date]` 的结果并登记覆盖区间。
+
+        区间内已有但本次未返回的 bar 视为上游已修正而删除。覆盖区间只登记到确定已收盘并发布的 bar：
+        开始时间不晚于 `当前时刻 - bar 周期 - 发布延迟`；仍在形成或尚未发布的 bar 下次继续回源。
+        返回写入的 bar 数。
+        """
+
+        bounds = _parse_bounds(start_date, end_date)
+        rows = {_to_micros(candle.timestamp): candle for candle in candles}
+        incoming = sorted(rows.items())
+        directory = self._series_dir(symbol, timeframe)
+
+        with self._series_lock(symbol, timeframe):
+            directory.mkdir(parents=True, exist_ok=True)
+            existing = _read_column(directory / "timestamp.i64", "q")
+            range_lo = _to_micros(bounds[0]) if bounds is not None else None
+            range_hi = _to_micros(bounds[1]) if bounds is not None else None
+            starts = [value for value in (range_lo, incoming[0][0] if incoming else None) if value is not None]
+
+            if not existing or not starts or existing[-1] < min(starts):
+                self._append_locked(directory, incoming)
+            else:
+                self._rewrite_locked(directory, existing, incoming, range_lo=range_lo, range_hi=range_hi)
+
+            if bounds is not None:
+                covered_hi = min(range_hi, self._complete_before(timeframe))
+                if covered_hi >= range_lo:
+                    coverage = self._load_coverage(directory)
+                    self._save_coverage(directory, merge_intervals([*coverage, (range_lo, covered_hi)]))
+
+        self._count("writes")
+        self._count("barsWritten", len(incoming))
+        return len(incoming)
+
+    def _complete_before(self, timeframe: str) -> int:
+        now = datetime.fromtimestamp(self._clock(), tz=timezone.utc)
+        return _to_micros(now - timeframe_period(timeframe) - self._publish_delay)
+
+    def _append_locked(self, directory: Path, incoming: list[tuple[int, MarketCandle]]) -> None:
+        if not incoming:
+            return
+        for name, typecode, values in _columns_for(incoming):
+            with (directory / _column_file(name, typecode)).open("ab") as handle:
+                handle.write(array(typecode, values).tobytes())
+
+    def _rewrite_locked(
+        self,
+        directory: Path,
+        existing: array,
+        incoming: list[tuple[int, MarketCandle]],
+        *,
+        range_lo: int | None,
+        range_hi: int | None,
+    ) -> None:
+        columns = {name: _read_column(directory / f"{name}.f64", "d") for name in _PRICE_COLUMNS}
+        count = min([len(existing), *(len(values) for values in columns.values())])
+        merged: dict[int, tuple[float, ...]] = {}
+        for idx in range(count):
+            timestamp = existing[idx]
+            if range_lo is not None and range_hi is not None and range_lo <= timestamp <= range_hi:
+                continue
+            merged[timestamp] = tuple(columns[name][idx] for name in _PRICE_COLUMNS)
+        for timestamp, candle in incoming:
+            merged[timestamp] = _price_tuple(candle)
+
+        ordered = sorted(merged.items())
+        for name, typecode, values in (
+            ("timestamp", "q", [timestamp for timestamp, _ in ordered]),
+            *((name, "d", [prices[pos] for _, prices in ordered]) for pos, name in enumerate(_PRICE_COLUMNS)),
+        ):
+            path = directory / _column_file(name, typecode)
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            tmp.write_bytes(array(typecode, values).tobytes())
+            os.replace(tmp, path)
+        self._count("rewrites")
+
+    def stats(self) -> dict[str, Any]:
+        with self._guard:
+            return {**self._counters, "rootDir": str(self._root)}
+
+
+def _column_file(name: str, typecode: str) -> str:
+    return f"{name}.i64" if typecode == "q" else f"{name}.f64"
+
+
+def _price_tuple(candle: MarketCandle) -> tuple[float, ...]:
+    return (
+        float(candle.open_price),
+        float(candle.high_price),
+        float(candle.low_price),
+        float(candle.close_price),
+        float(candle.volume),
+    )
+
+
+def _columns_for(incoming: list[tuple[int, MarketCandle]]):
+    prices = [_price_tuple(candle) for _, candle in incoming]
+    yield "timestamp", "q", [timestamp for timestamp, _ in incoming]
+    for pos, name in enumerate(_PRICE_COLUMNS):
+        yield name, "d", [row[pos] for row in prices]
+
+
+def _read_column(path: Path, typecode: str) -> array:
+    values = array(typecode)
+    if path.exists():
+        raw = path.read_bytes()
+        values.frombytes(raw[: len(raw) - len(raw) % values.itemsize])
+    return values
+
+
+@contextmanager
+def _mapped(path: Path) -> Iterator[memoryview | None]:
+    """只读 mmap 整列，视图截断到 8 字节整数倍；文件缺失或为空时给出 None。"""
+
+    if not path.exists() or path.stat().st_size < 8:
+        yield None
+        return
+    with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        usable = view[: len(view) - len(view) % 8]
+        try:
+            yield usable
+        finally:
+            usable.release()
+            view.release()
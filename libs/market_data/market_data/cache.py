@@ -1,26 +1,295 @@
-"""简易 TTL 缓存。"""
+"""有界 TTL 缓存。
+
+- 按条目数与估算字节数双重上限做 LRU 淘汰；
+- 读写时按 `sweep_interval_seconds` 周期性清扫全部过期条目，无人再读的 key 也会被回收；
+- 全部状态由一把锁保护，可在多线程 worker 下共享；
+- `get_or_load` 对同一 key 的并发未命中只回源一次（single-flight）；
+- 可选软 TTL（`stale_after_seconds`）：超过软 TTL 但未到硬 TTL 的条目仍可读，并标记为 stale。
+"""
 
 from __future__ import annotations
 
+import sys
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from typing import Any
 
+_ENTRY_OVERHEAD_BYTES = 128
+
+
+_SCALAR_TYPES = (str, bytes, bytearray, int, float, bool, type(None))
+
+
+def _default_sizer(value: Any) -> int:
+    """按类型逐层估算占用：容器计入元素，dataclass / 普通对象计入属性。
+
+    `sys.getsizeof` 只统计外层对象；同一对象被多处引用时只计一次。
+    """
+
+    seen: set[int] = set()
+    pending = [value]
+    total = 0
+    while pending:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, _SCALAR_TYPES):
+            continue
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            pending.extend(item)
+        elif hasattr(item, "__dict__"):
+            pending.append(vars(item))
+        elif hasattr(item, "__slots__"):
+            pending.extend(getattr(item, slot) for slot in item.__slots__ if hasattr(item, slot))
+    return total
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    expires_at: float
+    fresh_until: float
+    size_bytes: int
+
 
-class InMemoryTTLCache:
-    def __init__(self, *, clock=time.monotonic) -> None:
+@dataclass
+class _Flight:
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: BaseException | None = None
+
+
+class BoundedTTLCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10_000,
+        max_bytes: int = 16 * 1024 * 1024,
+        sweep_interval_seconds: float = 30.0,
+        sizer: Callable[[Any], int] = _default_sizer,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max(0, int(max_entries))
+        self._max_bytes = max(0, int(max_bytes))
+        self._sweep_interval_seconds = max(0.0, float(sweep_interval_seconds))
+        self._sizer = sizer
         self._clock = clock
-        self._store: dict[str, tuple[float, Any]] = {}
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._flights: dict[str, _Flight] = {}
+        self._bytes = 0
+        self._next_sweep_at = clock() + self._sweep_interval_seconds
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "staleHits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "loads": 0,
+            "loadErrors": 0,
+        }
+        self._load_seconds_total = 0.0
+        self._load_seconds_max = 0.0
 
     def get(self, key: str) -> Any | None:
-        item = self._store.get(key)
-        if item is None:
+        cached = self.peek(key)
+        return cached[0] if cached is not None else None
+
+    def peek(self, key: str) -> tuple[Any, bool] | None:
+        """返回 (value, 是否已过软 TTL)；未命中或已过硬 TTL 时返回 None。"""
+
+        with self._lock:
+            self._maybe_sweep_locked()
+            return self._lookup_locked(key)
+
+    def set(self, key: str, value: Any, *, ttl_seconds: float, stale_after_seconds: float | None = None) -> None:
+        with self._lock:
+            self._maybe_sweep_locked()
+            self._store_locked(key, value, ttl_seconds=ttl_seconds, stale_after_seconds=stale_after_seconds)
+
+    def get_or_load(
+        self,
+        key: str,
+        *,
+        loader: Callable[[], Any],
+        ttl_seconds: float,
+        stale_after_seconds: float | None = None,
+    ) -> Any:
+        """读取缓存，未命中时调用 `loader` 回源并写入；同 key 并发未命中共享一次回源。"""
+
+        value, _ = self.get_or_load_with_state(
+            key,
+            loader=loader,
+            ttl_seconds=ttl_seconds,
+            stale_after_seconds=stale_after_seconds,
+        )
+        return value
+
+    def get_or_load_with_state(
+        self,
+        key: str,
+        *,
+        loader: Callable[[], Any],
+        ttl_seconds: float,
+        stale_after_seconds: float | None = None,
+    ) -> tuple[Any, str]:
+        """同 `get_or_load`，额外返回来源：`hit` / `stale` / `coalesced` / `loaded`。"""
+
+        with self._lock:
+            self._maybe_sweep_locked()
+            cached = self._lookup_locked(key)
+            if cached is not None:
+                value, stale = cached
+                return value, "stale" if stale else "hit"
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._counters["coalesced"] += 1
+                leader = False
+            else:
+                flight = _Flight()
+                self._flights[key] = flight
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, "coalesced"
+
+        started = time.perf_counter()
+        try:
+            value = loader()
+        except BaseException as exc:
+            with self._lock:
+                self._flights.pop(key, None)
+                self._counters["loadErrors"] += 1
+            flight.error = exc
+            flight.done.set()
+            raise
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._counters["loads"] += 1
+            self._load_seconds_total += elapsed
+            self._load_seconds_max = max(self._load_seconds_max, elapsed)
+            if value is not None:
+                self._store_locked(key, value, ttl_seconds=ttl_seconds, stale_after_seconds=stale_after_seconds)
+            if self._flights.get(key) is flight:
+                self._flights.pop(key, None)
+        flight.result = value
+        flight.done.set()
+        return value, "loaded"
+
+    def invalidate(self, key: str | None = None) -> int:
+        with self._lock:
+            if key is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+                return dropped
+            return 1 if self._drop_locked(key) else 0
+
+    def sweep(self) -> int:
+        """立即清扫全部过期条目，返回清除数量。"""
+
+        with self._lock:
+            return self._sweep_locked()
+
+    def _lookup_locked(self, key: str) -> tuple[Any, bool] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._counters["misses"] += 1
             return None
-        expires_at, value = item
-        if self._clock() >= expires_at:
-            self._store.pop(key, None)
+        now = self._clock()
+        if entry.expires_at <= now:
+            self._drop_locked(key)
+            self._counters["expirations"] += 1
+            self._counters["misses"] += 1
             return None
-        return value
+        self._entries.move_to_end(key)
+        stale = entry.fresh_until <= now
+        self._counters["staleHits" if stale else "hits"] += 1
+        return entry.value, stale
+
+    def _store_locked(
+        self,
+        key: str,
+        value: Any,
+        *,
+        ttl_seconds: float,
+        stale_after_seconds: float | None,
+    ) -> None:
+        self._drop_locked(key)
+        size_bytes = _ENTRY_OVERHEAD_BYTES + len(key) + max(0, int(self._sizer(value)))
+        if size_bytes > self._max_bytes or self._max_entries == 0:
+            return
+
+        now = self._clock()
+        expires_at = now + max(float(ttl_seconds), 0.0)
+        fresh_until = expires_at
+        if stale_after_seconds is not None:
+            fresh_until = min(expires_at, now + max(float(stale_after_seconds), 0.0))
+        self._entries[key] = _CacheEntry(
+            value=value,
+            expires_at=expires_at,
+            fresh_until=fresh_until,
+            size_bytes=size_bytes,
+        )
+        self._bytes += size_bytes
+
+        while self._entries and (len(self._entries) > self._max_entries or self._bytes > self._max_bytes):
+            oldest_key = next(iter(self._entries))
+            self._drop_locked(oldest_key)
+            self._counters["evictions"] += 1
+
+    def _drop_locked(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry.size_bytes
+        return True
+
+    def _maybe_sweep_locked(self) -> None:
+        now = self._clock()
+        if now < self._next_sweep_at:
+            return
+        self._next_sweep_at = now + self._sweep_interval_seconds
+        self._sweep_locked()
+
+    def _sweep_locked(self) -> int:
+        now = self._clock()
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        for key in expired:
+            self._drop_locked(key)
+        self._counters["expirations"] += len(expired)
+        return len(expired)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            hits = self._counters["hits"] + self._counters["staleHits"]
+            lookups = hits + self._counters["misses"]
+            loads = self._counters["loads"]
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "maxEntries": self._max_entries,
+                "bytes": self._bytes,
+                "maxBytes": self._max_bytes,
+                "hitRate": (hits / lookups) if lookups else 0.0,
+                "avgLoadMs": (self._load_seconds_total * 1000 / loads) if loads else 0.0,
+                "maxLoadMs": self._load_seconds_max * 1000,
+            }
+
 
-    def set(self, key: str, value: Any, *, ttl_seconds: int) -> None:
-        expires_at = self._clock() + max(ttl_seconds, 0)
-        self._store[key] = (expires_at, value)
+# 兼容旧名称：原无界实现已由 BoundedTTLCache 取代。
+InMemoryTTLCache = BoundedTTLCache
@@ -0,0 +1,112 @@
+"""资产目录本地快照。
+
+单个 gzip 压缩的紧凑 JSON 文件：`version`（内容摘要）、`etag`（上游返回时记录）与精简后的资产列表。
+- 写入走临时文件 + rename，进程崩溃不会留下半个快照；
+- 文件 mtime 即“最近一次与上游确认”的时间：内容未变时只 `touch`，不重写整个文件；
+- 进程启动时加载快照即可直接提供目录与搜索，无需等待首次全量下载。
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+_FORMAT = 1
+# 只持久化搜索/目录实际用到的字段，其余上游字段不落盘。
+_FIELDS = ("symbol", "name", "exchange", "currency", "class", "assetClass", "tradable", "fractionable")
+
+
+def compact_asset(item: dict[str, Any]) -> dict[str, Any]:
+    return {key: item[key] for key in _FIELDS if key in item and item[key] is not None}
+
+
+def catalog_version(items: list[dict[str, Any]]) -> str:
+    """目录内容摘要，与上游返回顺序无关。"""
+
+    digest = hashlib.sha256()
+    for item in sorted(items, key=lambda value: str(value.get("symbol", ""))):
+        digest.update(json.dumps(item, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()[:32]
+
+
+def diff_catalog(previous: list[dict[str, Any]], current: list[dict[str, Any]]) -> dict[str, int]:
+    """按 symbol 比较两版目录，返回新增/删除/变更数量。"""
+
+    before = {str(item.get("symbol", "")): item for item in previous}
+    after = {str(item.get("symbol", "")): item for item in current}
+    return {
+        "added": sum(1 for symbol in after if symbol not in before),
+        "removed": sum(1 for symbol in before if symbol not in after),
+        "changed": sum(1 for symbol, item in after.items() if symbol in before and before[symbol] != item),
+    }
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    items: list[dict[str, Any]]
+    version: str
+    etag: str | None
+    fetched_at: float
+
+    def age_seconds(self, *, now: float | None = None) -> float:
+        return max(0.0, (time.time() if now is None else now) - self.fetched_at)
+
+
+class AssetCatalogSnapshotStore:
+    def __init__(self, *, path: str | os.PathLike[str]) -> None:
+        self._path = Path(path)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def load(self) -> CatalogSnapshot | None:
+        """读取快照；文件不存在、格式不符或已损坏时返回 None（回退到上游全量拉取）。"""
+
+        try:
+            fetched_at = self._path.stat().st_mtime
+            with gzip.open(self._path, "rt", encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except (OSError, EOFError, ValueError):
+            return None
+        if not isinstance(payload, dict) or payload.get("format") != _FORMAT:
+            return None
+        items = [item for item in payload.get("items") or [] if isinstance(item, dict)]
+        return CatalogSnapshot(
+            items=items,
+            version=str(payload.get("version") or catalog_version(items)),
+            etag=payload.get("etag") or None,
+            fetched_at=fetched_at,
+        )
+
+    def save(self, items: list[dict[str, Any]], *, version: str, etag: str | None = None) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_name(f".{self._path.name}.{os.getpid()}.tmp")
+        payload = {"format": _FORMAT, "version": version, "etag": etag, "items": items}
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as handle:
+            json.dump(payload, handle, separators=(",", ":"), ensure_ascii=False)
+        os.replace(tmp_path, self._path)
+
+    def touch(self) -> None:
+        """内容未变：只刷新确认时间。"""
+
+        try:
+            os.utime(self._path)
+        except OSError:
+            pass
+
+
+__all__ = [
+    "AssetCatalogSnapshotStore",
+    "CatalogSnapshot",
+    "catalog_version",
+    "compact_asset",
+    "diff_catalog",
+]
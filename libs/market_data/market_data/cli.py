@@ -62,7 +62,7 @@ _stream_gateway: MarketDataStreamGateway | None = None
 
 def _build_stream_gateway() -> MarketDataStreamGateway:
     return MarketDataStreamGateway(
-        quote_reader=lambda user_id, symbols: _service.get_quotes(user_id=user_id, symbols=symbols),
+        snapshot_reader=lambda symbols: _service.get_shared_quotes(symbols=symbols),
     )
 
 
@@ -361,6 +361,9 @@ def _cmd_sync(args: argparse.Namespace) -> None:
             start_date=args.start_date,
             end_date=args.end_date,
             timeframe=args.timeframe,
+            coverage_scope=getattr(args, "coverage_scope", None) or "user",
+            full_refresh=bool(getattr(args, "full_refresh", False)),
+            max_workers=int(getattr(args, "max_workers", None) or 1),
         )
     except MarketDataError as exc:
         _output({"success": False, "error": {"code": exc.code, "message": exc.message, "retryable": exc.retryable}})
@@ -520,6 +523,9 @@ def build_parser() -> argparse.ArgumentParser:
     sync.add_argument("--start-date", required=True)
     sync.add_argument("--end-date", required=True)
     sync.add_argument("--timeframe", default="1Day")
+    sync.add_argument("--coverage-scope", choices=["user", "global"], default="user", help="已同步覆盖区间的归属")
+    sync.add_argument("--full-refresh", action="store_true", help="忽略已同步覆盖，整段重新拉取")
+    sync.add_argument("--max-workers", type=int, default=1, help="并发同步的 symbol 数")
     _add_runtime_args(sync)
 
     indicators = sub.add_parser("indicators", help="技术指标")
@@ -30,8 +30,10 @@ class UpstreamUnauthorizedError(MarketDataError):
 
 
 class UpstreamRateLimitedError(MarketDataError):
-    def __init__(self, message: str = "upstream market data rate limited") -> None:
+    def __init__(self, message: str = "upstream market data rate limited", *, retry_after: float | None = None) -> None:
         super().__init__(code="UPSTREAM_RATE_LIMITED", message=message, retryable=True)
+        # 上游建议的重试等待秒数（Retry-After 等响应头）；未给出时为 None。
+        self.retry_after = retry_after
 
 
 class RateLimitExceededError(MarketDataError):
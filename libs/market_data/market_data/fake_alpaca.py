@@ -0,0 +1,107 @@
+"""Alpaca 行情 HTTP 端点的内存模拟。
+
+作为 `AlpacaHTTPTransport(request_executor=...)` 注入，覆盖单 symbol 快照、多 symbol 快照
+与分页的历史 bar 端点，并记录每次请求，用于测试批量分块与按 symbol 降级。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+from urllib.parse import urlparse
+
+
+def make_snapshot(
+    *,
+    price: float,
+    previous_close: float | None = None,
+    timestamp: str = "2026-01-02T15:30:00Z",
+) -> dict[str, Any]:
+    return {
+        "latestTrade": {"p": price, "t": timestamp},
+        "latestQuote": {"bp": price - 0.01, "ap": price + 0.01},
+        "dailyBar": {"o": price, "h": price, "l": price, "v": 1000, "t": timestamp},
+        "prevDailyBar": {"c": previous_close if previous_close is not None else price},
+    }
+
+
+class FakeAlpacaRequestExecutor:
+    def __init__(
+        self,
+        *,
+        snapshots: dict[str, dict[str, Any]] | None = None,
+        bars: dict[str, list[dict[str, Any]]] | None = None,
+        failing_symbols: set[str] | None = None,
+        latency_seconds: float = 0.0,
+        bars_page_size: int = 10_000,
+    ) -> None:
+        self.snapshots = {symbol.upper(): value for symbol, value in (snapshots or {}).items()}
+        self.bars = {symbol.upper(): list(value) for symbol, value in (bars or {}).items()}
+        # 请求中包含这些 symbol 时整个请求返回 500（模拟分块失败）。
+        self.failing_symbols = {symbol.upper() for symbol in (failing_symbols or set())}
+        self.latency_seconds = latency_seconds
+        # bars 端点单页上限；超出部分通过 `next_page_token` 续拉。
+        self.bars_page_size = max(1, int(bars_page_size))
+        self.requests: list[tuple[str, dict[str, Any]]] = []
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.max_in_flight = 0
+
+    def __call__(
+        self,
+        *,
+        method: str,
+        path: str,
+        params: dict[str, Any],
+        headers: dict[str, str],
+        timeout_seconds: float,
+    ) -> tuple[int, Any]:
+        del method, headers, timeout_seconds
+        route = urlparse(path).path
+        with self._lock:
+            self.requests.append((route, dict(params)))
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            if self.latency_seconds > 0:
+                time.sleep(self.latency_seconds)
+            return self._route(route, params)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _route(self, route: str, params: dict[str, Any]) -> tuple[int, Any]:
+        parts = [part for part in route.split("/") if part]
+        if parts == ["v2", "stocks", "snapshots"]:
+            symbols = [item.strip().upper() for item in str(params.get("symbols") or "").split(",") if item.strip()]
+            if self.failing_symbols.intersection(symbols):
+                return 500, {"message": "internal error"}
+            return 200, {symbol: self.snapshots[symbol] for symbol in symbols if symbol in self.snapshots}
+
+        if len(parts) == 4 and parts[:2] == ["v2", "stocks"]:
+            symbol = parts[2].upper()
+            if symbol in self.failing_symbols:
+                return 500, {"message": "internal error"}
+            if parts[3] == "snapshot":
+                if symbol not in self.snapshots:
+                    return 404, {"message": "not found"}
+                return 200, self.snapshots[symbol]
+            if parts[3] == "bars":
+                return 200, self._bars_page(symbol=symbol, params=params)
+
+        return 404, {"message": f"unknown route: {route}"}
+
+    def _bars_page(self, *, symbol: str, params: dict[str, Any]) -> dict[str, Any]:
+        rows = self.bars.get(symbol, [])
+        offset = int(params.get("page_token") or 0)
+        page_size = self.bars_page_size
+        if params.get("limit") is not None:
+            page_size = min(page_size, int(params["limit"]))
+        end = offset + page_size
+        next_page_token = str(end) if end < len(rows) else None
+        return {"bars": rows[offset:end], "symbol": symbol, "next_page_token": next_page_token}
+
+    def count(self, route: str) -> int:
+        with self._lock:
+            return sum(1 for recorded, _ in self.requests if recorded == route)
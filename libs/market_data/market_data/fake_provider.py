@@ -0,0 +1,90 @@
+"""进程内可控的行情 provider。
+
+报价由 `set_price` 驱动，时间戳随每次改价前进，用于在测试与本地开发中驱动推送流。
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from market_data.asset_index import AssetSearchIndex
+from market_data.domain import MarketAsset, MarketCandle, MarketQuote
+
+
+class FakeMarketDataProvider:
+    def __init__(self, *, prices: dict[str, float] | None = None) -> None:
+        self._base = datetime(2026, 1, 2, 14, 30, tzinfo=timezone.utc)
+        self._prices = {symbol.upper(): float(price) for symbol, price in (prices or {}).items()}
+        self._versions = {symbol: 0 for symbol in self._prices}
+        self._lock = threading.Lock()
+        self._index: AssetSearchIndex[MarketAsset] | None = None
+        self.quote_calls = 0
+        self.batch_calls: list[list[str]] = []
+
+    def set_price(self, symbol: str, price: float) -> None:
+        normalized = symbol.upper()
+        with self._lock:
+            if normalized not in self._prices:
+                self._index = None
+            self._prices[normalized] = float(price)
+            self._versions[normalized] = self._versions.get(normalized, 0) + 1
+
+    def _quote_locked(self, symbol: str) -> MarketQuote | None:
+        price = self._prices.get(symbol)
+        if price is None:
+            return None
+        return MarketQuote(
+            symbol=symbol,
+            name=symbol,
+            price=price,
+            bid_price=price - 0.01,
+            ask_price=price + 0.01,
+            timestamp=self._base + timedelta(seconds=self._versions.get(symbol, 0)),
+        )
+
+    def search(self, *, keyword: str, limit: int) -> list[MarketAsset]:
+        with self._lock:
+            if self._index is None:
+                self._index = AssetSearchIndex(
+                    [MarketAsset(symbol=symbol, name=symbol) for symbol in sorted(self._prices)],
+                    symbol_of=lambda asset: asset.symbol,
+                    name_of=lambda asset: asset.name,
+                )
+            index = self._index
+        return index.search(keyword, limit=limit)
+
+    def quote(self, *, symbol: str) -> MarketQuote:
+        with self._lock:
+            self.quote_calls += 1
+            quote = self._quote_locked(symbol.upper())
+        if quote is None:
+            raise LookupError(f"unknown symbol: {symbol}")
+        return quote
+
+    def batch_quote(self, *, symbols: list[str]) -> dict[str, MarketQuote]:
+        with self._lock:
+            self.batch_calls.append(list(symbols))
+            quotes = {symbol.upper(): self._quote_locked(symbol.upper()) for symbol in symbols}
+        return {symbol: quote for symbol, quote in quotes.items() if quote is not None}
+
+    def history(
+        self,
+        *,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        timeframe: str,
+        limit: int | None,
+    ) -> list[MarketCandle]:
+        del symbol, start_date, end_date, timeframe, limit
+        return []
+
+    def list_assets(self, *, limit: int) -> list[MarketAsset]:
+        with self._lock:
+            symbols = sorted(self._prices)
+        return [MarketAsset(symbol=symbol, name=symbol) for symbol in symbols[:limit]]
+
+    def health(self) -> dict[str, Any]:
+        return {"provider": "fake", "healthy": True, "status": "ok", "message": ""}
@@ -0,0 +1,318 @@
+"""历史 K 线缓存。
+
+按 (symbol, timeframe, start, end) 缓存 provider.history 结果：
+- 按估算字节数做 LRU 淘汰；
+- 同一查询并发未命中时只回源一次（single-flight）；
+- 已缓存的完整区间（未截断 limit）可以服务其子区间查询（range containment）；
+- 区间触及当前时刻（末根 bar 可能仍在形成）或无法解析时，TTL 缩短到一个 bar 周期；
+- 同步或本地 bar 存储写入后按 symbol（及重叠区间）失效。
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from market_data.domain import MarketCandle
+
+# 单根 MarketCandle（dataclass + datetime + 5 个 float + 列表槽位）的实测内存约 300 字节。
+_CANDLE_BYTES = 320
+_ENTRY_OVERHEAD_BYTES = 512
+
+_TIMEFRAME_PATTERN = re.compile(r"^\s*(\d+)?\s*([A-Za-z]+)\s*$")
+_TIMEFRAME_UNIT_SECONDS = {
+    "min": 60,
+    "t": 60,
+    "hour": 3600,
+    "h": 3600,
+    "day": 86_400,
+    "d": 86_400,
+    "week": 7 * 86_400,
+    "w": 7 * 86_400,
+    # 按最长月份计，宁可多回源一次也不提前冻结。
+    "month": 31 * 86_400,
+    "m": 31 * 86_400,
+}
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def timeframe_period(timeframe: str) -> timedelta:
+    """bar 周期；无法识别的 timeframe 按一天处理。"""
+
+    match = _TIMEFRAME_PATTERN.match(str(timeframe or ""))
+    unit_seconds = _TIMEFRAME_UNIT_SECONDS.get(match.group(2).lower()) if match else None
+    if unit_seconds is None:
+        return timedelta(days=1)
+    return timedelta(seconds=int(match.group(1) or 1) * unit_seconds)
+
+
+def _parse_bounds(start_date: str | None, end_date: str | None) -> tuple[datetime, datetime] | None:
+    """解析为闭区间 [lo, hi]；纯日期的结束边界覆盖当天全天。无法解析时返回 None。"""
+
+    if not start_date or not end_date:
+        return None
+    try:
+        lo = _parse_instant(start_date, end_of_day=False)
+        hi = _parse_instant(end_date, end_of_day=True)
+    except ValueError:
+        return None
+    if lo > hi:
+        return None
+    return lo, hi
+
+
+def _overlaps(left: tuple[datetime, datetime], right: tuple[datetime, datetime]) -> bool:
+    return left[0] <= right[1] and right[0] <= left[1]
+
+
+def _parse_instant(raw: str, *, end_of_day: bool) -> datetime:
+    text = raw.strip().replace("Z", "+00:00")
+    if len(text) == 10:
+        day = date.fromisoformat(text)
+        start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        return start + timedelta(days=1) - timedelta(microseconds=1) if end_of_day else start
+    return _as_utc(datetime.fromisoformat(text))
+
+
+@dataclass
+class _HistoryEntry:
+    symbol: str
+    timeframe: str
+    start_date: str
+    end_date: str
+    limit: int | None
+    candles: list[MarketCandle]
+    bounds: tuple[datetime, datetime] | None
+    expires_at: float
+    size_bytes: int = 0
+
+    @property
+    def key(self) -> tuple[str, str, str, str, int | None]:
+        return (self.symbol, self.timeframe, self.start_date, self.end_date, self.limit)
+
+    def contains(self, bounds: tuple[datetime, datetime]) -> bool:
+        # 只有未截断的完整区间才能推导子区间结果。
+        if self.limit is not None or self.bounds is None:
+            return False
+        return self.bounds[0] <= bounds[0] and bounds[1] <= self.bounds[1]
+
+    def slice(self, bounds: tuple[datetime, datetime], limit: int | None) -> list[MarketCandle]:
+        lo, hi = bounds
+        candles = [candle for candle in self.candles if lo <= _as_utc(candle.timestamp) <= hi]
+        return candles[:limit] if limit is not None else candles
+
+
+@dataclass
+class _Flight:
+    done: threading.Event = field(default_factory=threading.Event)
+    result: list[MarketCandle] | None = None
+    error: BaseException | None = None
+
+
+class HistoryCache:
+    def __init__(
+        self,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._max_bytes = max(0, int(max_bytes))
+        self._ttl_seconds = max(0.0, float(ttl_seconds))
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._entries: OrderedDict[tuple[str, str, str, str, int | None], _HistoryEntry] = OrderedDict()
+        self._by_series: dict[tuple[str, str], set[tuple[str, str, str, str, int | None]]] = {}
+        self._flights: dict[tuple[str, str, str, str, int | None], _Flight] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "containmentHits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def get_or_load(
+        self,
+        *,
+        symbol: str,
+        timeframe: str,
+        start_date: str | None,
+        end_date: str | None,
+        limit: int | None,
+        loader: Callable[[], list[MarketCandle]],
+        refresh: bool = False,
+    ) -> list[MarketCandle]:
+        """读取缓存，未命中时调用 `loader` 回源并写入；`refresh=True` 时强制回源。"""
+
+        key = (symbol, timeframe, start_date or "", end_date or "", limit)
+        bounds = _parse_bounds(start_date, end_date)
+
+        with self._lock:
+            if not refresh:
+                cached = self._lookup_locked(key=key, bounds=bounds)
+                if cached is not None:
+                    return cached
+
+            flight = self._flights.get(key)
+            if flight is not None and not refresh:
+                self._counters["coalesced"] += 1
+                leader = False
+            else:
+                flight = _Flight()
+                self._flights[key] = flight
+                self._counters["misses"] += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return list(flight.result or [])
+
+        try:
+            candles = list(loader())
+        except BaseException as exc:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.error = exc
+            flight.done.set()
+            raise
+
+        with self._lock:
+            self._store_locked(
+                _HistoryEntry(
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    start_date=key[2],
+                    end_date=key[3],
+                    limit=limit,
+                    candles=candles,
+                    bounds=bounds,
+                    expires_at=self._clock() + self._entry_ttl(timeframe=timeframe, bounds=bounds),
+                    size_bytes=_ENTRY_OVERHEAD_BYTES + _CANDLE_BYTES * len(candles),
+                )
+            )
+            if self._flights.get(key) is flight:
+                self._flights.pop(key, None)
+        flight.result = candles
+        flight.done.set()
+        return list(candles)
+
+    def _entry_ttl(self, *, timeframe: str, bounds: tuple[datetime, datetime] | None) -> float:
+        """已收盘区间用完整 TTL；触及当前时刻或无法解析的区间最多缓存一个 bar 周期。"""
+
+        period = timeframe_period(timeframe)
+        if bounds is not None:
+            now = datetime.fromtimestamp(self._wall_clock(), tz=timezone.utc)
+            if bounds[1] < now - period:
+                return self._ttl_seconds
+        return min(self._ttl_seconds, period.total_seconds())
+
+    def _lookup_locked(
+        self,
+        *,
+        key: tuple[str, str, str, str, int | None],
+        bounds: tuple[datetime, datetime] | None,
+    ) -> list[MarketCandle] | None:
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return list(entry.candles)
+            self._drop_locked(entry)
+            self._counters["expirations"] += 1
+
+        if bounds is None:
+            return None
+
+        for candidate_key in list(self._by_series.get((key[0], key[1]), ())):
+            candidate = self._entries[candidate_key]
+            if candidate.expires_at <= now:
+                self._drop_locked(candidate)
+                self._counters["expirations"] += 1
+                continue
+            if candidate.contains(bounds):
+                self._entries.move_to_end(candidate_key)
+                self._counters["containmentHits"] += 1
+                return candidate.slice(bounds, key[4])
+        return None
+
+    def _store_locked(self, entry: _HistoryEntry) -> None:
+        if entry.size_bytes > self._max_bytes:
+            return
+
+        existing = self._entries.get(entry.key)
+        if existing is not None:
+            self._drop_locked(existing)
+
+        self._entries[entry.key] = entry
+        self._by_series.setdefault((entry.symbol, entry.timeframe), set()).add(entry.key)
+        self._bytes += entry.size_bytes
+
+        while self._bytes > self._max_bytes and self._entries:
+            _, oldest = next(iter(self._entries.items()))
+            self._drop_locked(oldest)
+            self._counters["evictions"] += 1
+
+    def _drop_locked(self, entry: _HistoryEntry) -> None:
+        if self._entries.pop(entry.key, None) is None:
+            return
+        self._bytes -= entry.size_bytes
+        series_keys = self._by_series.get((entry.symbol, entry.timeframe))
+        if series_keys is not None:
+            series_keys.discard(entry.key)
+            if not series_keys:
+                self._by_series.pop((entry.symbol, entry.timeframe), None)
+
+    def invalidate(
+        self,
+        *,
+        symbol: str | None = None,
+        timeframe: str | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+    ) -> int:
+        """失效匹配的条目；给出区间时只失效与之重叠（或自身区间未知）的条目。"""
+
+        bounds = _parse_bounds(start_date, end_date)
+        with self._lock:
+            targets = [
+                entry
+                for entry in self._entries.values()
+                if (symbol is None or entry.symbol == symbol)
+                and (timeframe is None or entry.timeframe == timeframe)
+                and (bounds is None or entry.bounds is None or _overlaps(entry.bounds, bounds))
+            ]
+            for entry in targets:
+                self._drop_locked(entry)
+            return len(targets)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["containmentHits"] + self._counters["misses"]
+            hits = self._counters["hits"] + self._counters["containmentHits"]
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxBytes": self._max_bytes,
+                "hitRate": (hits / lookups) if lookups else 0.0,
+            }
@@ -0,0 +1,201 @@
+"""带 keep-alive 连接池的 HTTP request executor。
+
+按 (scheme, host, port) 复用 `http.client` 连接，省去每次请求的 TCP/TLS 握手；
+每个 host 的连接数受 `max_connections_per_host` 约束，超出时等待空闲连接。
+请求携带 `Accept-Encoding: gzip` 并透明解压。每次请求的建连/传输耗时与缓存校验头
+（ETag / Last-Modified）、限流头（Retry-After / X-RateLimit-Reset）记录在当前线程上，
+由 `last_timing()` / `last_response_headers()` 读取。
+"""
+
+from __future__ import annotations
+
+import gzip
+import http.client
+import json
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Any
+from urllib.parse import urlencode, urlsplit
+
+# 记录到当前线程、供 transport 读取的响应头。
+_RECORDED_HEADERS = ("ETag", "Last-Modified", "Retry-After", "X-RateLimit-Reset")
+
+
+def _decode_body(raw: bytes, *, content_encoding: str | None) -> Any:
+    encoding = (content_encoding or "").strip().lower()
+    if encoding == "gzip":
+        raw = gzip.decompress(raw)
+    elif encoding == "deflate":
+        raw = zlib.decompress(raw)
+    if not raw:
+        return {}
+    text = raw.decode("utf-8", errors="ignore").strip()
+    if not text:
+        return {}
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return {"raw": text}
+
+
+class _HostPool:
+    def __init__(self, max_connections: int) -> None:
+        self.idle: deque[http.client.HTTPConnection] = deque()
+        self.slots = threading.BoundedSemaphore(max_connections)
+
+
+class PooledHTTPRequestExecutor:
+    def __init__(self, *, max_connections_per_host: int = 8) -> None:
+        self._max_connections_per_host = max(1, int(max_connections_per_host))
+        self._pools: dict[tuple[str, str, int], _HostPool] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {"requests": 0, "connectionsOpened": 0, "connectionsReused": 0, "gzipResponses": 0}
+
+    def _pool(self, key: tuple[str, str, int]) -> _HostPool:
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = _HostPool(self._max_connections_per_host)
+                self._pools[key] = pool
+            return pool
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counters[key] += 1
+
+    @staticmethod
+    def _open(scheme: str, host: str, port: int, timeout_seconds: float) -> http.client.HTTPConnection:
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout_seconds)
+        return http.client.HTTPConnection(host, port, timeout=timeout_seconds)
+
+    def __call__(
+        self,
+        *,
+        method: str,
+        path: str,
+        params: dict[str, Any],
+        headers: dict[str, str],
+        timeout_seconds: float,
+    ) -> tuple[int, Any]:
+        parts = urlsplit(path)
+        scheme = (parts.scheme or "https").lower()
+        host = parts.hostname or ""
+        port = parts.port or (443 if scheme == "https" else 80)
+        query = urlencode({key: value for key, value in params.items() if value is not None})
+        target = parts.path or "/"
+        if parts.query or query:
+            target = f"{target}?{'&'.join(item for item in (parts.query, query) if item)}"
+        request_headers = {**headers, "Accept-Encoding": "gzip", "Connection": "keep-alive"}
+
+        pool = self._pool((scheme, host, port))
+        pool.slots.acquire()
+        try:
+            return self._send(
+                pool,
+                scheme=scheme,
+                host=host,
+                port=port,
+                method=method,
+                target=target,
+                headers=request_headers,
+                timeout_seconds=timeout_seconds,
+            )
+        finally:
+            pool.slots.release()
+
+    def _send(
+        self,
+        pool: _HostPool,
+        *,
+        scheme: str,
+        host: str,
+        port: int,
+        method: str,
+        target: str,
+        headers: dict[str, str],
+        timeout_seconds: float,
+    ) -> tuple[int, Any]:
+        self._count("requests")
+        for attempt in range(2):
+            started = time.perf_counter()
+            with self._lock:
+                idle = pool.idle.popleft() if pool.idle else None
+            reused = idle is not None
+            conn = idle if idle is not None else self._open(scheme, host, port, timeout_seconds)
+            try:
+                if not reused:
+                    conn.connect()
+                    self._count("connectionsOpened")
+                else:
+                    conn.timeout = timeout_seconds
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout_seconds)
+                    self._count("connectionsReused")
+                connected = time.perf_counter()
+
+                conn.request(method, target, headers=headers)
+                response = conn.getresponse()
+                raw = response.read()
+                finished = time.perf_counter()
+            except TimeoutError:
+                conn.close()
+                raise TimeoutError("request timeout") from None
+            except (http.client.HTTPException, OSError) as exc:
+                conn.close()
+                # 空闲连接可能已被服务端关闭：换新连接重试一次（transport 只发幂等的 GET）。
+                if reused and attempt == 0:
+                    continue
+                raise RuntimeError(f"request failed: {exc}") from exc
+
+            content_encoding = response.getheader("Content-Encoding")
+            if (content_encoding or "").lower() == "gzip":
+                self._count("gzipResponses")
+            if response.will_close:
+                conn.close()
+            else:
+                with self._lock:
+                    pool.idle.append(conn)
+
+            self._local.timing = {
+                "connectMs": int((connected - started) * 1000),
+                "transferMs": int((finished - connected) * 1000),
+                "connectionReused": reused,
+            }
+            self._local.response_headers = {
+                name: value
+                for name in _RECORDED_HEADERS
+                if (value := response.getheader(name)) is not None
+            }
+            return int(response.status), _decode_body(raw, content_encoding=content_encoding)
+
+        raise RuntimeError("request failed: connection closed by upstream")
+
+    def last_timing(self) -> dict[str, Any] | None:
+        """当前线程最近一次请求的建连/传输耗时。"""
+
+        return getattr(self._local, "timing", None)
+
+    def last_response_headers(self) -> dict[str, str]:
+        """当前线程最近一次响应的缓存校验头与限流头，用于发起条件请求与限流退避。"""
+
+        return dict(getattr(self._local, "response_headers", None) or {})
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "idleConnections": sum(len(pool.idle) for pool in self._pools.values()),
+                "maxConnectionsPerHost": self._max_connections_per_host,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            while pool.idle:
+                pool.idle.popleft().close()
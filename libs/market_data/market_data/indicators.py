@@ -0,0 +1,413 @@
+"""技术指标全序列计算引擎。
+
+每个指标对整条收盘价序列单趟计算，输出与 bar 下标对齐的序列（预热期为 None）：
+- SMA 与布林带共享同一份滚动均值，布林带的滚动标准差复用该均值；
+- EMA 以前 `period` 根的 SMA 作为种子，种子同样取自滚动均值缓存；
+- MACD 复用快/慢 EMA 序列，信号线是 MACD 序列上的 EMA；
+- RSI 使用 Wilder 平滑。
+
+安装 NumPy 时滚动均值/标准差走分段前缀和向量化路径（每段以段内均值中心化，误差不随序列长度累积），
+否则退化为纯 Python 滑动 Welford 更新（定期按窗口精确重算以截断漂移）；
+EMA/RSI 是逐点递推，两种路径都以单趟循环完成。
+
+传入 `IndicatorCache` 时，序列按 (scope, 指标, 参数) 跨请求缓存，并绑定 bar 指纹：
+指纹一致直接命中；缓存序列是当前 bar 的前缀时，从递推状态续算新增 bar。
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from market_data.cache import BoundedTTLCache
+
+try:
+    import numpy as np
+except ModuleNotFoundError:  # pragma: no cover
+    np = None
+
+Series = list[float | None]
+
+# 滚动均值/标准差的分段长度：NumPy 路径按段中心化，纯 Python 路径按段精确重算。
+_ROLLING_BLOCK = 1024
+
+
+@dataclass(frozen=True)
+class _SeriesEntry:
+    count: int
+    digest: int
+    series: tuple[Series, ...]
+    # 续算所需的递推状态；None 表示尚未越过预热期，只能整段重算。
+    state: tuple[float, ...] | None
+
+
+# 序列是 Python float 列表：每个元素一个 8 字节列表槽位 + 24 字节 float 对象（预热期的 None 共享单例，
+# 按上限估算）；每条序列另计列表对象本身。
+_SLOT_BYTES = 32
+_SERIES_OVERHEAD_BYTES = 64
+_ENTRY_OVERHEAD_BYTES = 256
+
+
+def _entry_bytes(entry: Any) -> int:
+    if not isinstance(entry, _SeriesEntry):
+        return 0
+    series_bytes = sum(_SERIES_OVERHEAD_BYTES + _SLOT_BYTES * len(series) for series in entry.series)
+    return _ENTRY_OVERHEAD_BYTES + series_bytes + 8 * len(entry.state or ())
+
+
+class IndicatorCache:
+    """跨请求的指标序列缓存（有界 LRU + TTL）。"""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 4096,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 3600.0,
+        cache: BoundedTTLCache | None = None,
+    ) -> None:
+        self._ttl_seconds = max(0.0, float(ttl_seconds))
+        self._cache = cache or BoundedTTLCache(max_entries=max_entries, max_bytes=max_bytes, sizer=_entry_bytes)
+        self._lock = threading.Lock()
+        self._counters = {"extensions": 0, "recomputes": 0}
+
+    def get(self, key: tuple[Any, ...]) -> _SeriesEntry | None:
+        return self._cache.get(repr(key))
+
+    def put(self, key: tuple[Any, ...], entry: _SeriesEntry) -> None:
+        self._cache.set(repr(key), entry, ttl_seconds=self._ttl_seconds)
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def invalidate(self) -> int:
+        return self._cache.invalidate()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {**self._cache.stats(), **counters}
+
+
+class IndicatorEngine:
+    """单条收盘价序列上的指标计算；中间结果按参数缓存，供同一请求内多个指标复用。"""
+
+    def __init__(
+        self,
+        close_prices: Sequence[float],
+        *,
+        timestamps: Sequence[Any] | None = None,
+        cache: IndicatorCache | None = None,
+        cache_scope: tuple[Any, ...] = (),
+    ) -> None:
+        self._prices = [float(price) for price in close_prices]
+        self._timestamps = tuple(timestamps) if timestamps is not None else ()
+        self._cache = cache
+        self._cache_scope = cache_scope
+        self._digests: dict[int, int] = {}
+        self._rolling: dict[int, tuple[Series, Series]] = {}
+        self._emas: dict[int, Series] = {}
+        self._rsis: dict[int, Series] = {}
+        self._macds: dict[tuple[int, int, int], tuple[Series, Series, Series]] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self._prices)
+
+    def sma(self, period: int) -> Series:
+        return self._rolling_pair(period)[0]
+
+    def rolling_std(self, period: int) -> Series:
+        """总体标准差（除以 period），与布林带定义一致。"""
+
+        return self._rolling_pair(period)[1]
+
+    def ema(self, period: int) -> Series:
+        cached = self._emas.get(period)
+        if cached is None:
+            (cached,) = self._through_cache(
+                ("ema", period),
+                compute=lambda: self._ema_from(period, base=None),
+                extend=lambda entry: self._ema_from(period, base=entry),
+            )
+            self._emas[period] = cached
+        return cached
+
+    def rsi(self, period: int) -> Series:
+        cached = self._rsis.get(period)
+        if cached is None:
+            (cached,) = self._through_cache(
+                ("rsi", period),
+                compute=lambda: self._rsi_from(period, base=None),
+                extend=lambda entry: self._rsi_from(period, base=entry),
+            )
+            self._rsis[period] = cached
+        return cached
+
+    def macd(self, fast: int, slow: int, signal: int) -> tuple[Series, Series, Series]:
+        """返回 (MACD 线, 信号线, 柱状图)；信号线未完成预热处为 None。"""
+
+        key = (fast, slow, signal)
+        cached = self._macds.get(key)
+        if cached is None:
+            macd_line, signal_line, histogram = self._through_cache(
+                ("macd", fast, slow, signal),
+                compute=lambda: self._macd_from(fast, slow, signal, base=None),
+                extend=lambda entry: self._macd_from(fast, slow, signal, base=entry),
+            )
+            cached = (macd_line, signal_line, histogram)
+            self._macds[key] = cached
+        return cached
+
+    def bollinger(self, period: int, std_dev: float) -> tuple[Series, Series, Series]:
+        """返回 (中轨, 上轨, 下轨)。"""
+
+        middle = self.sma(period)
+        deviation = self.rolling_std(period)
+        upper: Series = [None] * self.size
+        lower: Series = [None] * self.size
+        for index, (mean, std) in enumerate(zip(middle, deviation)):
+            if mean is None or std is None:
+                continue
+            upper[index] = mean + std_dev * std
+            lower[index] = mean - std_dev * std
+        return middle, upper, lower
+
+    def _digest(self, count: int) -> int:
+        digest = self._digests.get(count)
+        if digest is None:
+            digest = hash((tuple(self._prices[:count]), self._timestamps[:count]))
+            self._digests[count] = digest
+        return digest
+
+    def _through_cache(
+        self,
+        indicator_key: tuple[Any, ...],
+        *,
+        compute: Callable[[], tuple[tuple[Series, ...], tuple[float, ...] | None]],
+        extend: Callable[[_SeriesEntry], tuple[tuple[Series, ...], tuple[float, ...] | None]] | None,
+    ) -> tuple[Series, ...]:
+        cache = self._cache
+        if cache is None:
+            return compute()[0]
+
+        key = (*self._cache_scope, *indicator_key)
+        entry = cache.get(key)
+        if entry is not None and entry.count == self.size and entry.digest == self._digest(self.size):
+            return entry.series
+
+        if (
+            entry is not None
+            and extend is not None
+            and entry.state is not None
+            and 0 < entry.count < self.size
+            and entry.digest == self._digest(entry.count)
+        ):
+            series, state = extend(entry)
+            cache.count("extensions")
+        else:
+            series, state = compute()
+            cache.count("recomputes")
+        cache.put(key, _SeriesEntry(count=self.size, digest=self._digest(self.size), series=series, state=state))
+        return series
+
+    def _rolling_pair(self, period: int) -> tuple[Series, Series]:
+        cached = self._rolling.get(period)
+        if cached is None:
+            means, stds = self._through_cache(
+                ("rolling", period),
+                compute=lambda: self._rolling_from(period, base=None),
+                extend=lambda entry: self._rolling_from(period, base=entry),
+            )
+            cached = (means, stds)
+            self._rolling[period] = cached
+        return cached
+
+    def _rolling_from(
+        self,
+        period: int,
+        *,
+        base: _SeriesEntry | None,
+    ) -> tuple[tuple[Series, ...], tuple[float, ...] | None]:
+        if period <= 0 or period > self.size:
+            return ([None] * self.size, [None] * self.size), None
+        rolling = _rolling_numpy if np is not None else _rolling_python
+        if base is None:
+            means, stds = rolling(self._prices, period)
+        else:
+            # 只为新增 bar 结尾的窗口计算：取覆盖这些窗口的尾部价格。
+            tail_start = base.count - period + 1
+            tail_means, tail_stds = rolling(self._prices[tail_start:], period)
+            means = base.series[0] + tail_means[period - 1 :]
+            stds = base.series[1] + tail_stds[period - 1 :]
+        return (means, stds), ()
+
+    def _ema_from(
+        self,
+        period: int,
+        *,
+        base: _SeriesEntry | None,
+    ) -> tuple[tuple[Series, ...], tuple[float, ...] | None]:
+        if period <= 0 or period > self.size:
+            return ([None] * self.size,), None
+
+        if base is None:
+            series: Series = [None] * self.size
+            start = period
+            ema = self.sma(period)[period - 1]
+            series[period - 1] = ema
+        else:
+            series = base.series[0] + [None] * (self.size - base.count)
+            start = base.count
+            (ema,) = base.state
+
+        smoothing = 2.0 / (period + 1.0)
+        prices = self._prices
+        for index in range(start, self.size):
+            ema = (prices[index] - ema) * smoothing + ema
+            series[index] = ema
+        return (series,), (ema,)
+
+    def _rsi_from(
+        self,
+        period: int,
+        *,
+        base: _SeriesEntry | None,
+    ) -> tuple[tuple[Series, ...], tuple[float, ...] | None]:
+        if period <= 0 or period >= self.size:
+            return ([None] * self.size,), None
+
+        prices = self._prices
+        if base is None:
+            series: Series = [None] * self.size
+            average_gain = 0.0
+            average_loss = 0.0
+            for index in range(1, period + 1):
+                delta = prices[index] - prices[index - 1]
+                if delta > 0:
+                    average_gain += delta
+                else:
+                    average_loss -= delta
+            average_gain /= period
+            average_loss /= period
+            series[period] = _rsi_value(average_gain, average_loss)
+            start = period + 1
+        else:
+            series = base.series[0] + [None] * (self.size - base.count)
+            average_gain, average_loss = base.state
+            start = base.count
+
+        for index in range(start, self.size):
+            delta = prices[index] - prices[index - 1]
+            average_gain = (average_gain * (period - 1) + max(delta, 0.0)) / period
+            average_loss = (average_loss * (period - 1) + max(-delta, 0.0)) / period
+            series[index] = _rsi_value(average_gain, average_loss)
+        return (series,), (average_gain, average_loss)
+
+    def _macd_from(
+        self,
+        fast: int,
+        slow: int,
+        signal: int,
+        *,
+        base: _SeriesEntry | None,
+    ) -> tuple[tuple[Series, ...], tuple[float, ...] | None]:
+        size = self.size
+        if slow <= 0 or slow > size:
+            return ([None] * size, [None] * size, [None] * size), None
+
+        fast_series = self.ema(fast)
+        slow_series = self.ema(slow)
+        start = slow - 1
+        first_signal = start + signal - 1
+        if base is None:
+            macd_line: Series = [None] * size
+            signal_line: Series = [None] * size
+            histogram: Series = [None] * size
+            macd_start = start
+        else:
+            padding = [None] * (size - base.count)
+            macd_line = base.series[0] + padding
+            signal_line = base.series[1] + padding
+            histogram = base.series[2] + padding
+            macd_start = base.count
+
+        for index in range(macd_start, size):
+            macd_line[index] = fast_series[index] - slow_series[index]
+
+        if signal <= 0 or first_signal >= size:
+            return (macd_line, signal_line, histogram), None
+
+        smoothing = 2.0 / (signal + 1.0)
+        if base is None:
+            value = math.fsum(macd_line[start : first_signal + 1]) / signal
+            signal_line[first_signal] = value
+            histogram[first_signal] = macd_line[first_signal] - value
+            signal_start = first_signal + 1
+        else:
+            (value,) = base.state
+            signal_start = base.count
+        for index in range(signal_start, size):
+            value = (macd_line[index] - value) * smoothing + value
+            signal_line[index] = value
+            histogram[index] = macd_line[index] - value
+        return (macd_line, signal_line, histogram), (value,)
+
+
+def _rsi_value(average_gain: float, average_loss: float) -> float:
+    if average_loss == 0 and average_gain == 0:
+        return 50.0
+    if average_loss == 0:
+        return 100.0
+    return 100.0 - (100.0 / (1.0 + average_gain / average_loss))
+
+
+def _rolling_python(prices: list[float], period: int) -> tuple[Series, Series]:
+    size = len(prices)
+    means: Series = [None] * size
+    stds: Series = [None] * size
+    mean = 0.0
+    m2 = 0.0
+    for index in range(period - 1, size):
+        if (index - period + 1) % _ROLLING_BLOCK == 0:
+            window = prices[index - period + 1 : index + 1]
+            mean = sum(window) / period
+            m2 = sum((price - mean) ** 2 for price in window)
+        else:
+            incoming, dropped = prices[index], prices[index - period]
+            previous = mean
+            mean = previous + (incoming - dropped) / period
+            m2 += (incoming - dropped) * (incoming - mean + dropped - previous)
+        means[index] = mean
+        stds[index] = math.sqrt(max(m2 / period, 0.0))
+    return means, stds
+
+
+def _rolling_numpy(prices: list[float], period: int) -> tuple[Series, Series]:
+    values = np.asarray(prices, dtype=np.float64)
+    count = values.size - period + 1
+    block = max(period, _ROLLING_BLOCK)
+    blocks = -(-count // block)
+    span = block + period - 1
+    pad = blocks * block + period - 1 - values.size
+    if pad > 0:
+        values = np.concatenate((values, np.full(pad, values[-1])))
+    # 第 k 段覆盖起点落在 [k*block, (k+1)*block) 的全部窗口，段内中心化后再做前缀和。
+    segments = np.lib.stride_tricks.sliding_window_view(values, span)[::block]
+    center = segments.mean(axis=1, keepdims=True)
+    centered = segments - center
+    prefix = np.zeros((blocks, span + 1), dtype=np.float64)
+    np.cumsum(centered, axis=1, out=prefix[:, 1:])
+    window_mean = (prefix[:, period : period + block] - prefix[:, :block]) / period
+    np.cumsum(centered * centered, axis=1, out=prefix[:, 1:])
+    window_sq = (prefix[:, period : period + block] - prefix[:, :block]) / period
+    window_std = np.sqrt(np.maximum(window_sq - window_mean * window_mean, 0.0))
+    padding: Series = [None] * (period - 1)
+    return (
+        padding + (window_mean + center).ravel()[:count].tolist(),
+        padding + window_std.ravel()[:count].tolist(),
+    )
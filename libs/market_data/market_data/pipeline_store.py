@@ -7,9 +7,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
+GLOBAL_COVERAGE_SCOPE = "global"
+
+_TICK = timedelta(microseconds=1)
+
 
 @dataclass(frozen=True)
 class SyncedSymbolRecord:
@@ -22,10 +26,30 @@ class SyncedSymbolRecord:
     synced_at: datetime
 
 
+@dataclass(frozen=True)
+class CoverageSegment:
+    """已同步的闭区间及其 bar 数；同一序列的段互不重叠。"""
+
+    start: datetime
+    end: datetime
+    row_count: int
+
+    def overlap_rows(self, start: datetime, end: datetime) -> float:
+        lo, hi = max(self.start, start), min(self.end, end)
+        if lo > hi:
+            return 0.0
+        if lo == self.start and hi == self.end:
+            return float(self.row_count)
+        # 部分重叠时按时间占比估算。
+        span = (self.end - self.start) + _TICK
+        return self.row_count * (((hi - lo) + _TICK) / span)
+
+
 class InMemoryMarketDataPipelineStore:
     def __init__(self) -> None:
         self._synced_symbols: dict[str, dict[str, SyncedSymbolRecord]] = {}
         self._sync_results: dict[str, dict[str, dict[str, Any]]] = {}
+        self._coverage: dict[tuple[str, str, str], list[CoverageSegment]] = {}
 
     def record_synced_symbol(
         self,
@@ -61,3 +85,79 @@ class InMemoryMarketDataPipelineStore:
     def get_sync_result(self, *, user_id: str, task_id: str) -> dict[str, Any] | None:
         return self._sync_results.get(user_id, {}).get(task_id)
 
+    def record_coverage(
+        self,
+        *,
+        scope: str,
+        symbol: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        row_count: int,
+    ) -> list[CoverageSegment]:
+        """登记 `[start, end]` 已同步；与已有段重叠的部分被新段取代，相邻段合并。"""
+
+        key = (scope, symbol, timeframe)
+        kept: list[CoverageSegment] = []
+        for segment in self._coverage.get(key, []):
+            if segment.end < start or segment.start > end:
+                kept.append(segment)
+                continue
+            if segment.start < start:
+                head_end = start - _TICK
+                kept.append(
+                    CoverageSegment(segment.start, head_end, round(segment.overlap_rows(segment.start, head_end)))
+                )
+            if segment.end > end:
+                tail_start = end + _TICK
+                kept.append(
+                    CoverageSegment(tail_start, segment.end, round(segment.overlap_rows(tail_start, segment.end)))
+                )
+        kept.append(CoverageSegment(start, end, int(row_count)))
+
+        merged: list[CoverageSegment] = []
+        for segment in sorted(kept, key=lambda item: item.start):
+            if merged and segment.start <= merged[-1].end + _TICK:
+                previous = merged[-1]
+                merged[-1] = CoverageSegment(
+                    previous.start,
+                    max(previous.end, segment.end),
+                    previous.row_count + segment.row_count,
+                )
+            else:
+                merged.append(segment)
+        self._coverage[key] = merged
+        return list(merged)
+
+    def list_coverage(self, *, scope: str, symbol: str, timeframe: str) -> list[CoverageSegment]:
+        return list(self._coverage.get((scope, symbol, timeframe), []))
+
+    def missing_ranges(
+        self,
+        *,
+        scope: str,
+        symbol: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+    ) -> list[tuple[datetime, datetime]]:
+        gaps: list[tuple[datetime, datetime]] = []
+        cursor = start
+        for segment in self._coverage.get((scope, symbol, timeframe), []):
+            if segment.end < cursor:
+                continue
+            if segment.start > end:
+                break
+            if segment.start > cursor:
+                gaps.append((cursor, segment.start - _TICK))
+            cursor = max(cursor, segment.end + _TICK)
+            if cursor > end:
+                break
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def covered_row_count(self, *, scope: str, symbol: str, timeframe: str, start: datetime, end: datetime) -> int:
+        return round(
+            sum(segment.overlap_rows(start, end) for segment in self._coverage.get((scope, symbol, timeframe), []))
+        )
@@ -1,28 +1,117 @@
-"""简易滑动窗口限流器。"""
+"""限流器：按 key 的 GCRA 限流，以及共享上游的自适应令牌桶。"""
 
 from __future__ import annotations
 
+import threading
 import time
-from collections import deque
 
+from platform_core.rate_limit import GCRARateLimiter, InMemoryRateLimitBackend, RateLimitBackend
 
-class SlidingWindowRateLimiter:
-    def __init__(self, *, max_requests: int, window_seconds: int, clock=time.monotonic) -> None:
-        self._max_requests = max_requests
-        self._window_seconds = window_seconds
+__all__ = [
+    "AdaptiveTokenBucket",
+    "GCRARateLimiter",
+    "InMemoryRateLimitBackend",
+    "RateLimitBackend",
+]
+
+# 补充令牌的浮点误差可能让令牌数停在 1 以下极小处，对应的等待时长小于时钟精度、永远等不到。
+_TOKEN_EPSILON = 1e-9
+
+
+class AdaptiveTokenBucket:
+    """多个 worker 共享的上游令牌桶。
+
+    按 `rate_per_second` 补充令牌，`capacity` 限制突发。上游返回限流时调用 `penalize`：
+    速率减半（不低于 `min_rate_per_second`），并在冷却期内暂停发放；此后每次 `reward`
+    线性恢复到基准速率（AIMD）。
+    """
+
+    def __init__(
+        self,
+        *,
+        rate_per_second: float,
+        capacity: float | None = None,
+        min_rate_per_second: float | None = None,
+        cooldown_seconds: float = 1.0,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ) -> None:
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be > 0")
+        self._base_rate = float(rate_per_second)
+        self._rate = self._base_rate
+        self._min_rate = float(min_rate_per_second or self._base_rate / 16.0)
+        self._capacity = max(float(capacity if capacity is not None else rate_per_second), 1.0)
+        self._cooldown_seconds = max(float(cooldown_seconds), 0.0)
         self._clock = clock
-        self._events: dict[str, deque[float]] = {}
+        self._sleep = sleep
+        self._tokens = self._capacity
+        self._updated_at = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._counters = {"acquired": 0, "waits": 0, "penalties": 0, "timeouts": 0}
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, **kwargs) -> "AdaptiveTokenBucket":
+        return cls(rate_per_second=float(requests_per_minute) / 60.0, **kwargs)
+
+    def _refill_locked(self, now: float) -> None:
+        if now <= self._updated_at:
+            return
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    def acquire(self, *, timeout: float | None = None) -> bool:
+        """阻塞直到取得一个令牌；超过 `timeout` 秒仍未取得时返回 False。"""
 
-    def consume(self, key: str) -> bool:
-        now = self._clock()
-        events = self._events.setdefault(key, deque())
-        lower_bound = now - self._window_seconds
+        deadline = None if timeout is None else self._clock() + max(float(timeout), 0.0)
+        waited = False
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill_locked(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1.0 - _TOKEN_EPSILON:
+                    self._tokens = max(self._tokens - 1.0, 0.0)
+                    self._counters["acquired"] += 1
+                    if waited:
+                        self._counters["waits"] += 1
+                    return True
+                else:
+                    wait = (1.0 - self._tokens) / self._rate
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._counters["timeouts"] += 1
+                        return False
+                    wait = min(wait, remaining)
+            waited = True
+            self._sleep(wait)
 
-        while events and events[0] <= lower_bound:
-            events.popleft()
+    def penalize(self, *, retry_after: float | None = None) -> None:
+        with self._lock:
+            now = self._clock()
+            self._refill_locked(now)
+            self._rate = max(self._rate / 2.0, self._min_rate)
+            self._tokens = 0.0
+            pause = retry_after if retry_after is not None else self._cooldown_seconds
+            self._paused_until = max(self._paused_until, now + max(float(pause), 0.0))
+            # 冷却期内不累积令牌。
+            self._updated_at = self._paused_until
+            self._counters["penalties"] += 1
 
-        if len(events) >= self._max_requests:
-            return False
+    def reward(self) -> None:
+        with self._lock:
+            if self._rate < self._base_rate:
+                self._refill_locked(self._clock())
+                self._rate = min(self._base_rate, self._rate + self._base_rate / 16.0)
 
-        events.append(now)
-        return True
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            return {
+                **self._counters,
+                "ratePerSecond": self._rate,
+                "baseRatePerSecond": self._base_rate,
+                "capacity": self._capacity,
+            }
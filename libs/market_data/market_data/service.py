@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
-import math
+import threading
 import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, TypeVar
 
-from market_data.cache import InMemoryTTLCache
+from market_data.bar_store import LocalBarStore, format_bound, timeframe_period
+from market_data.cache import BoundedTTLCache
 from market_data.domain import (
     BatchQuoteItem,
     MarketAsset,
@@ -15,12 +19,17 @@ from market_data.domain import (
     MarketDataError,
     MarketQuote,
     RateLimitExceededError,
+    UpstreamRateLimitedError,
     UpstreamTimeoutError,
     UpstreamUnavailableError,
 )
+from market_data.history_cache import HistoryCache, _parse_bounds
+from market_data.indicators import IndicatorCache, IndicatorEngine
 from market_data.provider import MarketDataProvider
-from market_data.rate_limit import SlidingWindowRateLimiter
-from market_data.pipeline_store import InMemoryMarketDataPipelineStore
+from market_data.rate_limit import AdaptiveTokenBucket, GCRARateLimiter, RateLimitBackend
+from market_data.pipeline_store import GLOBAL_COVERAGE_SCOPE, InMemoryMarketDataPipelineStore
+
+_T = TypeVar("_T")
 
 
 @dataclass
@@ -44,18 +53,54 @@ class MarketDataService:
         quote_cache_ttl_seconds: int = 3,
         rate_limit_max_requests: int = 20,
         rate_limit_window_seconds: int = 10,
-        cache: InMemoryTTLCache | None = None,
-        quote_rate_limiter: SlidingWindowRateLimiter | None = None,
+        cache: BoundedTTLCache | None = None,
+        quote_rate_limiter: GCRARateLimiter | None = None,
+        rate_limit_backend: RateLimitBackend | None = None,
         pipeline_store: InMemoryMarketDataPipelineStore | None = None,
+        history_cache: HistoryCache | None = None,
+        indicator_cache: IndicatorCache | None = None,
+        bar_store: LocalBarStore | None = None,
+        upstream_bucket: AdaptiveTokenBucket | None = None,
+        upstream_rate_limit_retries: int = 3,
+        quote_stale_ttl_seconds: float | None = None,
+        quote_refresh_workers: int = 2,
+        hot_quote_symbols: list[str] | None = None,
+        hot_quote_refresh_seconds: float | None = None,
     ) -> None:
         self._provider = provider
         self._quote_cache_ttl_seconds = quote_cache_ttl_seconds
-        self._cache = cache or InMemoryTTLCache()
-        self._quote_rate_limiter = quote_rate_limiter or SlidingWindowRateLimiter(
+        # 设置硬 TTL 后启用 stale-while-revalidate：`quote_cache_ttl_seconds` 作为软 TTL。
+        self._quote_stale_ttl_seconds = (
+            max(float(quote_stale_ttl_seconds), float(quote_cache_ttl_seconds))
+            if quote_stale_ttl_seconds is not None
+            else None
+        )
+        self._quote_refresh_workers = max(1, int(quote_refresh_workers))
+        self._quote_refresh_pool: ThreadPoolExecutor | None = None
+        self._quote_refreshing: set[str] = set()
+        self._quote_refresh_lock = threading.Lock()
+        self._hot_quote_symbols = self._normalize_symbols(hot_quote_symbols or [])
+        self._hot_quote_refresh_seconds = max(
+            0.1, float(hot_quote_refresh_seconds if hot_quote_refresh_seconds is not None else quote_cache_ttl_seconds)
+        )
+        self._hot_quote_stop = threading.Event()
+        self._hot_quote_thread: threading.Thread | None = None
+        self._cache = cache or BoundedTTLCache()
+        # 传入共享 `rate_limit_backend` 时多个副本执行同一份按用户限额。
+        self._quote_rate_limiter = quote_rate_limiter or GCRARateLimiter(
             max_requests=rate_limit_max_requests,
             window_seconds=rate_limit_window_seconds,
+            backend=rate_limit_backend,
         )
         self._pipeline_store = pipeline_store or InMemoryMarketDataPipelineStore()
+        self._history_cache = history_cache or HistoryCache()
+        self._indicator_cache = indicator_cache or IndicatorCache()
+        self._bar_store = bar_store
+        # 未显式传入时按 provider 声明的文档限额构建共享令牌桶。
+        if upstream_bucket is None and getattr(provider, "upstream_requests_per_minute", None):
+            upstream_bucket = AdaptiveTokenBucket.per_minute(float(provider.upstream_requests_per_minute))
+        self._upstream_bucket = upstream_bucket
+        self._upstream_rate_limit_retries = max(0, int(upstream_rate_limit_retries))
 
     @staticmethod
     def _normalize_symbol(symbol: str) -> str:
@@ -202,18 +247,22 @@ class MarketDataService:
         normalized_symbol = self._normalize_symbol(symbol)
         self._consume_quote_limit(user_id=user_id)
 
-        cache_key = f"quote:{normalized_symbol}"
-        cached = self._cache.get(cache_key)
-        if cached is not None:
-            return QuoteResult(quote=cached, cache_hit=True, source="cache")
-
         try:
-            quote = self._provider.quote(symbol=normalized_symbol)
+            quote, state = self._cache.get_or_load_with_state(
+                f"quote:{normalized_symbol}",
+                loader=lambda: self._call_upstream(lambda: self._provider.quote(symbol=normalized_symbol)),
+                **self._quote_cache_ttls(),
+            )
         except Exception as exc:  # noqa: BLE001
             raise self._map_provider_error(exc) from exc
 
-        self._cache.set(cache_key, quote, ttl_seconds=self._quote_cache_ttl_seconds)
-        return QuoteResult(quote=quote, cache_hit=False, source="provider")
+        if state == "loaded":
+            return QuoteResult(quote=quote, cache_hit=False, source="provider")
+        if state == "stale":
+            self._schedule_quote_refresh([normalized_symbol])
+            return QuoteResult(quote=quote, cache_hit=True, source="stale")
+        # 并发未命中时跟随者复用领跑者的回源结果，同样视为缓存命中。
+        return QuoteResult(quote=quote, cache_hit=True, source="cache")
 
     def get_quote(self, *, user_id: str, symbol: str) -> QuoteResult:
         return self.get_latest_quote(user_id=user_id, symbol=symbol)
@@ -225,30 +274,44 @@ class MarketDataService:
             return BatchQuoteResult(items=[], timestamp=timestamp)
 
         self._consume_quote_limit(user_id=user_id)
+        return self._batch_quotes(normalized_symbols, timestamp=timestamp)
+
+    def get_shared_quotes(self, *, symbols: list[str]) -> BatchQuoteResult:
+        """不计入按用户限额的批量报价，供流网关等自行合并上游请求的内部调用方读取共享快照。
 
+        上游开销仍受缓存与共享令牌桶约束；对外接口必须走 `get_quotes` 按用户限流。
+        """
+
+        normalized_symbols = self._normalize_symbols(symbols)
+        timestamp = int(time.time())
+        if not normalized_symbols:
+            return BatchQuoteResult(items=[], timestamp=timestamp)
+        return self._batch_quotes(normalized_symbols, timestamp=timestamp)
+
+    def _batch_quotes(self, normalized_symbols: list[str], *, timestamp: int) -> BatchQuoteResult:
         cached_quotes: dict[str, MarketQuote] = {}
+        stale_symbols: list[str] = []
         missed_symbols: list[str] = []
         for symbol in normalized_symbols:
             cache_key = f"quote:{symbol}"
-            cached = self._cache.get(cache_key)
-            if cached is not None:
-                cached_quotes[symbol] = cached
-            else:
+            cached = self._cache.peek(cache_key)
+            if cached is None:
                 missed_symbols.append(symbol)
+                continue
+            cached_quotes[symbol] = cached[0]
+            if cached[1]:
+                stale_symbols.append(symbol)
 
         fetched_quotes: dict[str, MarketQuote] = {}
         if missed_symbols:
             try:
-                if hasattr(self._provider, "batch_quote"):
-                    fetched_quotes = self._provider.batch_quote(symbols=missed_symbols)
-                else:
-                    fetched_quotes = {symbol: self._provider.quote(symbol=symbol) for symbol in missed_symbols}
+                fetched_quotes = self._fetch_quotes(missed_symbols)
             except Exception as exc:  # noqa: BLE001
                 raise self._map_provider_error(exc) from exc
+            self._store_quotes(fetched_quotes)
 
-            for symbol, quote in fetched_quotes.items():
-                cache_key = f"quote:{self._normalize_symbol(symbol)}"
-                self._cache.set(cache_key, quote, ttl_seconds=self._quote_cache_ttl_seconds)
+        if stale_symbols:
+            self._schedule_quote_refresh(stale_symbols)
 
         items: list[BatchQuoteItem] = []
         for symbol in normalized_symbols:
@@ -259,7 +322,7 @@ class MarketDataService:
                         quote=cached_quotes[symbol],
                         status="ok",
                         cache_hit=True,
-                        source="cache",
+                        source="stale" if symbol in stale_symbols else "cache",
                     )
                 )
                 continue
@@ -290,6 +353,93 @@ class MarketDataService:
 
         return BatchQuoteResult(items=items, timestamp=timestamp)
 
+    def _quote_cache_ttls(self) -> dict[str, float | None]:
+        if self._quote_stale_ttl_seconds is None:
+            return {"ttl_seconds": self._quote_cache_ttl_seconds, "stale_after_seconds": None}
+        return {"ttl_seconds": self._quote_stale_ttl_seconds, "stale_after_seconds": self._quote_cache_ttl_seconds}
+
+    def _fetch_quotes(self, symbols: list[str]) -> dict[str, MarketQuote]:
+        # 报价回源与历史回源共用上游令牌桶与限流退避。
+        if hasattr(self._provider, "batch_quote"):
+            return self._call_upstream(lambda: self._provider.batch_quote(symbols=symbols))
+        return {
+            symbol: self._call_upstream(lambda symbol=symbol: self._provider.quote(symbol=symbol)) for symbol in symbols
+        }
+
+    def _store_quotes(self, quotes: dict[str, MarketQuote]) -> None:
+        ttls = self._quote_cache_ttls()
+        for symbol, quote in quotes.items():
+            self._cache.set(f"quote:{self._normalize_symbol(symbol)}", quote, **ttls)
+
+    def _schedule_quote_refresh(self, symbols: list[str]) -> None:
+        """后台刷新过期报价；同一 symbol 已在刷新中时不重复提交。"""
+
+        with self._quote_refresh_lock:
+            pending = [symbol for symbol in symbols if symbol not in self._quote_refreshing]
+            if not pending:
+                return
+            self._quote_refreshing.update(pending)
+            if self._quote_refresh_pool is None:
+                self._quote_refresh_pool = ThreadPoolExecutor(
+                    max_workers=self._quote_refresh_workers,
+                    thread_name_prefix="market-data-quote-refresh",
+                )
+            pool = self._quote_refresh_pool
+        try:
+            pool.submit(self._refresh_quotes, pending)
+        except RuntimeError:
+            # 线程池已关闭：放弃本次刷新，旧值在硬 TTL 到期前继续可用。
+            with self._quote_refresh_lock:
+                self._quote_refreshing.difference_update(pending)
+
+    def _refresh_quotes(self, symbols: list[str]) -> None:
+        try:
+            self._store_quotes(self._fetch_quotes(symbols))
+        except Exception:  # noqa: BLE001
+            # 刷新失败保留旧值，下次读取时再尝试。
+            pass
+        finally:
+            with self._quote_refresh_lock:
+                self._quote_refreshing.difference_update(symbols)
+
+    def refresh_hot_quotes(self) -> int:
+        """同步刷新热点 symbol 的报价，返回刷新成功的数量。"""
+
+        if not self._hot_quote_symbols:
+            return 0
+        try:
+            quotes = self._fetch_quotes(self._hot_quote_symbols)
+        except Exception:  # noqa: BLE001
+            return 0
+        self._store_quotes(quotes)
+        return len(quotes)
+
+    def start_hot_quote_refresher(self) -> bool:
+        """启动后台线程按 `hot_quote_refresh_seconds` 周期预热热点报价；未配置热点集时不启动。"""
+
+        if not self._hot_quote_symbols or self._hot_quote_thread is not None:
+            return False
+        self._hot_quote_stop.clear()
+
+        def _loop() -> None:
+            while not self._hot_quote_stop.is_set():
+                self.refresh_hot_quotes()
+                self._hot_quote_stop.wait(self._hot_quote_refresh_seconds)
+
+        self._hot_quote_thread = threading.Thread(target=_loop, name="market-data-hot-quotes", daemon=True)
+        self._hot_quote_thread.start()
+        return True
+
+    def close(self, *, wait: bool = False) -> None:
+        self._hot_quote_stop.set()
+        thread, self._hot_quote_thread = self._hot_quote_thread, None
+        if thread is not None:
+            thread.join(timeout=self._hot_quote_refresh_seconds)
+        with self._quote_refresh_lock:
+            pool, self._quote_refresh_pool = self._quote_refresh_pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
     def provider_health(self, *, user_id: str) -> dict:
         del user_id
         payload: dict = {
@@ -313,6 +463,13 @@ class MarketDataService:
                     }
                 )
 
+        payload["quoteCache"] = self._cache.stats()
+        payload["historyCache"] = self._history_cache.stats()
+        payload["indicatorCache"] = self._indicator_cache.stats()
+        if self._bar_store is not None:
+            payload["barStore"] = self._bar_store.stats()
+        if self._upstream_bucket is not None:
+            payload["upstreamBucket"] = self._upstream_bucket.stats()
         payload["timestamp"] = int(time.time())
         return payload
 
@@ -327,16 +484,221 @@ class MarketDataService:
         limit: int | None = None,
     ) -> list[MarketCandle]:
         del user_id
-        try:
-            return self._provider.history(
+        return self._load_history(
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            timeframe=timeframe,
+            limit=limit,
+        )
+
+    def _load_history(
+        self,
+        *,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        timeframe: str,
+        limit: int | None,
+        refresh: bool = False,
+    ) -> list[MarketCandle]:
+        normalized_symbol = self._normalize_symbol(symbol)
+
+        def _fetch() -> list[MarketCandle]:
+            return self._read_through_bar_store(
+                symbol=normalized_symbol,
+                start_date=start_date,
+                end_date=end_date,
+                timeframe=timeframe,
+                limit=limit,
+                refresh=refresh,
+            )
+
+        return self._history_cache.get_or_load(
+            symbol=normalized_symbol,
+            timeframe=timeframe,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+            loader=_fetch,
+            refresh=refresh,
+        )
+
+    def iter_history(
+        self,
+        *,
+        user_id: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        timeframe: str = "1Day",
+        limit: int | None = None,
+    ) -> Iterator[list[MarketCandle]]:
+        """按页流式产出历史 K 线，供长区间导出/同步以有界内存消费。
+
+        本地 bar 存储完整覆盖时直接读取；否则逐页回源，每页单独取令牌，且不写入历史缓存。
+        provider 不支持分页时退化为整段一次性产出。
+        """
+
+        del user_id
+        normalized_symbol = self._normalize_symbol(symbol)
+        fetch = {"symbol": normalized_symbol, "timeframe": timeframe}
+        if self._bar_store is not None and self._bar_store.missing_ranges(
+            **fetch, start_date=start_date, end_date=end_date
+        ) == []:
+            yield from self._bar_store.iter_stored(**fetch, start_date=start_date, end_date=end_date, limit=limit)
+            return
+
+        for candles, _last in self._history_pages(**fetch, start_date=start_date, end_date=end_date, limit=limit):
+            if candles:
+                yield candles
+
+    def _history_pages(
+        self,
+        *,
+        symbol: str,
+        timeframe: str,
+        start_date: str,
+        end_date: str,
+        limit: int | None = None,
+    ) -> Iterator[tuple[list[MarketCandle], bool]]:
+        """逐页回源，产出 (本页 bar, 是否最后一页)；provider 不支持分页时整段作为唯一一页。"""
+
+        fetch = {"symbol": symbol, "timeframe": timeframe}
+        history_page = getattr(self._provider, "history_page", None)
+        if history_page is None:
+            yield self._fetch_history(**fetch, start_date=start_date, end_date=end_date, limit=limit), True
+            return
+
+        remaining = limit
+        page_token: str | None = None
+        while remaining is None or remaining > 0:
+            candles, page_token = self._call_upstream(
+                lambda token=page_token, page_limit=remaining: history_page(
+                    **fetch,
+                    start_date=start_date,
+                    end_date=end_date,
+                    limit=page_limit,
+                    page_token=token,
+                )
+            )
+            if remaining is not None:
+                candles = candles[:remaining]
+                remaining -= len(candles)
+            last = not page_token or not candles or remaining == 0
+            yield candles, last
+            if last:
+                return
+
+    def _call_upstream(self, call: Callable[[], _T]) -> _T:
+        """回源调用；配置共享令牌桶时先取令牌，上游限流则退避重试。"""
+
+        bucket = self._upstream_bucket
+        attempt = 0
+        while True:
+            if bucket is not None:
+                bucket.acquire()
+            try:
+                result = call()
+            except UpstreamRateLimitedError as exc:
+                if bucket is None or attempt >= self._upstream_rate_limit_retries:
+                    raise
+                bucket.penalize(retry_after=exc.retry_after)
+                attempt += 1
+                continue
+            except Exception as exc:  # noqa: BLE001
+                raise self._map_provider_error(exc) from exc
+            if bucket is not None:
+                bucket.reward()
+            return result
+
+    def _fetch_history(
+        self,
+        *,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        timeframe: str,
+        limit: int | None,
+    ) -> list[MarketCandle]:
+        return self._call_upstream(
+            lambda: self._provider.history(
                 symbol=symbol,
                 start_date=start_date,
                 end_date=end_date,
                 timeframe=timeframe,
                 limit=limit,
             )
-        except Exception as exc:  # noqa: BLE001
-            raise self._map_provider_error(exc) from exc
+        )
+
+    def _write_bars(
+        self,
+        store: LocalBarStore,
+        *,
+        symbol: str,
+        timeframe: str,
+        candles: list[MarketCandle],
+        start_date: str,
+        end_date: str,
+    ) -> None:
+        """写入本地 bar 存储，并失效历史缓存中与写入区间重叠的条目。"""
+
+        store.write(
+            symbol=symbol,
+            timeframe=timeframe,
+            candles=candles,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        self._history_cache.invalidate(symbol=symbol, timeframe=timeframe, start_date=start_date, end_date=end_date)
+
+    def _read_through_bar_store(
+        self,
+        *,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        timeframe: str,
+        limit: int | None,
+        refresh: bool,
+    ) -> list[MarketCandle]:
+        """优先读本地 bar 存储，只为未覆盖的子区间回源并写回，再与已覆盖部分合并返回。
+
+        回源结果整段写入本地（仍在形成的 bar 同样落盘，只是不登记覆盖），因此补齐缺口后区间内的
+        本地数据即为完整结果。带 `limit` 的查询若缺口之前的已覆盖前缀已凑够 `limit` 根则直接本地返回，
+        否则整段回源：截断结果不能登记为完整覆盖。
+        """
+
+        store = self._bar_store
+        fetch = {"symbol": symbol, "timeframe": timeframe}
+        if store is None:
+            return self._fetch_history(**fetch, start_date=start_date, end_date=end_date, limit=limit)
+
+        if refresh:
+            candles = self._fetch_history(**fetch, start_date=start_date, end_date=end_date, limit=None)
+            self._write_bars(store, **fetch, candles=candles, start_date=start_date, end_date=end_date)
+            return candles[:limit] if limit is not None else candles
+
+        gaps = store.missing_ranges(**fetch, start_date=start_date, end_date=end_date)
+        if gaps is None:
+            return self._fetch_history(**fetch, start_date=start_date, end_date=end_date, limit=limit)
+        if gaps and limit is not None:
+            prefix_end = format_bound(gaps[0][0] - timedelta(microseconds=1), end_of_range=True)
+            if store.count_bars(**fetch, start_date=start_date, end_date=prefix_end) < limit:
+                return self._fetch_history(**fetch, start_date=start_date, end_date=end_date, limit=limit)
+            return store.read_stored(**fetch, start_date=start_date, end_date=prefix_end, limit=limit)
+
+        for gap_lo, gap_hi in gaps:
+            gap_start = format_bound(gap_lo, end_of_range=False)
+            gap_end = format_bound(gap_hi, end_of_range=True)
+            candles = self._fetch_history(**fetch, start_date=gap_start, end_date=gap_end, limit=None)
+            self._write_bars(store, **fetch, candles=candles, start_date=gap_start, end_date=gap_end)
+
+        if not gaps:
+            candles = store.read(**fetch, start_date=start_date, end_date=end_date, limit=limit)
+            if candles is not None:
+                return candles
+        return store.read_stored(**fetch, start_date=start_date, end_date=end_date, limit=limit)
 
     def sync_market_data(
         self,
@@ -346,57 +708,253 @@ class MarketDataService:
         start_date: str,
         end_date: str,
         timeframe: str = "1Day",
+        coverage_scope: str = "user",
+        full_refresh: bool = False,
+        max_workers: int = 1,
+        on_progress: Callable[[dict[str, Any]], None] | None = None,
     ) -> dict[str, Any]:
-        """同步行情数据（迁移期：以 provider.history 抽样拉取）。"""
+        """增量同步行情数据：只回源尚未覆盖的子区间，并把请求区间并入已同步覆盖。
+
+        `coverage_scope="global"` 时覆盖区间跨用户共享；配置本地 bar 存储时以其覆盖为准，
+        `full_refresh=True` 时整段重新拉取。`max_workers > 1` 时按 symbol 并发同步，
+        回源共享上游令牌桶；每完成一个 symbol 以当前部分结果回调 `on_progress`。
+        """
 
         normalized_symbols = self._normalize_symbols(symbols)
-        results: list[dict[str, Any]] = []
-        success_count = 0
-        failure_count = 0
+        scope = self._coverage_scope_key(user_id=user_id, coverage_scope=coverage_scope)
+        completed: dict[str, dict[str, Any]] = {}
+        lock = threading.Lock()
+
+        def _report(*, final: bool) -> dict[str, Any]:
+            ordered = [completed[symbol] for symbol in normalized_symbols if symbol in completed]
+            ok_items = [item for item in ordered if item["status"] == "ok"]
+            summary = {
+                "totalSymbols": len(normalized_symbols),
+                "successCount": len(ok_items),
+                "failureCount": len(ordered) - len(ok_items),
+                "startDate": start_date,
+                "endDate": end_date,
+                "timeframe": timeframe,
+                "coverageScope": scope if scope == GLOBAL_COVERAGE_SCOPE else "user",
+                "fetchedBarCount": sum(item["fetchedBarCount"] for item in ok_items),
+                "skippedBarCount": sum(item["skippedBarCount"] for item in ok_items),
+            }
+            if not final:
+                summary["completedSymbols"] = len(ordered)
+            return {"summary": summary, "items": ordered}
+
+        def _run(symbol: str) -> None:
+            item = self._sync_item(
+                user_id=user_id,
+                scope=scope,
+                symbol=symbol,
+                start_date=start_date,
+                end_date=end_date,
+                timeframe=timeframe,
+                full_refresh=full_refresh,
+            )
+            with lock:
+                completed[symbol] = item
+                if on_progress is not None and len(completed) < len(normalized_symbols):
+                    on_progress(_report(final=False))
+
+        workers = min(max(int(max_workers), 1), max(len(normalized_symbols), 1))
+        if workers == 1:
+            for symbol in normalized_symbols:
+                _run(symbol)
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="market-data-sync") as pool:
+                for future in as_completed([pool.submit(_run, symbol) for symbol in normalized_symbols]):
+                    future.result()
 
-        for symbol in normalized_symbols:
-            try:
-                rows = self.get_history(
-                    user_id=user_id,
+        return _report(final=True)
+
+    def _sync_item(
+        self,
+        *,
+        user_id: str,
+        scope: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        timeframe: str,
+        full_refresh: bool,
+    ) -> dict[str, Any]:
+        try:
+            outcome = self._sync_symbol(
+                scope=scope,
+                symbol=symbol,
+                start_date=start_date,
+                end_date=end_date,
+                timeframe=timeframe,
+                full_refresh=full_refresh,
+            )
+        except Exception as exc:  # noqa: BLE001
+            mapped = self._map_provider_error(exc)
+            return {
+                "symbol": symbol,
+                "status": "error",
+                "errorCode": mapped.code,
+                "errorMessage": mapped.message,
+                "retryable": mapped.retryable,
+            }
+
+        row_count = outcome["fetchedBarCount"] + outcome["skippedBarCount"]
+        self._pipeline_store.record_synced_symbol(
+            user_id=user_id,
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            timeframe=timeframe,
+            row_count=row_count,
+        )
+        return {"symbol": symbol, "status": "ok", "rowCount": row_count, **outcome}
+
+    @staticmethod
+    def _coverage_scope_key(*, user_id: str, coverage_scope: str) -> str:
+        normalized = (coverage_scope or "user").strip().lower()
+        if normalized == GLOBAL_COVERAGE_SCOPE:
+            return GLOBAL_COVERAGE_SCOPE
+        if normalized != "user":
+            raise MarketDataError(
+                code="INVALID_COVERAGE_SCOPE",
+                message="coverage scope must be one of: user, global",
+                retryable=False,
+            )
+        return f"user:{user_id}"
+
+    def _sync_symbol(
+        self,
+        *,
+        scope: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        timeframe: str,
+        full_refresh: bool,
+    ) -> dict[str, Any]:
+        bounds = _parse_bounds(start_date, end_date)
+        if bounds is None:
+            # 无法解析的区间无法计算缺口，退化为整段回源。
+            rows = self._load_history(
+                symbol=symbol,
+                start_date=start_date,
+                end_date=end_date,
+                timeframe=timeframe,
+                limit=None,
+                refresh=True,
+            )
+            return {
+                "fetchedBarCount": len(rows),
+                "skippedBarCount": 0,
+                "fetchedRanges": [{"startDate": start_date, "endDate": end_date}],
+            }
+
+        lo, hi = bounds
+        if full_refresh:
+            gaps = [bounds]
+        elif self._bar_store is not None:
+            gaps = self._bar_store.missing_ranges(
+                symbol=symbol,
+                timeframe=timeframe,
+                start_date=start_date,
+                end_date=end_date,
+            ) or []
+        else:
+            gaps = self._pipeline_store.missing_ranges(scope=scope, symbol=symbol, timeframe=timeframe, start=lo, end=hi)
+
+        fetched = 0
+        fetched_ranges: list[dict[str, str]] = []
+        for gap_lo, gap_hi in gaps:
+            gap_start = format_bound(gap_lo, end_of_range=False)
+            gap_end = format_bound(gap_hi, end_of_range=True)
+            if self._bar_store is not None:
+                fetched += self._sync_gap_to_store(
+                    self._bar_store,
                     symbol=symbol,
-                    start_date=start_date,
-                    end_date=end_date,
                     timeframe=timeframe,
+                    gap_lo=gap_lo,
+                    gap_hi=gap_hi,
                 )
-                self._pipeline_store.record_synced_symbol(
-                    user_id=user_id,
+            else:
+                # 强制回源：先失效与缺口重叠的旧缓存，再刷新历史缓存。
+                self._history_cache.invalidate(
+                    symbol=symbol, timeframe=timeframe, start_date=gap_start, end_date=gap_end
+                )
+                rows = self._load_history(
                     symbol=symbol,
-                    start_date=start_date,
-                    end_date=end_date,
+                    start_date=gap_start,
+                    end_date=gap_end,
                     timeframe=timeframe,
-                    row_count=len(rows),
+                    limit=None,
+                    refresh=True,
                 )
-                results.append({"symbol": symbol, "status": "ok", "rowCount": len(rows)})
-                success_count += 1
-            except Exception as exc:  # noqa: BLE001
-                mapped = self._map_provider_error(exc)
-                results.append(
-                    {
-                        "symbol": symbol,
-                        "status": "error",
-                        "errorCode": mapped.code,
-                        "errorMessage": mapped.message,
-                        "retryable": mapped.retryable,
-                    }
-                )
-                failure_count += 1
+                fetched += len(rows)
+            fetched_ranges.append({"startDate": gap_start, "endDate": gap_end})
+
+        if self._bar_store is not None:
+            total = self._bar_store.count_bars(symbol=symbol, timeframe=timeframe, start_date=start_date, end_date=end_date)
+            skipped = max(total - fetched, 0)
+        elif full_refresh:
+            skipped = 0
+        else:
+            skipped = self._pipeline_store.covered_row_count(
+                scope=scope,
+                symbol=symbol,
+                timeframe=timeframe,
+                start=lo,
+                end=hi,
+            )
 
-        return {
-            "summary": {
-                "totalSymbols": len(normalized_symbols),
-                "successCount": success_count,
-                "failureCount": failure_count,
-                "startDate": start_date,
-                "endDate": end_date,
-                "timeframe": timeframe,
-            },
-            "items": results,
-        }
+        # 覆盖只登记到已收盘的 bar，仍在形成的部分留给下次同步。
+        covered_hi = min(hi, datetime.now(timezone.utc) - timeframe_period(timeframe))
+        if covered_hi >= lo:
+            self._pipeline_store.record_coverage(
+                scope=scope,
+                symbol=symbol,
+                timeframe=timeframe,
+                start=lo,
+                end=covered_hi,
+                row_count=fetched + skipped,
+            )
+        return {"fetchedBarCount": fetched, "skippedBarCount": skipped, "fetchedRanges": fetched_ranges}
+
+    def _sync_gap_to_store(
+        self,
+        store: LocalBarStore,
+        *,
+        symbol: str,
+        timeframe: str,
+        gap_lo: datetime,
+        gap_hi: datetime,
+    ) -> int:
+        """逐页回源缺口并逐页写入本地 bar 存储，内存占用以单页为界。
+
+        每页登记的区间从上一页末 bar 之后到本页末 bar，最后一页延伸到缺口终点；
+        中途失败时已写入的页面仍保留其覆盖，下次同步只补剩余部分。
+        """
+
+        fetched = 0
+        cursor = gap_lo
+        pages = self._history_pages(
+            symbol=symbol,
+            timeframe=timeframe,
+            start_date=format_bound(gap_lo, end_of_range=False),
+            end_date=format_bound(gap_hi, end_of_range=True),
+        )
+        for candles, last in pages:
+            page_hi = gap_hi if last or not candles else max(candle.timestamp for candle in candles)
+            self._write_bars(
+                store,
+                symbol=symbol,
+                timeframe=timeframe,
+                candles=candles,
+                start_date=format_bound(cursor, end_of_range=False),
+                end_date=format_bound(page_hi, end_of_range=True),
+            )
+            fetched += len(candles)
+            cursor = page_hi + timedelta(microseconds=1)
+        return fetched
 
     def record_sync_result(self, *, user_id: str, task_id: str, result: dict[str, Any]) -> None:
         self._pipeline_store.record_sync_result(user_id=user_id, task_id=task_id, result=result)
@@ -430,20 +988,6 @@ class MarketDataService:
             return None
         return parsed
 
-    @staticmethod
-    def _ema_series(values: list[float], period: int) -> list[float]:
-        if period <= 0 or len(values) < period:
-            return []
-
-        smoothing = 2.0 / (period + 1.0)
-        seed = sum(values[:period]) / float(period)
-        series = [seed]
-        ema = seed
-        for value in values[period:]:
-            ema = (value - ema) * smoothing + ema
-            series.append(ema)
-        return series
-
     @staticmethod
     def _extract_indicator_parameters(spec: dict[str, Any]) -> dict[str, Any]:
         metadata: dict[str, Any] = {}
@@ -506,7 +1050,14 @@ class MarketDataService:
             output['period'] = period
         return output
 
-    def _calculate_sma_indicator(self, *, close_prices: list[float], spec: dict[str, Any]) -> dict[str, Any]:
+    @staticmethod
+    def _wants_series(spec: dict[str, Any]) -> bool:
+        raw = spec.get('series')
+        if isinstance(raw, str):
+            return raw.strip().lower() in {'1', 'true', 'yes'}
+        return bool(raw)
+
+    def _calculate_sma_indicator(self, *, engine: IndicatorEngine, spec: dict[str, Any]) -> dict[str, Any]:
         period = self._parse_positive_int(spec.get('period'), default=20)
         if period is None:
             return self._build_unsupported_indicator(
@@ -514,21 +1065,23 @@ class MarketDataService:
                 metadata=self._extract_indicator_parameters(spec),
             )
 
-        if len(close_prices) < period:
+        if engine.size < period:
             return self._build_insufficient_indicator(
                 name='sma',
                 metadata={
                     'period': period,
                     'requiredDataPoints': period,
-                    'actualDataPoints': len(close_prices),
+                    'actualDataPoints': engine.size,
                 },
             )
 
-        window = close_prices[-period:]
-        value = sum(window) / float(period)
-        return self._build_ok_indicator(name='sma', value=value, metadata={'period': period})
+        series = engine.sma(period)
+        output = self._build_ok_indicator(name='sma', value=series[-1], metadata={'period': period})
+        if self._wants_series(spec):
+            output['series'] = series
+        return output
 
-    def _calculate_ema_indicator(self, *, close_prices: list[float], spec: dict[str, Any]) -> dict[str, Any]:
+    def _calculate_ema_indicator(self, *, engine: IndicatorEngine, spec: dict[str, Any]) -> dict[str, Any]:
         period = self._parse_positive_int(spec.get('period'), default=20)
         if period is None:
             return self._build_unsupported_indicator(
@@ -536,20 +1089,23 @@ class MarketDataService:
                 metadata=self._extract_indicator_parameters(spec),
             )
 
-        ema_series = self._ema_series(close_prices, period)
-        if not ema_series:
+        if engine.size < period:
             return self._build_insufficient_indicator(
                 name='ema',
                 metadata={
                     'period': period,
                     'requiredDataPoints': period,
-                    'actualDataPoints': len(close_prices),
+                    'actualDataPoints': engine.size,
                 },
             )
 
-        return self._build_ok_indicator(name='ema', value=ema_series[-1], metadata={'period': period})
+        series = engine.ema(period)
+        output = self._build_ok_indicator(name='ema', value=series[-1], metadata={'period': period})
+        if self._wants_series(spec):
+            output['series'] = series
+        return output
 
-    def _calculate_rsi_indicator(self, *, close_prices: list[float], spec: dict[str, Any]) -> dict[str, Any]:
+    def _calculate_rsi_indicator(self, *, engine: IndicatorEngine, spec: dict[str, Any]) -> dict[str, Any]:
         period = self._parse_positive_int(spec.get('period'), default=14)
         if period is None:
             return self._build_unsupported_indicator(
@@ -558,38 +1114,27 @@ class MarketDataService:
             )
 
         required_points = period + 1
-        if len(close_prices) < required_points:
+        if engine.size < required_points:
             return self._build_insufficient_indicator(
                 name='rsi',
                 metadata={
                     'period': period,
                     'requiredDataPoints': required_points,
-                    'actualDataPoints': len(close_prices),
+                    'actualDataPoints': engine.size,
                 },
             )
 
-        prices = close_prices[-required_points:]
-        deltas = [
-            prices[idx] - prices[idx - 1]
-            for idx in range(1, len(prices))
-        ]
-        gains = [max(delta, 0.0) for delta in deltas]
-        losses = [abs(min(delta, 0.0)) for delta in deltas]
-
-        average_gain = sum(gains) / float(period)
-        average_loss = sum(losses) / float(period)
-
-        if average_loss == 0 and average_gain == 0:
-            rsi = 50.0
-        elif average_loss == 0:
-            rsi = 100.0
-        else:
-            relative_strength = average_gain / average_loss
-            rsi = 100.0 - (100.0 / (1.0 + relative_strength))
-
-        return self._build_ok_indicator(name='rsi', value=rsi, metadata={'period': period})
+        series = engine.rsi(period)
+        output = self._build_ok_indicator(
+            name='rsi',
+            value=series[-1],
+            metadata={'period': period, 'smoothing': 'wilder'},
+        )
+        if self._wants_series(spec):
+            output['series'] = series
+        return output
 
-    def _calculate_macd_indicator(self, *, close_prices: list[float], spec: dict[str, Any]) -> dict[str, Any]:
+    def _calculate_macd_indicator(self, *, engine: IndicatorEngine, spec: dict[str, Any]) -> dict[str, Any]:
         fast = self._parse_positive_int(spec.get('fast'), default=12)
         slow = self._parse_positive_int(spec.get('slow'), default=26)
         signal = self._parse_positive_int(spec.get('signal'), default=9)
@@ -600,28 +1145,7 @@ class MarketDataService:
                 metadata=self._extract_indicator_parameters(spec),
             )
 
-        if len(close_prices) < slow:
-            return self._build_insufficient_indicator(
-                name='macd',
-                metadata={
-                    'fast': fast,
-                    'slow': slow,
-                    'signal': signal,
-                    'requiredDataPoints': slow,
-                    'actualDataPoints': len(close_prices),
-                },
-            )
-
-        macd_series: list[float] = []
-        for index in range(slow - 1, len(close_prices)):
-            prices = close_prices[: index + 1]
-            fast_series = self._ema_series(prices, fast)
-            slow_series = self._ema_series(prices, slow)
-            if not fast_series or not slow_series:
-                continue
-            macd_series.append(fast_series[-1] - slow_series[-1])
-
-        if not macd_series:
+        if engine.size < slow:
             return self._build_insufficient_indicator(
                 name='macd',
                 metadata={
@@ -629,16 +1153,17 @@ class MarketDataService:
                     'slow': slow,
                     'signal': signal,
                     'requiredDataPoints': slow,
-                    'actualDataPoints': len(close_prices),
+                    'actualDataPoints': engine.size,
                 },
             )
 
-        signal_series = self._ema_series(macd_series, signal)
-        macd_value = macd_series[-1]
-        signal_value = signal_series[-1] if signal_series else macd_value
+        macd_line, signal_line, histogram_line = engine.macd(fast, slow, signal)
+        macd_value = macd_line[-1]
+        # 信号线尚未完成预热时以 MACD 值代替，柱状图为 0。
+        signal_value = signal_line[-1] if signal_line[-1] is not None else macd_value
         histogram = macd_value - signal_value
 
-        return self._build_ok_indicator(
+        output = self._build_ok_indicator(
             name='macd',
             value=macd_value,
             metadata={
@@ -649,8 +1174,13 @@ class MarketDataService:
                 'histogram': histogram,
             },
         )
+        if self._wants_series(spec):
+            output['series'] = macd_line
+            output['signalSeries'] = signal_line
+            output['histogramSeries'] = histogram_line
+        return output
 
-    def _calculate_bollinger_indicator(self, *, close_prices: list[float], spec: dict[str, Any]) -> dict[str, Any]:
+    def _calculate_bollinger_indicator(self, *, engine: IndicatorEngine, spec: dict[str, Any]) -> dict[str, Any]:
         period = self._parse_positive_int(spec.get('period'), default=20)
         std_dev = self._parse_positive_float(spec.get('stdDev') or spec.get('std_dev'), default=2.0)
 
@@ -660,34 +1190,33 @@ class MarketDataService:
                 metadata=self._extract_indicator_parameters(spec),
             )
 
-        if len(close_prices) < period:
+        if engine.size < period:
             return self._build_insufficient_indicator(
                 name='bollinger',
                 metadata={
                     'period': period,
                     'stdDev': std_dev,
                     'requiredDataPoints': period,
-                    'actualDataPoints': len(close_prices),
+                    'actualDataPoints': engine.size,
                 },
             )
 
-        window = close_prices[-period:]
-        middle = sum(window) / float(period)
-        variance = sum((price - middle) ** 2 for price in window) / float(period)
-        deviation = math.sqrt(variance)
-        upper = middle + std_dev * deviation
-        lower = middle - std_dev * deviation
-
-        return self._build_ok_indicator(
+        middle, upper, lower = engine.bollinger(period, std_dev)
+        output = self._build_ok_indicator(
             name='bollinger',
-            value=middle,
+            value=middle[-1],
             metadata={
                 'period': period,
                 'stdDev': std_dev,
-                'upperBand': upper,
-                'lowerBand': lower,
+                'upperBand': upper[-1],
+                'lowerBand': lower[-1],
             },
         )
+        if self._wants_series(spec):
+            output['series'] = middle
+            output['upperSeries'] = upper
+            output['lowerSeries'] = lower
+        return output
 
     def calculate_indicators(
         self,
@@ -699,7 +1228,10 @@ class MarketDataService:
         timeframe: str,
         indicators: list[dict[str, Any]],
     ) -> dict[str, Any]:
-        """计算技术指标（SMA/EMA/RSI/MACD/BOLL）。"""
+        """计算技术指标（SMA/EMA/RSI/MACD/BOLL）。
+
+        指标 spec 带 `series: true` 时额外返回与 `timestamps` 对齐的全序列（预热期为 null）。
+        """
 
         normalized_symbol = self._normalize_symbol(symbol)
         rows = self.get_history(
@@ -709,7 +1241,13 @@ class MarketDataService:
             end_date=end_date,
             timeframe=timeframe,
         )
-        close_prices = [float(row.close_price) for row in rows]
+        # 指标序列按 (symbol, timeframe, startDate) 跨请求缓存并绑定 bar 指纹，新 bar 到达时续算。
+        engine = IndicatorEngine(
+            [float(row.close_price) for row in rows],
+            timestamps=[row.timestamp for row in rows],
+            cache=self._indicator_cache,
+            cache_scope=(normalized_symbol, timeframe, start_date),
+        )
 
         calculators = {
             'sma': self._calculate_sma_indicator,
@@ -733,15 +1271,18 @@ class MarketDataService:
                 )
                 continue
 
-            outputs.append(calculator(close_prices=close_prices, spec=spec))
+            outputs.append(calculator(engine=engine, spec=spec))
 
-        return {
+        result = {
             'symbol': normalized_symbol,
             'startDate': start_date,
             'endDate': end_date,
             'timeframe': timeframe,
             'indicators': outputs,
         }
+        if any('series' in item for item in outputs):
+            result['timestamps'] = [row.timestamp.isoformat() for row in rows]
+        return result
 
     def boundary_check(self, *, user_id: str, symbols: list[str]) -> dict[str, Any]:
         """边界一致性校验：对账预期 symbols 与已同步 symbols。"""
@@ -1,7 +1,16 @@
-"""market_data 实时流网关（in-memory 基线）。"""
+"""market_data 实时流网关（in-memory 基线）。
+
+按 symbol 多路复用：网关维护 symbol → 订阅的反向索引，每个 tick 对全部订阅 symbol 的并集
+只做一次批量报价，再按订阅过滤分发；每个订阅记录已推送的报价，未变化的报价不重复推送。
+上游开销随不同 symbol 数增长，而不是随订阅数 × symbol 数增长。
+共享快照应通过 `snapshot_reader` 读取（不计入任何单个用户的报价限额）；上游失败按 symbol 记录，
+只影响订阅了这些 symbol 的订阅。
+"""
 
 from __future__ import annotations
 
+import threading
+import time
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -46,17 +55,36 @@ class MarketDataStreamGateway:
     def __init__(
         self,
         *,
-        quote_reader: Callable[[str, list[str]], BatchQuoteResult],
+        quote_reader: Callable[[str, list[str]], BatchQuoteResult] | None = None,
+        snapshot_reader: Callable[[list[str]], BatchQuoteResult] | None = None,
         max_symbols_per_subscription: int = 20,
         max_subscriptions_per_user: int = 5,
         max_connections_per_user: int = 3,
+        snapshot_ttl_seconds: float = 1.0,
+        tick_user_id: str = "stream-gateway",
+        clock: Callable[[], float] = time.monotonic,
     ) -> None:
-        self._quote_reader = quote_reader
+        if snapshot_reader is None:
+            if quote_reader is None:
+                raise ValueError("quote_reader or snapshot_reader is required")
+            # 兼容只提供按用户读取的调用方：以网关自身身份计入上游限额。
+            snapshot_reader = lambda symbols: quote_reader(tick_user_id, symbols)  # noqa: E731
+        self._snapshot_reader = snapshot_reader
+        # 共享快照的有效期：期内的 poll 直接复用上一次批量报价结果。
+        self._snapshot_ttl_seconds = max(0.0, float(snapshot_ttl_seconds))
+        self._clock = clock
         self._max_symbols_per_subscription = max_symbols_per_subscription
         self._max_subscriptions_per_user = max_subscriptions_per_user
         self._max_connections_per_user = max_connections_per_user
         self._subscriptions: dict[str, dict[str, StreamSubscription]] = {}
         self._connections: dict[str, set[str]] = {}
+        self._symbol_subscribers: dict[str, set[tuple[str, str]]] = {}
+        self._snapshot: dict[str, BatchQuoteItem] = {}
+        self._snapshot_at: float | None = None
+        self._symbol_errors: dict[str, MarketDataError] = {}
+        self._last_sent: dict[str, dict[str, tuple[Any, ...]]] = {}
+        self._lock = threading.RLock()
+        self._counters = {"ticks": 0, "symbolsFetched": 0, "eventsSent": 0, "eventsSuppressed": 0}
         self._status = "ok"
         self._fallback_hint: str | None = None
         self._last_error_code: str | None = None
@@ -144,7 +172,10 @@ class MarketDataStreamGateway:
             created_at=now,
             updated_at=now,
         )
-        user_subscriptions[subscription.id] = subscription
+        with self._lock:
+            user_subscriptions[subscription.id] = subscription
+            for symbol in subscription.symbols:
+                self._symbol_subscribers.setdefault(symbol, set()).add((user_id, subscription.id))
         return subscription
 
     def list_subscriptions(self, *, user_id: str) -> list[StreamSubscription]:
@@ -154,13 +185,30 @@ class MarketDataStreamGateway:
         user_subscriptions = self._subscriptions.get(user_id)
         if user_subscriptions is None:
             return False
-        removed = user_subscriptions.pop(subscription_id, None)
-        if not user_subscriptions:
-            self._subscriptions.pop(user_id, None)
+        with self._lock:
+            removed = user_subscriptions.pop(subscription_id, None)
+            if not user_subscriptions:
+                self._subscriptions.pop(user_id, None)
+            if removed is not None:
+                self._unindex_locked(removed)
         return removed is not None
 
     def clear_subscriptions(self, *, user_id: str) -> None:
-        self._subscriptions.pop(user_id, None)
+        with self._lock:
+            for subscription in self._subscriptions.pop(user_id, {}).values():
+                self._unindex_locked(subscription)
+
+    def _unindex_locked(self, subscription: StreamSubscription) -> None:
+        self._last_sent.pop(subscription.id, None)
+        for symbol in subscription.symbols:
+            subscribers = self._symbol_subscribers.get(symbol)
+            if subscribers is None:
+                continue
+            subscribers.discard((subscription.user_id, subscription.id))
+            if not subscribers:
+                self._symbol_subscribers.pop(symbol, None)
+                self._snapshot.pop(symbol, None)
+                self._symbol_errors.pop(symbol, None)
 
     def _set_degraded(self, *, error_code: str, error_message: str) -> None:
         self._status = "degraded"
@@ -193,42 +241,100 @@ class MarketDataStreamGateway:
             "askPrice": quote.ask_price,
         }
 
-    def poll_events(self, *, user_id: str, subscription_id: str) -> list[dict[str, Any]]:
-        subscription = self._subscriptions.get(user_id, {}).get(subscription_id)
-        if subscription is None:
-            raise StreamGatewayError(
-                code="STREAM_SUBSCRIPTION_NOT_FOUND",
-                message="subscription not found",
-            )
+    @staticmethod
+    def _quote_signature(item: BatchQuoteItem) -> tuple[Any, ...]:
+        quote = item.quote
+        if quote is None:
+            return ()
+        return (
+            quote.price,
+            quote.previous_close,
+            quote.open_price,
+            quote.high_price,
+            quote.low_price,
+            quote.volume,
+            quote.bid_price,
+            quote.ask_price,
+            quote.timestamp,
+        )
 
+    def _refresh_snapshot_locked(self) -> None:
+        """对全部订阅 symbol 的并集做一次批量报价。"""
+
+        symbols = sorted(self._symbol_subscribers)
+        self._snapshot_at = self._clock()
+        self._counters["ticks"] += 1
+        self._symbol_errors = {}
+        if not symbols:
+            self._snapshot = {}
+            return
+        self._fetch_locked(symbols)
+
+    def _fetch_locked(self, symbols: list[str]) -> None:
+        """拉取指定 symbol；失败只记在这些 symbol 上，其余 symbol 的快照不受影响。"""
+
+        self._counters["symbolsFetched"] += len(symbols)
         try:
-            result = self._quote_reader(user_id, list(subscription.symbols))
+            result = self._snapshot_reader(symbols)
         except MarketDataError as exc:
-            self._set_degraded(error_code=exc.code, error_message=exc.message)
-            return [
-                {
-                    "type": "stream.degraded",
-                    "symbol": "*",
-                    "timestamp": self._now_iso(),
-                    "channel": subscription.channel,
-                    "subscriptionId": subscription.id,
-                    "payload": {
-                        "status": "degraded",
-                        "errorCode": exc.code,
-                        "errorMessage": exc.message,
-                        "fallbackHint": self._fallback_hint,
-                    },
-                }
-            ]
+            for symbol in symbols:
+                self._symbol_errors[symbol] = exc
+            return
+        for symbol in symbols:
+            self._symbol_errors.pop(symbol, None)
+        self._snapshot.update({item.symbol: item for item in result.items})
+
+    def _ensure_snapshot_locked(self, symbols: list[str]) -> None:
+        """快照过期时整体刷新；未过期但缺少新订阅的 symbol 时只补拉缺失部分。"""
+
+        if self._snapshot_at is None or self._clock() - self._snapshot_at >= self._snapshot_ttl_seconds:
+            self._refresh_snapshot_locked()
+            return
+
+        missing = [symbol for symbol in symbols if symbol not in self._snapshot and symbol not in self._symbol_errors]
+        if missing:
+            self._fetch_locked(missing)
+
+    def _degraded_event(self, *, subscription: StreamSubscription, code: str, message: str) -> dict[str, Any]:
+        return {
+            "type": "stream.degraded",
+            "symbol": "*",
+            "timestamp": self._now_iso(),
+            "channel": subscription.channel,
+            "subscriptionId": subscription.id,
+            "payload": {
+                "status": "degraded",
+                "errorCode": code,
+                "errorMessage": message,
+                "fallbackHint": self._fallback_hint,
+            },
+        }
+
+    def _events_for_locked(self, subscription: StreamSubscription) -> list[dict[str, Any]]:
+        """按订阅过滤当前快照；只输出自上次推送以来发生变化的报价。"""
+
+        errors = [self._symbol_errors[symbol] for symbol in subscription.symbols if symbol in self._symbol_errors]
+        if errors and len(errors) == len(subscription.symbols):
+            error = errors[0]
+            self._set_degraded(error_code=error.code, error_message=error.message)
+            return [self._degraded_event(subscription=subscription, code=error.code, message=error.message)]
 
+        sent = self._last_sent.setdefault(subscription.id, {})
         events: list[dict[str, Any]] = []
         error_count = 0
 
-        for item in result.items:
-            if item.status != "ok" or item.quote is None:
+        for symbol in subscription.symbols:
+            item = self._snapshot.get(symbol)
+            if symbol in self._symbol_errors or item is None or item.status != "ok" or item.quote is None:
                 error_count += 1
                 continue
 
+            signature = self._quote_signature(item)
+            if sent.get(symbol) == signature:
+                self._counters["eventsSuppressed"] += 1
+                continue
+            sent[symbol] = signature
+
             events.append(
                 {
                     "type": "market.quote",
@@ -239,6 +345,7 @@ class MarketDataStreamGateway:
                     "payload": self._quote_payload(item),
                 }
             )
+        self._counters["eventsSent"] += len(events)
 
         if error_count > 0:
             self._set_degraded(
@@ -246,25 +353,47 @@ class MarketDataStreamGateway:
                 error_message="partial quote fetch failure",
             )
             events.append(
-                {
-                    "type": "stream.degraded",
-                    "symbol": "*",
-                    "timestamp": self._now_iso(),
-                    "channel": subscription.channel,
-                    "subscriptionId": subscription.id,
-                    "payload": {
-                        "status": "degraded",
-                        "errorCode": "STREAM_PARTIAL_DEGRADED",
-                        "errorMessage": "partial quote fetch failure",
-                        "fallbackHint": self._fallback_hint,
-                    },
-                }
+                self._degraded_event(
+                    subscription=subscription,
+                    code="STREAM_PARTIAL_DEGRADED",
+                    message="partial quote fetch failure",
+                )
             )
         else:
             self._set_ok()
 
         return events
 
+    def poll_events(self, *, user_id: str, subscription_id: str) -> list[dict[str, Any]]:
+        subscription = self._subscriptions.get(user_id, {}).get(subscription_id)
+        if subscription is None:
+            raise StreamGatewayError(
+                code="STREAM_SUBSCRIPTION_NOT_FOUND",
+                message="subscription not found",
+            )
+
+        with self._lock:
+            self._ensure_snapshot_locked(subscription.symbols)
+            return self._events_for_locked(subscription)
+
+    def tick(self, *, subscription_ids: set[str] | None = None) -> dict[str, list[dict[str, Any]]]:
+        """刷新一次共享快照并分发，返回 subscriptionId → 待推送事件（无变化的订阅省略）。
+
+        `subscription_ids` 限定参与分发的订阅，其余订阅（如仍走 poll 的连接）的推送状态不受影响。
+        """
+
+        with self._lock:
+            self._refresh_snapshot_locked()
+            fanout: dict[str, list[dict[str, Any]]] = {}
+            for user_subscriptions in self._subscriptions.values():
+                for subscription in user_subscriptions.values():
+                    if subscription_ids is not None and subscription.id not in subscription_ids:
+                        continue
+                    events = self._events_for_locked(subscription)
+                    if events:
+                        fanout[subscription.id] = events
+            return fanout
+
     def health(self, *, user_id: str | None = None) -> dict[str, Any]:
         if user_id is None:
             active_connections = sum(len(rows) for rows in self._connections.values())
@@ -281,6 +410,8 @@ class MarketDataStreamGateway:
             "lastErrorCode": self._last_error_code,
             "lastErrorMessage": self._last_error_message,
             "updatedAt": self._updated_at.isoformat(),
+            "subscribedSymbols": len(self._symbol_subscribers),
+            "fanout": dict(self._counters),
         }
 
 
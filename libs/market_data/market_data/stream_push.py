@@ -0,0 +1,153 @@
+"""market_data 服务端推送流（asyncio）。
+
+每个进程一个后台生产者任务：按 `refresh_interval_seconds` 调用网关 `tick()`，
+把多路复用后的事件分发到各连接的发送队列。
+
+发送队列有界并带合并（conflation）语义：同一订阅同一 symbol 的待发事件只保留最新一条；
+队列满时丢弃最旧的待发事件。慢消费者只会少收中间态，不会拖慢生产者或占用无界内存。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from typing import Any
+
+from market_data.stream_gateway import MarketDataStreamGateway
+
+
+class ConflatingEventQueue:
+    def __init__(self, *, max_size: int = 256) -> None:
+        self._max_size = max(1, int(max_size))
+        self._pending: OrderedDict[tuple[str, str, str], dict[str, Any]] = OrderedDict()
+        self._ready = asyncio.Event()
+        self._counters = {"enqueued": 0, "conflated": 0, "dropped": 0, "delivered": 0}
+
+    @staticmethod
+    def _key(event: dict[str, Any]) -> tuple[str, str, str]:
+        return (
+            str(event.get("subscriptionId") or ""),
+            str(event.get("symbol") or ""),
+            str(event.get("type") or ""),
+        )
+
+    def put(self, event: dict[str, Any]) -> None:
+        key = self._key(event)
+        self._counters["enqueued"] += 1
+        if key in self._pending:
+            # 原位替换：保持排队位置，避免高频 symbol 持续插队。
+            self._pending[key] = event
+            self._counters["conflated"] += 1
+        else:
+            if len(self._pending) >= self._max_size:
+                self._pending.popitem(last=False)
+                self._counters["dropped"] += 1
+            self._pending[key] = event
+        self._ready.set()
+
+    async def get(self) -> dict[str, Any]:
+        while not self._pending:
+            self._ready.clear()
+            await self._ready.wait()
+        _, event = self._pending.popitem(last=False)
+        self._counters["delivered"] += 1
+        return event
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> dict[str, int]:
+        return {**self._counters, "pending": len(self._pending)}
+
+
+class MarketDataPushStream:
+    def __init__(
+        self,
+        *,
+        gateway: MarketDataStreamGateway,
+        refresh_interval_seconds: float = 1.0,
+        queue_size: int = 256,
+    ) -> None:
+        self._gateway = gateway
+        self._refresh_interval_seconds = max(0.01, float(refresh_interval_seconds))
+        self._queue_size = max(1, int(queue_size))
+        self._routes: dict[str, ConflatingEventQueue] = {}
+        self._queues: set[ConflatingEventQueue] = set()
+        self._producer: asyncio.Task | None = None
+        self._ticks = 0
+        self._tick_errors = 0
+
+    def open_queue(self) -> ConflatingEventQueue:
+        """为一个连接创建发送队列，并确保生产者任务在当前事件循环中运行。"""
+
+        queue = ConflatingEventQueue(max_size=self._queue_size)
+        self._queues.add(queue)
+        if self._producer is None or self._producer.done():
+            self._producer = asyncio.get_running_loop().create_task(self._produce())
+        return queue
+
+    def close_queue(self, queue: ConflatingEventQueue) -> None:
+        self._queues.discard(queue)
+        for subscription_id in [key for key, routed in self._routes.items() if routed is queue]:
+            self._routes.pop(subscription_id, None)
+
+    def attach(self, *, subscription_id: str, queue: ConflatingEventQueue) -> None:
+        self._routes[subscription_id] = queue
+
+    def detach(self, *, subscription_id: str) -> None:
+        self._routes.pop(subscription_id, None)
+
+    async def tick_once(self) -> int:
+        """执行一次刷新并分发，返回入队事件数。网关调用上游是同步的，放到线程中执行。"""
+
+        fanout = await asyncio.to_thread(self._gateway.tick, subscription_ids=set(self._routes))
+        self._ticks += 1
+        delivered = 0
+        for subscription_id, events in fanout.items():
+            queue = self._routes.get(subscription_id)
+            if queue is None:
+                continue
+            for event in events:
+                queue.put(event)
+                delivered += 1
+        return delivered
+
+    async def _produce(self) -> None:
+        # 最后一个连接关闭后退出，下一个连接到来时重新启动。
+        while self._queues:
+            if self._routes:
+                try:
+                    await self.tick_once()
+                except Exception:  # noqa: BLE001
+                    self._tick_errors += 1
+            await asyncio.sleep(self._refresh_interval_seconds)
+
+    async def stop(self) -> None:
+        producer, self._producer = self._producer, None
+        if producer is None:
+            return
+        producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+
+    def stats(self) -> dict[str, Any]:
+        dropped = sum(queue.stats()["dropped"] for queue in self._queues)
+        conflated = sum(queue.stats()["conflated"] for queue in self._queues)
+        return {
+            "connections": len(self._queues),
+            "routedSubscriptions": len(self._routes),
+            "ticks": self._ticks,
+            "tickErrors": self._tick_errors,
+            "refreshIntervalSeconds": self._refresh_interval_seconds,
+            "dropped": dropped,
+            "conflated": conflated,
+            "producerRunning": self._producer is not None and not self._producer.done(),
+        }
+
+
+__all__ = [
+    "ConflatingEventQueue",
+    "MarketDataPushStream",
+]
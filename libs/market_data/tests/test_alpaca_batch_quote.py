@@ -0,0 +1,78 @@
+"""Alpaca 多 symbol 批量快照测试。"""
+
+from __future__ import annotations
+
+import pytest
+
+from market_data.alpaca_provider import AlpacaProvider
+from market_data.alpaca_transport import AlpacaHTTPTransport, AlpacaTransportConfig
+from market_data.domain import UpstreamUnavailableError
+from market_data.fake_alpaca import FakeAlpacaRequestExecutor, make_snapshot
+from market_data.service import MarketDataService
+
+_CONFIG = AlpacaTransportConfig(api_key="key", api_secret="secret", base_url="https://example.invalid")
+
+
+def _provider(executor: FakeAlpacaRequestExecutor, **kwargs) -> AlpacaProvider:
+    return AlpacaProvider(transport=AlpacaHTTPTransport(config=_CONFIG, request_executor=executor), **kwargs)
+
+
+def _symbols(count: int) -> list[str]:
+    return [f"S{idx:03d}" for idx in range(count)]
+
+
+def test_batch_quote_chunks_symbols_and_fetches_chunks_concurrently():
+    symbols = _symbols(250)
+    executor = FakeAlpacaRequestExecutor(
+        snapshots={symbol: make_snapshot(price=float(idx + 1)) for idx, symbol in enumerate(symbols)},
+        latency_seconds=0.05,
+    )
+
+    quotes = _provider(executor, batch_size=100).batch_quote(symbols=[symbol.lower() for symbol in symbols])
+
+    assert executor.count("/v2/stocks/snapshots") == 3
+    assert executor.count("/v2/stocks/S000/snapshot") == 0
+    assert sorted(len(params["symbols"].split(",")) for _, params in executor.requests) == [50, 100, 100]
+    assert executor.max_in_flight > 1
+    assert len(quotes) == 250
+    assert quotes["S010"].price == 11.0
+    assert quotes["S010"].bid_price == pytest.approx(10.99)
+
+
+def test_batch_quote_degrades_per_symbol_on_partial_failure():
+    symbols = _symbols(6)
+    snapshots = {symbol: make_snapshot(price=10.0) for symbol in symbols if symbol != "S001"}
+    executor = FakeAlpacaRequestExecutor(snapshots=snapshots, failing_symbols={"S004"})
+
+    quotes = _provider(executor, batch_size=3).batch_quote(symbols=symbols)
+
+    # S001 无快照；S003-S005 所在分块失败。
+    assert sorted(quotes) == ["S000", "S002"]
+
+    service = MarketDataService(provider=_provider(executor, batch_size=3))
+    items = {item.symbol: item for item in service.get_quotes(user_id="u-1", symbols=symbols).items}
+    assert items["S000"].status == "ok"
+    assert items["S001"].error_code == "QUOTE_NOT_AVAILABLE"
+    assert items["S005"].status == "error"
+
+
+def test_batch_quote_raises_when_every_chunk_fails():
+    executor = FakeAlpacaRequestExecutor(snapshots={"AAPL": make_snapshot(price=1.0)}, failing_symbols={"AAPL"})
+
+    with pytest.raises(UpstreamUnavailableError):
+        _provider(executor).batch_quote(symbols=["AAPL"])
+
+
+def test_batch_quote_falls_back_to_single_snapshots_without_batch_support():
+    calls: list[str] = []
+
+    def _transport(operation: str, **kwargs):
+        calls.append(operation)
+        if kwargs.get("symbol") == "MSFT":
+            raise RuntimeError("boom")
+        return {"price": 5.0}
+
+    quotes = AlpacaProvider(transport=_transport).batch_quote(symbols=["AAPL", "MSFT", "aapl"])
+
+    assert calls == ["quote", "quote"]
+    assert list(quotes) == ["AAPL"]
@@ -0,0 +1,121 @@
+"""资产目录本地快照与条件刷新测试。"""
+
+from __future__ import annotations
+
+import os
+import time
+
+from market_data.alpaca_transport import AlpacaHTTPTransport, resolve_alpaca_transport_config
+from market_data.catalog_snapshot import AssetCatalogSnapshotStore
+
+
+class _CatalogExecutor:
+    def __init__(self, catalog: list[dict], *, etag: str | None = None) -> None:
+        self.catalog = catalog
+        self.etag = etag
+        self.calls: list[dict[str, str]] = []
+
+    def __call__(self, method: str, path: str, params: dict, headers: dict[str, str], timeout_seconds: float):
+        del method, path, params, timeout_seconds
+        self.calls.append(dict(headers))
+        if self.etag is not None and headers.get("If-None-Match") == self.etag:
+            return 304, {}
+        return 200, list(self.catalog)
+
+    def last_response_headers(self) -> dict[str, str]:
+        return {"ETag": self.etag} if self.etag is not None else {}
+
+
+def _transport(executor, store: AssetCatalogSnapshotStore, **kwargs) -> AlpacaHTTPTransport:
+    return AlpacaHTTPTransport(
+        config=resolve_alpaca_transport_config(api_key="k", api_secret="s"),
+        request_executor=executor,
+        catalog_snapshot=store,
+        **kwargs,
+    )
+
+
+CATALOG = [
+    {"symbol": "AAPL", "name": "Apple", "class": "us_equity", "tradable": True, "id": "x-1", "status": "active"},
+    {"symbol": "MSFT", "name": "Microsoft", "class": "us_equity", "tradable": True, "id": "x-2", "status": "active"},
+]
+
+
+def test_cold_start_serves_search_from_snapshot_without_upstream(tmp_path):
+    store = AssetCatalogSnapshotStore(path=tmp_path / "catalog.json.gz")
+    warm = _CatalogExecutor(CATALOG)
+    _transport(warm, store)("search", keyword="aap", limit=5)
+
+    def _unreachable(**kwargs):
+        raise AssertionError("upstream must not be called")
+
+    restarted = _transport(_unreachable, store)
+    payload = restarted("search", keyword="micro", limit=5)
+
+    assert [item["symbol"] for item in payload["items"]] == ["MSFT"]
+    assert restarted.health()["assetCatalog"]["source"] == "snapshot"
+    # 快照只保存搜索所需字段。
+    assert "id" not in store.load().items[0]
+
+
+def test_stale_snapshot_is_served_while_refreshing_in_background(tmp_path):
+    store = AssetCatalogSnapshotStore(path=tmp_path / "catalog.json.gz")
+    _transport(_CatalogExecutor(CATALOG), store)("search", keyword="", limit=5)
+    stale_at = time.time() - 3600
+    os.utime(store.path, (stale_at, stale_at))
+
+    upstream = _CatalogExecutor([*CATALOG, {"symbol": "NVDA", "name": "Nvidia", "class": "us_equity"}])
+    transport = _transport(upstream, store)
+
+    first = transport("search", keyword="nvda", limit=5)
+    assert transport.wait_for_catalog_refresh(timeout=5)
+    second = transport("search", keyword="nvda", limit=5)
+
+    assert first["items"] == []
+    assert [item["symbol"] for item in second["items"]] == ["NVDA"]
+    catalog = transport.health()["assetCatalog"]
+    assert catalog["lastDiff"] == {"added": 1, "removed": 0, "changed": 0}
+    assert catalog["snapshotWrites"] == 1
+    assert store.load().age_seconds() < 60
+    assert len(store.load().items) == 3
+
+
+def test_refresh_uses_conditional_request_and_keeps_index_on_304(tmp_path):
+    store = AssetCatalogSnapshotStore(path=tmp_path / "catalog.json.gz")
+    upstream = _CatalogExecutor(CATALOG, etag='"v1"')
+    transport = _transport(upstream, store, asset_catalog_cache_ttl_seconds=0)
+
+    transport("search", keyword="aapl", limit=5)
+    index = transport._asset_search_index
+    payload = transport("search", keyword="aapl", limit=5)
+
+    assert "If-None-Match" not in upstream.calls[0]
+    assert upstream.calls[1]["If-None-Match"] == '"v1"'
+    assert payload["items"][0]["symbol"] == "AAPL"
+    assert transport._asset_search_index is index
+    assert transport.health()["assetCatalog"]["notModified"] == 1
+    assert store.load().etag == '"v1"'
+
+
+def test_unchanged_catalog_does_not_rewrite_snapshot(tmp_path):
+    store = AssetCatalogSnapshotStore(path=tmp_path / "catalog.json.gz")
+    transport = _transport(_CatalogExecutor(CATALOG), store, asset_catalog_cache_ttl_seconds=0)
+
+    transport("search", keyword="", limit=5)
+    transport("search", keyword="", limit=5)
+
+    catalog = transport.health()["assetCatalog"]
+    assert catalog["refreshes"] == 2
+    assert catalog["unchanged"] == 1
+    assert catalog["snapshotWrites"] == 1
+
+
+def test_corrupt_snapshot_falls_back_to_upstream(tmp_path):
+    store = AssetCatalogSnapshotStore(path=tmp_path / "catalog.json.gz")
+    store.path.write_bytes(b"not gzip")
+    upstream = _CatalogExecutor(CATALOG)
+
+    payload = _transport(upstream, store)("search", keyword="msft", limit=5)
+
+    assert len(upstream.calls) == 1
+    assert payload["items"][0]["symbol"] == "MSFT"
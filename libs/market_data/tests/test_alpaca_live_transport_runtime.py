@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import time
+
 import pytest
 
 
@@ -78,3 +80,37 @@ def test_alpaca_transport_health_exposes_last_failure_reason():
     assert health["healthy"] is False
     assert health["lastFailureCode"] == "UPSTREAM_AUTH_FAILED"
     assert isinstance(health.get("lastLatencyMs"), int)
+
+
+
+def test_alpaca_http_transport_reads_retry_after_into_rate_limit_error():
+    from market_data.alpaca_transport import AlpacaHTTPTransport, AlpacaTransportConfig
+    from market_data.domain import UpstreamRateLimitedError
+
+    config = AlpacaTransportConfig(api_key="key", api_secret="secret", base_url="https://example.invalid")
+
+    class _Executor:
+        def __init__(self, headers: dict[str, str]) -> None:
+            self._headers = headers
+
+        def __call__(self, *, method, path, params, headers, timeout_seconds):
+            del method, path, params, headers, timeout_seconds
+            return 429, {"message": "rate limited"}
+
+        def last_response_headers(self) -> dict[str, str]:
+            return dict(self._headers)
+
+    with pytest.raises(UpstreamRateLimitedError) as seconds:
+        AlpacaHTTPTransport(config=config, request_executor=_Executor({"Retry-After": "3"}))("quote", symbol="AAPL")
+    assert seconds.value.retry_after == 3.0
+
+    reset = f"{time.time() + 30:.0f}"
+    with pytest.raises(UpstreamRateLimitedError) as epoch:
+        AlpacaHTTPTransport(config=config, request_executor=_Executor({"X-RateLimit-Reset": reset}))(
+            "quote", symbol="AAPL"
+        )
+    assert 25.0 <= epoch.value.retry_after <= 31.0
+
+    with pytest.raises(UpstreamRateLimitedError) as missing:
+        AlpacaHTTPTransport(config=config, request_executor=_Executor({}))("quote", symbol="AAPL")
+    assert missing.value.retry_after is None
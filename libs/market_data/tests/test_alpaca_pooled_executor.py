@@ -0,0 +1,167 @@
+"""market_data keep-alive 连接池 executor 测试。"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from market_data.alpaca_transport import AlpacaHTTPTransport, AlpacaTransportConfig
+from market_data.domain import UpstreamTimeoutError
+from market_data.fake_alpaca import make_snapshot
+from market_data.http_pool import PooledHTTPRequestExecutor
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002
+        del format, args
+
+    def do_GET(self):  # noqa: N802
+        server = self.server
+        with server.lock:
+            server.peers.add(self.client_address)
+            server.accept_encodings.append(self.headers.get("Accept-Encoding"))
+        if self.path.startswith("/slow"):
+            server.release.wait(timeout=2)
+        if self.path.startswith("/v2/assets"):
+            if self.headers.get("If-None-Match") == '"catalog-v1"':
+                self.send_response(304)
+                self.send_header("ETag", '"catalog-v1"')
+                self.end_headers()
+                return
+            body = json.dumps([{"symbol": "AAPL", "name": "Apple"}]).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("ETag", '"catalog-v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        body = json.dumps({"path": self.path, **make_snapshot(price=187.5)}).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(200)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    httpd.lock = threading.Lock()
+    httpd.peers = set()
+    httpd.accept_encodings = []
+    httpd.release = threading.Event()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield httpd
+    finally:
+        httpd.release.set()
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def _base_url(httpd) -> str:
+    return f"http://127.0.0.1:{httpd.server_address[1]}"
+
+
+def test_transport_reuses_connection_and_decodes_gzip(server):
+    executor = PooledHTTPRequestExecutor()
+    transport = AlpacaHTTPTransport(
+        config=AlpacaTransportConfig(api_key="k", api_secret="s", base_url=_base_url(server)),
+        request_executor=executor,
+    )
+
+    for _ in range(5):
+        payload = transport("quote", symbol="AAPL")
+        assert payload["price"] == 187.5
+
+    health = transport.health()
+    assert len(server.peers) == 1
+    assert set(server.accept_encodings) == {"gzip"}
+    assert health["lastConnectionReused"] is True
+    assert health["lastConnectMs"] == 0
+    assert isinstance(health["lastTransferMs"], int)
+    assert health["connectionPool"]["connectionsOpened"] == 1
+    assert health["connectionPool"]["connectionsReused"] == 4
+    assert health["connectionPool"]["gzipResponses"] == 5
+    executor.close()
+
+
+def test_pool_bounds_connections_per_host(server):
+    executor = PooledHTTPRequestExecutor(max_connections_per_host=2)
+    url = f"{_base_url(server)}/slow"
+
+    def call(_):
+        return executor(method="GET", path=url, params={}, headers={}, timeout_seconds=5)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futures = [pool.submit(call, idx) for idx in range(6)]
+        server.release.set()
+        results = [future.result() for future in futures]
+
+    assert all(status == 200 for status, _ in results)
+    assert len(server.peers) <= 2
+    assert executor.stats()["connectionsOpened"] <= 2
+    executor.close()
+
+
+def test_stale_pooled_connection_is_replaced(server):
+    executor = PooledHTTPRequestExecutor()
+    url = f"{_base_url(server)}/v2/stocks/AAPL/snapshot"
+    executor(method="GET", path=url, params={}, headers={}, timeout_seconds=5)
+
+    # 模拟服务端关闭空闲连接。
+    for pool in executor._pools.values():
+        for conn in pool.idle:
+            conn.sock.close()
+
+    status, payload = executor(method="GET", path=url, params={"feed": "iex"}, headers={}, timeout_seconds=5)
+
+    assert status == 200
+    assert payload["path"].endswith("?feed=iex")
+    assert executor.last_timing()["connectionReused"] is False
+    assert executor.stats()["connectionsOpened"] == 2
+    executor.close()
+
+
+def test_timeout_maps_to_upstream_timeout(server):
+    transport = AlpacaHTTPTransport(
+        config=AlpacaTransportConfig(api_key="k", api_secret="s", base_url=f"{_base_url(server)}/slow", timeout_seconds=0.2),
+    )
+
+    with pytest.raises(UpstreamTimeoutError):
+        transport("quote", symbol="AAPL")
+
+    assert transport.health()["lastFailureCode"] == "UPSTREAM_TIMEOUT"
+
+
+def test_catalog_refresh_sends_conditional_request_with_recorded_etag(server):
+    executor = PooledHTTPRequestExecutor()
+    transport = AlpacaHTTPTransport(
+        config=AlpacaTransportConfig(api_key="k", api_secret="s", base_url=_base_url(server)),
+        request_executor=executor,
+        asset_catalog_cache_ttl_seconds=0,
+    )
+
+    first = transport("search", keyword="aapl", limit=5)
+    second = transport("search", keyword="aapl", limit=5)
+
+    assert executor.last_response_headers() == {"ETag": '"catalog-v1"'}
+    assert first == second
+    assert transport.health()["assetCatalog"]["notModified"] == 1
+    assert executor.stats()["connectionsReused"] == 1
+    executor.close()
@@ -52,3 +52,29 @@ def test_alpaca_transport_asset_detail_uses_direct_endpoint():
 
     assert calls == ["https://data.alpaca.markets/v2/assets/AAPL"]
     assert payload["symbol"] == "AAPL"
+
+
+def test_alpaca_transport_search_ranks_from_index_rebuilt_on_refresh():
+    catalog = [
+        {"symbol": "GAAP", "name": "Gaap Holdings", "class": "us_equity"},
+        {"symbol": "AAPL", "name": "Apple", "class": "us_equity"},
+        {"symbol": "", "name": "Broken"},
+    ]
+
+    def _request_executor(method: str, path: str, params: dict[str, object], headers: dict[str, str], timeout_seconds: float):
+        del method, path, params, headers, timeout_seconds
+        return 200, list(catalog)
+
+    transport = AlpacaHTTPTransport(
+        config=resolve_alpaca_transport_config(api_key="k", api_secret="s"),
+        request_executor=_request_executor,
+        asset_catalog_cache_ttl_seconds=0,
+    )
+
+    first = transport("search", keyword="aap", limit=10)
+    catalog.append({"symbol": "AAP", "name": "Advance Auto Parts", "class": "us_equity"})
+    second = transport("search", keyword="aap", limit=10)
+
+    assert [item["symbol"] for item in first["items"]] == ["AAPL", "GAAP"]
+    assert [item["symbol"] for item in second["items"]] == ["AAP", "AAPL", "GAAP"]
+    assert second["items"][0]["assetClass"] == "us_equity"
@@ -252,3 +252,61 @@ def test_indicators_calculate_task_returns_structured_json_contract():
     status_payload = status.json()
     assert status_payload["data"]["status"] == "succeeded"
 
+
+
+def test_sync_task_skips_covered_ranges_and_full_refresh_refetches():
+    client, _service, _job_service = _build_app(provider=_StableProvider())
+    body = {"symbols": ["AAPL", "MSFT"], "startDate": "2026-02-01", "endDate": "2026-02-05"}
+
+    first = client.post("/market/sync-task", json={**body, "idempotencyKey": "idem-inc-1"}).json()["data"]
+    second = client.post("/market/sync-task", json={**body, "idempotencyKey": "idem-inc-2"}).json()["data"]
+    refreshed = client.post(
+        "/market/sync-task",
+        json={**body, "fullRefresh": True, "idempotencyKey": "idem-inc-3"},
+    ).json()["data"]
+
+    assert first["result"]["summary"]["fetchedBarCount"] == 10
+    assert first["result"]["summary"]["skippedBarCount"] == 0
+    assert second["result"]["summary"]["fetchedBarCount"] == 0
+    assert second["result"]["summary"]["skippedBarCount"] == 10
+    assert second["result"]["items"][0]["fetchedRanges"] == []
+    assert refreshed["result"]["summary"]["fetchedBarCount"] == 10
+    assert refreshed["result"]["summary"]["coverageScope"] == "user"
+
+
+def test_sync_task_rejects_unknown_coverage_scope():
+    client, _service, _job_service = _build_app(provider=_StableProvider())
+
+    resp = client.post(
+        "/market/sync-task",
+        json={"symbols": ["AAPL"], "startDate": "2026-02-01", "endDate": "2026-02-05", "coverageScope": "team"},
+    )
+
+    assert resp.status_code == 422
+
+
+def test_sync_task_runs_concurrently_and_persists_streamed_result():
+    client, service, _job_service = _build_app(provider=_StableProvider())
+
+    resp = client.post(
+        "/market/sync-task",
+        json={
+            "symbols": ["AAPL", "MSFT", "NVDA", "TSLA"],
+            "startDate": "2026-02-01",
+            "endDate": "2026-02-05",
+            "maxWorkers": 4,
+            "idempotencyKey": "idem-sync-concurrent",
+        },
+    )
+
+    payload = resp.json()["data"]
+    assert payload["status"] == "succeeded"
+    assert [item["symbol"] for item in payload["result"]["items"]] == ["AAPL", "MSFT", "NVDA", "TSLA"]
+    stored = service.get_sync_result(user_id="u-1", task_id=payload["taskId"])
+    assert stored == payload["result"]
+
+    invalid = client.post(
+        "/market/sync-task",
+        json={"symbols": ["AAPL"], "startDate": "2026-02-01", "endDate": "2026-02-05", "maxWorkers": 0},
+    )
+    assert invalid.status_code == 422
@@ -0,0 +1,55 @@
+"""资产目录搜索索引测试。"""
+
+from __future__ import annotations
+
+from market_data.asset_index import RANK_EXACT, RANK_NAME, RANK_PREFIX, RANK_SYMBOL_SUBSTRING, AssetSearchIndex
+
+
+def _index(rows: list[tuple[str, str]]) -> AssetSearchIndex[tuple[str, str]]:
+    return AssetSearchIndex(rows, symbol_of=lambda row: row[0], name_of=lambda row: row[1])
+
+
+CATALOG = [
+    ("MSFT", "Microsoft Corporation"),
+    ("AAPL", "Apple Inc."),
+    ("AA", "Alcoa Corporation"),
+    ("AAP", "Advance Auto Parts"),
+    ("GAAP", "Gaap Holdings"),
+    ("PINE", "Apple Pine Partners"),
+]
+
+
+def test_ranks_exact_then_prefix_then_substring_then_name():
+    index = _index(CATALOG)
+
+    ranked = index.search_ranked("aap", limit=10)
+
+    assert [(rank, row[0]) for rank, row in ranked] == [
+        (RANK_EXACT, "AAP"),
+        (RANK_PREFIX, "AAPL"),
+        (RANK_SYMBOL_SUBSTRING, "GAAP"),
+    ]
+    assert [row[0] for row in index.search("apple", limit=10)] == ["AAPL", "PINE"]
+    assert index.search_ranked("apple", limit=10)[0][0] == RANK_NAME
+
+
+def test_top_k_is_bounded_and_keeps_best_ranks():
+    index = _index(CATALOG)
+
+    assert [row[0] for row in index.search("aa", limit=2)] == ["AA", "AAP"]
+    assert [row[0] for row in index.search("corporation", limit=1)] == ["AA"]
+    assert index.search("aa", limit=0) == []
+
+
+def test_short_keyword_falls_back_to_substring_scan():
+    index = _index(CATALOG)
+
+    assert [row[0] for row in index.search("in", limit=10)] == ["PINE", "AAPL", "GAAP"]
+
+
+def test_empty_keyword_returns_catalog_order_and_duplicates_are_dropped():
+    index = _index([*CATALOG, ("aapl", "Duplicate")])
+
+    assert len(index) == len(CATALOG)
+    assert [row[0] for row in index.search("", limit=3)] == ["MSFT", "AAPL", "AA"]
+    assert index.search("zzz", limit=5) == []
@@ -0,0 +1,258 @@
+"""market_data 本地列式 K 线存储测试。"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+from market_data.bar_store import LocalBarStore
+from market_data.domain import MarketCandle
+from market_data.history_cache import HistoryCache
+from market_data.service import MarketDataService
+
+
+def _candles(start: str, end: str, *, bump: float = 0.0) -> list[MarketCandle]:
+    first, last = date.fromisoformat(start[:10]), date.fromisoformat(end[:10])
+    return [
+        MarketCandle(
+            timestamp=datetime(day.year, day.month, day.day, tzinfo=timezone.utc),
+            open_price=100.0 + offset + bump,
+            high_price=101.0 + offset + bump,
+            low_price=99.0 + offset + bump,
+            close_price=100.5 + offset + bump,
+            volume=1000.0 + offset,
+        )
+        for offset, day in enumerate(first + timedelta(days=step) for step in range((last - first).days + 1))
+    ]
+
+
+class _DailyProvider:
+    def __init__(self) -> None:
+        self.history_calls: list[tuple[str, str, int | None]] = []
+        self.bump = 0.0
+
+    def search(self, *, keyword: str, limit: int):
+        del keyword, limit
+        return []
+
+    def quote(self, *, symbol: str):
+        raise NotImplementedError(symbol)
+
+    def history(self, *, symbol: str, start_date: str, end_date: str, timeframe: str, limit: int | None):
+        del symbol, timeframe
+        self.history_calls.append((start_date, end_date, limit))
+        candles = _candles(start_date, end_date, bump=self.bump)
+        return candles[:limit] if limit is not None else candles
+
+    def list_assets(self, *, limit: int):
+        del limit
+        return []
+
+    def batch_quote(self, *, symbols: list[str]):
+        del symbols
+        return {}
+
+    def health(self):
+        return {"provider": "daily", "healthy": True, "status": "ok", "message": ""}
+
+
+def _service(provider: _DailyProvider, root) -> MarketDataService:
+    # 关闭内存历史缓存，使每次查询都经过本地 bar 存储。
+    return MarketDataService(
+        provider=provider,
+        history_cache=HistoryCache(max_bytes=0),
+        bar_store=LocalBarStore(root_dir=root),
+    )
+
+
+def _history(service: MarketDataService, *, start: str, end: str, limit: int | None = None):
+    return service.get_history(
+        user_id="u-1",
+        symbol="AAPL",
+        start_date=start,
+        end_date=end,
+        timeframe="1Day",
+        limit=limit,
+    )
+
+
+def test_synced_bars_are_persisted_and_served_locally(tmp_path):
+    provider = _DailyProvider()
+    _service(provider, tmp_path).sync_market_data(
+        user_id="u-1",
+        symbols=["aapl"],
+        start_date="2024-01-01",
+        end_date="2024-03-31",
+    )
+    assert provider.history_calls == [("2024-01-01", "2024-03-31", None)]
+
+    reopened = _service(provider, tmp_path)
+    rows = _history(reopened, start="2024-02-01", end="2024-02-10")
+    limited = _history(reopened, start="2024-01-01", end="2024-03-31", limit=3)
+
+    assert len(provider.history_calls) == 1
+    assert [row.timestamp.day for row in rows] == list(range(1, 11))
+    assert rows[0].close_price == 100.5 + 31
+    assert rows[0].volume == 1000.0 + 31
+    assert [row.timestamp.day for row in limited] == [1, 2, 3]
+    assert reopened.provider_health(user_id="u-1")["barStore"]["localHits"] == 2
+
+
+def test_partially_covered_range_fetches_only_the_gaps(tmp_path):
+    provider = _DailyProvider()
+    service = _service(provider, tmp_path)
+    service.sync_market_data(user_id="u-1", symbols=["AAPL"], start_date="2024-01-10", end_date="2024-01-20")
+
+    rows = _history(service, start="2024-01-01", end="2024-01-31")
+
+    assert provider.history_calls[1:] == [("2024-01-01", "2024-01-09", None), ("2024-01-21", "2024-01-31", None)]
+    assert [row.timestamp.day for row in rows] == list(range(1, 32))
+    assert _history(service, start="2024-01-01", end="2024-01-31") == rows
+    assert len(provider.history_calls) == 3
+
+
+def test_limited_query_with_gaps_goes_upstream_without_recording_coverage(tmp_path):
+    provider = _DailyProvider()
+    store = LocalBarStore(root_dir=tmp_path)
+    service = MarketDataService(provider=provider, history_cache=HistoryCache(max_bytes=0), bar_store=store)
+
+    rows = _history(service, start="2024-01-01", end="2024-12-31", limit=5)
+
+    assert len(rows) == 5
+    assert provider.history_calls == [("2024-01-01", "2024-12-31", 5)]
+    assert store.coverage(symbol="AAPL", timeframe="1Day") == []
+
+
+def test_out_of_order_and_repeated_writes_keep_series_sorted_and_replace_range(tmp_path):
+    store = LocalBarStore(root_dir=tmp_path)
+    store.write(
+        symbol="AAPL",
+        timeframe="1Day",
+        candles=_candles("2024-02-01", "2024-02-29"),
+        start_date="2024-02-01",
+        end_date="2024-02-29",
+    )
+    store.write(
+        symbol="AAPL",
+        timeframe="1Day",
+        candles=_candles("2024-01-01", "2024-01-31"),
+        start_date="2024-01-01",
+        end_date="2024-01-31",
+    )
+    # 上游修正：同一区间重拉后旧 bar 被替换，区间内缺失的 bar 被删除。
+    corrected = [candle for candle in _candles("2024-01-15", "2024-01-20", bump=50.0) if candle.timestamp.day != 17]
+    store.write(symbol="AAPL", timeframe="1Day", candles=corrected, start_date="2024-01-15", end_date="2024-01-20")
+
+    rows = store.read(symbol="AAPL", timeframe="1Day", start_date="2024-01-01", end_date="2024-02-29")
+
+    assert rows is not None
+    timestamps = [row.timestamp for row in rows]
+    assert timestamps == sorted(timestamps)
+    assert len(rows) == 31 + 29 - 1
+    assert [row.close_price for row in rows if row.timestamp.day == 15 and row.timestamp.month == 1] == [150.5]
+    assert store.coverage(symbol="AAPL", timeframe="1Day") == [
+        (datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 2, 29, 23, 59, 59, 999999, tzinfo=timezone.utc))
+    ]
+    assert store.stats()["rewrites"] == 2
+
+
+def test_coverage_stops_before_bars_that_may_still_be_forming(tmp_path):
+    now = datetime(2024, 1, 10, 12, 0, tzinfo=timezone.utc)
+    store = LocalBarStore(root_dir=tmp_path, clock=now.timestamp)
+    store.write(
+        symbol="BTC/USD",
+        timeframe="1Day",
+        candles=_candles("2024-01-01", "2024-01-10"),
+        start_date="2024-01-01",
+        end_date="2024-01-31",
+    )
+
+    assert store.read(symbol="BTC/USD", timeframe="1Day", start_date="2024-01-01", end_date="2024-01-31") is None
+    assert store.missing_ranges(
+        symbol="BTC/USD",
+        timeframe="1Day",
+        start_date="2024-01-01",
+        end_date="2024-01-31",
+    ) == [
+        (now - timedelta(days=1) + timedelta(microseconds=1), datetime(2024, 1, 31, 23, 59, 59, 999999, tzinfo=timezone.utc))
+    ]
+    assert store.read(symbol="BTC/USD", timeframe="1Day", start_date="2024-01-01", end_date="2024-01-09") is None
+    rows = store.read(symbol="BTC/USD", timeframe="1Day", start_date="2024-01-01", end_date="2024-01-08")
+    assert rows is not None and len(rows) == 8
+
+
+def _hourly(*hours_and_closes: tuple[int, float]) -> list[MarketCandle]:
+    return [
+        MarketCandle(
+            timestamp=datetime(2024, 3, 4, hour, tzinfo=timezone.utc),
+            open_price=close,
+            high_price=close,
+            low_price=close,
+            close_price=close,
+            volume=1.0,
+        )
+        for hour, close in hours_and_closes
+    ]
+
+
+def test_bar_forming_mid_window_is_refetched_once_complete(tmp_path):
+    clock = {"now": datetime(2024, 3, 4, 14, 30, tzinfo=timezone.utc)}
+    store = LocalBarStore(root_dir=tmp_path, clock=lambda: clock["now"].timestamp())
+    day = {"symbol": "AAPL", "timeframe": "1Hour", "start_date": "2024-03-04", "end_date": "2024-03-04"}
+
+    # 14:00 bar 在 14:30 拉取时仍在形成。
+    store.write(candles=_hourly((13, 1.0), (14, 2.0)), **day)
+    gaps = store.missing_ranges(**day)
+    assert gaps is not None and gaps[0][0] == datetime(2024, 3, 4, 13, 30, 0, 1, tzinfo=timezone.utc)
+
+    clock["now"] = datetime(2024, 3, 4, 15, 30, tzinfo=timezone.utc)
+    gap_lo, gap_hi = store.missing_ranges(**day)[0]
+    store.write(
+        symbol="AAPL",
+        timeframe="1Hour",
+        candles=_hourly((14, 2.5), (15, 3.0)),
+        start_date=gap_lo.isoformat(),
+        end_date=gap_hi.isoformat(),
+    )
+
+    rows = store.read(symbol="AAPL", timeframe="1Hour", start_date="2024-03-04T13:00:00+00:00", end_date="2024-03-04T14:30:00+00:00")
+    assert rows is not None
+    assert [(row.timestamp.hour, row.close_price) for row in rows] == [(13, 1.0), (14, 2.5)]
+    assert store.missing_ranges(**day)[0][0] == datetime(2024, 3, 4, 14, 30, 0, 1, tzinfo=timezone.utc)
+
+
+def test_unpublished_bars_within_provider_delay_are_not_covered(tmp_path):
+    now = datetime(2024, 3, 4, 15, 0, tzinfo=timezone.utc)
+    store = LocalBarStore(root_dir=tmp_path, clock=now.timestamp, publish_delay_seconds=15 * 60)
+    day = {"symbol": "AAPL", "timeframe": "1Hour", "start_date": "2024-03-04", "end_date": "2024-03-04"}
+
+    store.write(candles=_hourly((13, 1.0)), **day)
+
+    # 14:00 bar 在 15:00 收盘，但延时行情要到 15:15 才发布。
+    assert store.missing_ranges(**day)[0][0] == datetime(2024, 3, 4, 13, 45, 0, 1, tzinfo=timezone.utc)
+
+
+def test_range_ending_today_fetches_only_the_forming_tail(tmp_path):
+    now = datetime(2024, 1, 10, 12, 0, tzinfo=timezone.utc)
+    provider = _DailyProvider()
+    service = MarketDataService(
+        provider=provider,
+        history_cache=HistoryCache(max_bytes=0),
+        bar_store=LocalBarStore(root_dir=tmp_path, clock=now.timestamp),
+    )
+
+    first = _history(service, start="2024-01-01", end="2024-01-10")
+    provider.bump = 5.0
+    second = _history(service, start="2024-01-01", end="2024-01-10")
+
+    assert len(provider.history_calls) == 2
+    tail_start, tail_end, tail_limit = provider.history_calls[1]
+    assert tail_start.startswith("2024-01-09T12:00:00") and (tail_end, tail_limit) == ("2024-01-10", None)
+    assert [row.timestamp.day for row in first] == list(range(1, 11))
+    assert [row.timestamp.day for row in second] == list(range(1, 11))
+    assert second[0] == first[0]
+    # 仍在形成的 01-10 bar 来自本次尾部回源（起点 01-09，偏移 1，bump 5）。
+    assert second[-1].close_price == 100.5 + 1 + 5.0
+
+    # 已覆盖前缀足够时带 limit 的查询不回源。
+    assert [row.timestamp.day for row in _history(service, start="2024-01-01", end="2024-01-10", limit=3)] == [1, 2, 3]
+    assert len(provider.history_calls) == 2
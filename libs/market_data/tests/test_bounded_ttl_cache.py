@@ -0,0 +1,146 @@
+"""有界 TTL 缓存测试。"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+
+import pytest
+
+from market_data.cache import BoundedTTLCache
+from market_data.domain import MarketQuote
+from market_data.service import MarketDataService
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction_respects_entry_bound_and_recency():
+    cache = BoundedTTLCache(max_entries=2)
+    cache.set("a", 1, ttl_seconds=60)
+    cache.set("b", 2, ttl_seconds=60)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3, ttl_seconds=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_bound_evicts_and_skips_oversized_values():
+    cache = BoundedTTLCache(max_bytes=1000, sizer=lambda value: value)
+    cache.set("big", 2000, ttl_seconds=60)
+    cache.set("a", 400, ttl_seconds=60)
+    cache.set("b", 400, ttl_seconds=60)
+
+    assert cache.get("big") is None
+    assert cache.get("a") is None
+    assert cache.get("b") == 400
+    assert cache.stats()["bytes"] <= 1000
+
+
+def test_default_sizer_counts_nested_members():
+    quotes = [MarketQuote(symbol=f"S{idx}", name=f"Name {idx}" * 10, price=float(idx)) for idx in range(100)]
+    cache = BoundedTTLCache()
+    cache.set("quotes", quotes, ttl_seconds=60)
+
+    measured = cache.stats()["bytes"]
+    per_quote = len(quotes[0].name) + sys.getsizeof(vars(quotes[0]))
+    assert measured > sys.getsizeof(quotes) + 100 * per_quote
+
+
+def test_periodic_sweep_drops_expired_keys_nobody_reads():
+    clock = _Clock()
+    cache = BoundedTTLCache(sweep_interval_seconds=10, clock=clock)
+    for idx in range(5):
+        cache.set(f"quote:S{idx}", idx, ttl_seconds=3)
+    cache.set("keep", "x", ttl_seconds=60)
+
+    clock.now = 11
+    cache.set("other", "y", ttl_seconds=60)
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["expirations"] == 5
+
+
+def test_get_or_load_coalesces_concurrent_misses():
+    cache = BoundedTTLCache()
+    calls = 0
+    barrier = threading.Barrier(8)
+
+    def _load():
+        nonlocal calls
+        calls += 1
+        time.sleep(0.05)
+        return "value"
+
+    results: list[str] = []
+
+    def _worker():
+        barrier.wait()
+        results.append(cache.get_or_load("k", loader=_load, ttl_seconds=60))
+
+    threads = [threading.Thread(target=_worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == 1
+    assert results == ["value"] * 8
+    stats = cache.stats()
+    assert stats["loads"] == 1
+    assert stats["coalesced"] == 7
+    assert stats["maxLoadMs"] >= 40
+
+
+def test_get_or_load_propagates_errors_without_caching():
+    cache = BoundedTTLCache()
+
+    def _boom():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("k", loader=_boom, ttl_seconds=60)
+
+    assert cache.get_or_load("k", loader=lambda: "ok", ttl_seconds=60) == "ok"
+    assert cache.stats()["loadErrors"] == 1
+
+
+def test_service_quote_reads_share_one_provider_call():
+    class _Provider:
+        def __init__(self) -> None:
+            self.calls = 0
+
+        def quote(self, *, symbol: str) -> MarketQuote:
+            self.calls += 1
+            time.sleep(0.05)
+            return MarketQuote(symbol=symbol, name=symbol, price=1.0)
+
+    provider = _Provider()
+    service = MarketDataService(provider=provider, rate_limit_max_requests=100)
+    barrier = threading.Barrier(5)
+    sources: list[str] = []
+
+    def _worker():
+        barrier.wait()
+        sources.append(service.get_latest_quote(user_id="u-1", symbol="aapl").source)
+
+    threads = [threading.Thread(target=_worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert provider.calls == 1
+    assert sorted(sources) == ["cache"] * 4 + ["provider"]
+    assert service.provider_health(user_id="u-1")["quoteCache"]["loads"] == 1
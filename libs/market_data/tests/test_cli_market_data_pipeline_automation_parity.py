@@ -110,3 +110,26 @@ def test_cli_sync_then_boundary_check_reports_missing(capsys, monkeypatch):
     assert report["data"]["consistent"] is False
     assert report["data"]["missingIds"] == ["MSFT"]
 
+
+
+def test_cli_sync_reports_skipped_bars_and_honours_full_refresh(capsys, monkeypatch):
+    service = MarketDataService(provider=_Provider())
+    monkeypatch.setattr(cli, "_service", service)
+    args = {
+        "user_id": "u-1",
+        "symbols": "AAPL",
+        "start_date": "2026-02-01",
+        "end_date": "2026-02-05",
+        "timeframe": "1Day",
+        "coverage_scope": "user",
+    }
+
+    first = _run(cli._cmd_sync, capsys=capsys, full_refresh=False, **args)
+    second = _run(cli._cmd_sync, capsys=capsys, full_refresh=False, **args)
+    refreshed = _run(cli._cmd_sync, capsys=capsys, full_refresh=True, **args)
+
+    assert first["data"]["summary"]["fetchedBarCount"] == 5
+    assert second["data"]["summary"]["fetchedBarCount"] == 0
+    assert second["data"]["summary"]["skippedBarCount"] == 5
+    assert refreshed["data"]["summary"]["fetchedBarCount"] == 5
+    assert refreshed["data"]["summary"]["skippedBarCount"] == 0
@@ -0,0 +1,208 @@
+"""market_data 并发同步与共享上游令牌桶测试。"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from market_data.alpaca_provider import AlpacaProvider
+from market_data.domain import MarketCandle, UpstreamRateLimitedError
+from market_data.rate_limit import AdaptiveTokenBucket
+from market_data.service import MarketDataService
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class _SlowProvider:
+    def __init__(self, *, delay: float = 0.05, rate_limited: set[str] | None = None) -> None:
+        self._delay = delay
+        self._rate_limited = set(rate_limited or ())
+        self._lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.calls: list[str] = []
+
+    def search(self, *, keyword: str, limit: int):
+        del keyword, limit
+        return []
+
+    def quote(self, *, symbol: str):
+        raise NotImplementedError(symbol)
+
+    def history(self, *, symbol: str, start_date: str, end_date: str, timeframe: str, limit: int | None):
+        del timeframe, limit
+        with self._lock:
+            self.calls.append(symbol)
+            if symbol in self._rate_limited:
+                self._rate_limited.discard(symbol)
+                raise UpstreamRateLimitedError()
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self._delay)
+            first, last = date.fromisoformat(start_date), date.fromisoformat(end_date)
+            return [
+                MarketCandle(
+                    timestamp=datetime(day.year, day.month, day.day, tzinfo=timezone.utc),
+                    open_price=1.0,
+                    high_price=1.0,
+                    low_price=1.0,
+                    close_price=1.0,
+                    volume=1.0,
+                )
+                for day in (first + timedelta(days=step) for step in range((last - first).days + 1))
+            ]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def list_assets(self, *, limit: int):
+        del limit
+        return []
+
+    def batch_quote(self, *, symbols: list[str]):
+        del symbols
+        return {}
+
+    def health(self):
+        return {"provider": "slow", "healthy": True, "status": "ok", "message": ""}
+
+
+def test_token_bucket_waits_for_refill_and_backs_off_on_penalty():
+    clock = _FakeClock()
+    bucket = AdaptiveTokenBucket(rate_per_second=2.0, capacity=2.0, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() and bucket.acquire()
+    assert bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+    bucket.penalize(retry_after=3.0)
+    assert bucket.stats()["ratePerSecond"] == pytest.approx(1.0)
+    started = clock.now
+    assert bucket.acquire()
+    assert clock.now - started >= 3.0
+
+    assert bucket.acquire(timeout=0.1) is False
+    for _ in range(32):
+        bucket.reward()
+    assert bucket.stats()["ratePerSecond"] == pytest.approx(2.0)
+    assert bucket.stats()["penalties"] == 1
+    assert bucket.stats()["timeouts"] == 1
+
+
+def test_concurrent_sync_overlaps_symbols_and_streams_partial_results():
+    provider = _SlowProvider()
+    service = MarketDataService(provider=provider)
+    symbols = [f"SYM{idx}" for idx in range(8)]
+    snapshots: list[dict] = []
+
+    result = service.sync_market_data(
+        user_id="u-1",
+        symbols=symbols,
+        start_date="2024-01-01",
+        end_date="2024-01-05",
+        max_workers=4,
+        on_progress=snapshots.append,
+    )
+
+    assert provider.max_active > 1
+    assert [item["symbol"] for item in result["items"]] == symbols
+    assert result["summary"]["successCount"] == 8
+    assert result["summary"]["fetchedBarCount"] == 40
+    assert "completedSymbols" not in result["summary"]
+    assert [snapshot["summary"]["completedSymbols"] for snapshot in snapshots] == list(range(1, 8))
+    assert all(len(snapshot["items"]) == snapshot["summary"]["completedSymbols"] for snapshot in snapshots)
+
+
+def test_rate_limited_fetch_backs_off_on_shared_bucket_and_retries():
+    provider = _SlowProvider(delay=0.0, rate_limited={"MSFT"})
+    clock = _FakeClock()
+    bucket = AdaptiveTokenBucket(rate_per_second=100.0, clock=clock, sleep=clock.sleep)
+    service = MarketDataService(provider=provider, upstream_bucket=bucket)
+
+    result = service.sync_market_data(
+        user_id="u-1",
+        symbols=["AAPL", "MSFT"],
+        start_date="2024-01-01",
+        end_date="2024-01-02",
+        max_workers=2,
+    )
+
+    assert result["summary"]["failureCount"] == 0
+    assert provider.calls.count("MSFT") == 2
+    stats = service.provider_health(user_id="u-1")["upstreamBucket"]
+    assert stats["penalties"] == 1
+    assert stats["ratePerSecond"] < 100.0
+
+
+def test_rate_limited_fetch_without_retries_left_reports_symbol_error():
+    provider = _SlowProvider(delay=0.0, rate_limited={"AAPL"})
+    clock = _FakeClock()
+    bucket = AdaptiveTokenBucket(rate_per_second=100.0, clock=clock, sleep=clock.sleep)
+    service = MarketDataService(provider=provider, upstream_bucket=bucket, upstream_rate_limit_retries=0)
+
+    result = service.sync_market_data(user_id="u-1", symbols=["AAPL"], start_date="2024-01-01", end_date="2024-01-02")
+
+    assert result["items"][0]["errorCode"] == "UPSTREAM_RATE_LIMITED"
+    assert result["items"][0]["retryable"] is True
+
+
+def test_alpaca_provider_gets_bucket_sized_to_documented_limit():
+    service = MarketDataService(provider=AlpacaProvider(transport=lambda operation, **kwargs: {}))
+
+    stats = service.provider_health(user_id="u-1")["upstreamBucket"]
+
+    assert stats["baseRatePerSecond"] == pytest.approx(200 / 60)
+
+
+class _RateLimitedQuoteProvider:
+    def __init__(self, *, retry_after: float) -> None:
+        self._retry_after = retry_after
+        self.calls: list[list[str]] = []
+
+    def search(self, *, keyword: str, limit: int):
+        del keyword, limit
+        return []
+
+    def quote(self, *, symbol: str):
+        return self.batch_quote(symbols=[symbol])[symbol]
+
+    def batch_quote(self, *, symbols: list[str]):
+        from market_data.domain import MarketQuote
+
+        self.calls.append(list(symbols))
+        if len(self.calls) == 1:
+            raise UpstreamRateLimitedError(retry_after=self._retry_after)
+        return {symbol: MarketQuote(symbol=symbol, name=symbol, price=1.0) for symbol in symbols}
+
+
+def test_quote_fetches_share_the_bucket_and_honor_retry_after():
+    provider = _RateLimitedQuoteProvider(retry_after=7.0)
+    clock = _FakeClock()
+    bucket = AdaptiveTokenBucket(rate_per_second=100.0, clock=clock, sleep=clock.sleep)
+    service = MarketDataService(provider=provider, upstream_bucket=bucket)
+
+    result = service.get_quotes(user_id="u-1", symbols=["AAPL", "MSFT"])
+    single = service.get_latest_quote(user_id="u-1", symbol="NVDA")
+
+    assert [item.status for item in result.items] == ["ok", "ok"]
+    assert single.quote.symbol == "NVDA"
+    assert len(provider.calls) == 3
+    assert clock.sleeps[0] == pytest.approx(7.0)
+    stats = bucket.stats()
+    assert stats["acquired"] == 3
+    assert stats["penalties"] == 1
@@ -0,0 +1,245 @@
+"""market_data 历史 K 线缓存测试。"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from market_data.domain import MarketCandle, UpstreamTimeoutError
+from market_data.history_cache import HistoryCache
+from market_data.service import MarketDataService
+
+
+def _candles(start: str, days: int) -> list[MarketCandle]:
+    base = datetime.fromisoformat(start).replace(tzinfo=timezone.utc)
+    return [
+        MarketCandle(
+            timestamp=base + timedelta(days=offset),
+            open_price=100.0 + offset,
+            high_price=101.0 + offset,
+            low_price=99.0 + offset,
+            close_price=100.5 + offset,
+            volume=1000.0,
+        )
+        for offset in range(days)
+    ]
+
+
+class _CountingProvider:
+    def __init__(self) -> None:
+        self.history_calls: list[tuple[str, str, str, int | None]] = []
+        self.fail_next = False
+
+    def search(self, *, keyword: str, limit: int):
+        del keyword, limit
+        return []
+
+    def quote(self, *, symbol: str):
+        raise NotImplementedError(symbol)
+
+    def history(
+        self,
+        *,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        timeframe: str,
+        limit: int | None,
+    ):
+        del timeframe
+        self.history_calls.append((symbol, start_date, end_date, limit))
+        if self.fail_next:
+            self.fail_next = False
+            raise UpstreamTimeoutError()
+        start = datetime.fromisoformat(start_date)
+        end = datetime.fromisoformat(end_date)
+        candles = _candles(start_date, (end - start).days + 1)
+        return candles[:limit] if limit is not None else candles
+
+    def list_assets(self, *, limit: int):
+        del limit
+        return []
+
+    def batch_quote(self, *, symbols: list[str]):
+        del symbols
+        return {}
+
+    def health(self):
+        return {"provider": "counting", "healthy": True, "status": "ok", "message": ""}
+
+
+def _history(service: MarketDataService, *, start: str, end: str, symbol: str = "AAPL", limit: int | None = None):
+    return service.get_history(
+        user_id="u-1",
+        symbol=symbol,
+        start_date=start,
+        end_date=end,
+        timeframe="1Day",
+        limit=limit,
+    )
+
+
+def test_repeated_history_query_is_served_from_cache():
+    provider = _CountingProvider()
+    service = MarketDataService(provider=provider)
+
+    first = _history(service, start="2024-01-01", end="2024-01-31")
+    second = _history(service, start="2024-01-01", end="2024-01-31", symbol="aapl")
+
+    assert len(first) == 31
+    assert [item.close_price for item in second] == [item.close_price for item in first]
+    assert len(provider.history_calls) == 1
+
+    stats = service.provider_health(user_id="u-1")["historyCache"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+
+def test_cached_superset_range_serves_subset_and_limit_queries():
+    provider = _CountingProvider()
+    service = MarketDataService(provider=provider)
+
+    _history(service, start="2024-01-01", end="2024-12-31")
+    subset = _history(service, start="2024-03-01", end="2024-03-10")
+    limited = _history(service, start="2024-03-01", end="2024-03-31", limit=5)
+
+    assert len(provider.history_calls) == 1
+    assert [item.timestamp.day for item in subset] == list(range(1, 11))
+    assert [item.timestamp.day for item in limited] == [1, 2, 3, 4, 5]
+    assert service.provider_health(user_id="u-1")["historyCache"]["containmentHits"] == 2
+
+
+def test_truncated_result_does_not_serve_other_ranges():
+    provider = _CountingProvider()
+    service = MarketDataService(provider=provider)
+
+    _history(service, start="2024-01-01", end="2024-12-31", limit=10)
+    _history(service, start="2024-01-01", end="2024-01-05")
+
+    assert len(provider.history_calls) == 2
+
+
+def test_lru_evicts_by_estimated_bytes():
+    provider = _CountingProvider()
+    cache = HistoryCache(max_bytes=40_000)
+    service = MarketDataService(provider=provider, history_cache=cache)
+
+    _history(service, start="2024-01-01", end="2024-02-29", symbol="AAPL")
+    _history(service, start="2024-01-01", end="2024-02-29", symbol="MSFT")
+    _history(service, start="2024-01-01", end="2024-02-29", symbol="AAPL")
+    _history(service, start="2024-01-01", end="2024-02-29", symbol="NVDA")
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= 40_000
+
+    _history(service, start="2024-01-01", end="2024-02-29", symbol="AAPL")
+    _history(service, start="2024-01-01", end="2024-02-29", symbol="MSFT")
+    assert [call[0] for call in provider.history_calls] == ["AAPL", "MSFT", "NVDA", "MSFT"]
+
+
+def test_concurrent_misses_are_coalesced_into_one_upstream_call():
+    release = threading.Event()
+    calls: list[int] = []
+
+    def _loader():
+        calls.append(1)
+        release.wait(5)
+        return _candles("2024-01-01", 3)
+
+    cache = HistoryCache()
+    results: list[list[MarketCandle]] = []
+
+    def _read():
+        results.append(
+            cache.get_or_load(
+                symbol="AAPL",
+                timeframe="1Day",
+                start_date="2024-01-01",
+                end_date="2024-01-03",
+                limit=None,
+                loader=_loader,
+            )
+        )
+
+    threads = [threading.Thread(target=_read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < 3 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert [len(item) for item in results] == [3, 3, 3, 3]
+
+
+def test_failed_loads_are_not_cached_and_sync_refreshes_cache():
+    provider = _CountingProvider()
+    service = MarketDataService(provider=provider)
+
+    provider.fail_next = True
+    with pytest.raises(UpstreamTimeoutError):
+        _history(service, start="2024-01-01", end="2024-01-10")
+    _history(service, start="2024-01-01", end="2024-01-10")
+    assert len(provider.history_calls) == 2
+
+    service.sync_market_data(user_id="u-1", symbols=["AAPL"], start_date="2024-01-01", end_date="2024-01-10")
+    _history(service, start="2024-01-01", end="2024-01-10")
+    assert len(provider.history_calls) == 3
+
+
+def test_ranges_reaching_now_expire_after_one_bar_period():
+    clock = {"now": 0.0}
+    wall = datetime(2024, 1, 10, 12, 0, tzinfo=timezone.utc).timestamp()
+    cache = HistoryCache(ttl_seconds=3600.0, clock=lambda: clock["now"], wall_clock=lambda: wall)
+    calls: list[str] = []
+
+    def _load(start: str, end: str, timeframe: str):
+        return cache.get_or_load(
+            symbol="AAPL",
+            timeframe=timeframe,
+            start_date=start,
+            end_date=end,
+            limit=None,
+            loader=lambda: calls.append(f"{timeframe}:{end}") or _candles(start, 3),
+        )
+
+    _load("2024-01-01", "2024-01-05", "1Day")
+    _load("2024-01-01", "2024-01-10", "1Min")
+    clock["now"] = 61.0
+    _load("2024-01-01", "2024-01-05", "1Day")
+    _load("2024-01-01", "2024-01-10", "1Min")
+
+    # 已收盘区间继续命中，触及当前时刻的 1Min 区间一分钟后重新回源。
+    assert calls == ["1Day:2024-01-05", "1Min:2024-01-10", "1Min:2024-01-10"]
+
+
+def test_sync_invalidates_overlapping_cached_ranges():
+    provider = _CountingProvider()
+    service = MarketDataService(provider=provider)
+
+    _history(service, start="2024-01-01", end="2024-01-31")
+    _history(service, start="2024-03-01", end="2024-03-31")
+    service.sync_market_data(
+        user_id="u-1",
+        symbols=["AAPL"],
+        start_date="2024-01-10",
+        end_date="2024-01-20",
+        full_refresh=True,
+    )
+    _history(service, start="2024-01-01", end="2024-01-31")
+    _history(service, start="2024-03-01", end="2024-03-31")
+
+    assert [(call[1], call[2]) for call in provider.history_calls] == [
+        ("2024-01-01", "2024-01-31"),
+        ("2024-03-01", "2024-03-31"),
+        ("2024-01-10", "2024-01-20"),
+        ("2024-01-01", "2024-01-31"),
+    ]
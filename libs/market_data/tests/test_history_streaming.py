@@ -0,0 +1,122 @@
+"""分页历史 K 线流式拉取测试。"""
+
+from __future__ import annotations
+
+from market_data.alpaca_provider import AlpacaProvider
+from market_data.alpaca_transport import AlpacaHTTPTransport, AlpacaTransportConfig
+from market_data.fake_alpaca import FakeAlpacaRequestExecutor
+from market_data.service import MarketDataService
+
+_CONFIG = AlpacaTransportConfig(api_key="key", api_secret="secret", base_url="https://example.invalid")
+_BARS_ROUTE = "/v2/stocks/AAPL/bars"
+
+
+def _bars(count: int) -> list[dict]:
+    return [
+        {"t": f"2026-01-01T{idx // 60:02d}:{idx % 60:02d}:00Z", "o": 1, "h": 1, "l": 1, "c": float(idx), "v": 1}
+        for idx in range(count)
+    ]
+
+
+def _provider(executor: FakeAlpacaRequestExecutor, **kwargs) -> AlpacaProvider:
+    return AlpacaProvider(transport=AlpacaHTTPTransport(config=_CONFIG, request_executor=executor), **kwargs)
+
+
+def test_iter_history_follows_next_page_token_in_chunks():
+    executor = FakeAlpacaRequestExecutor(bars={"AAPL": _bars(25)}, bars_page_size=10)
+    provider = _provider(executor, history_page_size=10)
+
+    pages = list(
+        provider.iter_history(
+            symbol="aapl",
+            start_date="2026-01-01",
+            end_date="2026-01-02",
+            timeframe="1Min",
+            limit=None,
+        )
+    )
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [params["page_token"] for _, params in executor.requests] == [None, "10", "20"]
+    assert pages[-1][-1].close_price == 24.0
+
+
+def test_history_wrapper_returns_all_pages_and_respects_limit():
+    executor = FakeAlpacaRequestExecutor(bars={"AAPL": _bars(25)}, bars_page_size=10)
+    provider = _provider(executor, history_page_size=10)
+
+    full = provider.history(symbol="AAPL", start_date="2026-01-01", end_date="2026-01-02", timeframe="1Min", limit=None)
+    limited = provider.history(symbol="AAPL", start_date="2026-01-01", end_date="2026-01-02", timeframe="1Min", limit=12)
+
+    assert len(full) == 25
+    assert [candle.close_price for candle in limited] == [float(idx) for idx in range(12)]
+    assert executor.requests[-1][1]["limit"] == 2
+
+
+def test_transport_history_operation_pages_through_full_range():
+    executor = FakeAlpacaRequestExecutor(bars={"AAPL": _bars(25)}, bars_page_size=10)
+    transport = AlpacaHTTPTransport(config=_CONFIG, request_executor=executor)
+
+    payload = transport("history", symbol="AAPL", start_date="2026-01-01", end_date="2026-01-02", timeframe="1Min")
+
+    assert len(payload["items"]) == 25
+    assert executor.count(_BARS_ROUTE) == 3
+
+
+def test_service_iter_history_streams_pages_without_filling_history_cache():
+    executor = FakeAlpacaRequestExecutor(bars={"AAPL": _bars(25)}, bars_page_size=10)
+    service = MarketDataService(provider=_provider(executor, history_page_size=10))
+
+    chunks = service.iter_history(user_id="u-1", symbol="aapl", start_date="2026-01-01", end_date="2026-01-02")
+    first = next(chunks)
+
+    assert len(first) == 10
+    assert executor.count(_BARS_ROUTE) == 1
+    assert sum(len(chunk) for chunk in chunks) == 15
+    assert executor.count(_BARS_ROUTE) == 3
+    assert service.provider_health(user_id="u-1")["historyCache"]["entries"] == 0
+
+
+def test_service_iter_history_falls_back_to_single_chunk_without_paging():
+    class _Provider:
+        def history(self, **kwargs):
+            return _provider(FakeAlpacaRequestExecutor(bars={"AAPL": _bars(3)})).history(**kwargs)
+
+    service = MarketDataService(provider=_Provider())
+
+    chunks = list(service.iter_history(user_id="u-1", symbol="AAPL", start_date="2026-01-01", end_date="2026-01-02"))
+
+    assert [len(chunk) for chunk in chunks] == [3]
+
+
+def test_sync_writes_each_upstream_page_to_the_bar_store(tmp_path):
+    from market_data.bar_store import LocalBarStore
+
+    executor = FakeAlpacaRequestExecutor(bars={"AAPL": _bars(25)}, bars_page_size=10)
+    store = LocalBarStore(root_dir=tmp_path)
+    service = MarketDataService(provider=_provider(executor, history_page_size=10), bar_store=store)
+
+    result = service.sync_market_data(
+        user_id="u-1",
+        symbols=["AAPL"],
+        start_date="2026-01-01",
+        end_date="2026-01-01",
+        timeframe="1Min",
+    )
+
+    assert result["summary"]["fetchedBarCount"] == 25
+    assert executor.count(_BARS_ROUTE) == 3
+    assert store.stats()["writes"] == 3
+    assert store.missing_ranges(symbol="AAPL", timeframe="1Min", start_date="2026-01-01", end_date="2026-01-01") == []
+
+    chunks = list(
+        store.iter_stored(symbol="AAPL", timeframe="1Min", start_date="2026-01-01", end_date="2026-01-01", chunk_size=8)
+    )
+    assert [len(chunk) for chunk in chunks] == [8, 8, 8, 1]
+    assert [candle.close_price for chunk in chunks for candle in chunk] == [float(idx) for idx in range(25)]
+
+    streamed = service.iter_history(
+        user_id="u-1", symbol="AAPL", start_date="2026-01-01", end_date="2026-01-01", timeframe="1Min"
+    )
+    assert sum(len(chunk) for chunk in streamed) == 25
+    assert executor.count(_BARS_ROUTE) == 3
@@ -0,0 +1,182 @@
+"""market_data 增量同步（缺口感知）测试。"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from market_data.bar_store import LocalBarStore
+from market_data.domain import MarketCandle, MarketDataError
+from market_data.pipeline_store import InMemoryMarketDataPipelineStore
+from market_data.service import MarketDataService
+
+
+class _DailyProvider:
+    def __init__(self) -> None:
+        self.history_calls: list[tuple[str, str, str]] = []
+
+    def search(self, *, keyword: str, limit: int):
+        del keyword, limit
+        return []
+
+    def quote(self, *, symbol: str):
+        raise NotImplementedError(symbol)
+
+    def history(self, *, symbol: str, start_date: str, end_date: str, timeframe: str, limit: int | None):
+        del timeframe, limit
+        self.history_calls.append((symbol, start_date, end_date))
+        first, last = date.fromisoformat(start_date[:10]), date.fromisoformat(end_date[:10])
+        return [
+            MarketCandle(
+                timestamp=datetime(day.year, day.month, day.day, tzinfo=timezone.utc),
+                open_price=1.0,
+                high_price=1.0,
+                low_price=1.0,
+                close_price=1.0,
+                volume=1.0,
+            )
+            for day in (first + timedelta(days=step) for step in range((last - first).days + 1))
+        ]
+
+    def list_assets(self, *, limit: int):
+        del limit
+        return []
+
+    def batch_quote(self, *, symbols: list[str]):
+        del symbols
+        return {}
+
+    def health(self):
+        return {"provider": "daily", "healthy": True, "status": "ok", "message": ""}
+
+
+def _sync(service: MarketDataService, *, start: str, end: str, user_id: str = "u-1", **kwargs):
+    return service.sync_market_data(
+        user_id=user_id,
+        symbols=["AAPL", "MSFT"],
+        start_date=start,
+        end_date=end,
+        **kwargs,
+    )
+
+
+def test_resync_fetches_only_missing_sub_ranges_and_reports_skipped_bars():
+    provider = _DailyProvider()
+    store = InMemoryMarketDataPipelineStore()
+    service = MarketDataService(provider=provider, pipeline_store=store)
+
+    first = _sync(service, start="2024-01-01", end="2024-01-31")
+    assert first["summary"]["fetchedBarCount"] == 62
+    assert first["summary"]["skippedBarCount"] == 0
+
+    provider.history_calls.clear()
+    second = _sync(service, start="2024-01-01", end="2024-02-10")
+
+    assert provider.history_calls == [("AAPL", "2024-02-01", "2024-02-10"), ("MSFT", "2024-02-01", "2024-02-10")]
+    assert second["summary"]["fetchedBarCount"] == 20
+    assert second["summary"]["skippedBarCount"] == 62
+    item = second["items"][0]
+    assert item["rowCount"] == 41
+    assert item["fetchedRanges"] == [{"startDate": "2024-02-01", "endDate": "2024-02-10"}]
+
+    segments = store.list_coverage(scope="user:u-1", symbol="AAPL", timeframe="1Day")
+    assert [(segment.start.date(), segment.end.date(), segment.row_count) for segment in segments] == [
+        (date(2024, 1, 1), date(2024, 2, 10), 41)
+    ]
+
+    provider.history_calls.clear()
+    third = _sync(service, start="2024-01-05", end="2024-01-20")
+    assert provider.history_calls == []
+    assert third["summary"]["skippedBarCount"] == 32
+
+
+def test_coverage_scope_isolates_users_unless_global():
+    provider = _DailyProvider()
+    service = MarketDataService(provider=provider)
+
+    _sync(service, start="2024-01-01", end="2024-01-10")
+    _sync(service, start="2024-01-01", end="2024-01-10", user_id="u-2")
+    assert len(provider.history_calls) == 4
+
+    _sync(service, start="2024-01-01", end="2024-01-10", coverage_scope="global")
+    provider.history_calls.clear()
+    shared = _sync(service, start="2024-01-01", end="2024-01-10", user_id="u-2", coverage_scope="global")
+
+    assert provider.history_calls == []
+    assert shared["summary"]["coverageScope"] == "global"
+    assert shared["summary"]["skippedBarCount"] == 20
+
+    with pytest.raises(MarketDataError) as exc_info:
+        _sync(service, start="2024-01-01", end="2024-01-10", coverage_scope="team")
+    assert exc_info.value.code == "INVALID_COVERAGE_SCOPE"
+
+
+def test_full_refresh_refetches_whole_range():
+    provider = _DailyProvider()
+    service = MarketDataService(provider=provider)
+    _sync(service, start="2024-01-01", end="2024-01-10")
+    provider.history_calls.clear()
+
+    refreshed = _sync(service, start="2024-01-01", end="2024-01-10", full_refresh=True)
+
+    assert provider.history_calls == [("AAPL", "2024-01-01", "2024-01-10"), ("MSFT", "2024-01-01", "2024-01-10")]
+    assert refreshed["summary"]["fetchedBarCount"] == 20
+    assert refreshed["summary"]["skippedBarCount"] == 0
+
+
+def test_bar_store_coverage_drives_gaps_and_exact_skipped_counts(tmp_path):
+    provider = _DailyProvider()
+    bar_store = LocalBarStore(root_dir=tmp_path)
+    MarketDataService(provider=provider, bar_store=bar_store).sync_market_data(
+        user_id="u-1",
+        symbols=["AAPL"],
+        start_date="2024-01-01",
+        end_date="2024-01-31",
+    )
+
+    # 新进程/新用户：本地已有的 bar 不再回源。
+    provider.history_calls.clear()
+    result = MarketDataService(provider=provider, bar_store=LocalBarStore(root_dir=tmp_path)).sync_market_data(
+        user_id="u-2",
+        symbols=["AAPL"],
+        start_date="2023-12-25",
+        end_date="2024-01-31",
+    )
+
+    assert provider.history_calls == [("AAPL", "2023-12-25", "2023-12-31")]
+    assert result["items"][0]["fetchedBarCount"] == 7
+    assert result["items"][0]["skippedBarCount"] == 31
+    assert result["items"][0]["rowCount"] == 38
+
+
+def test_partial_segment_overlap_is_estimated_by_time_share():
+    store = InMemoryMarketDataPipelineStore()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    store.record_coverage(
+        scope="global",
+        symbol="AAPL",
+        timeframe="1Day",
+        start=start,
+        end=start + timedelta(days=10) - timedelta(microseconds=1),
+        row_count=10,
+    )
+    store.record_coverage(
+        scope="global",
+        symbol="AAPL",
+        timeframe="1Day",
+        start=start + timedelta(days=5),
+        end=start + timedelta(days=15) - timedelta(microseconds=1),
+        row_count=10,
+    )
+
+    segments = store.list_coverage(scope="global", symbol="AAPL", timeframe="1Day")
+    assert len(segments) == 1
+    assert segments[0].row_count == 15
+    assert store.covered_row_count(
+        scope="global",
+        symbol="AAPL",
+        timeframe="1Day",
+        start=start,
+        end=start + timedelta(days=3) - timedelta(microseconds=1),
+    ) == 3
@@ -0,0 +1,100 @@
+"""指标序列缓存测试。"""
+
+from __future__ import annotations
+
+import math
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from market_data.indicators import IndicatorCache, IndicatorEngine
+
+_BASE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+_PRICES = [50.0 + 3.0 * math.sin(idx / 5.0) + 0.1 * (idx % 7) for idx in range(200)]
+_SCOPE = ("AAPL", "1Day", "2026-01-01")
+
+
+def _engine(prices: list[float], cache: IndicatorCache | None) -> IndicatorEngine:
+    timestamps = [_BASE + timedelta(days=idx) for idx in range(len(prices))]
+    return IndicatorEngine(prices, timestamps=timestamps, cache=cache, cache_scope=_SCOPE)
+
+
+def _compute_all(engine: IndicatorEngine) -> dict[str, list]:
+    macd_line, signal_line, histogram = engine.macd(12, 26, 9)
+    middle, upper, lower = engine.bollinger(20, 2.0)
+    return {
+        "ema": engine.ema(10),
+        "rsi": engine.rsi(14),
+        "macd": macd_line,
+        "signal": signal_line,
+        "histogram": histogram,
+        "middle": middle,
+        "upper": upper,
+    }
+
+
+def _assert_series_equal(actual: dict[str, list], expected: dict[str, list]) -> None:
+    for name, series in expected.items():
+        assert len(actual[name]) == len(series), name
+        for got, want in zip(actual[name], series):
+            if want is None:
+                assert got is None, name
+            else:
+                assert got == pytest.approx(want, rel=1e-9, abs=1e-9), name
+
+
+def test_identical_bars_hit_the_cache_without_recomputing():
+    cache = IndicatorCache()
+    first = _compute_all(_engine(_PRICES, cache))
+    recomputes = cache.stats()["recomputes"]
+
+    second = _compute_all(_engine(list(_PRICES), cache))
+
+    assert cache.stats()["recomputes"] == recomputes
+    assert second["macd"] is first["macd"]
+
+
+def test_appended_bars_extend_recurrence_state_instead_of_recomputing():
+    cache = IndicatorCache()
+    _compute_all(_engine(_PRICES[:180], cache))
+    recomputes = cache.stats()["recomputes"]
+
+    extended = _compute_all(_engine(_PRICES, cache))
+
+    stats = cache.stats()
+    assert stats["recomputes"] == recomputes
+    assert stats["extensions"] > 0
+    _assert_series_equal(extended, _compute_all(_engine(_PRICES, None)))
+
+
+def test_revised_history_invalidates_cached_series():
+    cache = IndicatorCache()
+    _compute_all(_engine(_PRICES[:180], cache))
+    revised = list(_PRICES)
+    revised[50] += 1.0
+    extensions = cache.stats()["extensions"]
+
+    result = _compute_all(_engine(revised, cache))
+
+    assert cache.stats()["extensions"] == extensions
+    _assert_series_equal(result, _compute_all(_engine(revised, None)))
+
+
+def test_series_still_in_warmup_are_recomputed_when_extended():
+    cache = IndicatorCache()
+    _engine(_PRICES[:10], cache).rsi(14)
+
+    series = _engine(_PRICES[:40], cache).rsi(14)
+
+    assert series[14] is not None
+    assert cache.stats()["extensions"] == 0
+
+
+def test_cached_bytes_cover_python_float_lists():
+    cache = IndicatorCache()
+    engine = _engine(_PRICES, cache)
+    series = engine.ema(10)
+
+    actual = sys.getsizeof(series) + sum(sys.getsizeof(value) for value in series if value is not None)
+    assert cache.stats()["bytes"] >= actual
@@ -0,0 +1,141 @@
+"""技术指标全序列引擎测试。"""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from market_data import indicators as indicators_module
+from market_data.domain import MarketCandle
+from market_data.indicators import IndicatorEngine
+from market_data.service import MarketDataService
+
+_PRICES = [100.0 + 5.0 * math.sin(idx / 7.0) + 0.3 * (idx % 5) for idx in range(120)]
+
+
+def _naive_ema(values: list[float], period: int) -> list[float]:
+    ema = sum(values[:period]) / period
+    series = [ema]
+    for value in values[period:]:
+        ema = (value - ema) * (2.0 / (period + 1.0)) + ema
+        series.append(ema)
+    return series
+
+
+def _naive_wilder_rsi(values: list[float], period: int) -> float:
+    deltas = [values[idx] - values[idx - 1] for idx in range(1, len(values))]
+    gain = sum(max(delta, 0.0) for delta in deltas[:period]) / period
+    loss = sum(max(-delta, 0.0) for delta in deltas[:period]) / period
+    for delta in deltas[period:]:
+        gain = (gain * (period - 1) + max(delta, 0.0)) / period
+        loss = (loss * (period - 1) + max(-delta, 0.0)) / period
+    return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+@pytest.fixture(params=["numpy", "python"])
+def engine(request, monkeypatch) -> IndicatorEngine:
+    if request.param == "python":
+        monkeypatch.setattr(indicators_module, "np", None)
+    elif indicators_module.np is None:
+        pytest.skip("numpy not installed")
+    return IndicatorEngine(_PRICES)
+
+
+def test_sma_and_bollinger_series_match_window_definitions(engine):
+    middle, upper, lower = engine.bollinger(20, 2.0)
+
+    assert middle is engine.sma(20)
+    assert middle[:19] == [None] * 19
+    for index in (19, 60, 119):
+        window = _PRICES[index - 19 : index + 1]
+        mean = sum(window) / 20
+        std = math.sqrt(sum((price - mean) ** 2 for price in window) / 20)
+        assert middle[index] == pytest.approx(mean, rel=1e-12)
+        assert upper[index] == pytest.approx(mean + 2 * std, rel=1e-9)
+        assert lower[index] == pytest.approx(mean - 2 * std, rel=1e-9)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "python"])
+def test_rolling_std_stays_exact_on_long_series(backend, monkeypatch):
+    if backend == "python":
+        monkeypatch.setattr(indicators_module, "np", None)
+    elif indicators_module.np is None:
+        pytest.skip("numpy not installed")
+    # 长序列 + 大幅漂移：全局中心化的 E[x²]-E[x]² 在此会丢失有效位。
+    prices = [5_000.0 + 0.01 * idx + 3.0 * math.sin(idx / 3.0) + 0.1 * (idx % 7) for idx in range(200_000)]
+
+    middle, upper, _lower = IndicatorEngine(prices).bollinger(20, 1.0)
+
+    for index in range(19, len(prices), 4_999):
+        window = prices[index - 19 : index + 1]
+        mean = sum(window) / 20
+        std = math.sqrt(sum((price - mean) ** 2 for price in window) / 20)
+        assert middle[index] == pytest.approx(mean, rel=1e-12)
+        assert upper[index] - middle[index] == pytest.approx(std, rel=1e-9)
+
+
+def test_ema_and_macd_series_match_prefix_recomputation(engine):
+    macd_line, signal_line, histogram = engine.macd(12, 26, 9)
+
+    assert engine.ema(12)[11:] == pytest.approx(_naive_ema(_PRICES, 12), rel=1e-12)
+    for index in (25, 40, 119):
+        prefix = _PRICES[: index + 1]
+        expected = _naive_ema(prefix, 12)[-1] - _naive_ema(prefix, 26)[-1]
+        assert macd_line[index] == pytest.approx(expected, rel=1e-9, abs=1e-12)
+    assert signal_line[:33] == [None] * 33
+    assert signal_line[-1] == pytest.approx(_naive_ema(macd_line[25:], 9)[-1], rel=1e-9)
+    assert histogram[-1] == pytest.approx(macd_line[-1] - signal_line[-1])
+
+
+def test_rsi_uses_wilder_smoothing(engine):
+    series = engine.rsi(14)
+
+    assert series[:14] == [None] * 14
+    assert series[-1] == pytest.approx(_naive_wilder_rsi(_PRICES, 14), rel=1e-12)
+    assert IndicatorEngine([1.0, 2.0, 3.0, 4.0]).rsi(3)[-1] == 100.0
+    assert IndicatorEngine([5.0, 5.0, 5.0, 5.0]).rsi(3)[-1] == 50.0
+
+
+class _Provider:
+    def history(self, **kwargs):
+        del kwargs
+        base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        return [
+            MarketCandle(
+                timestamp=base + timedelta(days=idx),
+                open_price=price,
+                high_price=price,
+                low_price=price,
+                close_price=price,
+                volume=1.0,
+            )
+            for idx, price in enumerate(_PRICES)
+        ]
+
+
+def test_calculate_indicators_returns_aligned_series_on_request():
+    service = MarketDataService(provider=_Provider())
+
+    result = service.calculate_indicators(
+        user_id="u-1",
+        symbol="aapl",
+        start_date="2026-01-01",
+        end_date="2026-05-01",
+        timeframe="1Day",
+        indicators=[
+            {"name": "macd", "series": True},
+            {"name": "bollinger", "period": 20},
+            {"name": "rsi", "period": 14},
+        ],
+    )
+
+    macd, bollinger, rsi = result["indicators"]
+    assert len(result["timestamps"]) == len(_PRICES)
+    assert len(macd["series"]) == len(macd["signalSeries"]) == len(_PRICES)
+    assert macd["series"][-1] == macd["value"]
+    assert macd["metadata"]["histogram"] == pytest.approx(macd["histogramSeries"][-1])
+    assert "series" not in bollinger
+    assert rsi["value"] == pytest.approx(_naive_wilder_rsi(_PRICES, 14))
+    assert rsi["metadata"]["smoothing"] == "wilder"
@@ -0,0 +1,107 @@
+"""报价 stale-while-revalidate 测试。"""
+
+from __future__ import annotations
+
+import threading
+
+from market_data.cache import BoundedTTLCache
+from market_data.domain import MarketQuote
+from market_data.service import MarketDataService
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Provider:
+    def __init__(self) -> None:
+        self.price = 1.0
+        self.calls: list[list[str]] = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def quote(self, *, symbol: str) -> MarketQuote:
+        return self.batch_quote(symbols=[symbol])[symbol]
+
+    def batch_quote(self, *, symbols: list[str]) -> dict[str, MarketQuote]:
+        self.calls.append(list(symbols))
+        self.release.wait(timeout=2)
+        return {symbol: MarketQuote(symbol=symbol, name=symbol, price=self.price) for symbol in symbols}
+
+
+def _service(provider: _Provider, clock: _Clock, **kwargs) -> MarketDataService:
+    return MarketDataService(
+        provider=provider,
+        cache=BoundedTTLCache(clock=clock),
+        quote_cache_ttl_seconds=3,
+        quote_stale_ttl_seconds=60,
+        rate_limit_max_requests=100,
+        **kwargs,
+    )
+
+
+def test_stale_quote_is_served_immediately_and_refreshed_once_in_background():
+    provider = _Provider()
+    clock = _Clock()
+    service = _service(provider, clock)
+    assert service.get_latest_quote(user_id="u-1", symbol="AAPL").source == "provider"
+
+    clock.now = 5
+    provider.price = 2.0
+    provider.release.clear()
+    first = service.get_latest_quote(user_id="u-1", symbol="AAPL")
+    second = service.get_latest_quote(user_id="u-1", symbol="aapl")
+
+    assert (first.source, first.quote.price, first.cache_hit) == ("stale", 1.0, True)
+    assert second.source == "stale"
+    provider.release.set()
+    service.close(wait=True)
+
+    # 两次 stale 读取只触发一次后台刷新。
+    assert provider.calls == [["AAPL"], ["AAPL"]]
+    fresh = service.get_latest_quote(user_id="u-1", symbol="AAPL")
+    assert (fresh.source, fresh.quote.price) == ("cache", 2.0)
+
+
+def test_quote_past_hard_ttl_blocks_on_provider():
+    provider = _Provider()
+    clock = _Clock()
+    service = _service(provider, clock)
+    service.get_latest_quote(user_id="u-1", symbol="AAPL")
+
+    clock.now = 61
+    result = service.get_latest_quote(user_id="u-1", symbol="AAPL")
+
+    assert result.source == "provider"
+    assert len(provider.calls) == 2
+
+
+def test_batch_quotes_mark_stale_items_and_refresh_them():
+    provider = _Provider()
+    clock = _Clock()
+    service = _service(provider, clock)
+    service.get_quotes(user_id="u-1", symbols=["AAPL", "MSFT"])
+
+    clock.now = 5
+    items = service.get_quotes(user_id="u-1", symbols=["AAPL", "MSFT", "TSLA"]).items
+
+    assert [item.source for item in items] == ["stale", "stale", "provider"]
+    service.close(wait=True)
+    assert sorted(sorted(call) for call in provider.calls[1:]) == [["AAPL", "MSFT"], ["TSLA"]]
+
+
+def test_hot_quotes_are_kept_warm():
+    provider = _Provider()
+    clock = _Clock()
+    service = _service(provider, clock, hot_quote_symbols=["aapl", "msft"])
+
+    assert service.refresh_hot_quotes() == 2
+    result = service.get_latest_quote(user_id="u-1", symbol="MSFT")
+
+    assert result.source == "cache"
+    assert provider.calls == [["AAPL", "MSFT"]]
+    assert MarketDataService(provider=provider).start_hot_quote_refresher() is False
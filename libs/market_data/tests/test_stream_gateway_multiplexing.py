@@ -0,0 +1,177 @@
+"""流网关按 symbol 多路复用测试。"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from market_data.domain import BatchQuoteItem, MarketQuote, UpstreamUnavailableError
+from market_data.fake_provider import FakeMarketDataProvider
+from market_data.service import BatchQuoteResult, MarketDataService
+from market_data.stream_gateway import MarketDataStreamGateway
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _QuoteReader:
+    def __init__(self) -> None:
+        self.prices: dict[str, float] = {}
+        self.failing: set[str] = set()
+        self.calls: list[list[str]] = []
+
+    def __call__(self, symbols: list[str]) -> BatchQuoteResult:
+        self.calls.append(list(symbols))
+        if self.failing.intersection(symbols):
+            raise UpstreamUnavailableError("upstream down")
+        now = datetime(2026, 2, 12, 9, 0, tzinfo=timezone.utc)
+        return BatchQuoteResult(
+            items=[
+                BatchQuoteItem(
+                    symbol=symbol,
+                    status="ok",
+                    quote=MarketQuote(symbol=symbol, name=symbol, price=self.prices.get(symbol, 1.0), timestamp=now),
+                )
+                for symbol in symbols
+            ],
+            timestamp=int(now.timestamp()),
+        )
+
+
+def _gateway(reader: _QuoteReader, clock: _Clock) -> MarketDataStreamGateway:
+    return MarketDataStreamGateway(
+        snapshot_reader=reader,
+        max_subscriptions_per_user=1000,
+        clock=clock,
+    )
+
+
+def test_many_subscribers_share_one_batch_quote_per_tick():
+    reader = _QuoteReader()
+    clock = _Clock()
+    gateway = _gateway(reader, clock)
+    subscriptions = [
+        gateway.subscribe(
+            user_id=f"u-{idx}",
+            symbols=["aapl", "msft"] if idx % 2 else ["aapl"],
+            channel="quote",
+            timeframe="1Min",
+        )
+        for idx in range(1000)
+    ]
+
+    fanout = gateway.tick()
+
+    assert reader.calls == [["AAPL", "MSFT"]]
+    assert len(fanout) == 1000
+    assert [event["symbol"] for event in fanout[subscriptions[1].id]] == ["AAPL", "MSFT"]
+    assert [event["symbol"] for event in fanout[subscriptions[0].id]] == ["AAPL"]
+    assert gateway.health()["subscribedSymbols"] == 2
+
+
+def test_unchanged_quotes_are_not_resent():
+    reader = _QuoteReader()
+    clock = _Clock()
+    gateway = _gateway(reader, clock)
+    subscription = gateway.subscribe(user_id="u-1", symbols=["AAPL", "MSFT"], channel="quote", timeframe="1Min")
+    gateway.tick()
+
+    assert gateway.tick() == {}
+
+    reader.prices["MSFT"] = 2.0
+    events = gateway.tick()[subscription.id]
+    assert [(event["symbol"], event["payload"]["price"]) for event in events] == [("MSFT", 2.0)]
+
+
+def test_polls_within_snapshot_ttl_reuse_the_shared_snapshot():
+    reader = _QuoteReader()
+    clock = _Clock()
+    gateway = _gateway(reader, clock)
+    first = gateway.subscribe(user_id="u-1", symbols=["AAPL"], channel="quote", timeframe="1Min")
+    second = gateway.subscribe(user_id="u-2", symbols=["AAPL"], channel="quote", timeframe="1Min")
+
+    assert len(gateway.poll_events(user_id="u-1", subscription_id=first.id)) == 1
+    assert len(gateway.poll_events(user_id="u-2", subscription_id=second.id)) == 1
+    assert len(reader.calls) == 1
+
+    # 新 symbol 只补拉缺失部分。
+    third = gateway.subscribe(user_id="u-3", symbols=["AAPL", "TSLA"], channel="quote", timeframe="1Min")
+    assert len(gateway.poll_events(user_id="u-3", subscription_id=third.id)) == 2
+    assert reader.calls[-1] == ["TSLA"]
+
+    clock.now = 5
+    gateway.poll_events(user_id="u-1", subscription_id=first.id)
+    assert reader.calls[-1] == ["AAPL", "TSLA"]
+
+
+def test_unsubscribe_drops_symbols_from_the_reverse_index():
+    reader = _QuoteReader()
+    clock = _Clock()
+    gateway = _gateway(reader, clock)
+    kept = gateway.subscribe(user_id="u-1", symbols=["AAPL"], channel="quote", timeframe="1Min")
+    dropped = gateway.subscribe(user_id="u-2", symbols=["AAPL", "NVDA"], channel="quote", timeframe="1Min")
+
+    gateway.unsubscribe(user_id="u-2", subscription_id=dropped.id)
+    gateway.tick()
+
+    assert reader.calls[-1] == ["AAPL"]
+    assert gateway.health()["subscribedSymbols"] == 1
+    gateway.clear_subscriptions(user_id=kept.user_id)
+    assert gateway.health()["subscribedSymbols"] == 0
+
+
+def test_failed_backfill_only_degrades_subscriptions_of_the_failed_symbols():
+    reader = _QuoteReader()
+    clock = _Clock()
+    gateway = _gateway(reader, clock)
+    healthy = gateway.subscribe(user_id="u-1", symbols=["AAPL"], channel="quote", timeframe="1Min")
+    assert len(gateway.poll_events(user_id="u-1", subscription_id=healthy.id)) == 1
+
+    reader.failing = {"TSLA"}
+    broken = gateway.subscribe(user_id="u-2", symbols=["TSLA"], channel="quote", timeframe="1Min")
+    mixed = gateway.subscribe(user_id="u-3", symbols=["AAPL", "TSLA"], channel="quote", timeframe="1Min")
+
+    broken_events = gateway.poll_events(user_id="u-2", subscription_id=broken.id)
+    assert [event["type"] for event in broken_events] == ["stream.degraded"]
+    assert broken_events[0]["payload"]["errorCode"] == "UPSTREAM_UNAVAILABLE"
+
+    mixed_events = gateway.poll_events(user_id="u-3", subscription_id=mixed.id)
+    assert [(event["type"], event["symbol"]) for event in mixed_events] == [
+        ("market.quote", "AAPL"),
+        ("stream.degraded", "*"),
+    ]
+
+    reader.prices["AAPL"] = 2.0
+    clock.now = 5
+    reader.failing = set()
+    healthy_events = gateway.poll_events(user_id="u-1", subscription_id=healthy.id)
+    assert [event["type"] for event in healthy_events] == ["market.quote"]
+
+
+def test_shared_snapshot_reads_do_not_consume_any_user_quote_limit():
+    service = MarketDataService(
+        provider=FakeMarketDataProvider(prices={"AAPL": 100.0}),
+        quote_cache_ttl_seconds=0,
+        rate_limit_max_requests=1,
+        rate_limit_window_seconds=60,
+    )
+    clock = _Clock()
+    gateway = MarketDataStreamGateway(
+        snapshot_reader=lambda symbols: service.get_shared_quotes(symbols=symbols),
+        snapshot_ttl_seconds=0,
+        clock=clock,
+    )
+    subscription = gateway.subscribe(user_id="u-1", symbols=["AAPL"], channel="quote", timeframe="1Min")
+
+    for _ in range(5):
+        gateway.tick()
+    events = gateway.poll_events(user_id="u-1", subscription_id=subscription.id)
+
+    assert all(event["type"] != "stream.degraded" for event in events)
+    assert gateway.health()["status"] == "ok"
+    # 用户自身的限额仍完整可用。
+    assert service.get_quotes(user_id="u-1", symbols=["AAPL"]).items[0].status == "ok"
@@ -0,0 +1,115 @@
+"""服务端推送流测试。"""
+
+from __future__ import annotations
+
+import asyncio
+
+from market_data.fake_provider import FakeMarketDataProvider
+from market_data.service import MarketDataService
+from market_data.stream_gateway import MarketDataStreamGateway
+from market_data.stream_push import ConflatingEventQueue, MarketDataPushStream
+
+
+def _event(subscription_id: str, symbol: str, price: float) -> dict:
+    return {"type": "market.quote", "subscriptionId": subscription_id, "symbol": symbol, "payload": {"price": price}}
+
+
+def _setup(prices: dict[str, float]) -> tuple[FakeMarketDataProvider, MarketDataStreamGateway, MarketDataPushStream]:
+    provider = FakeMarketDataProvider(prices=prices)
+    service = MarketDataService(provider=provider, quote_cache_ttl_seconds=0, rate_limit_max_requests=1000)
+    gateway = MarketDataStreamGateway(
+        snapshot_reader=lambda symbols: service.get_shared_quotes(symbols=symbols),
+        snapshot_ttl_seconds=0,
+    )
+    return provider, gateway, MarketDataPushStream(gateway=gateway, refresh_interval_seconds=60)
+
+
+def test_queue_conflates_same_symbol_and_keeps_position():
+    queue = ConflatingEventQueue(max_size=8)
+    queue.put(_event("s1", "AAPL", 1.0))
+    queue.put(_event("s1", "MSFT", 2.0))
+    queue.put(_event("s1", "AAPL", 3.0))
+
+    async def drain() -> list[dict]:
+        return [await queue.get(), await queue.get()]
+
+    events = asyncio.run(drain())
+
+    assert [(event["symbol"], event["payload"]["price"]) for event in events] == [("AAPL", 3.0), ("MSFT", 2.0)]
+    assert queue.stats()["conflated"] == 1
+
+
+def test_queue_drops_oldest_when_full():
+    queue = ConflatingEventQueue(max_size=2)
+    for symbol in ["AAPL", "MSFT", "TSLA"]:
+        queue.put(_event("s1", symbol, 1.0))
+
+    async def drain() -> list[str]:
+        return [(await queue.get())["symbol"] for _ in range(len(queue))]
+
+    assert asyncio.run(drain()) == ["MSFT", "TSLA"]
+    assert queue.stats()["dropped"] == 1
+
+
+def test_tick_once_pushes_only_changed_quotes():
+    provider, gateway, push_stream = _setup({"AAPL": 100.0, "MSFT": 200.0})
+    subscription = gateway.subscribe(user_id="u-1", symbols=["AAPL", "MSFT"], channel="quote", timeframe="1Min")
+
+    async def scenario() -> tuple[list[dict], int, list[dict]]:
+        queue = push_stream.open_queue()
+        push_stream.attach(subscription_id=subscription.id, queue=queue)
+        await push_stream.tick_once()
+        first = [await queue.get() for _ in range(len(queue))]
+
+        unchanged = await push_stream.tick_once()
+
+        provider.set_price("MSFT", 201.0)
+        await push_stream.tick_once()
+        second = [await queue.get() for _ in range(len(queue))]
+        push_stream.close_queue(queue)
+        await push_stream.stop()
+        return first, unchanged, second
+
+    first, unchanged, second = asyncio.run(scenario())
+
+    assert [event["symbol"] for event in first] == ["AAPL", "MSFT"]
+    assert unchanged == 0
+    assert [(event["symbol"], event["payload"]["price"]) for event in second] == [("MSFT", 201.0)]
+    assert all(calls == ["AAPL", "MSFT"] for calls in provider.batch_calls)
+
+
+def test_push_ticks_leave_pull_subscriptions_untouched():
+    _, gateway, push_stream = _setup({"AAPL": 100.0})
+    pushed = gateway.subscribe(user_id="u-1", symbols=["AAPL"], channel="quote", timeframe="1Min")
+    pulled = gateway.subscribe(user_id="u-2", symbols=["AAPL"], channel="quote", timeframe="1Min")
+
+    async def scenario() -> int:
+        queue = push_stream.open_queue()
+        push_stream.attach(subscription_id=pushed.id, queue=queue)
+        delivered = await push_stream.tick_once()
+        push_stream.close_queue(queue)
+        await push_stream.stop()
+        return delivered
+
+    assert asyncio.run(scenario()) == 1
+    assert len(gateway.poll_events(user_id="u-2", subscription_id=pulled.id)) == 1
+    assert push_stream.stats()["routedSubscriptions"] == 0
+
+
+def test_producer_loop_delivers_until_last_queue_closes():
+    _, gateway, _ = _setup({"AAPL": 100.0})
+    push_stream = MarketDataPushStream(gateway=gateway, refresh_interval_seconds=0.01)
+    subscription = gateway.subscribe(user_id="u-1", symbols=["AAPL"], channel="quote", timeframe="1Min")
+
+    async def scenario() -> tuple[dict, bool]:
+        queue = push_stream.open_queue()
+        push_stream.attach(subscription_id=subscription.id, queue=queue)
+        event = await asyncio.wait_for(queue.get(), timeout=2)
+        push_stream.close_queue(queue)
+        await asyncio.sleep(0.05)
+        return event, push_stream.stats()["producerRunning"]
+
+    event, running = asyncio.run(scenario())
+
+    assert event["symbol"] == "AAPL"
+    assert running is False
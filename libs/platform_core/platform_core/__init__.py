@@ -4,10 +4,14 @@
 """
 
 from platform_core.callback_contract import require_explicit_keyword_parameters
+from platform_core.rate_limit import GCRARateLimiter, InMemoryRateLimitBackend, RateLimitBackend
 from platform_core.uow import NoopUnitOfWork, SnapshotUnitOfWork, UnitOfWork
 
 __all__ = [
     "require_explicit_keyword_parameters",
+    "GCRARateLimiter",
+    "InMemoryRateLimitBackend",
+    "RateLimitBackend",
     "UnitOfWork",
     "NoopUnitOfWork",
     "SnapshotUnitOfWork",
@@ -0,0 +1,122 @@
+"""按 key 的 GCRA 限流器。
+
+GCRA（Generic Cell Rate Algorithm）每个 key 只保存一个浮点数 TAT（理论到达时间）：
+- 允许 `window_seconds` 内最多 `max_requests` 次突发，之后按 `window_seconds / max_requests` 匀速放行；
+- TAT 早于当前时刻的 key 与全新 key 等价，可直接删除，因此空闲 key 由清扫回收；
+- 状态存放在 `RateLimitBackend` 中，多副本共享同一个后端即可执行同一份限额。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Protocol, runtime_checkable
+
+# 吸收 TAT 累加的浮点误差，避免恰好第 max_requests 次被误拒。
+_EPSILON = 1e-9
+
+
+@runtime_checkable
+class RateLimitBackend(Protocol):
+    """限流状态存储。实现需保证 `compare_and_set` 的原子性（如 Redis WATCH/Lua）。"""
+
+    def get(self, key: str) -> float | None: ...
+
+    def compare_and_set(self, key: str, *, expected: float | None, value: float, ttl_seconds: float) -> bool: ...
+
+
+class InMemoryRateLimitBackend:
+    """进程内后端：过期时间到达后由周期清扫删除 key。
+
+    多个限流器实例共享同一个对象时可模拟多副本共享后端。
+    """
+
+    def __init__(
+        self,
+        *,
+        sweep_interval_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._sweep_interval_seconds = max(0.0, float(sweep_interval_seconds))
+        self._clock = clock
+        self._values: dict[str, tuple[float, float]] = {}
+        self._next_sweep_at = clock() + self._sweep_interval_seconds
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> float | None:
+        with self._lock:
+            return self._get_locked(key, now=self._clock())
+
+    def compare_and_set(self, key: str, *, expected: float | None, value: float, ttl_seconds: float) -> bool:
+        with self._lock:
+            now = self._clock()
+            if self._get_locked(key, now=now) != expected:
+                return False
+            self._values[key] = (value, now + max(float(ttl_seconds), 0.0))
+            if now >= self._next_sweep_at:
+                self._next_sweep_at = now + self._sweep_interval_seconds
+                self._sweep_locked(now)
+            return True
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._sweep_locked(self._clock())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._values)
+
+    def _get_locked(self, key: str, *, now: float) -> float | None:
+        item = self._values.get(key)
+        if item is None:
+            return None
+        if item[1] <= now:
+            self._values.pop(key, None)
+            return None
+        return item[0]
+
+    def _sweep_locked(self, now: float) -> int:
+        expired = [key for key, (_, expires_at) in self._values.items() if expires_at <= now]
+        for key in expired:
+            self._values.pop(key, None)
+        return len(expired)
+
+
+class GCRARateLimiter:
+    def __init__(
+        self,
+        *,
+        max_requests: int,
+        window_seconds: float,
+        backend: RateLimitBackend | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_requests <= 0:
+            raise ValueError("max_requests must be > 0")
+        if window_seconds <= 0:
+            raise ValueError("window_seconds must be > 0")
+        self._window_seconds = float(window_seconds)
+        self._emission_interval = self._window_seconds / int(max_requests)
+        self._clock = clock
+        self._backend = backend if backend is not None else InMemoryRateLimitBackend(clock=clock)
+
+    def consume(self, key: str) -> bool:
+        while True:
+            now = self._clock()
+            stored = self._backend.get(key)
+            new_tat = max(stored if stored is not None else now, now) + self._emission_interval
+            if new_tat - now > self._window_seconds + _EPSILON:
+                return False
+            # TAT 过去后 key 等价于不存在，过期时间取到 TAT 为止。
+            if self._backend.compare_and_set(key, expected=stored, value=new_tat, ttl_seconds=new_tat - now):
+                return True
+
+    def retry_after(self, key: str) -> float:
+        """距离下一次可放行的秒数；当前即可放行时返回 0。"""
+
+        stored = self._backend.get(key)
+        if stored is None:
+            return 0.0
+        now = self._clock()
+        return max(0.0, stored + self._emission_interval - self._window_seconds - now)
@@ -0,0 +1,80 @@
+"""GCRA 限流器测试。"""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from platform_core.rate_limit import GCRARateLimiter, InMemoryRateLimitBackend
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_allows_burst_then_paces_at_emission_interval():
+    clock = _Clock()
+    limiter = GCRARateLimiter(max_requests=3, window_seconds=1, clock=clock)
+
+    assert [limiter.consume("u1") for _ in range(4)] == [True, True, True, False]
+    assert limiter.retry_after("u1") == pytest.approx(1 / 3)
+    assert limiter.consume("u2") is True
+
+    clock.now += 1 / 3
+    assert limiter.consume("u1") is True
+    assert limiter.consume("u1") is False
+
+    clock.now += 1
+    assert [limiter.consume("u1") for _ in range(4)] == [True, True, True, False]
+
+
+def test_stores_one_value_per_key_and_sweeps_idle_keys():
+    clock = _Clock()
+    backend = InMemoryRateLimitBackend(sweep_interval_seconds=10, clock=clock)
+    limiter = GCRARateLimiter(max_requests=20, window_seconds=10, backend=backend, clock=clock)
+
+    for idx in range(50):
+        for _ in range(5):
+            limiter.consume(f"user-{idx}")
+    assert len(backend) == 50
+
+    clock.now += 11
+    limiter.consume("fresh")
+
+    assert len(backend) == 1
+
+
+def test_shared_backend_enforces_one_limit_across_replicas():
+    clock = _Clock()
+    backend = InMemoryRateLimitBackend(clock=clock)
+    replicas = [GCRARateLimiter(max_requests=4, window_seconds=1, backend=backend, clock=clock) for _ in range(2)]
+
+    allowed = [replicas[idx % 2].consume("u1") for idx in range(6)]
+
+    assert allowed == [True, True, True, True, False, False]
+
+
+def test_concurrent_consumers_never_exceed_the_limit():
+    limiter = GCRARateLimiter(max_requests=50, window_seconds=60)
+    barrier = threading.Barrier(8)
+    results: list[bool] = []
+    lock = threading.Lock()
+
+    def _worker():
+        barrier.wait()
+        local = [limiter.consume("u1") for _ in range(20)]
+        with lock:
+            results.extend(local)
+
+    threads = [threading.Thread(target=_worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(results) == 50
@@ -5,7 +5,11 @@ from __future__ import annotations
 import pytest
 
 from apps.backend_app.router_registry import build_context
-from apps.backend_app.settings import CompositionSettings, normalize_job_executor_mode
+from apps.backend_app.settings import (
+    CompositionSettings,
+    normalize_job_executor_mode,
+    normalize_job_executor_workers,
+)
 from backtest_runner.repository import InMemoryBacktestRepository
 from backtest_runner.repository_postgres import PostgresBacktestRepository
 from backtest_runner.result_store import InMemoryBacktestResultStore
@@ -129,6 +133,14 @@ def test_normalize_job_executor_mode_supports_inprocess_and_celery_adapter():
     assert normalize_job_executor_mode("celery-adapter") == "celery-adapter"
 
 
+def test_normalize_job_executor_mode_supports_processpool_and_worker_count():
+    assert normalize_job_executor_mode("ProcessPool") == "processpool"
+    assert normalize_job_executor_workers(None) == 2
+    assert normalize_job_executor_workers("4") == 4
+    with pytest.raises(ValueError, match="job_executor_workers"):
+        normalize_job_executor_workers("0")
+
+
 def test_composition_settings_reads_job_executor_mode_from_env(monkeypatch):
     monkeypatch.setenv("BACKEND_JOB_EXECUTOR_MODE", "celery-adapter")
 